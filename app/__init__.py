@@ -31,9 +31,13 @@ from .models.user import User
 # Email processing components
 from .email.processing.processor import EmailProcessor
 from .email.parsing.parser import EmailParser
+from .email.parsing.body_reducer import default_body_reducer
 from .email.models.analysis_settings import ProcessingConfig
 from .email.analyzers.semantic.analyzer import SemanticAnalyzer
+from .email.analyzers.semantic.utilities.llm_dispatcher import get_llm_dispatcher
 from .email.analyzers.content.core.nlp_subprocess_analyzer import ContentAnalyzerSubprocess
+from .email.analyzers.content.core.nlp_analyzer import ContentAnalyzer, THROUGHPUT_MODE
+from .email.analyzers.content.processing.worker_pool import get_worker_pool, close_worker_pool
 from .email.utils.priority_scorer import PriorityScorer
 from .email.pipeline.orchestrator import create_pipeline
 from .email.clients.gmail.client_subprocess import GmailClientSubprocess
@@ -41,6 +45,9 @@ from .email.storage.redis_cache import RedisEmailCache
 
 # Utility imports
 from .utils.memory_profiling import MemoryProfilingMiddleware
+from .email.utils.connection_pool import close_all_pools
+from .email.processing.send_queue import create_outbound_queue, OutboundSender
+from .email.processing.deferred_analysis import create_deferred_batch_store, DeferredAnalysisPoller
 
 # Service initialization
 from .services.openai_service import init_openai_client
@@ -70,6 +77,7 @@ class ASGIApp:
         Args:
             app: The Flask application to wrap.
         """
+        self.flask_app = app
         self.app = WsgiToAsgi(app)
     
     async def __call__(self, scope, receive, send):
@@ -87,11 +95,35 @@ class ASGIApp:
             while True:
                 message = await receive()
                 if message["type"] == "lifespan.startup":
-                    # Perform any startup tasks
+                    # Resume delivering any emails left queued by a previous run
+                    sender = getattr(self.flask_app, 'outbound_sender', None)
+                    if sender is not None:
+                        sender.start()
+                    # Resume collecting Batch API analyses submitted before a restart
+                    deferred = getattr(self.flask_app, 'deferred_analysis', None)
+                    if deferred is not None:
+                        deferred.start()
+                    # Pre-warm NLP workers so the first request doesn't pay for model load
+                    nlp_pool = getattr(self.flask_app, 'nlp_worker_pool', None)
+                    if nlp_pool is not None:
+                        nlp_pool.start()
+                    # Open the worker's persistent OpenAI client before the first request
+                    openai_manager = getattr(self.flask_app, 'openai_client_manager', None)
+                    if openai_manager is not None:
+                        openai_manager.start()
                     await send({"type": "lifespan.startup.complete"})
                 elif message["type"] == "lifespan.shutdown":
                     # Perform any cleanup
-                    await self.app.close_openai_client()
+                    sender = getattr(self.flask_app, 'outbound_sender', None)
+                    if sender is not None:
+                        sender.stop()
+                    deferred = getattr(self.flask_app, 'deferred_analysis', None)
+                    if deferred is not None:
+                        deferred.stop()
+                    close_all_pools()
+                    close_worker_pool()
+                    if hasattr(self.flask_app, 'close_openai_client'):
+                        self.flask_app.close_openai_client()
                     await self.app.close_redis_client()
                     await send({"type": "lifespan.shutdown.complete"})
                     return
@@ -164,14 +196,48 @@ def create_app(config_class: Optional[object] = Config) -> Flask:
             # Initialize Redis (if needed)
             init_redis_client(flask_app)
         
+        processing_config = ProcessingConfig(NLP_PROFILE=flask_app.config.get('NLP_PROFILE', 'full'))
+        
         # Initialize analyzers
-        text_analyzer = ContentAnalyzerSubprocess()
-        llm_analyzer = SemanticAnalyzer()
+        if flask_app.config.get('CONTENT_ANALYZER_MODE') == THROUGHPUT_MODE:
+            text_analyzer = ContentAnalyzer(
+                mode=THROUGHPUT_MODE,
+                profile=processing_config.NLP_PROFILE,
+                pipe_batch_size=flask_app.config.get('NLP_PIPE_BATCH_SIZE', 64),
+                n_process=flask_app.config.get('NLP_N_PROCESS', 1),
+                reload_rss_growth_mb=flask_app.config.get('NLP_RELOAD_RSS_GROWTH_MB', 200)
+            )
+        else:
+            flask_app.nlp_worker_pool = get_worker_pool(
+                size=flask_app.config.get('NLP_POOL_SIZE', 1),
+                max_docs=flask_app.config.get('NLP_WORKER_MAX_DOCS', 500),
+                max_rss_mb=flask_app.config.get('NLP_WORKER_MAX_RSS_MB', 700),
+                profile=processing_config.NLP_PROFILE
+            )
+            text_analyzer = ContentAnalyzerSubprocess(worker_pool=flask_app.nlp_worker_pool)
+        get_llm_dispatcher(
+            max_concurrency=flask_app.config.get('LLM_MAX_CONCURRENCY', 8),
+            tokens_per_minute=flask_app.config.get('LLM_TOKENS_PER_MINUTE', 200000),
+            requests_per_minute=flask_app.config.get('LLM_REQUESTS_PER_MINUTE', 500),
+            max_retries=flask_app.config.get('LLM_MAX_RETRIES', 4)
+        )
+        llm_analyzer = SemanticAnalyzer(
+            pack_emails=flask_app.config.get('LLM_PACK_EMAILS', True),
+            pack_token_budget=flask_app.config.get('LLM_PACK_TOKEN_BUDGET', 6000),
+            max_pack_size=flask_app.config.get('LLM_MAX_PACK_SIZE', 8),
+            email_token_target=flask_app.config.get('LLM_EMAIL_TOKEN_TARGET', 1400),
+            cascade_enabled=flask_app.config.get('LLM_CASCADE_ENABLED', False),
+            cascade_model=flask_app.config.get('LLM_CASCADE_MODEL', 'gpt-4o-mini'),
+            cascade_response_tokens=flask_app.config.get('LLM_CASCADE_RESPONSE_TOKENS', 200),
+            cascade_confidence_threshold=flask_app.config.get('LLM_CASCADE_CONFIDENCE_THRESHOLD', 0.8),
+            local_classifier_path=flask_app.config.get('LOCAL_CLASSIFIER_PATH'),
+            local_classifier_threshold=flask_app.config.get('LOCAL_CLASSIFIER_THRESHOLD', 0.9)
+        )
         
         # Create priority calculator
         priority_calculator = PriorityScorer(
             vip_senders=set(flask_app.config.get('VIP_SENDERS', [])),
-            config=ProcessingConfig()
+            config=processing_config
         )
         priority_calculator.set_priority_threshold(50)
 
@@ -192,12 +258,39 @@ def create_app(config_class: Optional[object] = Config) -> Flask:
         # Create cache with function to get Redis client
         cache = RedisEmailCache(flask_app.get_redis_client)
         
+        # Older emails of large backfills go to the Batch API, collected in the background
+        if flask_app.config.get('DEFERRED_ANALYSIS_ENABLED'):
+            flask_app.deferred_analysis = DeferredAnalysisPoller(
+                create_deferred_batch_store(flask_app),
+                cache,
+                processor.complete_deferred_email,
+                app=flask_app,
+                poll_interval=flask_app.config.get('DEFERRED_ANALYSIS_POLL_INTERVAL', 60),
+                defer_after_days=flask_app.config.get('DEFERRED_ANALYSIS_AFTER_DAYS', 3),
+                min_emails=flask_app.config.get('DEFERRED_ANALYSIS_MIN_EMAILS', 20)
+            )
+            processor.deferred_analysis = flask_app.deferred_analysis
+        
         # Create and store pipeline
         flask_app.pipeline = create_pipeline(
             connection=gmail_client,
             parser=parser,
             processor=processor,
-            cache=cache
+            cache=cache,
+            body_reducer=default_body_reducer if flask_app.config.get('BODY_REDUCTION_ENABLED', True) else None,
+            thread_aware=flask_app.config.get('THREAD_AWARE_ANALYSIS', True)
+        )
+        
+        # Outbound email queue, drained by a background sender started on first use
+        flask_app.send_queue = create_outbound_queue(flask_app)
+        flask_app.outbound_sender = OutboundSender(
+            flask_app.send_queue,
+            app=flask_app,
+            concurrency=flask_app.config.get('SEND_QUEUE_CONCURRENCY', 2),
+            max_attempts=flask_app.config.get('SEND_QUEUE_MAX_ATTEMPTS', 4),
+            max_poll_interval=flask_app.config.get('SEND_QUEUE_MAX_POLL_INTERVAL', 30),
+            sweep_interval=flask_app.config.get('SEND_QUEUE_SWEEP_INTERVAL', 60),
+            heartbeat_interval=flask_app.config.get('SEND_QUEUE_CLAIM_TIMEOUT', 300) / 5
         )
         
         # User authentication and session management
@@ -13,6 +13,7 @@ from google.oauth2 import id_token
 from google.auth.transport import requests
 
 from .utils import get_oauth_config, create_or_update_user, SCOPES
+from app.email.clients.gmail.core.token_cache import serialize_expiry
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -143,7 +144,8 @@ async def oauth2callback():
             'client_id': credentials.client_id,
             'client_secret': credentials.client_secret,
             'scopes': credentials.scopes,
-            'id_token': credentials.id_token
+            'id_token': credentials.id_token,
+            'expiry': serialize_expiry(credentials.expiry)
         }
         
         # Create or update user
@@ -44,12 +44,88 @@ class Config:
         self.SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD') or self.IMAP_PASSWORD
         self.SUPPORT_EMAIL = os.environ.get('SUPPORT_EMAIL') or 'support@shronas.com'
         
+        # Pooled IMAP/SMTP sessions per account
+        self.MAIL_POOL_MAX_CONNECTIONS = int(os.environ.get('MAIL_POOL_MAX_CONNECTIONS') or 2)
+        self.MAIL_POOL_IDLE_TIMEOUT = float(os.environ.get('MAIL_POOL_IDLE_TIMEOUT') or 120)
+        
+        # Google OAuth client, also used by the send queue to build Gmail credentials
+        self.GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
+        self.GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
+        
+        # Outbound send queue ('redis' or 'memory') and background sender settings
+        self.SEND_QUEUE_BACKEND = os.environ.get('SEND_QUEUE_BACKEND')
+        self.SEND_QUEUE_CONCURRENCY = int(os.environ.get('SEND_QUEUE_CONCURRENCY') or 2)
+        self.SEND_QUEUE_MAX_ATTEMPTS = int(os.environ.get('SEND_QUEUE_MAX_ATTEMPTS') or 4)
+        self.SEND_QUEUE_STATUS_TTL = int(os.environ.get('SEND_QUEUE_STATUS_TTL') or 86400)
+        self.SEND_QUEUE_CLAIM_TIMEOUT = float(os.environ.get('SEND_QUEUE_CLAIM_TIMEOUT') or 300)
+        self.SEND_QUEUE_MAX_POLL_INTERVAL = float(os.environ.get('SEND_QUEUE_MAX_POLL_INTERVAL') or 30)
+        self.SEND_QUEUE_SWEEP_INTERVAL = float(os.environ.get('SEND_QUEUE_SWEEP_INTERVAL') or 60)
+        
+        # Batch API analysis of the older emails of large backfills; pending batches
+        # are stored in 'redis' or 'memory' and polled in the background
+        self.DEFERRED_ANALYSIS_ENABLED = os.environ.get('DEFERRED_ANALYSIS_ENABLED', 'false').lower() == 'true'
+        self.DEFERRED_ANALYSIS_BACKEND = os.environ.get('DEFERRED_ANALYSIS_BACKEND')
+        self.DEFERRED_ANALYSIS_AFTER_DAYS = int(os.environ.get('DEFERRED_ANALYSIS_AFTER_DAYS') or 3)
+        self.DEFERRED_ANALYSIS_MIN_EMAILS = int(os.environ.get('DEFERRED_ANALYSIS_MIN_EMAILS') or 20)
+        self.DEFERRED_ANALYSIS_POLL_INTERVAL = float(os.environ.get('DEFERRED_ANALYSIS_POLL_INTERVAL') or 60)
+        
+        # Persistent SpaCy worker processes, restarted after N documents or an RSS ceiling
+        self.NLP_POOL_SIZE = int(os.environ.get('NLP_POOL_SIZE') or 1)
+        self.NLP_WORKER_MAX_DOCS = int(os.environ.get('NLP_WORKER_MAX_DOCS') or 500)
+        self.NLP_WORKER_MAX_RSS_MB = int(os.environ.get('NLP_WORKER_MAX_RSS_MB') or 700)
+        
+        # Content analyzer: 'subprocess' (worker pool) or 'throughput' (in-process nlp.pipe)
+        # NLP_PROFILE: 'full' (parser), 'fast' (NER + senter) or 'minimal' (rule-based only)
+        self.NLP_PROFILE = os.environ.get('NLP_PROFILE') or 'full'
+        self.CONTENT_ANALYZER_MODE = os.environ.get('CONTENT_ANALYZER_MODE') or 'subprocess'
+        self.NLP_PIPE_BATCH_SIZE = int(os.environ.get('NLP_PIPE_BATCH_SIZE') or 64)
+        self.NLP_N_PROCESS = int(os.environ.get('NLP_N_PROCESS') or 1)
+        self.NLP_RELOAD_RSS_GROWTH_MB = int(os.environ.get('NLP_RELOAD_RSS_GROWTH_MB') or 200)
+        
+        # Strip quoted replies, signatures and footers from bodies before analysis
+        self.BODY_REDUCTION_ENABLED = os.environ.get('BODY_REDUCTION_ENABLED', 'true').lower() != 'false'
+        
+        # Analyze only the newest new message of each thread, with earlier ones as context
+        self.THREAD_AWARE_ANALYSIS = os.environ.get('THREAD_AWARE_ANALYSIS', 'true').lower() != 'false'
+        
+        # Pack several emails into one LLM request, up to a prompt token budget
+        self.LLM_PACK_EMAILS = os.environ.get('LLM_PACK_EMAILS', 'true').lower() != 'false'
+        self.LLM_PACK_TOKEN_BUDGET = int(os.environ.get('LLM_PACK_TOKEN_BUDGET') or 6000)
+        self.LLM_MAX_PACK_SIZE = int(os.environ.get('LLM_MAX_PACK_SIZE') or 8)
+        
+        # Prompt tokens for each email's part of a prompt (body and NLP context)
+        self.LLM_EMAIL_TOKEN_TARGET = int(os.environ.get('LLM_EMAIL_TOKEN_TARGET') or 1400)
+        
+        # Triage batches with a cheap model first, escalating uncertain, Work or needs-action emails
+        self.LLM_CASCADE_ENABLED = os.environ.get('LLM_CASCADE_ENABLED', 'false').lower() == 'true'
+        self.LLM_CASCADE_MODEL = os.environ.get('LLM_CASCADE_MODEL') or 'gpt-4o-mini'
+        self.LLM_CASCADE_RESPONSE_TOKENS = int(os.environ.get('LLM_CASCADE_RESPONSE_TOKENS') or 200)
+        self.LLM_CASCADE_CONFIDENCE_THRESHOLD = float(os.environ.get('LLM_CASCADE_CONFIDENCE_THRESHOLD') or 0.8)
+        
+        # Local classifier artifact (scripts/train_local_classifier.py); confident Promotions and
+        # Informational predictions skip the LLM. Disabled when unset.
+        self.LOCAL_CLASSIFIER_PATH = os.environ.get('LOCAL_CLASSIFIER_PATH') or None
+        self.LOCAL_CLASSIFIER_THRESHOLD = float(os.environ.get('LOCAL_CLASSIFIER_THRESHOLD') or 0.9)
+        
+        # LLM request dispatching: concurrency cap, per-minute budgets and retries
+        self.LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY') or 8)
+        self.LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE') or 200000)
+        self.LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE') or 500)
+        self.LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES') or 4)
+        
         # Load environment variables into config
         self.REDIS_TOKEN = os.environ.get('REDIS_TOKEN')
         self.REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379')
 
         # OpenAI Configuration
         self.OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY') or 'your-default-openai-key'
+        
+        # Persistent OpenAI client: request timeout and connection pool limits
+        self.OPENAI_TIMEOUT = float(os.environ.get('OPENAI_TIMEOUT') or 60)
+        self.OPENAI_MAX_CONNECTIONS = int(os.environ.get('OPENAI_MAX_CONNECTIONS') or 20)
+        self.OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get('OPENAI_MAX_KEEPALIVE_CONNECTIONS') or 10)
+        self.OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get('OPENAI_KEEPALIVE_EXPIRY') or 60)
+        self.OPENAI_HTTP2 = os.environ.get('OPENAI_HTTP2', 'true').lower() != 'false'
 
         # Database Configuration
         database_url = os.environ.get('DATABASE_URL', 'postgresql://localhost/beacon')
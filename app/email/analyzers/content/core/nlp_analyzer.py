@@ -14,6 +14,7 @@ Key Features:
 - Email pattern analysis (bulk, automated)
 - Memory-efficient batch processing
 - Automatic model reloading to prevent memory leaks
+- Throughput mode: one nlp.pipe pass per batch, reloading only on RSS growth
 
 Example::
 
@@ -30,39 +31,58 @@ Memory Management:
 - SpaCy document cleanup
 - Model reloading after threshold
 - Reference clearing
+
+In throughput mode (``ContentAnalyzer(nlp_model, mode='throughput')``) the whole
+batch goes through a single ``nlp.pipe`` call with a tuned batch size (and
+optionally several processes). Each Doc is reduced to plain Python structures
+as soon as it is yielded and is not kept, so no per-document cleanup or forced
+garbage collection is needed. Instead of reloading the model on a fixed
+schedule, the process RSS is measured after each batch and the model is only
+reloaded once it has grown by more than ``reload_rss_growth_mb`` since the
+model was loaded.
 """
 
 import spacy
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set, Union
 from concurrent.futures import ThreadPoolExecutor
+import os
 import time
 import logging
 import asyncio
 import gc
+import psutil
 from app.utils.memory_profiling import log_memory_usage
 
 from ...base import BaseAnalyzer
-from ..utils.spacy_utils import load_optimized_model, cleanup_doc
+from ....parsing.normalized_text import NormalizedText, as_normalized
+from ..utils.spacy_utils import load_optimized_model, cleanup_doc, validate_profile, PROFILE_FULL
 from ..utils.pattern_matchers import (
-    analyze_sentiment,
-    detect_email_patterns,
-    check_urgency,
+    scan_text,
+    scan_texts,
+    has_html_indicator,
+    extract_key_phrases_regex,
     VALID_ENTITY_LABELS,
-    HTML_INDICATORS,
     QUESTION_WORDS,
     MODAL_VERBS,
-    DEADLINE_WORDS
+    DEADLINE_WORD_PATTERN
 )
+from ..utils.temporal_extractor import extract_time_sensitivity
 from ..utils.result_formatter import (
     create_error_response,
     format_nlp_result,
     _format_sentiment,
     _format_email_patterns,
-    _format_questions,
     _format_time_sensitivity,
     _format_structural_elements
 )
 
+# Maximum characters of clean text analyzed per email
+MAX_TEXT_CHARS = 30000
+
+# Analyzer modes
+STANDARD_MODE = 'standard'
+THROUGHPUT_MODE = 'throughput'
+
 class ContentAnalyzer(BaseAnalyzer):
     """SpaCy-based content analyzer for processing email texts.
     
@@ -75,41 +95,84 @@ class ContentAnalyzer(BaseAnalyzer):
         model_name: Name of the SpaCy model being used.
         nlp: SpaCy language model instance.
         batch_size: Size of batches for processing texts.
+        mode: 'standard' or 'throughput'.
+        profile: Pipeline profile ('full', 'fast' or 'minimal').
+        n_process: Processes used by nlp.pipe in throughput mode.
+        reload_rss_growth_mb: RSS growth (MB) that triggers a model reload in
+            throughput mode.
+        model_reloads: Number of model reloads performed.
         _batch_count: Counter for tracking processed batches.
         _reload_threshold: Number of batches before model reload.
     """
 
-    def __init__(self, nlp_model: spacy.language.Language):
+    def __init__(
+        self,
+        nlp_model: Optional[spacy.language.Language] = None,
+        mode: str = STANDARD_MODE,
+        pipe_batch_size: Optional[int] = None,
+        n_process: int = 1,
+        reload_rss_growth_mb: int = 200,
+        profile: str = PROFILE_FULL
+    ):
         """Initialize the ContentAnalyzer with SpaCy model and configuration.
         
         Args:
             nlp_model: SpaCy language model to use for text processing.
+            mode: 'standard' (sub-batches, cleanup and scheduled reloads) or
+                'throughput' (single nlp.pipe pass, RSS-based reloads).
+            pipe_batch_size: nlp.pipe batch size. Defaults to 100 in standard
+                mode and 64 in throughput mode.
+            n_process: Processes used by nlp.pipe in throughput mode.
+            reload_rss_growth_mb: RSS growth in MB since the model was loaded
+                that triggers a reload in throughput mode.
+            profile: Pipeline profile. 'fast' and 'minimal' skip the parser,
+                so verbs, dependencies and parse-based key phrases are replaced
+                or omitted as described in spacy_utils.
         """
         self.logger = logging.getLogger(__name__)
+        if mode not in (STANDARD_MODE, THROUGHPUT_MODE):
+            raise ValueError(f"Unknown ContentAnalyzer mode: {mode}")
         
         # Store model name rather than keeping model instance
-        self.model_name = nlp_model.meta['lang'] + '_core_web_sm'
+        lang = nlp_model.meta['lang'] if nlp_model is not None else 'en'
+        self.model_name = lang + '_core_web_sm'
+        self.mode = mode
+        self.profile = validate_profile(profile)
         self._batch_count = 0
-        self._reload_threshold = 3  # Reload model every 3 batches
+        self._reload_threshold = 3  # Reload model every 3 batches (standard mode)
+        
+        # Memory watermark for throughput mode
+        self.n_process = max(1, n_process)
+        self.reload_rss_growth_mb = reload_rss_growth_mb
+        self.model_reloads = 0
+        self._process = psutil.Process(os.getpid())
+        # One long-lived thread owns the model in throughput mode
+        self._executor = ThreadPoolExecutor(max_workers=1) if mode == THROUGHPUT_MODE else None
         
         # Load optimized model using spacy_utils
-        self.nlp = load_optimized_model()
+        self.nlp = load_optimized_model(profile=self.profile)
+        self._rss_baseline = self._rss_mb()
         
         # Configure batch processing
-        self.batch_size = 100
+        self.batch_size = pipe_batch_size or (64 if mode == THROUGHPUT_MODE else 100)
         
         self._log_configuration()
 
     def _log_configuration(self):
         """Log the current configuration of the analyzer."""
+        if self.mode == THROUGHPUT_MODE:
+            reload_policy = f"RSS growth over {self.reload_rss_growth_mb}MB ({self.n_process} process(es))"
+        else:
+            reload_policy = f"every {self._reload_threshold} batches"
         self.logger.debug(
             f"SpaCy pipeline configuration:\n"
-            f"    Model: {self.model_name}\n"
+            f"    Model: {self.model_name} ({self.profile} profile)\n"
             f"    Enabled components: {[pipe for pipe in self.nlp.pipe_names if pipe not in ['textcat', 'lemmatizer', 'attribute_ruler', 'vectors', 'tok2vec']]}\n"
             f"    Disabled components: ['textcat', 'lemmatizer', 'attribute_ruler', 'vectors', 'tok2vec']\n"
             f"    Max length: {self.nlp.max_length}\n"
+            f"    Mode: {self.mode}\n"
             f"    Batch size: {self.batch_size}\n"
-            f"    Reload threshold: {self._reload_threshold} batches"
+            f"    Model reload: {reload_policy}"
         )
 
     def _load_nlp_model(self):
@@ -120,7 +183,7 @@ class ContentAnalyzer(BaseAnalyzer):
         """
         gc.collect()
         gc.collect()
-        self.nlp = load_optimized_model()
+        self.nlp = load_optimized_model(profile=self.profile)
 
     def _cleanup_doc(self, doc: spacy.tokens.Doc):
         """Safely cleanup SpaCy doc to free memory.
@@ -171,7 +234,7 @@ class ContentAnalyzer(BaseAnalyzer):
         entity_dict = {}
         for ent in doc.ents:
             if ent.label_ in VALID_ENTITY_LABELS:
-                if not any(indicator in ent.text.lower() for indicator in HTML_INDICATORS):
+                if not has_html_indicator(ent.text):
                     entity_dict[ent.text] = ent.label_
                     result['structural_elements']['named_entities_categories'].add(ent.label_)
                 if ent.label_ in {'DATE', 'TIME'}:
@@ -184,11 +247,18 @@ class ContentAnalyzer(BaseAnalyzer):
         Args:
             doc: SpaCy Doc object to process.
             result: Result dictionary to update with token information.
+            
+        Verbs need part-of-speech tags and dependencies need a parse, so
+        pipelines without them (fast and minimal profiles) skip this step.
         """
+        has_pos = doc.has_annotation("POS")
+        has_dep = doc.has_annotation("DEP")
+        if not (has_pos or has_dep):
+            return
         for token in doc:
-            if token.pos_ == 'VERB':
+            if has_pos and token.pos_ == 'VERB':
                 result['structural_elements']['verbs'].add(token.lemma_)
-            if token.dep_ in ('ROOT', 'dobj', 'iobj'):
+            if has_dep and token.dep_ in ('ROOT', 'dobj', 'iobj'):
                 result['structural_elements']['dependencies'].append((token.text, token.dep_))
 
     def _process_sentences(self, doc: spacy.tokens.Doc, result: Dict):
@@ -240,25 +310,55 @@ class ContentAnalyzer(BaseAnalyzer):
             sent_text: Original sentence text.
             result: Result dictionary to update with deadline information.
         """
-        if any(word in sent_lower for word in DEADLINE_WORDS):
+        if DEADLINE_WORD_PATTERN.search(sent_lower):
             has_time = any(ent.label_ in {'DATE', 'TIME'} for ent in sent.ents)
             if has_time:
                 result['time_sensitivity']['deadline_phrases'].append(sent_text)
                 result['time_sensitivity']['has_deadline'] = True
 
+    def _process_temporal(self, text: str, result: Dict):
+        """Merge rule-based deadlines and time references into the result.
+        
+        Complements the DATE/TIME entities, and is the only source of
+        deadlines when the pipeline has no NER (minimal profile).
+        
+        Args:
+            text: Original document text.
+            result: Result dictionary to update with time sensitivity information.
+        """
+        time_sensitivity = result['time_sensitivity']
+        rule_based = extract_time_sensitivity(text)
+        known = {reference.lower() for reference in time_sensitivity['time_references']}
+        for reference in rule_based['time_references']:
+            if reference.lower() not in known:
+                known.add(reference.lower())
+                time_sensitivity['time_references'].append(reference)
+        for phrase in rule_based['deadline_phrases']:
+            if phrase not in time_sensitivity['deadline_phrases']:
+                time_sensitivity['deadline_phrases'].append(phrase)
+        time_sensitivity['has_deadline'] = time_sensitivity['has_deadline'] or rule_based['has_deadline']
+
     def _process_noun_chunks(self, doc: spacy.tokens.Doc, result: Dict):
         """Process noun chunks from a SpaCy document.
         
+        Without a dependency parse (fast and minimal profiles) key phrases
+        come from regex patterns over the text instead.
+        
         Args:
             doc: SpaCy Doc object to process.
             result: Result dictionary to update with noun chunk information.
         """
-        if len(result['key_phrases']) < 3:
-            for chunk in doc.noun_chunks:
-                if not any(indicator in chunk.text.lower() for indicator in HTML_INDICATORS):
-                    result['key_phrases'].append(chunk.text)
-                    if len(result['key_phrases']) >= 3:
-                        break
+        if len(result['key_phrases']) >= 3:
+            return
+        if not doc.has_annotation("DEP"):
+            limit = 3 - len(result['key_phrases'])
+            result['key_phrases'].extend(phrase['text'] for phrase in extract_key_phrases_regex(doc.text, limit))
+            return
+        for chunk in doc.noun_chunks:
+            if not has_html_indicator(chunk.text):
+                result['key_phrases'].append(chunk.text)
+                if len(result['key_phrases']) >= 3:
+                    break
 
     def _format_result(self, result: Dict, entity_dict: Dict, sentiment_results: Dict,
                       email_patterns: Dict, is_urgent: bool) -> Dict:
@@ -278,7 +378,10 @@ class ContentAnalyzer(BaseAnalyzer):
             'entities': dict(list(entity_dict.items())[:5]),
             'key_phrases': result['key_phrases'][:3],
             'sentence_count': result['sentence_count'],
-            'questions': _format_questions(result['questions']),
+            'questions': {
+                'has_questions': result['questions']['question_count'] > 0,
+                **result['questions']
+            },
             'sentiment_analysis': _format_sentiment(sentiment_results),
             'email_patterns': _format_email_patterns(email_patterns),
             'urgency': is_urgent,
@@ -294,12 +397,14 @@ class ContentAnalyzer(BaseAnalyzer):
             }
         }
 
-    def _process_analyzed_doc(self, doc: spacy.tokens.Doc, text_lower: str) -> Dict:
+    def _process_analyzed_doc(self, doc: spacy.tokens.Doc, text_lower: str, scan: Optional[Dict] = None) -> Dict:
         """Process a single analyzed document.
         
         Args:
             doc: SpaCy Doc object to process.
             text_lower: Lowercase version of the original text.
+            scan: Keyword scan of text_lower from scan_texts, computed here if
+                not given.
             
         Returns:
             Dictionary containing all analysis results.
@@ -337,15 +442,14 @@ class ContentAnalyzer(BaseAnalyzer):
             self._process_tokens(doc, result)
             self._process_sentences(doc, result)
             self._process_noun_chunks(doc, result)
+            self._process_temporal(doc.text, result)
             
-            # Get additional analysis results
-            sentiment_results = analyze_sentiment(text_lower)
-            email_patterns = detect_email_patterns(text_lower)
-            is_urgent = check_urgency(text_lower)
+            # Keyword-based analysis (single pass over the text)
+            scan = scan or scan_text(text_lower)
             
             # Format final result
             formatted_result = self._format_result(
-                result, entity_dict, sentiment_results, email_patterns, is_urgent
+                result, entity_dict, scan['sentiment'], scan['email_patterns'], scan['is_urgent']
             )
             
             # Clear large intermediate objects
@@ -357,11 +461,12 @@ class ContentAnalyzer(BaseAnalyzer):
             self.logger.error(f"Document processing failed: {str(e)}")
             return create_error_response()
 
-    async def analyze_batch(self, texts: List[str]) -> List[Dict]:
+    async def analyze_batch(self, texts: List[Union[NormalizedText, str]]) -> List[Dict]:
         """Analyze a batch of texts efficiently.
         
         Args:
-            texts: List of texts to analyze.
+            texts: List of texts to analyze, as NormalizedText (whose memoized
+                clean and lowercase views are reused) or raw strings.
             
         Returns:
             List of dictionaries containing analysis results for each text.
@@ -373,6 +478,9 @@ class ContentAnalyzer(BaseAnalyzer):
         - Result collection and cleanup
         - Model reloading when needed
         """
+        if self.mode == THROUGHPUT_MODE:
+            return await self._analyze_batch_throughput(texts)
+        
         log_memory_usage(self.logger, "ContentAnalyzer Batch Start")
         
         try:
@@ -385,8 +493,9 @@ class ContentAnalyzer(BaseAnalyzer):
             
             # Increment batch counter and preprocess texts
             self._batch_count += 1
-            texts = [text[:30000] for text in texts]
-            texts_lower = [text.lower() for text in texts]
+            normalized = [as_normalized(text) for text in texts]
+            texts = [text.clean_prefix(MAX_TEXT_CHARS) for text in normalized]
+            texts_lower = [text.lower_prefix(MAX_TEXT_CHARS) for text in normalized]
             
             # Process texts in batches
             with ThreadPoolExecutor(max_workers=1) as executor:
@@ -423,6 +532,82 @@ class ContentAnalyzer(BaseAnalyzer):
             self.logger.error(f"Batch analysis failed: {str(e)}")
             raise
 
+    async def _analyze_batch_throughput(self, texts: List[Union[NormalizedText, str]]) -> List[Dict]:
+        """Analyze a batch with a single nlp.pipe pass (throughput mode).
+        
+        Args:
+            texts: List of texts to analyze.
+            
+        Returns:
+            List of dictionaries containing analysis results for each text.
+        """
+        if not texts:
+            return []
+        start_time = time.time()
+        normalized = [as_normalized(text) for text in texts]
+        clean = [text.clean_prefix(MAX_TEXT_CHARS) for text in normalized]
+        lower = [text.lower_prefix(MAX_TEXT_CHARS) for text in normalized]
+        
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(self._executor, self._pipe_and_extract, clean, lower)
+        
+        self._batch_count += 1
+        # A reload takes seconds; run it off the event loop, after this batch's pipe work
+        await loop.run_in_executor(self._executor, self._check_memory_watermark)
+        
+        total_time = time.time() - start_time
+        self.logger.info(
+            f"NLP Analysis completed (throughput) - {len(results)} texts in {total_time:.2f}s "
+            f"(avg {total_time/len(results):.3f}s/text)"
+        )
+        return results
+
+    def _pipe_and_extract(self, texts: List[str], texts_lower: List[str]) -> List[Dict]:
+        """Run nlp.pipe over the whole batch and extract plain results.
+        
+        Docs are consumed as they are yielded and never kept, so each one is
+        released as soon as its result has been extracted.
+        
+        Args:
+            texts: Clean texts to process.
+            texts_lower: Lowercase versions of the texts.
+            
+        Returns:
+            List of result dictionaries made of plain Python values.
+        """
+        # Extra processes only pay off once there is more than one pipe batch
+        n_process = self.n_process if len(texts) > self.batch_size else 1
+        docs = self.nlp.pipe(texts, batch_size=self.batch_size, n_process=n_process)
+        scans = scan_texts(texts_lower)
+        return [
+            self._process_analyzed_doc(doc, text_lower, scan)
+            for doc, text_lower, scan in zip(docs, texts_lower, scans)
+        ]
+
+    def _rss_mb(self) -> float:
+        """Current resident memory of this process in MB."""
+        return self._process.memory_info().rss / (1024 * 1024)
+
+    def _check_memory_watermark(self):
+        """Reload the model if RSS grew past the threshold since it was loaded.
+        
+        Runs on the analyzer's executor, which also runs nlp.pipe, so a reload
+        never overlaps a batch.
+        """
+        growth = self._rss_mb() - self._rss_baseline
+        if growth <= self.reload_rss_growth_mb:
+            return
+        self.logger.info(
+            f"RSS grew {growth:.0f}MB since model load (threshold {self.reload_rss_growth_mb}MB) "
+            f"- Reloading SpaCy model"
+        )
+        self.nlp = None
+        gc.collect()
+        self.nlp = load_optimized_model(profile=self.profile)
+        self.model_reloads += 1
+        self._batch_count = 0
+        self._rss_baseline = self._rss_mb()
+
     def _cleanup_batch_processing(self, docs, texts, texts_lower):
         """Clean up resources after batch processing.
         
@@ -444,7 +629,7 @@ class ContentAnalyzer(BaseAnalyzer):
         self.nlp = None
         gc.collect()
         gc.collect()
-        self.nlp = load_optimized_model()
+        self.nlp = load_optimized_model(profile=self.profile)
         self._batch_count = 0
         log_memory_usage(self.logger, "After Model Reload")
 
@@ -16,12 +16,17 @@ Typical usage:
 
 import logging
 import time
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Union
 
 from ..processing.subprocess_manager import SubprocessNLPAnalyzer
+from ..processing.worker_pool import NLPWorkerPool
 from ..utils.result_formatter import format_nlp_result, create_error_response
 from ....models.analysis_settings import ProcessingConfig
 from ...base import BaseAnalyzer
+from ....parsing.normalized_text import NormalizedText, as_normalized
+
+# Maximum characters of clean text sent to the NLP worker per email
+MAX_TEXT_CHARS = 10000
 
 class ContentAnalyzerSubprocess(BaseAnalyzer):
     """Analyzes text using SpaCy in isolated subprocesses to prevent memory leaks.
@@ -36,24 +41,27 @@ class ContentAnalyzerSubprocess(BaseAnalyzer):
         batch_size: Number of texts to process in each batch
     """
     
-    def __init__(self, nlp_model=None, batch_size: int = 5):
+    def __init__(self, nlp_model=None, batch_size: int = 5, worker_pool: Optional[NLPWorkerPool] = None):
         """Initialize the ContentAnalyzerSubprocess.
         
         Args:
             nlp_model: Ignored, included for compatibility with original ContentAnalyzer
             batch_size: Number of texts to process in each batch. Defaults to 5.
+            worker_pool: NLP worker pool to use. Defaults to the shared pool.
         """
         self.logger = logging.getLogger(__name__)
-        self.nlp_analyzer = SubprocessNLPAnalyzer()
+        self.nlp_analyzer = SubprocessNLPAnalyzer(worker_pool)
         self.batch_size = batch_size
         
         self.logger.info(f"ContentAnalyzerSubprocess initialized with batch size {self.batch_size}")
 
-    async def analyze_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+    async def analyze_batch(self, texts: List[Union[NormalizedText, str]]) -> List[Dict[str, Any]]:
         """Analyze a batch of texts efficiently using subprocess isolation.
         
+        Only the clean text prefix the worker analyzes is sent to the subprocess.
+        
         Args:
-            texts: List of texts to analyze
+            texts: List of texts to analyze, as NormalizedText or raw strings
             
         Returns:
             List of dictionaries containing analysis results for each text.
@@ -71,6 +79,7 @@ class ContentAnalyzerSubprocess(BaseAnalyzer):
             )
             
             # Process texts in isolated subprocess
+            texts = [as_normalized(text).clean_prefix(MAX_TEXT_CHARS) for text in texts]
             nlp_results = await self.nlp_analyzer.analyze_batch(texts)
             
             # Format and validate results
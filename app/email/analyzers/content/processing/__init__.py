@@ -1,10 +1,19 @@
 """Processing components for content analysis.
 
 This package provides the processing components:
-- nlp_worker: Standalone NLP processing script
-- subprocess_manager: Manages subprocess execution and communication
+- nlp_worker: Standalone NLP processing script (one-shot or serve mode)
+- worker_pool: Supervised pool of long-lived NLP worker processes
+- subprocess_manager: Sends batches to the worker pool
 """
 
 from .subprocess_manager import SubprocessNLPAnalyzer
+from .worker_pool import NLPWorker, NLPWorkerError, NLPWorkerPool, get_worker_pool, close_worker_pool
 
-__all__ = ['SubprocessNLPAnalyzer']
+__all__ = [
+    'SubprocessNLPAnalyzer',
+    'NLPWorker',
+    'NLPWorkerError',
+    'NLPWorkerPool',
+    'get_worker_pool',
+    'close_worker_pool'
+]
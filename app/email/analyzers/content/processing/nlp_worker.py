@@ -24,6 +24,9 @@ Typical usage example::
     # Process texts from a JSON string
     python nlp_worker.py '["text1", "text2"]'
 
+    # Serve batches over stdin/stdout as a long-lived pool worker
+    python nlp_worker.py --serve --profile fast
+
 Attributes:
     VALID_ENTITY_LABELS (List[str]): List of valid SpaCy entity labels to extract,
         imported from pattern_matchers module.
@@ -35,7 +38,8 @@ Memory Management:
     - Garbage collection after processing each document
     - Document cleanup using spacy_utils.cleanup_doc
     - Limited text size (10K chars) for processing
-    - Model unloading after batch processing
+    - Model unloading after batch processing (one-shot modes only; in serve
+      mode the model stays loaded and the pool restarts the worker instead)
 
 Dependencies:
     - spacy: For NLP processing
@@ -54,18 +58,19 @@ import spacy
 
 # Get the absolute path of the utils module
 UTILS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../"))
-print(f"UTILS_PATH: {UTILS_PATH}")
+print(f"UTILS_PATH: {UTILS_PATH}", file=sys.stderr)
 # Add utils path to sys.path
 sys.path.insert(0, UTILS_PATH)
 
 # Now we can use imports relative to the app package
-from utils.spacy_utils import load_optimized_model, cleanup_doc
+from utils.spacy_utils import load_optimized_model, cleanup_doc, PROFILE_FULL
 from utils.pattern_matchers import (
-    analyze_sentiment,
-    detect_email_patterns,
-    check_urgency,
+    scan_text,
+    extract_key_phrases_regex,
     VALID_ENTITY_LABELS
 )
+from utils.temporal_extractor import extract_time_sensitivity
+from utils.wire_format import encode_results, dumps, WIRE_FORMAT_VERSION
 
 def extract_entities(doc: spacy.tokens.Doc) -> Dict[str, List[Dict[str, Any]]]:
     """Extract named entities from a SpaCy document.
@@ -95,6 +100,9 @@ def extract_entities(doc: spacy.tokens.Doc) -> Dict[str, List[Dict[str, Any]]]:
 def extract_key_phrases(doc: spacy.tokens.Doc, limit: int = 5) -> List[Dict[str, Any]]:
     """Extract key noun phrases from a SpaCy document.
 
+    Pipelines without a dependency parse (fast and minimal profiles) use
+    regex-based phrases instead of noun chunks.
+
     Args:
         doc: A SpaCy Doc object containing processed text.
         limit: Maximum number of phrases to return. Defaults to 5.
@@ -106,6 +114,8 @@ def extract_key_phrases(doc: spacy.tokens.Doc, limit: int = 5) -> List[Dict[str,
             - end: Character end position
             - root: The root word of the phrase
     """
+    if not doc.has_annotation("DEP"):
+        return extract_key_phrases_regex(doc.text, limit)
     key_phrases = []
     for chunk in doc.noun_chunks:
         if len(chunk) < 2:
@@ -148,6 +158,7 @@ def analyze_text(doc: spacy.tokens.Doc, text_lower: str) -> Dict[str, Any]:
             - sentiment: Sentiment analysis results
             - email_type: Email type classification
             - urgency: Urgency indicators
+            - time_sensitivity: Rule-based deadlines and time references
             - is_question: Whether the text contains a question
             - error: Error message if processing failed
     """
@@ -156,10 +167,12 @@ def analyze_text(doc: spacy.tokens.Doc, text_lower: str) -> Dict[str, Any]:
     key_phrases = extract_key_phrases(doc)
     questions = extract_questions(doc)
     
-    # Pattern matching analysis
-    sentiment_results = analyze_sentiment(text_lower)
-    email_patterns = detect_email_patterns(text_lower)
-    is_urgent = check_urgency(text_lower)
+    # Pattern matching analysis (single pass over the text)
+    scan = scan_text(text_lower)
+    sentiment_results = scan['sentiment']
+    email_patterns = scan['email_patterns']
+    is_urgent = scan['is_urgent']
+    time_sensitivity = extract_time_sensitivity(doc.text)
     
     # Combine results
     return {
@@ -183,8 +196,9 @@ def analyze_text(doc: spacy.tokens.Doc, text_lower: str) -> Dict[str, Any]:
         },
         'urgency': {
             'is_urgent': is_urgent,
-            'has_deadline': email_patterns.get('has_deadline', False)
+            'has_deadline': time_sensitivity['has_deadline']
         },
+        'time_sensitivity': time_sensitivity,
         'is_question': '?' in text_lower and any(qw in text_lower for qw in ('what', 'when', 'where', 'who', 'why', 'how')),
         'error': None
     }
@@ -218,7 +232,11 @@ def process_single_text(text: str, nlp: spacy.language.Language) -> Dict[str, An
     except Exception as e:
         return create_error_result(str(e))
 
-def process_texts(texts: List[str]) -> List[Dict[str, Any]]:
+def process_texts(
+    texts: List[str],
+    nlp: Optional[spacy.language.Language] = None,
+    profile: str = PROFILE_FULL
+) -> List[Dict[str, Any]]:
     """Process multiple texts with SpaCy and return structured results.
     
     This function handles the complete pipeline of loading the model,
@@ -227,6 +245,9 @@ def process_texts(texts: List[str]) -> List[Dict[str, Any]]:
     
     Args:
         texts: List of texts to process.
+        nlp: Already loaded model to reuse. If None, a model is loaded for
+            this call and released afterwards.
+        profile: Pipeline profile used when loading a model.
     
     Returns:
         List of dictionaries containing analysis results for each text.
@@ -241,8 +262,10 @@ def process_texts(texts: List[str]) -> List[Dict[str, Any]]:
             - is_question: Whether the text contains a question
             - error: Error message if processing failed
     """
-    # Load model
-    nlp = load_optimized_model()
+    # Load model unless the caller keeps one loaded
+    owns_model = nlp is None
+    if owns_model:
+        nlp = load_optimized_model(profile=profile)
     
     # Preprocess texts - limit to most relevant parts
     preprocessed = [text[:10000] for text in texts]  # Limit to 10K chars
@@ -254,9 +277,10 @@ def process_texts(texts: List[str]) -> List[Dict[str, Any]]:
         gc.collect()  # Force garbage collection after each document
     
     # Final cleanup
-    nlp = None
-    gc.collect()
-    gc.collect()
+    if owns_model:
+        nlp = None
+        gc.collect()
+        gc.collect()
     
     return results
 
@@ -289,6 +313,11 @@ def create_empty_result() -> Dict[str, Any]:
             'is_urgent': False,
             'has_deadline': False
         },
+        'time_sensitivity': {
+            'has_deadline': False,
+            'deadline_phrases': [],
+            'time_references': []
+        },
         'is_question': False,
         'error': None
     }
@@ -306,6 +335,48 @@ def create_error_result(error_message: str) -> Dict[str, Any]:
     result['error'] = error_message
     return result
 
+def serve(profile: str = PROFILE_FULL) -> None:
+    """Serve analysis requests over stdin/stdout until shutdown.
+
+    The model is loaded once, then a ready message is written and each
+    request line ({"id": n, "texts": [...]}) is answered with one response
+    line ({"id": n, "v": 1, "labels": [...], "rows": [...]}, see
+    utils.wire_format). A {"cmd": "shutdown"} line or EOF on stdin ends the
+    loop. Anything else printed while serving goes to stderr so stdout
+    carries only protocol messages.
+
+    Args:
+        profile: Pipeline profile to load ('full', 'fast' or 'minimal').
+    """
+    logger = logging.getLogger(__name__)
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    def send(message: Dict[str, Any]) -> None:
+        protocol_out.write(dumps(message) + '\n')
+        protocol_out.flush()
+
+    nlp = load_optimized_model(profile=profile)
+    send({'type': 'ready', 'pid': os.getpid(), 'profile': profile, 'wire': WIRE_FORMAT_VERSION})
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            logger.error(f"Invalid request: {e}")
+            continue
+        if request.get('cmd') == 'shutdown':
+            break
+        try:
+            results = process_texts(request.get('texts', []), nlp)
+            send({'id': request.get('id'), **encode_results(results)})
+        except Exception as e:
+            logger.error(f"Error processing request {request.get('id')}: {e}")
+            send({'id': request.get('id'), 'error': str(e)})
+
 def main(args: Optional[argparse.Namespace] = None) -> None:
     """Main entry point for the script.
 
@@ -313,8 +384,8 @@ def main(args: Optional[argparse.Namespace] = None) -> None:
         args: Optional parsed command line arguments.
             If None, arguments will be parsed from sys.argv.
     """
-    # Set up logging
-    logging.basicConfig(level=logging.INFO)
+    # Set up logging (stderr, so stdout stays reserved for results)
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
     logger = logging.getLogger(__name__)
     
     if args is None:
@@ -323,7 +394,15 @@ def main(args: Optional[argparse.Namespace] = None) -> None:
         parser.add_argument('--file', type=str, help='Input JSON file containing texts to process')
         parser.add_argument('--text', type=str, help='Text to analyze directly')
         parser.add_argument('text_json', nargs='?', help='JSON string of texts to process (alternative to --file)')
+        parser.add_argument('--serve', action='store_true', help='Serve batches over stdin/stdout until shutdown')
+        parser.add_argument('--profile', type=str, default=PROFILE_FULL, choices=['full', 'fast', 'minimal'],
+                            help='SpaCy pipeline profile')
         args = parser.parse_args()
+
+    profile = getattr(args, 'profile', PROFILE_FULL)
+    if getattr(args, 'serve', False):
+        serve(profile)
+        return
     
     try:
         # Get input data either from file or command line
@@ -342,7 +421,7 @@ def main(args: Optional[argparse.Namespace] = None) -> None:
         logger.info(f"Received {len(texts)} texts to process")
         
         # Process texts
-        results = process_texts(texts)
+        results = process_texts(texts, profile=profile)
         
         # Log the number of results being returned
         logger.info(f"Returning {len(results)} results")
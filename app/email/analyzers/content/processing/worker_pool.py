@@ -0,0 +1,499 @@
+"""Supervised pool of long-lived NLP worker processes.
+
+Each worker runs nlp_worker.py in serve mode: it loads the SpaCy model once,
+then answers batches sent over its stdin/stdout pipes as newline-delimited
+compact JSON, so a batch costs only inference time instead of interpreter start-up
+and model load. Workers still run in separate processes to keep SpaCy's
+memory out of the web worker, and the pool restarts a worker once it has
+processed a configured number of documents or its RSS exceeds a ceiling.
+
+Protocol (one JSON object per line):
+    worker -> pool: {"type": "ready", "pid": 1234, "wire": 1}
+    pool -> worker: {"id": 1, "texts": ["...", "..."]}
+    worker -> pool: {"id": 1, "v": 1, "labels": [...], "rows": [[...], [...]]}
+    pool -> worker: {"cmd": "shutdown"}
+
+Results use the versioned row format of utils.wire_format and are decoded
+back into result dictionaries here; a response with a plain "results" list
+(no "v") is passed through unchanged.
+
+The pool is driven through blocking pipe I/O guarded by threading primitives,
+so it works from any event loop (or none); async callers run process() in an
+executor.
+
+Typical usage:
+    pool = NLPWorkerPool(size=1, max_docs=500, max_rss_mb=700)
+    pool.start()                       # Pre-warm at application start-up
+    results = pool.process(["text 1", "text 2"])
+    pool.close()
+"""
+
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+from ..utils.wire_format import WireFormatError, decode_results, dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCRIPT_PATH = os.path.join(os.path.dirname(__file__), 'nlp_worker.py')
+
+# Sentinel placed on a worker's output queue when its stdout closes
+_EOF = object()
+
+
+class NLPWorkerError(RuntimeError):
+    """Exception raised when an NLP worker fails, exits or times out."""
+    pass
+
+
+class NLPWorker:
+    """A single long-lived NLP worker process.
+
+    Attributes:
+        docs_processed: Number of documents analyzed by this worker
+        started_at: Monotonic time the worker became ready
+    """
+
+    def __init__(
+        self,
+        script_path: str = DEFAULT_SCRIPT_PATH,
+        start_timeout: float = 120.0,
+        profile: str = 'full'
+    ):
+        """Initialize the worker without starting it.
+
+        Args:
+            script_path: Path to the worker script
+            start_timeout: Seconds to wait for the worker to load its model
+            profile: SpaCy pipeline profile the worker loads
+        """
+        self.script_path = script_path
+        self.profile = profile
+        self.start_timeout = start_timeout
+        self.docs_processed = 0
+        self.started_at: Optional[float] = None
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: 'queue.Queue[Any]' = queue.Queue()
+        self._request_id = 0
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Process ID of the worker, if started."""
+        return self._proc.pid if self._proc else None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is running."""
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self) -> 'NLPWorker':
+        """Start the worker and wait until its model is loaded.
+
+        Returns:
+            NLPWorker: This worker
+
+        Raises:
+            NLPWorkerError: If the worker exits or does not become ready in time
+        """
+        self._proc = subprocess.Popen(
+            [sys.executable, self.script_path, '--serve', '--profile', self.profile],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+        )
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+        threading.Thread(target=self._drain_stderr, daemon=True).start()
+
+        message = self._next_message(self.start_timeout)
+        if message.get('type') != 'ready':
+            self.kill()
+            raise NLPWorkerError(f"NLP worker sent unexpected start-up message: {message}")
+        self.started_at = time.monotonic()
+        logger.info(f"NLP worker {self.pid} ready in {self._elapsed_since_spawn():.2f}s")
+        return self
+
+    def _elapsed_since_spawn(self) -> float:
+        """Seconds since the process was created, for start-up logging."""
+        try:
+            return time.time() - psutil.Process(self.pid).create_time()
+        except Exception:
+            return 0.0
+
+    def _read_stdout(self) -> None:
+        """Forward protocol lines from the worker's stdout to the line queue."""
+        proc = self._proc
+        try:
+            for line in proc.stdout:
+                self._lines.put(line)
+        except Exception as e:
+            logger.debug(f"NLP worker stdout reader stopped: {e}")
+        finally:
+            self._lines.put(_EOF)
+
+    def _drain_stderr(self) -> None:
+        """Log the worker's stderr so the pipe never fills up."""
+        proc = self._proc
+        try:
+            for line in proc.stderr:
+                if line.strip():
+                    logger.debug(f"NLP worker {proc.pid}: {line.rstrip()}")
+        except Exception:
+            pass
+
+    def _next_message(self, timeout: float) -> Dict[str, Any]:
+        """Read the next JSON message from the worker.
+
+        Non-JSON lines (e.g. stray library output) are logged and skipped.
+
+        Args:
+            timeout: Seconds to wait for a message
+
+        Returns:
+            Dict: The decoded message
+
+        Raises:
+            NLPWorkerError: If the worker exits or times out
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise NLPWorkerError(f"NLP worker {self.pid} timed out after {timeout}s")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise NLPWorkerError(f"NLP worker {self.pid} timed out after {timeout}s")
+            if line is _EOF:
+                raise NLPWorkerError(
+                    f"NLP worker {self.pid} exited with code {self._proc.poll() if self._proc else None}"
+                )
+            try:
+                message = json.loads(line)
+            except ValueError:
+                logger.debug(f"NLP worker {self.pid} non-protocol output: {line.rstrip()}")
+                continue
+            if isinstance(message, dict):
+                return message
+
+    def process(self, texts: List[str], timeout: float) -> List[Dict[str, Any]]:
+        """Analyze a batch of texts.
+
+        Args:
+            texts: Texts to analyze
+            timeout: Seconds to wait for the results
+
+        Returns:
+            List[Dict]: One result per text
+
+        Raises:
+            NLPWorkerError: If the worker fails, exits or times out
+        """
+        if not self.alive:
+            raise NLPWorkerError("NLP worker is not running")
+        self._request_id += 1
+        request_id = self._request_id
+        try:
+            self._proc.stdin.write(dumps({'id': request_id, 'texts': texts}) + '\n')
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise NLPWorkerError(f"NLP worker {self.pid} pipe closed: {e}")
+
+        while True:
+            message = self._next_message(timeout)
+            if message.get('id') != request_id:
+                continue  # Late reply to an earlier, abandoned request
+            if message.get('error'):
+                raise NLPWorkerError(f"NLP worker {self.pid} failed: {message['error']}")
+            if 'v' in message:
+                try:
+                    results = decode_results(message)
+                except WireFormatError as e:
+                    raise NLPWorkerError(f"NLP worker {self.pid} returned invalid results: {e}")
+            else:
+                results = message.get('results')
+            if not isinstance(results, list):
+                raise NLPWorkerError(f"NLP worker {self.pid} returned invalid results")
+            self.docs_processed += len(texts)
+            return results
+
+    def rss_bytes(self) -> int:
+        """Resident memory of the worker process in bytes (0 if unavailable)."""
+        try:
+            return psutil.Process(self.pid).memory_info().rss
+        except Exception:
+            return 0
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ask the worker to exit, killing it if it does not stop in time.
+
+        Args:
+            timeout: Seconds to wait for a clean exit
+        """
+        if self._proc is None:
+            return
+        if self.alive:
+            try:
+                self._proc.stdin.write(json.dumps({'cmd': 'shutdown'}) + '\n')
+                self._proc.stdin.flush()
+                self._proc.stdin.close()
+            except Exception:
+                pass
+            try:
+                self._proc.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.kill()
+        self._close_pipes()
+
+    def kill(self) -> None:
+        """Terminate the worker immediately."""
+        if self._proc is None:
+            return
+        try:
+            self._proc.kill()
+            self._proc.wait(timeout=5)
+        except Exception as e:
+            logger.debug(f"Error killing NLP worker {self.pid}: {e}")
+        self._close_pipes()
+
+    def _close_pipes(self) -> None:
+        """Close the worker's pipes."""
+        for stream in (self._proc.stdin, self._proc.stdout, self._proc.stderr):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+
+class NLPWorkerPool:
+    """Thread-safe pool of pre-warmed NLP worker processes.
+
+    Attributes:
+        size: Number of worker processes kept running
+        max_docs: Documents after which a worker is restarted
+        max_rss_bytes: Resident memory after which a worker is restarted
+        request_timeout: Seconds to wait for a batch result
+        profile: SpaCy pipeline profile loaded by the workers
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        max_docs: int = 500,
+        max_rss_mb: int = 700,
+        start_timeout: float = 120.0,
+        request_timeout: float = 120.0,
+        script_path: str = DEFAULT_SCRIPT_PATH,
+        profile: str = 'full'
+    ):
+        """Initialize the pool without starting workers.
+
+        Args:
+            size: Number of worker processes kept running
+            max_docs: Documents after which a worker is restarted
+            max_rss_mb: Resident memory (MB) after which a worker is restarted
+            start_timeout: Seconds to wait for a worker to load its model
+            request_timeout: Seconds to wait for a batch result
+            script_path: Path to the worker script
+            profile: SpaCy pipeline profile loaded by the workers
+        """
+        self.size = max(1, size)
+        self.max_docs = max_docs
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.start_timeout = start_timeout
+        self.request_timeout = request_timeout
+        self.script_path = script_path
+        self.profile = profile
+        # Idle workers, and NLPWorkerErrors of workers that failed to start
+        self._idle: 'queue.Queue[Any]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._starting = 0
+        self._workers: List[NLPWorker] = []
+        self._closed = False
+        self.restarts = 0
+
+    @property
+    def started(self) -> bool:
+        """Whether the pool has live or starting workers."""
+        with self._lock:
+            return bool(self._workers) or self._starting > 0
+
+    def start(self, wait: bool = False) -> None:
+        """Start (pre-warm) workers up to the pool size.
+
+        Args:
+            wait: Block until the workers are ready instead of starting them
+                in background threads
+        """
+        with self._lock:
+            self._closed = False
+            missing = self.size - len(self._workers) - self._starting
+            self._starting += max(0, missing)
+        for _ in range(max(0, missing)):
+            if wait:
+                self._spawn()
+            else:
+                threading.Thread(target=self._spawn, daemon=True).start()
+
+    def _spawn(self) -> None:
+        """Start one worker and make it available.
+
+        If the worker fails to start, the error is queued in its place so a
+        caller waiting for a worker fails right away instead of timing out.
+        """
+        worker = NLPWorker(self.script_path, self.start_timeout, self.profile)
+        try:
+            worker.start()
+        except Exception as e:
+            logger.error(f"Failed to start NLP worker: {e}")
+            worker.kill()
+            with self._lock:
+                self._starting -= 1
+            self._idle.put(NLPWorkerError(f"NLP worker failed to start: {e}"))
+            return
+        with self._lock:
+            self._starting -= 1
+            if self._closed:
+                worker.stop()
+                return
+            self._workers.append(worker)
+        self._idle.put(worker)
+
+    def _retire(self, worker: NLPWorker, reason: str, kill: bool = False) -> None:
+        """Stop a worker and start a replacement in the background.
+
+        Args:
+            worker: The worker to stop
+            reason: Why the worker is being restarted, for logging
+            kill: Kill the worker instead of asking it to exit
+        """
+        logger.info(f"Restarting NLP worker {worker.pid}: {reason}")
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+            self.restarts += 1
+            closed = self._closed
+        threading.Thread(target=worker.kill if kill else worker.stop, daemon=True).start()
+        if not closed:
+            self.start()
+
+    def _acquire(self) -> NLPWorker:
+        """Check out an idle worker, starting the pool if needed.
+
+        Raises:
+            NLPWorkerError: If no worker becomes available in time, or no
+                worker is left to wait for after one failed to start
+        """
+        if not self.started:
+            self.start()
+        deadline = time.monotonic() + self.start_timeout + self.request_timeout
+        while True:
+            try:
+                item = self._idle.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise NLPWorkerError("No NLP worker available")
+            if not isinstance(item, NLPWorkerError):
+                return item
+            # A worker failed to start; keep waiting only if another may still come
+            if not self.started:
+                raise item
+
+    def _release(self, worker: NLPWorker) -> None:
+        """Return a worker to the pool, restarting it if it hit a limit."""
+        if self._closed:
+            worker.stop()
+            return
+        if self.max_docs and worker.docs_processed >= self.max_docs:
+            self._retire(worker, f"processed {worker.docs_processed} documents")
+            return
+        rss = worker.rss_bytes()
+        if self.max_rss_bytes and rss > self.max_rss_bytes:
+            self._retire(worker, f"RSS {rss / (1024 * 1024):.0f}MB over ceiling")
+            return
+        self._idle.put(worker)
+
+    def process(self, texts: List[str], retries: int = 1) -> List[Dict[str, Any]]:
+        """Analyze a batch of texts on a pooled worker.
+
+        A worker that fails is killed and replaced, and the batch is retried
+        on another worker.
+
+        Args:
+            texts: Texts to analyze
+            retries: Number of times to retry on a fresh worker after a failure
+
+        Returns:
+            List[Dict]: One result per text
+
+        Raises:
+            NLPWorkerError: If the batch fails on every attempt
+        """
+        if not texts:
+            return []
+        attempt = 0
+        while True:
+            worker = self._acquire()
+            try:
+                results = worker.process(texts, self.request_timeout)
+            except NLPWorkerError as e:
+                self._retire(worker, str(e), kill=True)
+                if attempt >= retries:
+                    raise
+                attempt += 1
+                continue
+            self._release(worker)
+            return results
+
+    def close(self) -> None:
+        """Stop all workers."""
+        with self._lock:
+            self._closed = True
+            workers, self._workers = self._workers, []
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.stop()
+
+
+_default_pool: Optional[NLPWorkerPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_worker_pool(**kwargs) -> NLPWorkerPool:
+    """Get or create the process-wide NLP worker pool.
+
+    Args:
+        **kwargs: NLPWorkerPool arguments used when the pool is created
+
+    Returns:
+        NLPWorkerPool: The shared pool
+    """
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = NLPWorkerPool(**kwargs)
+        return _default_pool
+
+
+def close_worker_pool() -> None:
+    """Stop the process-wide NLP worker pool, if one was created."""
+    global _default_pool
+    with _default_pool_lock:
+        pool, _default_pool = _default_pool, None
+    if pool is not None:
+        pool.close()
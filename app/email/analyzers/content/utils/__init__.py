@@ -3,21 +3,60 @@
 This package provides utility functions:
 - spacy_utils: SpaCy model management and cleanup
 - pattern_matchers: Text pattern matching and analysis
+- temporal_extractor: Rule-based deadline and time reference extraction
+- wire_format: Compact encoding of NLP worker results
 """
 
-from .spacy_utils import load_optimized_model, cleanup_doc
+from .spacy_utils import (
+    load_optimized_model,
+    cleanup_doc,
+    validate_profile,
+    NLP_PROFILES,
+    PROFILE_FULL,
+    PROFILE_FAST,
+    PROFILE_MINIMAL
+)
 from .pattern_matchers import (
     analyze_sentiment,
     detect_email_patterns,
     check_urgency,
+    scan_text,
+    scan_texts,
+    has_html_indicator,
+    KeywordScanner,
     VALID_ENTITY_LABELS
 )
+from .temporal_extractor import (
+    extract_time_sensitivity,
+    extract_time_sensitivity_batch
+)
+from .wire_format import (
+    encode_results,
+    decode_results,
+    WireFormatError,
+    WIRE_FORMAT_VERSION
+)
 
 __all__ = [
     'load_optimized_model',
     'cleanup_doc',
+    'validate_profile',
+    'NLP_PROFILES',
+    'PROFILE_FULL',
+    'PROFILE_FAST',
+    'PROFILE_MINIMAL',
     'analyze_sentiment',
     'detect_email_patterns',
     'check_urgency',
-    'VALID_ENTITY_LABELS'
+    'scan_text',
+    'scan_texts',
+    'has_html_indicator',
+    'KeywordScanner',
+    'VALID_ENTITY_LABELS',
+    'extract_time_sensitivity',
+    'extract_time_sensitivity_batch',
+    'encode_results',
+    'decode_results',
+    'WireFormatError',
+    'WIRE_FORMAT_VERSION'
 ]
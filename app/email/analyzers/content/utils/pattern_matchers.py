@@ -19,45 +19,58 @@ Key Components:
    - HTML content indicators
 
 3. Urgency Assessment
-   - Direct urgency indicators
+   - Direct urgency indicators (deadline words and time indicators match whole words)
    - Deadline detection
    - Time-sensitive phrase analysis
 
-The module uses pre-compiled patterns and pre-defined sets for optimal performance,
-making it suitable for high-throughput email processing pipelines.
+4. Key Phrases
+   - Regex-based multi-word phrases for pipelines without a dependency parse
+
+Every keyword family is compiled into a single scanner, so scan_text() reads a
+text once and returns sentiment, email type and urgency together; scan_texts()
+does the same for a batch. analyze_sentiment, detect_email_patterns and
+check_urgency remain as single-purpose wrappers.
 
 Usage:
-    from .pattern_matchers import analyze_sentiment, detect_email_patterns, check_urgency
-    sentiment = analyze_sentiment(text.lower())
-    patterns = detect_email_patterns(text.lower())
-    is_urgent = check_urgency(text.lower())
+    from .pattern_matchers import scan_text, scan_texts
+    flags = scan_text(text.lower())
+    flags['sentiment'], flags['email_patterns'], flags['is_urgent']
+    batch_flags = scan_texts([t.lower() for t in texts])
 """
 
 import re
-from typing import Dict, Set
+from typing import Any, Dict, FrozenSet, List, Set, Tuple
 
-# Pre-compiled regex patterns for sentiment and content analysis
-POSITIVE_PATTERNS = {
-    'gratitude': re.compile(r'\b(thank|thanks|grateful|appreciate|appreciated)\b'),
-    'positive': re.compile(r'\b(great|excellent|good|wonderful|fantastic|amazing|helpful|pleased|happy|excited)\b'),
-    'agreement': re.compile(r'\b(agree|approved|confirmed|sounds good|perfect)\b')
+# Keyword families, as regex fragments matched on whole words in lowercase text.
+# Every family is compiled into a single scanner (see KeywordScanner).
+KEYWORD_FAMILIES: Dict[str, Tuple[str, ...]] = {
+    # Sentiment: positive
+    'gratitude': ('thank', 'thanks', 'grateful', 'appreciate', 'appreciated'),
+    'positive': ('great', 'excellent', 'good', 'wonderful', 'fantastic', 'amazing', 'helpful',
+                 'pleased', 'happy', 'excited'),
+    'agreement': ('agree', 'approved', 'confirmed', 'sounds good', 'perfect'),
+    # Sentiment: negative
+    'urgency': ('urgent', 'asap', 'emergency', 'immediate', 'critical'),
+    'dissatisfaction': ('disappointed', 'concerned', 'worried', 'unfortunately', 'issue', 'problem',
+                        'error', 'failed', 'wrong'),
+    'demand': ('must', 'need', 'require', 'mandatory', 'asap'),
+    # Email type
+    'marketing': ('subscribe', 'unsubscribe', 'newsletter', 'marketing', 'offer', 'promotion',
+                  'discount', 'sale', 'deal'),
+    'mass_email': ('view in browser', 'email preferences', 'opt out', 'mailing list'),
+    'system': ('system', 'automated', 'automatic', 'bot', 'daemon', 'notification'),
+    'noreply': (r'no[- ]?reply', r'do[- ]?not[- ]?reply', r'auto[- ]?generated'),
+    # Urgency by deadline
+    'deadline_word': ('deadline', 'due', 'by', 'until', 'before'),
+    'time_indicator': ('today', 'tomorrow', 'asap', 'soon', 'eod', 'cob'),
 }
 
-NEGATIVE_PATTERNS = {
-    'urgency': re.compile(r'\b(urgent|asap|emergency|immediate|critical)\b'),
-    'dissatisfaction': re.compile(r'\b(disappointed|concerned|worried|unfortunately|issue|problem|error|failed|wrong)\b'),
-    'demand': re.compile(r'\b(must|need|require|mandatory|asap)\b')
-}
+LITERAL_KEYWORD_PATTERN = re.compile(r'[a-z ]+')
 
-BULK_PATTERNS = {
-    'marketing': re.compile(r'\b(subscribe|unsubscribe|newsletter|marketing|offer|promotion|discount|sale|deal)\b'),
-    'mass_email': re.compile(r'\b(view in browser|email preferences|opt out|mailing list)\b')
-}
-
-AUTOMATED_PATTERNS = {
-    'system': re.compile(r'\b(system|automated|automatic|bot|daemon|notification)\b'),
-    'noreply': re.compile(r'\b(no[- ]?reply|do[- ]?not[- ]?reply|auto[- ]?generated)\b')
-}
+POSITIVE_FAMILIES = ('gratitude', 'positive', 'agreement')
+NEGATIVE_FAMILIES = ('urgency', 'dissatisfaction', 'demand')
+BULK_FAMILIES = ('marketing', 'mass_email')
+AUTOMATED_FAMILIES = ('system', 'noreply')
 
 # Pre-defined sets for faster lookups
 VALID_ENTITY_LABELS: Set[str] = {'PERSON', 'ORG', 'GPE', 'DATE', 'TIME', 'MONEY', 'PERCENT', 'PRODUCT', 'EVENT', 'WORK_OF_ART'}
@@ -66,16 +79,114 @@ QUESTION_WORDS: Set[str] = {'what', 'when', 'where', 'who', 'why', 'how'}
 MODAL_VERBS: Set[str] = {'could', 'would', 'can', 'will', 'should'}
 DEADLINE_WORDS: Set[str] = {'deadline', 'due', 'by', 'until', 'before'}
 
+# Words that end a key phrase candidate (function words, pronouns, common verbs)
+KEY_PHRASE_STOPWORDS: Set[str] = {
+    'a', 'an', 'the', 'and', 'or', 'but', 'if', 'then', 'so', 'of', 'to', 'in', 'on', 'at', 'by',
+    'for', 'with', 'from', 'about', 'as', 'into', 'over', 'after', 'before', 'until', 'up', 'out',
+    'is', 'are', 'was', 'were', 'be', 'been', 'being', 'am', 'do', 'does', 'did', 'have', 'has',
+    'had', 'will', 'would', 'can', 'could', 'should', 'may', 'might', 'must', 'shall',
+    'i', 'you', 'he', 'she', 'it', 'we', 'they', 'me', 'him', 'her', 'us', 'them', 'my', 'your',
+    'his', 'its', 'our', 'their', 'this', 'that', 'these', 'those', 'there', 'here',
+    'what', 'when', 'where', 'who', 'why', 'how', 'which', 'not', 'no', 'yes', 'all', 'any',
+    'please', 'thanks', 'thank', 'hi', 'hello', 'dear', 'regards', 'best', 'just', 'also', 'very',
+    'let', 'know', 'get', 'got', 'send', 'see', 'make', 'need', 'want', 'like', 'meet', 'review',
+    'call', 'check', 'take', 'go', 'come', 'today', 'tomorrow', 'yesterday'
+}
+# Runs of words separated only by spaces; punctuation ends a run
+WORD_RUN_PATTERN = re.compile(r"[A-Za-z][A-Za-z'\-]*(?:[ \t]+[A-Za-z][A-Za-z'\-]*)*")
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z'\-]*")
 
-def analyze_sentiment(text_lower: str) -> Dict:
-    """Analyze sentiment in text using pattern matching.
+
+class KeywordScanner:
+    """Single-pass scanner for several keyword families.
+    
+    All keywords are compiled into one alternation regex, longest first, and
+    each match is mapped back to every family it belongs to. A keyword shared
+    by several families (e.g. 'asap') or containing another family's keyword
+    (e.g. 'sounds good' contains 'good') flags all of them, so one scan gives
+    the same flags as searching each family separately. Scanning stops as
+    soon as every family has been seen.
+    
+    Attributes:
+        families: Family names handled by the scanner
+    """
+    
+    def __init__(self, families: Dict[str, Tuple[str, ...]]):
+        """Compile the scanner.
+        
+        Args:
+            families: Mapping of family name to keyword regex fragments
+        """
+        self.families = tuple(families)
+        fragments: Dict[str, Set[str]] = {}
+        for family, keywords in families.items():
+            for keyword in keywords:
+                fragments.setdefault(keyword, set()).add(family)
+        
+        # Literal keywords also carry the families of keywords they contain
+        literals = {keyword for keyword in fragments if LITERAL_KEYWORD_PATTERN.fullmatch(keyword)}
+        for keyword in literals:
+            for other in literals:
+                if other != keyword and re.search(rf'\b{re.escape(other)}\b', keyword):
+                    fragments[keyword] |= fragments[other]
+        
+        ordered = sorted(fragments, key=len, reverse=True)
+        self._fragment_patterns = [(re.compile(rf'(?:{fragment})\Z'), frozenset(fragments[fragment]))
+                                   for fragment in ordered]
+        self._families_by_match: Dict[str, FrozenSet[str]] = {
+            keyword: frozenset(found) for keyword, found in fragments.items() if keyword in literals
+        }
+        # The first-letter lookahead lets the regex skip most word starts cheaply
+        first_letters = ''.join(sorted({fragment[0] for fragment in ordered}))
+        self.pattern = re.compile(rf'\b(?=[{first_letters}])(?:' + '|'.join(ordered) + r')\b')
+    
+    def _families_for(self, match: str) -> FrozenSet[str]:
+        """Families of a matched keyword, resolving non-literal fragments once."""
+        found = self._families_by_match.get(match)
+        if found is None:
+            found = frozenset().union(*(families for pattern, families in self._fragment_patterns
+                                        if pattern.match(match)))
+            self._families_by_match[match] = found
+        return found
+    
+    def scan(self, text_lower: str) -> Set[str]:
+        """Find the keyword families present in a text.
+        
+        Args:
+            text_lower: Lowercase text to scan
+            
+        Returns:
+            Set of family names with at least one match
+        """
+        found: Set[str] = set()
+        total = len(self.families)
+        for match in self.pattern.finditer(text_lower):
+            found |= self._families_for(match.group())
+            if len(found) == total:
+                break
+        return found
+
+
+KEYWORD_SCANNER = KeywordScanner(KEYWORD_FAMILIES)
+DEADLINE_WORD_PATTERN = re.compile(r'\b(?:' + '|'.join(sorted(DEADLINE_WORDS)) + r')\b')
+HTML_INDICATOR_PATTERN = re.compile('|'.join(re.escape(indicator) for indicator in sorted(HTML_INDICATORS)),
+                                    re.IGNORECASE)
+
+
+def has_html_indicator(text: str) -> bool:
+    """Check whether text looks like markup or a URL fragment.
     
     Args:
-        text_lower: Lowercase text to analyze
+        text: Text to check (any case)
         
     Returns:
-        Dictionary with sentiment analysis results
+        True if any HTML indicator occurs in the text
     """
+    return HTML_INDICATOR_PATTERN.search(text) is not None
+
+
+def _sentiment_from(found: Set[str]) -> Dict:
+    """Build the sentiment result from scanned keyword families."""
     sentiment = {
         'is_positive': False,
         'is_negative': False,
@@ -84,50 +195,83 @@ def analyze_sentiment(text_lower: str) -> Dict:
         'dissatisfaction': False,
         'demand': False
     }
-    
-    # Check positive patterns
-    for pattern_name, pattern in POSITIVE_PATTERNS.items():
-        if pattern.search(text_lower):
+    for family in POSITIVE_FAMILIES:
+        if family in found:
             sentiment['is_positive'] = True
-            sentiment[pattern_name] = True
-    
-    # Check negative patterns
-    for pattern_name, pattern in NEGATIVE_PATTERNS.items():
-        if pattern.search(text_lower):
+            sentiment[family] = True
+    for family in NEGATIVE_FAMILIES:
+        if family in found:
             sentiment['is_negative'] = True
-            if pattern_name != 'urgency':  # Urgency is handled separately
-                sentiment[pattern_name] = True
-    
+            if family != 'urgency':  # Urgency is handled separately
+                sentiment[family] = True
     return sentiment
 
 
-def detect_email_patterns(text_lower: str) -> Dict:
-    """Detect patterns indicating email type (bulk, automated, etc).
+def _email_patterns_from(found: Set[str]) -> Dict:
+    """Build the email type result from scanned keyword families."""
+    return {
+        'is_bulk': any(family in found for family in BULK_FAMILIES),
+        'is_automated': any(family in found for family in AUTOMATED_FAMILIES),
+    }
+
+
+def _urgency_from(found: Set[str]) -> bool:
+    """Urgent if there is an urgency word, or a deadline word with a time indicator."""
+    return 'urgency' in found or ('deadline_word' in found and 'time_indicator' in found)
+
+
+def scan_text(text_lower: str) -> Dict[str, Any]:
+    """Run every keyword check over a text in a single pass.
     
     Args:
         text_lower: Lowercase text to analyze
         
     Returns:
-        Dictionary with detected email patterns
+        Dictionary with 'sentiment', 'email_patterns' and 'is_urgent' results,
+        as returned by analyze_sentiment, detect_email_patterns and check_urgency
     """
-    patterns = {
-        'is_bulk': False,
-        'is_automated': False,
+    found = KEYWORD_SCANNER.scan(text_lower)
+    return {
+        'sentiment': _sentiment_from(found),
+        'email_patterns': _email_patterns_from(found),
+        'is_urgent': _urgency_from(found)
     }
+
+
+def scan_texts(texts_lower: List[str]) -> List[Dict[str, Any]]:
+    """Run every keyword check over a batch of texts.
     
-    # Check for bulk email indicators
-    for pattern in BULK_PATTERNS.values():
-        if pattern.search(text_lower):
-            patterns['is_bulk'] = True
-            break
+    Args:
+        texts_lower: Lowercase texts to analyze
+        
+    Returns:
+        List of scan_text results, one per text
+    """
+    return [scan_text(text_lower) for text_lower in texts_lower]
+
+
+def analyze_sentiment(text_lower: str) -> Dict:
+    """Analyze sentiment in text using pattern matching.
     
-    # Check for automated email indicators
-    for pattern in AUTOMATED_PATTERNS.values():
-        if pattern.search(text_lower):
-            patterns['is_automated'] = True
-            break
+    Args:
+        text_lower: Lowercase text to analyze
+        
+    Returns:
+        Dictionary with sentiment analysis results
+    """
+    return _sentiment_from(KEYWORD_SCANNER.scan(text_lower))
+
+
+def detect_email_patterns(text_lower: str) -> Dict:
+    """Detect patterns indicating email type (bulk, automated, etc).
     
-    return patterns
+    Args:
+        text_lower: Lowercase text to analyze
+        
+    Returns:
+        Dictionary with detected email patterns
+    """
+    return _email_patterns_from(KEYWORD_SCANNER.scan(text_lower))
 
 
 def check_urgency(text_lower: str) -> bool:
@@ -139,13 +283,39 @@ def check_urgency(text_lower: str) -> bool:
     Returns:
         True if text appears urgent, False otherwise
     """
-    # Direct urgency words
-    if NEGATIVE_PATTERNS['urgency'].search(text_lower):
-        return True
-        
-    # Check for deadline words near time indicators
-    has_deadline = any(word in text_lower for word in DEADLINE_WORDS)
-    time_indicators = ('today', 'tomorrow', 'asap', 'soon', 'eod', 'cob')
-    has_time = any(indicator in text_lower for indicator in time_indicators)
+    return _urgency_from(KEYWORD_SCANNER.scan(text_lower))
+
+
+def extract_key_phrases_regex(text: str, limit: int = 3, max_words: int = 4) -> List[Dict[str, Any]]:
+    """Extract multi-word key phrases without a dependency parse.
+    
+    Splits each run of words at stopwords and keeps the remaining runs of two
+    or more words, in order of appearance. English noun phrases are head-final,
+    so the last word is reported as the root.
     
-    return has_deadline and has_time
\ No newline at end of file
+    Args:
+        text: Text to analyze (original case)
+        limit: Maximum number of phrases to return
+        max_words: Maximum words per phrase
+        
+    Returns:
+        List of dictionaries with text, start, end and root of each phrase
+    """
+    phrases = []
+    for run in WORD_RUN_PATTERN.finditer(text):
+        words = []
+        for word in list(WORD_PATTERN.finditer(run.group())) + [None]:
+            if word is not None and word.group().lower() not in KEY_PHRASE_STOPWORDS:
+                words.append(word)
+                continue
+            if len(words) >= 2:
+                words = words[:max_words]
+                start = run.start() + words[0].start()
+                end = run.start() + words[-1].end()
+                phrase = text[start:end]
+                if not has_html_indicator(phrase):
+                    phrases.append({'text': phrase, 'start': start, 'end': end, 'root': words[-1].group()})
+                    if len(phrases) >= limit:
+                        return phrases
+            words = []
+    return phrases
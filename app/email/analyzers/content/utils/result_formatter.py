@@ -12,6 +12,8 @@ The module handles:
 
 from typing import Dict, List, Any
 
+from .temporal_extractor import extract_time_sensitivity
+
 def create_error_response() -> Dict[str, Any]:
     """Create a default error response with empty fields.
     
@@ -75,17 +77,20 @@ def format_nlp_result(nlp_result: Dict[str, Any], text: str = "") -> Dict[str, A
     Returns:
         Formatted result dictionary with all required fields.
         
-    The function handles the following fields from the NLP worker:
-        - entities: Dict[str, List[Dict]] mapping entity labels to entity info
-        - key_phrases: List[Dict] of noun phrases with text and position
+    The function handles the following fields from the NLP worker (as decoded
+    by utils.wire_format):
+        - entities: Dict[str, List[str]] mapping entity labels to entity texts
+        - key_phrases: List[str] of key phrases
         - sentence_count: int
         - questions: List[str] of question sentences
         - sentiment: Dict with is_positive, is_negative, and pattern flags
         - email_type: Dict with is_bulk and is_automated flags
         - urgency: Dict with is_urgent and has_deadline flags
+        - time_sensitivity: Dict with has_deadline, deadline_phrases and time_references
+          (extracted from text with the rule-based extractor if missing)
         - is_question: bool indicating if text contains question words
     """
-    if "error" in nlp_result and not nlp_result.get("entities"):
+    if nlp_result.get("error") and not nlp_result.get("entities"):
         return create_error_response()
     
     # Preserve entity structure from worker
@@ -110,7 +115,7 @@ def format_nlp_result(nlp_result: Dict[str, Any], text: str = "") -> Dict[str, A
         'sentiment_analysis': _format_sentiment(sentiment),
         'email_patterns': _format_email_patterns(email_type),
         'questions': _format_questions(nlp_result.get('questions', [])),
-        'time_sensitivity': _format_time_sensitivity(nlp_result),
+        'time_sensitivity': _format_time_sensitivity(nlp_result, text),
         'structural_elements': _format_structural_elements(nlp_result)
     }
 
@@ -172,20 +177,29 @@ def _format_questions(questions: List[str]) -> Dict[str, Any]:
         'question_count': len(questions)
     }
 
-def _format_time_sensitivity(result: Dict[str, Any]) -> Dict[str, Any]:
+def _format_time_sensitivity(result: Dict[str, Any], text: str = "") -> Dict[str, Any]:
     """Format time sensitivity results.
     
     Args:
         result: Raw NLP result dictionary
+        text: Original text, used when the result has no time sensitivity
         
     Returns:
         Formatted time sensitivity dictionary
     """
-    urgency = result.get('urgency', {})
+    time_sensitivity = result.get('time_sensitivity')
+    if time_sensitivity is None and text:
+        time_sensitivity = extract_time_sensitivity(text)
+    if time_sensitivity is None:
+        return {
+            'has_deadline': result.get('urgency', {}).get('has_deadline', False),
+            'deadline_phrases': [],
+            'time_references': []
+        }
     return {
-        'has_deadline': urgency.get('has_deadline', False),
-        'deadline_phrases': [],  # Not implemented in worker
-        'time_references': []  # Not implemented in worker
+        'has_deadline': time_sensitivity.get('has_deadline', False),
+        'deadline_phrases': time_sensitivity.get('deadline_phrases', [])[:2],
+        'time_references': time_sensitivity.get('time_references', [])[:3]
     }
 
 def _format_structural_elements(result: Dict[str, Any]) -> Dict[str, Any]:
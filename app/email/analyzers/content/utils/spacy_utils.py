@@ -23,13 +23,19 @@ Key Components:
    - Reduced maximum text length
    - Minimal pipeline components
    - Efficient token and span handling
+   - Named pipeline profiles trading analysis depth for speed:
+
+     * ``full``: tagger, parser and NER (dependency-based sentences and noun chunks)
+     * ``fast``: NER plus the statistical sentence recognizer; no tagger or parser,
+       so key phrases come from regex patterns
+     * ``minimal``: rule-based sentence splitting only, no trained model needed
 
 The module is designed for production email processing systems where
 memory efficiency and stability are critical requirements.
 
 Usage:
     from .spacy_utils import load_optimized_model, cleanup_doc
-    nlp = load_optimized_model("en_core_web_sm")
+    nlp = load_optimized_model("en_core_web_sm", profile="fast")
     doc = nlp(text)
     cleanup_doc(doc)
 """
@@ -40,12 +46,41 @@ import spacy
 
 logger = logging.getLogger(__name__)
 
+# Pipeline profiles
+PROFILE_FULL = 'full'
+PROFILE_FAST = 'fast'
+PROFILE_MINIMAL = 'minimal'
+NLP_PROFILES = (PROFILE_FULL, PROFILE_FAST, PROFILE_MINIMAL)
+
+# Components not loaded by the fast profile, which keeps NER and 'senter'
+# ('senter' ships disabled in the small models and is enabled on load)
+FAST_PROFILE_EXCLUDED = ('tagger', 'parser', 'attribute_ruler', 'lemmatizer', 'textcat')
+
+
+def validate_profile(profile: str) -> str:
+    """Check that a pipeline profile name is known.
+    
+    Args:
+        profile: Profile name
+        
+    Returns:
+        The profile name, lowercased
+        
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    profile = (profile or PROFILE_FULL).lower()
+    if profile not in NLP_PROFILES:
+        raise ValueError(f"Unknown NLP profile '{profile}', expected one of {NLP_PROFILES}")
+    return profile
+
 
-def load_optimized_model(model_name: str = "en_core_web_sm") -> spacy.language.Language:
+def load_optimized_model(model_name: str = "en_core_web_sm", profile: str = PROFILE_FULL) -> spacy.language.Language:
     """Load a highly optimized SpaCy model with minimal memory footprint.
     
     Args:
         model_name: Name of the SpaCy model to load
+        profile: Pipeline profile ('full', 'fast' or 'minimal')
         
     Returns:
         Optimized SpaCy language model
@@ -56,10 +91,32 @@ def load_optimized_model(model_name: str = "en_core_web_sm") -> spacy.language.L
     3. Limits maximum text length for memory efficiency
     4. Configures optimal pipeline settings
     """
+    profile = validate_profile(profile)
+    
     # Force garbage collection before loading
     gc.collect()
     gc.collect()
     
+    if profile == PROFILE_MINIMAL:
+        # Rule-based only: tokenizer and punctuation-based sentence splitting
+        nlp = spacy.blank(model_name.split('_')[0])
+        nlp.add_pipe('sentencizer')
+        nlp.max_length = 50000
+        return nlp
+    
+    if profile == PROFILE_FAST:
+        # NER and the statistical sentence recognizer, without tagger or parser
+        nlp = spacy.load(model_name, exclude=list(FAST_PROFILE_EXCLUDED))
+        if 'senter' in nlp.disabled:
+            nlp.enable_pipe('senter')
+        # The shared tok2vec only matters if a kept component listens to it
+        if 'tok2vec' in nlp.pipe_names:
+            listeners = getattr(nlp.get_pipe('tok2vec'), 'listening_components', [])
+            if not any(name in nlp.pipe_names for name in listeners):
+                nlp.remove_pipe('tok2vec')
+        nlp.max_length = 50000
+        return nlp
+    
     # Load with minimal components
     nlp = spacy.load(model_name, disable=[
         'vectors',       # Disable word vectors (massive memory savings)
@@ -0,0 +1,187 @@
+"""Compact, versioned wire format for NLP worker results.
+
+NLP workers send their results to the parent process over a pipe. Instead of
+the nested result dictionaries (entity offsets, phrase roots, repeated key
+names), each result is encoded as a flat row carrying only the fields that
+format_nlp_result consumes, and entity labels are interned in a per-response
+string table.
+
+Response payload (version 1):
+    {"v": 1, "labels": ["PERSON", "ORG"], "rows": [row, ...]}
+
+Row layout (one JSON array per text):
+    [flags, sentence_count, entities, key_phrases, questions,
+     deadline_phrases, time_references, error]
+
+    - flags: Bit mask of the boolean fields (FLAG_* constants)
+    - entities: Flat [label index, text, label index, text, ...] list
+    - key_phrases, questions, deadline_phrases, time_references: Strings
+    - error: Error message, or null
+
+Both ends import this module, so the flag bits and the row layout can only
+change together with WIRE_FORMAT_VERSION.
+
+Usage:
+    # Worker
+    payload = encode_results(process_texts(texts, nlp))
+    # Parent
+    results = decode_results(payload)  # Dicts accepted by format_nlp_result
+"""
+
+import json
+from typing import Any, Dict, List
+
+WIRE_FORMAT_VERSION = 1
+
+# Flag bits
+FLAG_POSITIVE = 1 << 0
+FLAG_NEGATIVE = 1 << 1
+FLAG_GRATITUDE = 1 << 2
+FLAG_AGREEMENT = 1 << 3
+FLAG_DISSATISFACTION = 1 << 4
+FLAG_DEMAND = 1 << 5
+FLAG_BULK = 1 << 6
+FLAG_AUTOMATED = 1 << 7
+FLAG_URGENT = 1 << 8
+FLAG_DEADLINE = 1 << 9
+FLAG_QUESTION = 1 << 10
+
+
+class WireFormatError(ValueError):
+    """Exception raised for payloads that cannot be decoded."""
+    pass
+
+
+def _text(item: Any) -> str:
+    """Text of a phrase or entity given as a string or a dict with 'text'."""
+    return item['text'] if isinstance(item, dict) else item
+
+
+def _flags(result: Dict[str, Any]) -> int:
+    """Pack the boolean fields of a raw result into a bit mask."""
+    sentiment = result.get('sentiment', {})
+    patterns = sentiment.get('patterns', {})
+    email_type = result.get('email_type', {})
+    bits = (
+        (sentiment.get('is_positive'), FLAG_POSITIVE),
+        (sentiment.get('is_negative'), FLAG_NEGATIVE),
+        (patterns.get('gratitude'), FLAG_GRATITUDE),
+        (patterns.get('agreement'), FLAG_AGREEMENT),
+        (patterns.get('dissatisfaction'), FLAG_DISSATISFACTION),
+        (patterns.get('demand'), FLAG_DEMAND),
+        (email_type.get('is_bulk'), FLAG_BULK),
+        (email_type.get('is_automated'), FLAG_AUTOMATED),
+        (result.get('urgency', {}).get('is_urgent'), FLAG_URGENT),
+        (result.get('time_sensitivity', {}).get('has_deadline'), FLAG_DEADLINE),
+        (result.get('is_question'), FLAG_QUESTION),
+    )
+    return sum(flag for value, flag in bits if value)
+
+
+def encode_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Encode raw worker results into a compact payload.
+
+    Args:
+        results: Results as produced by the worker's analyze_text
+
+    Returns:
+        Dict: Versioned payload with an interned label table and one row per result
+    """
+    labels: List[str] = []
+    label_index: Dict[str, int] = {}
+    rows = []
+
+    for result in results:
+        entities = []
+        for label, items in result.get('entities', {}).items():
+            index = label_index.get(label)
+            if index is None:
+                index = label_index[label] = len(labels)
+                labels.append(label)
+            for item in items:
+                entities.append(index)
+                entities.append(_text(item))
+
+        time_sensitivity = result.get('time_sensitivity', {})
+        rows.append([
+            _flags(result),
+            result.get('sentence_count', 0),
+            entities,
+            [_text(phrase) for phrase in result.get('key_phrases', [])],
+            result.get('questions', []),
+            time_sensitivity.get('deadline_phrases', []),
+            time_sensitivity.get('time_references', []),
+            result.get('error'),
+        ])
+
+    return {'v': WIRE_FORMAT_VERSION, 'labels': labels, 'rows': rows}
+
+
+def decode_results(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Decode a payload into results accepted by format_nlp_result.
+
+    Entities are returned as {label: [text, ...]} and key phrases as strings;
+    character offsets and phrase roots are not transmitted.
+
+    Args:
+        payload: Payload produced by encode_results
+
+    Returns:
+        List[Dict]: One raw result dictionary per row
+
+    Raises:
+        WireFormatError: If the version is unsupported or a row is malformed
+    """
+    if payload.get('v') != WIRE_FORMAT_VERSION:
+        raise WireFormatError(f"Unsupported NLP wire format version: {payload.get('v')}")
+    labels = payload.get('labels', [])
+
+    results = []
+    try:
+        for flags, sentence_count, entities, key_phrases, questions, deadlines, references, error in payload['rows']:
+            entity_map: Dict[str, List[str]] = {}
+            for i in range(0, len(entities), 2):
+                entity_map.setdefault(labels[entities[i]], []).append(entities[i + 1])
+
+            has_deadline = bool(flags & FLAG_DEADLINE)
+            result = {
+                'entities': entity_map,
+                'key_phrases': key_phrases,
+                'sentence_count': sentence_count,
+                'questions': questions,
+                'sentiment': {
+                    'is_positive': bool(flags & FLAG_POSITIVE),
+                    'is_negative': bool(flags & FLAG_NEGATIVE),
+                    'patterns': {
+                        'gratitude': bool(flags & FLAG_GRATITUDE),
+                        'agreement': bool(flags & FLAG_AGREEMENT),
+                        'dissatisfaction': bool(flags & FLAG_DISSATISFACTION),
+                        'demand': bool(flags & FLAG_DEMAND)
+                    }
+                },
+                'email_type': {
+                    'is_bulk': bool(flags & FLAG_BULK),
+                    'is_automated': bool(flags & FLAG_AUTOMATED)
+                },
+                'urgency': {
+                    'is_urgent': bool(flags & FLAG_URGENT),
+                    'has_deadline': has_deadline
+                },
+                'time_sensitivity': {
+                    'has_deadline': has_deadline,
+                    'deadline_phrases': deadlines,
+                    'time_references': references
+                },
+                'is_question': bool(flags & FLAG_QUESTION)
+            }
+            if error:
+                result['error'] = error
+            results.append(result)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        raise WireFormatError(f"Malformed NLP wire format payload: {e}")
+    return results
+
+
+def dumps(message: Dict[str, Any]) -> str:
+    """Serialize a protocol message as one compact JSON line (without newline)."""
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False)
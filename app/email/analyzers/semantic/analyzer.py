@@ -3,9 +3,15 @@ Semantic Analyzer for email content.
 
 This module provides semantic analysis of emails using LLM, providing insights
 about content, priority, action items, and more.
+
+With cascade mode enabled, batches are triaged by a cheap model first and only
+the emails it can't settle are analyzed with the user's model (see
+processors.cascade). With a local classifier artifact configured, emails it
+classifies confidently as Promotions or Informational skip the LLM entirely
+(see classifier.fast_path).
 """
 import logging
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 from flask import g, current_app
 
@@ -15,6 +21,7 @@ from ..base import BaseAnalyzer
 from .utilities import (
     # Token and text handling
     TokenHandler,
+    get_token_handler,
     
     # LLM client operations
     get_openai_client,
@@ -30,6 +37,7 @@ from .utilities import (
     
     # Cost calculation
     format_cost_stats,
+    get_cached_tokens,
     
     # Email validation and preprocessing
     validate_email_data,
@@ -37,21 +45,84 @@ from .utilities import (
 )
 from .processors.prompt_creator import PromptCreator
 from .processors.response_parser import ResponseParser
-from .processors.batch_processor import BatchProcessor
+from .processors.batch_processor import BatchProcessor, DEFAULT_PACK_TOKEN_BUDGET, DEFAULT_MAX_PACK_SIZE
+from .utilities.token_budget import PromptBudget, DEFAULT_EMAIL_TOKEN_TARGET
+from .processors.batch_api import DeferredBatchProcessor
+from .processors.cascade import (
+    ModelCascade, DEFAULT_TRIAGE_MODEL, DEFAULT_TRIAGE_RESPONSE_TOKENS, DEFAULT_CONFIDENCE_THRESHOLD
+)
+from .classifier import LocalClassifier, LocalFastPath, DEFAULT_FAST_PATH_THRESHOLD
 
 
 class SemanticAnalyzer(BaseAnalyzer):
     """Analyzes emails using LLM for semantic understanding."""
     
-    def __init__(self):
-        """Initialize the semantic analyzer."""
+    def __init__(
+        self,
+        pack_emails: bool = True,
+        pack_token_budget: int = DEFAULT_PACK_TOKEN_BUDGET,
+        max_pack_size: int = DEFAULT_MAX_PACK_SIZE,
+        email_token_target: int = DEFAULT_EMAIL_TOKEN_TARGET,
+        cascade_enabled: bool = False,
+        cascade_model: str = DEFAULT_TRIAGE_MODEL,
+        cascade_response_tokens: int = DEFAULT_TRIAGE_RESPONSE_TOKENS,
+        cascade_confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+        local_classifier_path: Optional[str] = None,
+        local_classifier_threshold: float = DEFAULT_FAST_PATH_THRESHOLD,
+        token_handler: Optional[TokenHandler] = None
+    ):
+        """Initialize the semantic analyzer.
+        
+        Args:
+            pack_emails: Analyze several emails per LLM request in batches
+            pack_token_budget: Maximum prompt tokens of a packed request
+            max_pack_size: Maximum number of emails in a packed request
+            email_token_target: Prompt tokens for each email's part of a prompt
+            cascade_enabled: Triage batches with a cheap model, escalating uncertain emails
+            cascade_model: Model of the triage stage
+            cascade_response_tokens: Completion tokens per email allowed to the triage model
+            cascade_confidence_threshold: Triage confidence below which an email is escalated
+            local_classifier_path: Local classifier artifact; emails it classifies
+                confidently skip the LLM. Disabled if None or the artifact can't be loaded.
+            local_classifier_threshold: Local classifier confidence needed to skip the LLM
+            token_handler: Token handler for counting and truncation (default: the shared one)
+        """
         self.logger = logging.getLogger(__name__)
         self.model = "gpt-4o-mini"  # Default model - will be overridden by user settings
         self.max_content_tokens = 1000  # Default to medium length - will be overridden by user settings
-        self.token_handler = TokenHandler()
-        self.prompt_creator = PromptCreator(token_handler=self.token_handler)
+        self.token_handler = token_handler or get_token_handler()
+        self.prompt_creator = PromptCreator(token_handler=self.token_handler, email_token_target=email_token_target)
         self.response_parser = ResponseParser()
-        self.batch_processor = BatchProcessor(self.token_handler)
+        self.batch_processor = BatchProcessor(
+            self.token_handler,
+            pack_emails=pack_emails,
+            pack_token_budget=pack_token_budget,
+            max_pack_size=max_pack_size,
+            email_token_target=email_token_target
+        )
+        self.cascade = None
+        if cascade_enabled:
+            triage_processor = BatchProcessor(
+                self.token_handler,
+                pack_emails=pack_emails,
+                pack_token_budget=pack_token_budget,
+                max_pack_size=max_pack_size,
+                email_token_target=email_token_target,
+                response_tokens=cascade_response_tokens,
+                request_confidence=True
+            )
+            triage_processor.model = cascade_model
+            self.cascade = ModelCascade(
+                self.batch_processor, triage_processor, confidence_threshold=cascade_confidence_threshold
+            )
+        self.fast_path = None
+        if local_classifier_path:
+            try:
+                self.fast_path = LocalFastPath(
+                    LocalClassifier.load(local_classifier_path), threshold=local_classifier_threshold
+                )
+            except Exception as e:
+                self.logger.warning(f"Local classifier disabled, could not load {local_classifier_path}: {e}")
         
     async def analyze(self, email_data: EmailMetadata, nlp_results: Dict) -> Dict[str, Any]:
         """
@@ -129,14 +200,14 @@ class SemanticAnalyzer(BaseAnalyzer):
         Raises:
             LLMProcessingError: If LLM processing fails
         """
-        # Create prompt for LLM
-        prompt = self.prompt_creator.create_prompt(email_data, nlp_results)
-        prompt_tokens = self.token_handler.count_tokens(prompt)
+        # Create prompt for LLM within the per-email token target
+        prompt, budget = self.prompt_creator.create_prompt_with_budget(email_data, nlp_results)
         
-        # Log the analysis request
+        # Log the analysis request; exact prompt tokens come back in the response usage
         self.logger.info(
             f"Processing email {email_data.id} - Model: {self.model}, " 
-            f"Prompt Tokens: {prompt_tokens}, Max Response: {self.response_tokens}"
+            f"Prompt Chars: {len(prompt)}, Prompt Budget: {budget.budgeted_prompt_tokens} tokens, "
+            f"Max Response: {self.response_tokens}"
         )
         
         # Get OpenAI client and send request
@@ -149,13 +220,13 @@ class SemanticAnalyzer(BaseAnalyzer):
         )
         
         # Extract and process response
-        return await self._process_llm_response(response, email_data, prompt_tokens)
+        return await self._process_llm_response(response, email_data, budget)
     
     async def _process_llm_response(
         self, 
         response, 
-        email_data: EmailMetadata, 
-        prompt_tokens: int
+        email_data: EmailMetadata,
+        budget: Optional[PromptBudget] = None
     ) -> Dict[str, Any]:
         """
         Process the LLM response and format results.
@@ -163,7 +234,7 @@ class SemanticAnalyzer(BaseAnalyzer):
         Args:
             response: The LLM response object
             email_data: Original email data
-            prompt_tokens: Number of tokens in the prompt
+            budget: Token budget of the prompt, reported next to the actual usage
             
         Returns:
             Processed analysis results
@@ -172,11 +243,13 @@ class SemanticAnalyzer(BaseAnalyzer):
         prompt_tokens = response.usage.prompt_tokens
         completion_tokens = response.usage.completion_tokens
         total_tokens = response.usage.total_tokens
+        cached_tokens = get_cached_tokens(response.usage)
         
         # Log completion details
         self.logger.info(
             f"Completed email {email_data.id} - "
-            f"Tokens: {prompt_tokens}/{completion_tokens}/{total_tokens} (in/out/total)"
+            f"Tokens: {prompt_tokens}/{completion_tokens}/{total_tokens} (in/out/total), "
+            f"{cached_tokens} cached"
         )
         
         # Parse the response content
@@ -184,7 +257,10 @@ class SemanticAnalyzer(BaseAnalyzer):
         analysis = self.response_parser.parse_response(response_content)
         
         # Add usage statistics
-        stats = format_cost_stats(self.model, prompt_tokens, completion_tokens, total_tokens)
+        stats = format_cost_stats(
+            self.model, prompt_tokens, completion_tokens, total_tokens, cached_tokens=cached_tokens,
+            budgeted_tokens=budget.budgeted_prompt_tokens if budget else None
+        )
         analysis.update(stats)
         
         # Add email identifier and enabled flag
@@ -195,12 +271,19 @@ class SemanticAnalyzer(BaseAnalyzer):
         
         return analysis
     
-    async def analyze_batch(self, emails: List[Tuple[EmailMetadata, Dict]], max_batch_size: int = 20) -> List[Dict[str, Any]]:
-        """Analyze a batch of emails using a single LLM request.
+    async def analyze_batch(
+        self,
+        emails: List[Tuple[EmailMetadata, Dict]],
+        max_batch_size: int = 20,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze a batch of emails, packing several emails per LLM request.
         
         Args:
             emails: List of tuples containing (EmailMetadata, nlp_results)
             max_batch_size: Maximum number of emails to process in a single batch
+            on_partial: Receives partial results (id, subject, category,
+                needs_action, summary so far) while responses stream in
             
         Returns:
             List of analysis results corresponding to input emails
@@ -212,4 +295,46 @@ class SemanticAnalyzer(BaseAnalyzer):
         self.batch_processor.model = self.model
         self.batch_processor.max_content_tokens = self.max_content_tokens
         
-        return await self.batch_processor.analyze_batch(emails, max_batch_size) 
\ No newline at end of file
+        # Settle confidently classified bulk and informational mail locally
+        local_results = {}
+        if self.fast_path is not None and is_ai_enabled():
+            local_results = self.fast_path.classify(emails)
+            if on_partial is not None:
+                for i, result in local_results.items():
+                    on_partial({'id': result['email_id'], 'subject': emails[i][0].subject,
+                                'category': result['category'], 'needs_action': result['needs_action'],
+                                'summary': result['summary']})
+        remaining = [email for i, email in enumerate(emails) if i not in local_results]
+        
+        llm_results = []
+        if remaining:
+            if self.cascade is not None:
+                llm_results = await self.cascade.analyze_batch(remaining, max_batch_size, on_partial)
+            else:
+                llm_results = await self.batch_processor.analyze_batch(remaining, max_batch_size, on_partial)
+        if not local_results:
+            return llm_results
+        
+        llm_iter = iter(llm_results)
+        return [local_results[i] if i in local_results else next(llm_iter) for i in range(len(emails))]
+
+    async def create_deferred_processor(self, client=None) -> DeferredBatchProcessor:
+        """Create a Batch API processor configured from the user's settings.
+        
+        Use it for backfills that can wait for results; see
+        processors.batch_api and app.email.processing.deferred_analysis.
+        
+        Args:
+            client: AsyncOpenAI client. Defaults to the application's client.
+            
+        Returns:
+            DeferredBatchProcessor using this analyzer's model and limits
+        """
+        await self._configure_analysis_settings()
+        return DeferredBatchProcessor(
+            client or await get_openai_client(),
+            token_handler=self.token_handler,
+            model=self.model,
+            max_content_tokens=self.max_content_tokens,
+            response_tokens=self.response_tokens
+        )
@@ -0,0 +1,19 @@
+"""
+Local classifier for semantic analysis.
+
+This package provides a CPU-only classifier (hashed n-gram features with a
+linear model) trained offline from the category and needs_action labels the
+LLM assigned to cached emails. At run time its fast path answers confidently
+classified Promotions and Informational emails without an LLM call.
+"""
+
+from .features import HashedFeaturizer
+from .model import LocalClassifier, LocalPrediction, ARTIFACT_FORMAT_VERSION
+from .fast_path import LocalFastPath, DEFAULT_FAST_PATH_THRESHOLD
+from .training import TrainingExample, examples_from_emails, split_examples, train_classifier, evaluate_fast_path
+
+__all__ = [
+    'HashedFeaturizer', 'LocalClassifier', 'LocalPrediction', 'ARTIFACT_FORMAT_VERSION',
+    'LocalFastPath', 'DEFAULT_FAST_PATH_THRESHOLD',
+    'TrainingExample', 'examples_from_emails', 'split_examples', 'train_classifier', 'evaluate_fast_path'
+]
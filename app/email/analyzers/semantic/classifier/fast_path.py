@@ -0,0 +1,135 @@
+"""
+Fast path that settles emails with the local classifier instead of the LLM.
+
+Before a batch goes to the LLM, each email is classified locally. An email
+is answered without an LLM call only when the classifier is confident in both
+labels, the predicted category is a fast path category (Promotions and
+Informational by default) and the email doesn't need action; everything else
+goes to the LLM as before. A local result has the category and needs_action
+of the prediction, no action items, the subject as its summary and no token
+usage or cost.
+
+Typical usage:
+    fast_path = LocalFastPath(LocalClassifier.load(path), threshold=0.9)
+    local_results = fast_path.classify(batch)
+"""
+import logging
+from typing import Any, Dict, List, Tuple
+
+from ....models.processed_email import LABEL_SOURCE_LOCAL
+from ....parsing.parser import EmailMetadata
+from .model import LocalClassifier, LocalPrediction
+
+# Default confidence needed to skip the LLM
+DEFAULT_FAST_PATH_THRESHOLD = 0.9
+
+# Categories the fast path may settle
+FAST_PATH_CATEGORIES = ('Promotions', 'Informational')
+
+# Model name reported for local results
+LOCAL_MODEL_NAME = 'local-classifier'
+
+
+class LocalFastPath:
+    """Answers confidently classified bulk and informational emails locally.
+
+    Attributes:
+        logger (logging.Logger): Logger for logging information and errors.
+        classifier (LocalClassifier): Trained local classifier.
+        threshold (float): Confidence needed to skip the LLM.
+        categories (Tuple[str, ...]): Categories the fast path may settle.
+        last_run_stats (Dict): Emails seen and LLM calls avoided in the last batch.
+    """
+
+    def __init__(
+        self,
+        classifier: LocalClassifier,
+        threshold: float = DEFAULT_FAST_PATH_THRESHOLD,
+        categories: Tuple[str, ...] = FAST_PATH_CATEGORIES
+    ):
+        """Initialize the fast path.
+
+        Args:
+            classifier: Trained local classifier
+            threshold: Confidence needed to skip the LLM
+            categories: Categories the fast path may settle
+        """
+        self.logger = logging.getLogger(__name__)
+        self.classifier = classifier
+        self.threshold = threshold
+        self.categories = tuple(categories)
+        self.last_run_stats: Dict[str, Any] = {}
+
+    def accepts(self, prediction: LocalPrediction) -> bool:
+        """Whether a prediction may be used instead of an LLM analysis.
+
+        Args:
+            prediction: Local prediction of an email
+
+        Returns:
+            True if the email can skip the LLM
+        """
+        return (prediction.category in self.categories
+                and not prediction.needs_action
+                and prediction.confidence >= self.threshold)
+
+    def classify(self, emails: List[Tuple[EmailMetadata, Dict]]) -> Dict[int, Dict[str, Any]]:
+        """Settle the emails of a batch the classifier is confident about.
+
+        Args:
+            emails: List of tuples containing (EmailMetadata, nlp_results)
+
+        Returns:
+            Analysis results of the settled emails, by index in emails
+        """
+        results = {}
+        for i, (email, _) in enumerate(emails):
+            try:
+                prediction = self.classifier.predict(email.subject, email.sender, email.body)
+            except Exception as e:
+                self.logger.warning(f"Local classification of email {email.id} failed: {e}")
+                continue
+            if self.accepts(prediction):
+                results[i] = self.create_result(email, prediction)
+
+        self.last_run_stats = {
+            'emails': len(emails),
+            'avoided': len(results),
+            'avoided_rate': len(results) / len(emails) if emails else 0.0,
+            'version': self.classifier.version
+        }
+        if results:
+            self.logger.info(
+                f"Local classifier {self.classifier.version} settled {len(results)}/{len(emails)} emails "
+                f"without an LLM call"
+            )
+        return results
+
+    def create_result(self, email: EmailMetadata, prediction: LocalPrediction) -> Dict[str, Any]:
+        """Create the analysis result of a locally settled email.
+
+        Args:
+            email: The email
+            prediction: Its local prediction
+
+        Returns:
+            Analysis result in the shape of an LLM result
+        """
+        return {
+            'needs_action': prediction.needs_action,
+            'category': prediction.category,
+            'action_items': [],
+            'summary': email.subject or 'No summary available',
+            'model': LOCAL_MODEL_NAME,
+            'label_source': LABEL_SOURCE_LOCAL,
+            'total_tokens': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'cost': 0,
+            'email_id': email.id,
+            'ai_enabled': True,
+            'local_classifier': {
+                'version': self.classifier.version,
+                'confidence': prediction.confidence
+            }
+        }
@@ -0,0 +1,118 @@
+"""
+Hashed n-gram features for the local classifier.
+
+Emails are turned into sparse feature vectors without a vocabulary: word
+unigrams and bigrams of the subject and the start of the body, plus the
+sender's address parts, are hashed into a fixed number of buckets (the
+hashing trick). A stable hash (CRC-32) is used so a trained artifact gives the
+same features in every process, and a sign bit from the hash keeps colliding
+features from always adding up.
+
+Typical usage:
+    featurizer = HashedFeaturizer()
+    indices, values = featurizer.transform(subject, sender, body)
+"""
+import math
+import re
+import zlib
+from collections import Counter
+from typing import List, Tuple
+
+import numpy as np
+
+# Default number of hash buckets (a power of two)
+DEFAULT_N_FEATURES = 2 ** 18
+
+# Default number of body characters featurized
+DEFAULT_MAX_BODY_CHARS = 2000
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9'_-]*")
+ADDRESS_PATTERN = re.compile(r"([^<\s@]+)@([^>\s@]+)")
+
+
+class HashedFeaturizer:
+    """Hashes the words of an email into a sparse feature vector.
+
+    Attributes:
+        n_features (int): Number of hash buckets, a power of two.
+        max_body_chars (int): Number of body characters featurized.
+    """
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, max_body_chars: int = DEFAULT_MAX_BODY_CHARS):
+        """Initialize the featurizer.
+
+        Args:
+            n_features: Number of hash buckets, rounded up to a power of two
+            max_body_chars: Number of body characters featurized
+
+        Raises:
+            ValueError: If n_features or max_body_chars is not positive
+        """
+        if n_features <= 0 or max_body_chars <= 0:
+            raise ValueError("n_features and max_body_chars must be positive")
+        self.n_features = 1 << (n_features - 1).bit_length()
+        self.max_body_chars = max_body_chars
+
+    def features(self, subject: str, sender: str, body: str) -> List[str]:
+        """List the named features of an email.
+
+        Args:
+            subject: Email subject
+            sender: Sender, as "Name <address>" or a bare address
+            body: Email body
+
+        Returns:
+            Feature names, with repeats
+        """
+        features = self._ngrams('s', subject or '')
+        features += self._ngrams('b', (body or '')[:self.max_body_chars])
+        match = ADDRESS_PATTERN.search((sender or '').lower())
+        if match:
+            local, domain = match.groups()
+            features.append(f"u:{local}")
+            features.append(f"d:{domain}")
+            # Organization part of the domain, e.g. "example" for mail.example.com
+            parts = domain.split('.')
+            if len(parts) >= 2:
+                features.append(f"o:{parts[-2]}")
+        return features
+
+    def transform(self, subject: str, sender: str, body: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Turn an email into a sparse feature vector.
+
+        Counts are log-scaled and the vector is L2-normalized.
+
+        Args:
+            subject: Email subject
+            sender: Sender, as "Name <address>" or a bare address
+            body: Email body
+
+        Returns:
+            Tuple of (unique bucket indices, values)
+        """
+        buckets: Counter = Counter()
+        for feature, count in Counter(self.features(subject, sender, body)).items():
+            hashed = zlib.crc32(feature.encode('utf-8'))
+            sign = -1.0 if hashed & 0x80000000 else 1.0
+            buckets[hashed & (self.n_features - 1)] += sign * (1.0 + math.log(count))
+        indices = np.fromiter(buckets.keys(), dtype=np.int64, count=len(buckets))
+        values = np.fromiter(buckets.values(), dtype=np.float32, count=len(buckets))
+        norm = float(np.linalg.norm(values))
+        if norm > 0:
+            values /= norm
+        return indices, values
+
+    def _ngrams(self, prefix: str, text: str) -> List[str]:
+        """Word unigrams and bigrams of a text.
+
+        Args:
+            prefix: Field prefix of the feature names
+            text: Text to tokenize
+
+        Returns:
+            Prefixed unigram and bigram features
+        """
+        words = TOKEN_PATTERN.findall(text.lower())
+        features = [f"{prefix}:{word}" for word in words]
+        features += [f"{prefix}:{first} {second}" for first, second in zip(words, words[1:])]
+        return features
@@ -0,0 +1,240 @@
+"""
+Linear model of the local classifier and its versioned artifact.
+
+The classifier predicts the two labels the LLM assigns that matter most for
+triage: the category (softmax regression over the four categories) and
+needs_action (logistic regression), both on hashed n-gram features. It is
+trained with plain SGD on cached LLM labels and runs on the CPU in well
+under a millisecond per email.
+
+A trained classifier is saved as a single .npz artifact holding the weights
+and a JSON metadata record (artifact format version, model version,
+featurizer settings, training set size and evaluation metrics). Loading an
+artifact of another format version raises a ValueError.
+
+Typical usage:
+    classifier = LocalClassifier.load('instance/classifiers/local-classifier.npz')
+    prediction = classifier.predict(email.subject, email.sender, email.body)
+"""
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .features import HashedFeaturizer, DEFAULT_N_FEATURES, DEFAULT_MAX_BODY_CHARS
+
+logger = logging.getLogger(__name__)
+
+# Format of the saved artifact; bumped when the layout or features change
+ARTIFACT_FORMAT_VERSION = 1
+
+# Categories predicted, in the order of the weight columns
+CATEGORIES = ('Work', 'Personal', 'Promotions', 'Informational')
+
+
+@dataclass
+class LocalPrediction:
+    """Labels predicted for one email.
+
+    Attributes:
+        category: Predicted category.
+        needs_action: Predicted needs_action flag.
+        category_confidence: Probability of the predicted category.
+        needs_action_confidence: Probability of the predicted needs_action value.
+    """
+    category: str
+    needs_action: bool
+    category_confidence: float
+    needs_action_confidence: float
+
+    @property
+    def confidence(self) -> float:
+        """Confidence in both labels (the lower of the two probabilities)."""
+        return min(self.category_confidence, self.needs_action_confidence)
+
+
+class LocalClassifier:
+    """Predicts category and needs_action from hashed n-gram features.
+
+    Attributes:
+        featurizer (HashedFeaturizer): Feature hashing of emails.
+        categories (Tuple[str, ...]): Categories, in weight column order.
+        category_weights (np.ndarray): Category weights, (n_features, categories).
+        category_bias (np.ndarray): Category bias, (categories,).
+        action_weights (np.ndarray): needs_action weights, (n_features,).
+        action_bias (float): needs_action bias.
+        metadata (Dict[str, Any]): Version, training and evaluation metadata.
+    """
+
+    def __init__(self, featurizer: Optional[HashedFeaturizer] = None, categories: Sequence[str] = CATEGORIES):
+        """Initialize an untrained classifier.
+
+        Args:
+            featurizer: Feature hashing of emails. Defaults to HashedFeaturizer().
+            categories: Categories to predict
+        """
+        self.featurizer = featurizer or HashedFeaturizer()
+        self.categories = tuple(categories)
+        n_features = self.featurizer.n_features
+        self.category_weights = np.zeros((n_features, len(self.categories)), dtype=np.float32)
+        self.category_bias = np.zeros(len(self.categories), dtype=np.float32)
+        self.action_weights = np.zeros(n_features, dtype=np.float32)
+        self.action_bias = 0.0
+        self.metadata: Dict[str, Any] = {}
+
+    @property
+    def version(self) -> Optional[str]:
+        """Model version of a trained classifier, or None."""
+        return self.metadata.get('version')
+
+    def fit(
+        self,
+        samples: List[Tuple[str, str, str]],
+        categories: List[str],
+        needs_action: List[bool],
+        epochs: int = 5,
+        learning_rate: float = 0.5,
+        seed: int = 0
+    ) -> 'LocalClassifier':
+        """Train the classifier with SGD.
+
+        Args:
+            samples: (subject, sender, body) of each email
+            categories: LLM category of each email
+            needs_action: LLM needs_action flag of each email
+            epochs: Passes over the training set
+            learning_rate: Initial step size, decayed by 1/(1 + epoch)
+            seed: Seed of the example order
+
+        Returns:
+            The trained classifier
+        """
+        vectors = [self.featurizer.transform(*sample) for sample in samples]
+        targets = [self.categories.index(category) for category in categories]
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            step = learning_rate / (1 + epoch)
+            for n in rng.permutation(len(vectors)):
+                indices, values = vectors[n]
+                # Softmax regression step for the category
+                logits = values @ self.category_weights[indices] + self.category_bias
+                probabilities = self._softmax(logits)
+                probabilities[targets[n]] -= 1.0
+                self.category_weights[indices] -= step * np.outer(values, probabilities)
+                self.category_bias -= step * probabilities
+                # Logistic regression step for needs_action
+                z = float(values @ self.action_weights[indices]) + self.action_bias
+                error = self._sigmoid(z) - float(needs_action[n])
+                self.action_weights[indices] -= step * error * values
+                self.action_bias -= step * error
+
+        trained_at = datetime.now(timezone.utc)
+        self.metadata = {
+            'version': trained_at.strftime('%Y%m%d%H%M%S'),
+            'trained_at': trained_at.isoformat(),
+            'examples': len(samples),
+            'label_counts': {category: categories.count(category) for category in self.categories},
+            'epochs': epochs,
+            'learning_rate': learning_rate
+        }
+        return self
+
+    def predict(self, subject: str, sender: str, body: str) -> LocalPrediction:
+        """Predict the labels of an email.
+
+        Args:
+            subject: Email subject
+            sender: Email sender
+            body: Email body
+
+        Returns:
+            Predicted labels with their probabilities
+        """
+        indices, values = self.featurizer.transform(subject, sender, body)
+        probabilities = self._softmax(values @ self.category_weights[indices] + self.category_bias)
+        best = int(np.argmax(probabilities))
+        action_probability = self._sigmoid(float(values @ self.action_weights[indices]) + self.action_bias)
+        needs_action = action_probability >= 0.5
+        return LocalPrediction(
+            category=self.categories[best],
+            needs_action=needs_action,
+            category_confidence=float(probabilities[best]),
+            needs_action_confidence=action_probability if needs_action else 1.0 - action_probability
+        )
+
+    def save(self, path: str) -> None:
+        """Save the classifier as a versioned artifact.
+
+        Args:
+            path: Artifact path (.npz)
+        """
+        metadata = dict(
+            self.metadata,
+            format_version=ARTIFACT_FORMAT_VERSION,
+            categories=list(self.categories),
+            n_features=self.featurizer.n_features,
+            max_body_chars=self.featurizer.max_body_chars
+        )
+        with open(path, 'wb') as artifact:
+            np.savez_compressed(
+                artifact,
+                category_weights=self.category_weights,
+                category_bias=self.category_bias,
+                action_weights=self.action_weights,
+                action_bias=np.array([self.action_bias], dtype=np.float64),
+                metadata=np.array(json.dumps(metadata))
+            )
+        logger.info(f"Saved local classifier {self.version} to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'LocalClassifier':
+        """Load a classifier artifact.
+
+        Args:
+            path: Artifact path (.npz)
+
+        Returns:
+            The trained classifier
+
+        Raises:
+            ValueError: If the artifact has another format version or its
+                weights don't match its metadata
+        """
+        with np.load(path, allow_pickle=False) as artifact:
+            metadata = json.loads(str(artifact['metadata']))
+            if metadata.get('format_version') != ARTIFACT_FORMAT_VERSION:
+                raise ValueError(
+                    f"Local classifier artifact {path} has format version {metadata.get('format_version')}, "
+                    f"expected {ARTIFACT_FORMAT_VERSION}"
+                )
+            featurizer = HashedFeaturizer(
+                metadata.get('n_features', DEFAULT_N_FEATURES),
+                metadata.get('max_body_chars', DEFAULT_MAX_BODY_CHARS)
+            )
+            classifier = cls(featurizer, metadata['categories'])
+            if artifact['category_weights'].shape != classifier.category_weights.shape:
+                raise ValueError(f"Local classifier artifact {path} has weights of an unexpected shape")
+            classifier.category_weights = artifact['category_weights']
+            classifier.category_bias = artifact['category_bias']
+            classifier.action_weights = artifact['action_weights']
+            classifier.action_bias = float(artifact['action_bias'][0])
+        classifier.metadata = metadata
+        logger.info(f"Loaded local classifier {classifier.version} from {path}")
+        return classifier
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        """Softmax of a logit vector."""
+        exp = np.exp(logits - np.max(logits))
+        return exp / exp.sum()
+
+    @staticmethod
+    def _sigmoid(z: float) -> float:
+        """Logistic function, safe for large |z|."""
+        if z >= 0:
+            return float(1.0 / (1.0 + np.exp(-z)))
+        exp = np.exp(z)
+        return float(exp / (1.0 + exp))
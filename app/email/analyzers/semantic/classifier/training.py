@@ -0,0 +1,190 @@
+"""
+Training and evaluation of the local classifier from cached LLM labels.
+
+Cached ProcessedEmail records carry the category and needs_action the LLM
+assigned. Only records labeled by the LLM (label_source 'llm') are used:
+results of the fast path itself and of thread expansion would train the
+classifier on its own or derived predictions. Records without an analysis
+(AI disabled, failed analysis: summary missing or 'No summary available')
+or with an unknown category are left out as well. Examples are split into training and holdout sets by a hash of the
+email ID, so the split is stable across runs as the cache grows.
+
+The evaluation harness runs the classifier over labeled examples and reports
+its agreement with the LLM on both labels, and, for the fast path gate used
+at run time, the fraction of LLM calls avoided and the agreement on the
+emails it would have settled.
+
+Typical usage:
+    examples = examples_from_emails(cached_emails)
+    train, holdout = split_examples(examples)
+    classifier = train_classifier(train)
+    report = evaluate_fast_path(LocalFastPath(classifier), holdout)
+"""
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ....models.processed_email import ProcessedEmail, LABEL_SOURCE_LLM
+from .features import HashedFeaturizer
+from .model import LocalClassifier, CATEGORIES
+from .fast_path import LocalFastPath
+
+# Summary of results that have no LLM analysis
+UNANALYZED_SUMMARY = 'No summary available'
+
+# Default fraction of examples held out for evaluation
+DEFAULT_HOLDOUT_FRACTION = 0.2
+
+
+@dataclass
+class TrainingExample:
+    """An email with the labels the LLM assigned to it.
+
+    Attributes:
+        email_id: Email ID.
+        subject: Email subject.
+        sender: Email sender.
+        body: Email body.
+        category: LLM category.
+        needs_action: LLM needs_action flag.
+    """
+    email_id: str
+    subject: str
+    sender: str
+    body: str
+    category: str
+    needs_action: bool
+
+    @property
+    def sample(self) -> Tuple[str, str, str]:
+        """(subject, sender, body) input of the classifier."""
+        return self.subject, self.sender, self.body
+
+
+def examples_from_emails(emails: Iterable[ProcessedEmail]) -> List[TrainingExample]:
+    """Turn cached processed emails into labeled examples.
+
+    Args:
+        emails: Processed emails, e.g. from RedisEmailCache.get_all_emails
+
+    Returns:
+        Examples of the emails labeled by the LLM, one per email ID
+    """
+    examples = {}
+    for email in emails:
+        if getattr(email, 'label_source', None) != LABEL_SOURCE_LLM:
+            continue
+        if not email.summary or email.summary == UNANALYZED_SUMMARY or email.category not in CATEGORIES:
+            continue
+        examples[email.id] = TrainingExample(
+            email_id=email.id,
+            subject=email.subject or '',
+            sender=email.sender or '',
+            body=email.body or '',
+            category=email.category,
+            needs_action=bool(email.needs_action)
+        )
+    return list(examples.values())
+
+
+def split_examples(
+    examples: List[TrainingExample],
+    holdout_fraction: float = DEFAULT_HOLDOUT_FRACTION
+) -> Tuple[List[TrainingExample], List[TrainingExample]]:
+    """Split examples into training and holdout sets by email ID hash.
+
+    Args:
+        examples: Labeled examples
+        holdout_fraction: Fraction of examples held out
+
+    Returns:
+        Tuple of (training examples, holdout examples)
+    """
+    train, holdout = [], []
+    for example in examples:
+        bucket = zlib.crc32(example.email_id.encode('utf-8')) % 1000
+        (holdout if bucket < holdout_fraction * 1000 else train).append(example)
+    return train, holdout
+
+
+def train_classifier(
+    examples: List[TrainingExample],
+    featurizer: Optional[HashedFeaturizer] = None,
+    epochs: int = 5,
+    learning_rate: float = 0.5,
+    seed: int = 0
+) -> LocalClassifier:
+    """Train a local classifier on labeled examples.
+
+    Args:
+        examples: Training examples
+        featurizer: Feature hashing of emails. Defaults to HashedFeaturizer().
+        epochs: Passes over the training set
+        learning_rate: Initial SGD step size
+        seed: Seed of the example order
+
+    Returns:
+        The trained classifier
+
+    Raises:
+        ValueError: If there are no examples
+    """
+    if not examples:
+        raise ValueError("No labeled examples to train on")
+    return LocalClassifier(featurizer).fit(
+        [example.sample for example in examples],
+        [example.category for example in examples],
+        [example.needs_action for example in examples],
+        epochs=epochs,
+        learning_rate=learning_rate,
+        seed=seed
+    )
+
+
+def evaluate_fast_path(fast_path: LocalFastPath, examples: List[TrainingExample]) -> Dict[str, Any]:
+    """Compare the classifier with the LLM labels of held-out examples.
+
+    Args:
+        fast_path: Fast path with the classifier and gate to evaluate
+        examples: Labeled examples not used in training
+
+    Returns:
+        Report with the agreement on each label over all examples, the
+        fraction of LLM calls the fast path would avoid, the agreement on
+        those emails, and the same per LLM category
+    """
+    report: Dict[str, Any] = {
+        'emails': len(examples),
+        'category_agreement': 0.0,
+        'needs_action_agreement': 0.0,
+        'calls_avoided': 0,
+        'calls_avoided_rate': 0.0,
+        'avoided_agreement': 0.0,
+        'per_category': {category: {'emails': 0, 'agreement': 0.0, 'avoided': 0} for category in CATEGORIES}
+    }
+    if not examples:
+        return report
+
+    category_matches = action_matches = avoided_matches = 0
+    for example in examples:
+        prediction = fast_path.classifier.predict(*example.sample)
+        category_match = prediction.category == example.category
+        both_match = category_match and prediction.needs_action == example.needs_action
+        category_matches += category_match
+        action_matches += prediction.needs_action == example.needs_action
+        per_category = report['per_category'][example.category]
+        per_category['emails'] += 1
+        per_category['agreement'] += both_match
+        if fast_path.accepts(prediction):
+            report['calls_avoided'] += 1
+            per_category['avoided'] += 1
+            avoided_matches += both_match
+
+    report['category_agreement'] = category_matches / len(examples)
+    report['needs_action_agreement'] = action_matches / len(examples)
+    report['calls_avoided_rate'] = report['calls_avoided'] / len(examples)
+    report['avoided_agreement'] = avoided_matches / report['calls_avoided'] if report['calls_avoided'] else 0.0
+    for per_category in report['per_category'].values():
+        if per_category['emails']:
+            per_category['agreement'] /= per_category['emails']
+    return report
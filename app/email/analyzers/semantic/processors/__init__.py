@@ -2,11 +2,17 @@
 Processors for semantic analysis.
 
 This package provides processor classes for handling various aspects of
-semantic analysis, including prompt creation, response parsing, and batch processing.
+semantic analysis, including prompt creation, response parsing (complete and
+streamed), batch processing, the confidence-gated model cascade and deferred
+analysis through the OpenAI Batch API.
 """
 
-from .prompt_creator import PromptCreator
+from .prompt_creator import PromptCreator, PromptTemplate
 from .response_parser import ResponseParser
+from .partial_parser import PartialResponseParser
 from .batch_processor import BatchProcessor
+from .batch_api import DeferredBatchProcessor
+from .cascade import ModelCascade
 
-__all__ = ['PromptCreator', 'ResponseParser', 'BatchProcessor'] 
\ No newline at end of file
+__all__ = ['PromptCreator', 'PromptTemplate', 'ResponseParser', 'PartialResponseParser', 'BatchProcessor',
+           'DeferredBatchProcessor', 'ModelCascade'] 
\ No newline at end of file
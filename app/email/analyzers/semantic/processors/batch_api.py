@@ -0,0 +1,258 @@
+"""
+Deferred email analysis through the OpenAI Batch API.
+
+Background refreshes and large backfills don't need interactive latency. This
+module analyzes such emails through the Batch API instead of live chat
+completions: requests are billed at half price and don't count against the
+live rate limits, in exchange for results arriving within the completion
+window (up to 24 hours) instead of seconds.
+
+Flow:
+    1. build_requests: one chat completion request per email, with the same
+       prompt (PromptCreator) and request body as a live analysis
+    2. submit: upload the requests as a JSONL file and create a batch
+    3. poll: check once whether the batch has reached a terminal status
+    4. fetch_results: download the output file and parse each response
+       with ResponseParser, priced at the Batch API discount
+
+Nothing here waits for a batch. The caller saves the batch ID and polls it
+from a background task (see app.email.processing.deferred_analysis).
+
+Typical usage:
+    processor = DeferredBatchProcessor(client, model="gpt-4o-mini")
+    batch_id = await processor.submit(emails)
+    ...
+    batch = await processor.poll(batch_id)
+    if batch is not None:
+        results = await processor.fetch_results(batch)
+"""
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ....models.exceptions import LLMProcessingError
+from ....parsing.parser import EmailMetadata
+from ..utilities import (
+    TokenHandler,
+    get_token_handler,
+    create_completion_body,
+    preprocess_emails,
+    format_cost_stats,
+    get_cached_tokens,
+    BATCH_API_PRICE_FACTOR
+)
+from .prompt_creator import PromptCreator
+from .response_parser import ResponseParser
+
+# Endpoint the batch requests are sent to
+BATCH_ENDPOINT = '/v1/chat/completions'
+
+# Batch statuses after which the batch no longer changes
+TERMINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+class DeferredBatchProcessor:
+    """Analyzes emails through the OpenAI Batch API.
+
+    Attributes:
+        logger (logging.Logger): Logger for logging information and errors.
+        client: AsyncOpenAI client (any base URL implementing the batch endpoints).
+        model (str): The language model to use for processing.
+        max_content_tokens (int): Maximum number of tokens for email content.
+        response_tokens (int): Maximum completion tokens per email.
+        completion_window (str): Batch completion window.
+    """
+
+    def __init__(
+        self,
+        client,
+        token_handler: Optional[TokenHandler] = None,
+        model: str = "gpt-4o-mini",
+        max_content_tokens: int = 1000,
+        response_tokens: int = 300,
+        completion_window: str = '24h'
+    ):
+        """Initialize the deferred batch processor.
+
+        Args:
+            client: AsyncOpenAI client.
+            token_handler: The token handler for text truncation (default: the shared one).
+            model: The language model to use for processing.
+            max_content_tokens: Maximum number of tokens for email content.
+            response_tokens: Maximum completion tokens per email.
+            completion_window: Batch completion window.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.client = client
+        self.token_handler = token_handler or get_token_handler()
+        self.model = model
+        self.max_content_tokens = max_content_tokens
+        self.response_tokens = response_tokens
+        self.completion_window = completion_window
+        self.prompt_creator = PromptCreator(token_handler=self.token_handler)
+        self.response_parser = ResponseParser()
+
+    def build_requests(self, emails: List[Tuple[EmailMetadata, Dict]]) -> List[Dict[str, Any]]:
+        """Build one Batch API request per email.
+
+        The email ID is the request's custom_id; repeated IDs are skipped.
+
+        Args:
+            emails: List of tuples containing (EmailMetadata, nlp_results).
+
+        Returns:
+            List of request objects for the batch input file.
+        """
+        requests = []
+        unique = {}
+        for email_data, nlp_results in emails:
+            if email_data.id in unique:
+                self.logger.warning(f"Skipping repeated email {email_data.id} in batch requests")
+                continue
+            unique[email_data.id] = (email_data, nlp_results)
+        clean_emails = preprocess_emails(
+            [email_data for email_data, _ in unique.values()], self.token_handler, self.max_content_tokens
+        )
+        for clean_email, (email_data, nlp_results) in zip(clean_emails, unique.values()):
+            prompt = self.prompt_creator.create_prompt(clean_email, nlp_results)
+            requests.append({
+                'custom_id': email_data.id,
+                'method': 'POST',
+                'url': BATCH_ENDPOINT,
+                'body': create_completion_body(self.model, prompt, self.response_tokens)
+            })
+        return requests
+
+    @staticmethod
+    def to_jsonl(requests: List[Dict[str, Any]]) -> bytes:
+        """Serialize requests as a JSONL batch input file.
+
+        Args:
+            requests: Request objects from build_requests.
+
+        Returns:
+            File content, one request per line.
+        """
+        return ''.join(json.dumps(request) + '\n' for request in requests).encode('utf-8')
+
+    async def submit(
+        self,
+        emails: List[Tuple[EmailMetadata, Dict]],
+        metadata: Optional[Dict[str, str]] = None
+    ) -> str:
+        """Upload the requests for a set of emails and create a batch.
+
+        Args:
+            emails: List of tuples containing (EmailMetadata, nlp_results).
+            metadata: Optional metadata attached to the batch.
+
+        Returns:
+            The batch ID.
+
+        Raises:
+            LLMProcessingError: If there is nothing to submit or the upload fails.
+        """
+        requests = self.build_requests(emails)
+        if not requests:
+            raise LLMProcessingError("No emails to submit for batch analysis")
+        try:
+            input_file = await self.client.files.create(
+                file=(f"email-analysis-{int(time.time())}.jsonl", self.to_jsonl(requests)),
+                purpose='batch'
+            )
+            batch = await self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=self.completion_window,
+                metadata=metadata
+            )
+        except Exception as e:
+            self.logger.error(f"Batch submission failed: {e}")
+            raise LLMProcessingError(f"Batch submission failed: {e}")
+        self.logger.info(f"Submitted batch {batch.id} with {len(requests)} email analysis requests")
+        return batch.id
+
+    async def poll(self, batch_id: str):
+        """Check a batch once.
+
+        Args:
+            batch_id: The batch ID.
+
+        Returns:
+            The batch object if it has reached a terminal status, else None.
+        """
+        batch = await self.client.batches.retrieve(batch_id)
+        if batch.status in TERMINAL_STATUSES:
+            self.logger.info(f"Batch {batch_id} finished with status '{batch.status}'")
+            return batch
+        self.logger.debug(f"Batch {batch_id} is '{batch.status}'")
+        return None
+
+    async def fetch_results(self, batch) -> Dict[str, Dict[str, Any]]:
+        """Download and parse the results of a finished batch.
+
+        Requests that failed, or whose response can't be parsed, are logged
+        and left out.
+
+        Args:
+            batch: Batch object returned by poll.
+
+        Returns:
+            Dictionary mapping email IDs to analysis results.
+        """
+        if batch.error_file_id:
+            errors = await self._read_file(batch.error_file_id)
+            self.logger.warning(f"Batch {batch.id} reported {len(errors)} failed requests")
+        if not batch.output_file_id:
+            self.logger.warning(f"Batch {batch.id} ({batch.status}) has no output file")
+            return {}
+
+        results = {}
+        for line in await self._read_file(batch.output_file_id):
+            custom_id = line.get('custom_id')
+            response = line.get('response') or {}
+            if line.get('error') or response.get('status_code') != 200:
+                self.logger.warning(f"Batch request for email {custom_id} failed: {line.get('error') or response}")
+                continue
+            try:
+                body = response['body']
+                analysis = self.response_parser.parse_response(body['choices'][0]['message']['content'])
+                usage = body.get('usage', {})
+                analysis.update(format_cost_stats(
+                    body.get('model', self.model),
+                    usage.get('prompt_tokens', 0),
+                    usage.get('completion_tokens', 0),
+                    usage.get('total_tokens'),
+                    BATCH_API_PRICE_FACTOR,
+                    get_cached_tokens(usage)
+                ))
+            except Exception as e:
+                self.logger.warning(f"Could not parse batch result for email {custom_id}: {e}")
+                continue
+            analysis.update({
+                'email_id': custom_id,
+                'ai_enabled': True
+            })
+            results[custom_id] = analysis
+        return results
+
+    async def _read_file(self, file_id: str) -> List[Dict[str, Any]]:
+        """Download a JSONL file and decode its lines.
+
+        Args:
+            file_id: The file ID.
+
+        Returns:
+            Decoded lines (invalid lines are skipped).
+        """
+        content = await self.client.files.content(file_id)
+        lines = []
+        for raw in content.text.splitlines():
+            if not raw.strip():
+                continue
+            try:
+                lines.append(json.loads(raw))
+            except ValueError:
+                self.logger.warning(f"Skipping invalid line in batch file {file_id}")
+        return lines
@@ -1,12 +1,24 @@
 """
 Batch processing functionality for the semantic analyzer.
 
-This module handles batch processing of emails for analysis.
+This module handles batch processing of emails for analysis. In packed mode
+several emails share one LLM request: the instructions and schema are sent
+once, followed by each email's content and NLP context, and the model returns
+a keyed JSON array. Packs are filled up to a prompt token budget; emails whose
+packed result is missing or malformed are retried with individual requests.
+
+Requests go through the LLM dispatcher (bounded concurrency, rate limits,
+retries). Outcomes are kept per email: an email whose request still fails
+gets a failed response instead of discarding the rest of the batch.
+
+With an on_partial callback, responses are streamed and each email's
+category, needs_action and growing summary are reported as they arrive,
+before the batch completes.
 """
 import asyncio
 import logging
 import time
-from typing import Dict, Any, List, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from flask import g
 
 from ....parsing.parser import EmailMetadata
@@ -17,7 +29,7 @@ from ..utilities import (
     send_completion_request,
     
     # Email validation
-    preprocess_email,
+    preprocess_emails,
     
     # Settings management
     is_ai_enabled,
@@ -25,10 +37,26 @@ from ..utilities import (
     get_context_length,
     
     # Cost calculation
-    format_cost_stats
+    format_cost_stats,
+    get_cached_tokens
 )
-from ..processors.prompt_creator import PromptCreator
+from ..processors.prompt_creator import PromptCreator, PACKED_RESULTS_KEY, PACKED_EMAIL_KEY
 from ..processors.response_parser import ResponseParser
+from ..processors.partial_parser import PartialResponseParser, PARTIAL_FIELDS
+from ..utilities.token_budget import PromptBudget, DEFAULT_EMAIL_TOKEN_TARGET
+
+# Default completion tokens allowed per email
+RESPONSE_TOKENS_PER_EMAIL = 300
+
+# Default prompt token budget and email count of one packed request
+DEFAULT_PACK_TOKEN_BUDGET = 6000
+DEFAULT_MAX_PACK_SIZE = 8
+
+# Nesting depth of the per-email objects in a packed response ({"results": [{...}]})
+PACKED_RECORD_DEPTH = 3
+
+# Characters a streamed summary grows by between partial updates
+PARTIAL_SUMMARY_STEP = 40
 
 
 class BatchProcessor:
@@ -45,74 +73,328 @@ class BatchProcessor:
         max_content_tokens (int): Maximum number of tokens for email content.
         prompt_creator (PromptCreator): Utility for creating prompts.
         response_parser (ResponseParser): Utility for parsing model responses.
+        pack_emails (bool): Whether several emails are sent in one request.
+        pack_token_budget (int): Maximum prompt tokens of a packed request.
+        max_pack_size (int): Maximum number of emails in a packed request.
+        email_token_target (int): Prompt tokens for each email's part of a prompt.
+        response_tokens (int): Completion tokens allowed per email.
     """
-    def __init__(self, token_handler):
+    def __init__(
+        self,
+        token_handler,
+        pack_emails: bool = True,
+        pack_token_budget: int = DEFAULT_PACK_TOKEN_BUDGET,
+        max_pack_size: int = DEFAULT_MAX_PACK_SIZE,
+        email_token_target: int = DEFAULT_EMAIL_TOKEN_TARGET,
+        response_tokens: int = RESPONSE_TOKENS_PER_EMAIL,
+        request_confidence: bool = False
+    ):
         """Initialize the batch processor.
         
         Args:
             token_handler: The token handler for text truncation.
+            pack_emails: Send several emails per request. Defaults to True.
+            pack_token_budget: Maximum prompt tokens of a packed request.
+            max_pack_size: Maximum number of emails in a packed request.
+            email_token_target: Prompt tokens for each email's part of a prompt.
+            response_tokens: Completion tokens allowed per email.
+            request_confidence: Ask the model for a confidence field with each result.
         """
         self.logger = logging.getLogger(__name__)
         self.token_handler = token_handler
         self.model = "gpt-4o-mini"  # Default model - will be overridden by user settings
         self.max_content_tokens = 1000  # Default - will be overridden by user settings
-        self.prompt_creator = PromptCreator()
+        self.email_token_target = email_token_target
+        self.response_tokens = response_tokens
+        self.prompt_creator = PromptCreator(
+            token_handler=token_handler,
+            email_token_target=email_token_target,
+            request_confidence=request_confidence
+        )
         self.response_parser = ResponseParser()
+        self.pack_emails = pack_emails
+        self.pack_token_budget = pack_token_budget
+        self.max_pack_size = max(1, max_pack_size)
         
-    async def process_batch(self, batch: List[Tuple[EmailMetadata, Dict]]) -> List[Dict[str, Any]]:
+    async def process_batch(
+        self,
+        batch: List[Tuple[EmailMetadata, Dict]],
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
         """Process a single batch of emails.
         
         Args:
             batch: List of tuples containing (EmailMetadata, nlp_results).
+            on_partial: Receives partial results while responses stream in.
             
         Returns:
             List of analysis results.
             
+        Raises:
+            LLMProcessingError: If batch processing fails.
+        """
+        results, _ = await self.process_batch_with_stats(batch, on_partial)
+        return results
+
+    async def process_batch_with_stats(
+        self,
+        batch: List[Tuple[EmailMetadata, Dict]],
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Process a single batch of emails and report how it was sent.
+        
+        The stats belong to this call, so concurrent batches sharing the
+        processor do not overwrite each other's figures.
+        
+        Args:
+            batch: List of tuples containing (EmailMetadata, nlp_results).
+            on_partial: Receives partial results while responses stream in.
+            
+        Returns:
+            Tuple of the analysis results and the batch's email, request,
+            packed request and fallback email counts.
+            
         Raises:
             LLMProcessingError: If batch processing fails.
         """
         try:
+            if self.pack_emails and len(batch) > 1:
+                return await self._process_batch_packed(batch, on_partial)
+
             # Create prompts for all emails in batch
-            prompts, clean_emails = await self._prepare_batch_prompts(batch)
+            prompts, clean_emails, budgets = await self._prepare_batch_prompts(batch)
             
             # Create messages for the batch
             messages = self._create_batch_messages(prompts)
             
             # Process batch with LLM
-            responses = await self._process_batch_with_llm(messages)
+            responses = await self._process_batch_with_llm(messages, clean_emails, on_partial)
+            stats = {'emails': len(batch), 'requests': len(responses), 'packed_requests': 0, 'fallback_emails': 0}
             
             # Process responses
-            return self._process_batch_responses(responses, batch, clean_emails)
+            return self._process_batch_responses(responses, batch, clean_emails, budgets), stats
 
         except Exception as e:
             self.logger.error(f"Batch processing failed: {str(e)}")
             raise LLMProcessingError(f"Batch processing failed: {str(e)}")
+
+    async def _process_batch_packed(
+        self,
+        batch: List[Tuple[EmailMetadata, Dict]],
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Process a batch with several emails per LLM request.
+        
+        Args:
+            batch: List of tuples containing (EmailMetadata, nlp_results).
+            on_partial: Receives partial results while responses stream in.
+            
+        Returns:
+            Tuple of the analysis results in input order and the batch stats.
+        """
+        clean_emails = preprocess_emails(
+            [email_data for email_data, _ in batch], self.token_handler, self.max_content_tokens
+        )
+        keys = [f"E{i + 1}" for i in range(len(batch))]
+        sections, budgets = zip(*[
+            self.prompt_creator.create_packed_email_section(key, clean_email, nlp_results)
+            for key, clean_email, (_, nlp_results) in zip(keys, clean_emails, batch)
+        ])
+        budgets = list(budgets)
+        # Sections were measured by the budget allocator
+        section_tokens = [budget.budgeted for budget in budgets]
+        header_tokens = self.token_handler.count_tokens(self.prompt_creator.create_packed_prompt([]))
+        packs = self._plan_packs(section_tokens, header_tokens)
+        for pack in packs:
+            # Each email of a pack is budgeted a share of the shared instructions
+            for i in pack:
+                budgets[i].prefix = header_tokens // len(pack)
+
+        client = await get_openai_client()
+        start_time = time.time()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(batch)
+        multi_email_packs = [pack for pack in packs if len(pack) > 1]
+        self.logger.info(
+            f"Processing batch of {len(batch)} emails in {len(packs)} requests with model {self.model}"
+        )
+        await asyncio.gather(*[
+            self._process_pack(client, pack, keys, sections, section_tokens, budgets, clean_emails, results, on_partial)
+            for pack in multi_email_packs
+        ])
+
+        # Single-email packs and emails without a valid packed result get their own request
+        remaining = [i for i, result in enumerate(results) if result is None]
+        fallback_count = len(remaining) - sum(1 for pack in packs if len(pack) == 1)
+        if remaining:
+            if fallback_count:
+                self.logger.warning(f"Retrying {fallback_count} emails individually after packed requests")
+            prompts, fallback_budgets = zip(*[
+                self.prompt_creator.create_prompt_with_budget(clean_emails[i], batch[i][1]) for i in remaining
+            ])
+            for i, budget in zip(remaining, fallback_budgets):
+                budgets[i] = budget
+            try:
+                responses = await self._process_batch_with_llm(
+                    self._create_batch_messages(prompts), [clean_emails[i] for i in remaining], on_partial
+                )
+            except LLMProcessingError as e:
+                if len(remaining) == len(batch):
+                    raise
+                # Keep the packed results; only the remaining emails failed
+                responses = [e] * len(remaining)
+            individual = self._process_batch_responses(
+                responses, [batch[i] for i in remaining], [clean_emails[i] for i in remaining], fallback_budgets
+            )
+            for i, analysis in zip(remaining, individual):
+                results[i] = analysis
+
+        stats = {
+            'emails': len(batch),
+            'requests': len(multi_email_packs) + len(remaining),
+            'packed_requests': len(multi_email_packs),
+            'fallback_emails': fallback_count
+        }
+        prompt_tokens = sum(result.get('prompt_tokens', 0) for result in results)
+        cached_tokens = sum(result.get('cached_tokens', 0) for result in results)
+        budgeted_tokens = sum(result.get('budgeted_prompt_tokens', 0) for result in results)
+        self.logger.info(
+            f"Packed batch completed in {time.time() - start_time:.2f}s: {len(batch)} emails, "
+            f"{stats['requests']} requests, {fallback_count} fallbacks, "
+            f"prompt tokens: {prompt_tokens} actual / {budgeted_tokens} budgeted, "
+            f"prompt cache hits: {cached_tokens}/{prompt_tokens} tokens"
+        )
+        return results, stats
+
+    def _plan_packs(self, section_tokens: List[int], header_tokens: int) -> List[List[int]]:
+        """Group emails into packs that fit the prompt token budget.
+        
+        Emails are packed in order; a pack is closed when the next email would
+        exceed the budget or the maximum pack size. An email too large to share
+        a request forms a pack of its own.
+        
+        Args:
+            section_tokens: Prompt tokens of each email's section.
+            header_tokens: Prompt tokens of the shared instructions.
+            
+        Returns:
+            Lists of email indices, one per request.
+        """
+        packs: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = header_tokens
+        for i, tokens in enumerate(section_tokens):
+            if current and (current_tokens + tokens > self.pack_token_budget or len(current) >= self.max_pack_size):
+                packs.append(current)
+                current, current_tokens = [], header_tokens
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            packs.append(current)
+        return packs
+
+    async def _process_pack(
+        self,
+        client,
+        pack: List[int],
+        keys: List[str],
+        sections: List[str],
+        section_tokens: List[int],
+        budgets: List[PromptBudget],
+        clean_emails: List[EmailMetadata],
+        results: List[Optional[Dict[str, Any]]],
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> None:
+        """Send one packed request and store the results it returns.
+        
+        Token usage is shared among the emails with a valid result, in
+        proportion to their section size. Emails left without a result (request
+        failed, response malformed or entry missing) stay None in results.
+        
+        Args:
+            client: OpenAI client.
+            pack: Indices of the emails in this request.
+            keys: Keys of all emails in the batch.
+            sections: Prompt sections of all emails in the batch.
+            section_tokens: Prompt tokens of each section.
+            budgets: Token budget of each email.
+            clean_emails: Preprocessed emails of the batch.
+            results: Results of the batch, updated in place.
+            on_partial: Receives partial results while the response streams in.
+        """
+        pack_keys = [keys[i] for i in pack]
+        on_content = self._create_partial_listener(on_partial, {keys[i]: clean_emails[i] for i in pack}, packed=True)
+        try:
+            prompt = self.prompt_creator.create_packed_prompt([sections[i] for i in pack])
+            response = await send_completion_request(
+                client, self.model, prompt, self.response_tokens * len(pack), on_content=on_content
+            )
+            parsed = self.response_parser.parse_packed_response(
+                response.choices[0].message.content, pack_keys, PACKED_RESULTS_KEY, PACKED_EMAIL_KEY
+            )
+        except Exception as e:
+            self.logger.warning(f"Packed request for {len(pack)} emails failed: {e}")
+            return
+
+        answered = [i for i in pack if keys[i] in parsed]
+        if not answered:
+            return
+        prompt_tokens = response.usage.prompt_tokens
+        completion_tokens = response.usage.completion_tokens
+        cached_tokens = get_cached_tokens(response.usage)
+        weight_total = sum(section_tokens[i] for i in answered) or len(answered)
+        assigned_prompt = assigned_completion = assigned_cached = 0
+        for n, i in enumerate(answered):
+            if n == len(answered) - 1:
+                email_prompt = prompt_tokens - assigned_prompt
+                email_completion = completion_tokens - assigned_completion
+                email_cached = cached_tokens - assigned_cached
+            else:
+                share = (section_tokens[i] or 1) / weight_total
+                email_prompt = int(prompt_tokens * share)
+                email_completion = completion_tokens // len(answered)
+                email_cached = int(cached_tokens * share)
+            assigned_prompt += email_prompt
+            assigned_completion += email_completion
+            assigned_cached += email_cached
+
+            analysis = parsed[keys[i]]
+            analysis.update(format_cost_stats(
+                self.model, email_prompt, email_completion, cached_tokens=email_cached,
+                budgeted_tokens=budgets[i].budgeted_prompt_tokens
+            ))
+            analysis.update({
+                'email_id': clean_emails[i].id,
+                'ai_enabled': True
+            })
+            results[i] = analysis
     
     async def _prepare_batch_prompts(
         self, 
         batch: List[Tuple[EmailMetadata, Dict]]
-    ) -> Tuple[List[str], List[EmailMetadata]]:
+    ) -> Tuple[List[str], List[EmailMetadata], List[PromptBudget]]:
         """Prepare prompts for a batch of emails.
         
         Args:
             batch: List of tuples containing (EmailMetadata, nlp_results).
             
         Returns:
-            Tuple of (list of prompts, list of preprocessed emails).
+            Tuple of (list of prompts, list of preprocessed emails, list of prompt budgets).
         """
         prompts = []
-        clean_emails = []
+        budgets = []
         
-        for email_data, nlp_results in batch:
-            # Preprocess the email
-            clean_email = preprocess_email(email_data, self.token_handler, self.max_content_tokens)
-            clean_emails.append(clean_email)
-            
-            # Create prompt
-            prompt = self.prompt_creator.create_prompt(clean_email, nlp_results)
+        # Preprocess the emails, encoding their bodies together
+        clean_emails = preprocess_emails(
+            [email_data for email_data, _ in batch], self.token_handler, self.max_content_tokens
+        )
+        
+        for clean_email, (_, nlp_results) in zip(clean_emails, batch):
+            # Create prompt within the per-email token target
+            prompt, budget = self.prompt_creator.create_prompt_with_budget(clean_email, nlp_results)
             prompts.append(prompt)
+            budgets.append(budget)
             
-        return prompts, clean_emails
+        return prompts, clean_emails, budgets
     
     def _create_batch_messages(self, prompts: List[str]) -> List[List[Dict[str, str]]]:
         """Create message structures for batch processing.
@@ -133,18 +415,22 @@ class BatchProcessor:
     
     async def _process_batch_with_llm(
         self, 
-        messages: List[List[Dict[str, str]]]
+        messages: List[List[Dict[str, str]]],
+        emails: Optional[List[EmailMetadata]] = None,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> List[Any]:
         """Process a batch of messages with the LLM.
         
         Args:
             messages: List of message structures for the OpenAI API.
+            emails: The email of each message, for partial results.
+            on_partial: Receives partial results while responses stream in.
             
         Returns:
-            List of LLM responses.
+            List of LLM responses, or the exception of each failed request.
             
         Raises:
-            LLMProcessingError: If the API call fails.
+            LLMProcessingError: If every request fails.
         """
         # Get OpenAI client
         client = await get_openai_client()
@@ -153,11 +439,12 @@ class BatchProcessor:
         self.logger.info(f"Processing batch of {len(messages)} emails with model {self.model}")
         
         # Process messages in parallel with asyncio.gather
-        async def process_message(msg):
+        async def process_message(msg, email):
             """Process a single message with the LLM.
             
             Args:
                 msg: The message structure to process.
+                email: The email of the message, or None.
                 
             Returns:
                 The LLM response.
@@ -166,31 +453,89 @@ class BatchProcessor:
                 client, 
                 self.model, 
                 msg[1]["content"],  # Extract prompt from message structure
-                300  # Use fixed 300 tokens for batch processing
+                self.response_tokens,
+                on_content=self._create_partial_listener(on_partial, {None: email}, packed=False) if email else None
             )
         
-        try:
-            responses = await asyncio.gather(*[process_message(msg) for msg in messages])
-            processing_time = time.time() - start_time
-            self.logger.debug(f"Batch processing completed in {processing_time:.2f} seconds")
-            return responses
+        emails = emails or [None] * len(messages)
+        responses = await asyncio.gather(
+            *[process_message(msg, email) for msg, email in zip(messages, emails)], return_exceptions=True
+        )
+        processing_time = time.time() - start_time
+        failures = [response for response in responses if isinstance(response, Exception)]
+        if failures and len(failures) == len(responses):
+            self.logger.error(f"All {len(responses)} LLM requests failed: {failures[0]}")
+            raise LLMProcessingError(f"All {len(responses)} LLM requests failed: {failures[0]}")
+        if failures:
+            self.logger.warning(f"{len(failures)} of {len(responses)} LLM requests failed")
+        self.logger.debug(f"Batch processing completed in {processing_time:.2f} seconds")
+        return responses
+    
+    def _create_partial_listener(
+        self,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]],
+        emails_by_key: Dict[Optional[str], EmailMetadata],
+        packed: bool
+    ) -> Optional[Callable[[str], None]]:
+        """Create the content callback that turns a streamed response into partial results.
+        
+        A partial result holds the email's id and subject and the fields known
+        so far (category, needs_action, summary). Updates of a summary still
+        being streamed are sent every PARTIAL_SUMMARY_STEP characters.
+        
+        Args:
+            on_partial: Receives partial results, or None to not stream.
+            emails_by_key: Emails of the request by packed key (None for a single email).
+            packed: Whether the response is a packed response.
             
-        except Exception as e:
-            self.logger.error(f"OpenAI batch API call failed: {e}")
-            raise LLMProcessingError(f"OpenAI batch API call failed: {e}")
+        Returns:
+            Callback for streamed content deltas, or None if on_partial is None.
+        """
+        if on_partial is None:
+            return None
+        if packed:
+            parser = PartialResponseParser(PARTIAL_FIELDS + (PACKED_EMAIL_KEY,), record_depth=PACKED_RECORD_DEPTH)
+        else:
+            parser = PartialResponseParser()
+        records: Dict[int, Dict[str, Any]] = {}
+        sent_summary_length: Dict[int, int] = {}
+        
+        def on_content(delta: str) -> None:
+            for record, fields in parser.feed(delta):
+                state = records.setdefault(record, {})
+                changed = [field for field, value in fields.items() if state.get(field) != value]
+                state.update(fields)
+                email = emails_by_key.get(state.get(PACKED_EMAIL_KEY) if packed else None)
+                if email is None or not changed:
+                    continue
+                if (changed == ['summary'] and parser.streaming_field == (record, 'summary')
+                        and len(state['summary']) - sent_summary_length.get(record, 0) < PARTIAL_SUMMARY_STEP):
+                    continue
+                known = {field: state[field] for field in PARTIAL_FIELDS if field in state}
+                if not known:
+                    continue
+                sent_summary_length[record] = len(state.get('summary', ''))
+                on_partial({'id': email.id, 'subject': email.subject, **known})
+        
+        return on_content
     
     def _process_batch_responses(
         self, 
         responses: List[Any], 
         batch: List[Tuple[EmailMetadata, Dict]],
-        clean_emails: List[EmailMetadata]
+        clean_emails: List[EmailMetadata],
+        budgets: Optional[List[PromptBudget]] = None
     ) -> List[Dict[str, Any]]:
         """Process batch responses and format results.
         
+        Failed requests and unparseable responses produce a failed response
+        for that email only.
+        
         Args:
-            responses: List of LLM responses.
+            responses: List of LLM responses or exceptions.
             batch: Original batch of email data.
             clean_emails: List of preprocessed emails.
+            budgets: Prompt budget of each email, reported next to the actual usage.
             
         Returns:
             List of analysis results.
@@ -198,23 +543,42 @@ class BatchProcessor:
         results = []
         total_tokens = 0
         total_cost = 0
+        total_prompt_tokens = 0
+        total_cached_tokens = 0
+        total_budgeted_tokens = 0
 
         for i, response in enumerate(responses):
             email_data = clean_emails[i]
+            if isinstance(response, Exception):
+                results.append(self.response_parser.create_failed_response(email_data.id, str(response)))
+                continue
             
             # Parse the response
-            analysis = self.response_parser.parse_response(response.choices[0].message.content)
+            try:
+                analysis = self.response_parser.parse_response(response.choices[0].message.content)
+            except Exception as e:
+                self.logger.warning(f"Could not parse LLM response for email {email_data.id}: {e}")
+                results.append(self.response_parser.create_failed_response(email_data.id, str(e)))
+                continue
             
             # Calculate and add usage statistics
             prompt_tokens = response.usage.prompt_tokens
             completion_tokens = response.usage.completion_tokens
+            cached_tokens = get_cached_tokens(response.usage)
             
             # Track total usage
             email_tokens = prompt_tokens + completion_tokens
             total_tokens += email_tokens
+            total_prompt_tokens += prompt_tokens
+            total_cached_tokens += cached_tokens
+            budgeted_tokens = budgets[i].budgeted_prompt_tokens if budgets else None
+            total_budgeted_tokens += budgeted_tokens or 0
             
             # Add usage stats to the results
-            stats = format_cost_stats(self.model, prompt_tokens, completion_tokens)
+            stats = format_cost_stats(
+                self.model, prompt_tokens, completion_tokens,
+                cached_tokens=cached_tokens, budgeted_tokens=budgeted_tokens
+            )
             analysis.update(stats)
             
             # Track cost
@@ -229,29 +593,46 @@ class BatchProcessor:
             results.append(analysis)
 
         # Log batch processing statistics
-        self._log_batch_stats(len(batch), total_tokens, total_cost)
+        self._log_batch_stats(
+            len(batch), total_tokens, total_cost, total_prompt_tokens, total_cached_tokens, total_budgeted_tokens
+        )
         
         return results
     
-    def _log_batch_stats(self, batch_size: int, total_tokens: int, total_cost: float) -> None:
+    def _log_batch_stats(
+        self,
+        batch_size: int,
+        total_tokens: int,
+        total_cost: float,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        budgeted_tokens: int = 0
+    ) -> None:
         """Log batch processing statistics.
         
         Args:
             batch_size: Number of emails in the batch.
             total_tokens: Total tokens used.
             total_cost: Total cost incurred.
+            prompt_tokens: Prompt tokens sent.
+            cached_tokens: Prompt tokens served from the prompt cache.
+            budgeted_tokens: Prompt tokens the prompts were budgeted for.
         """
+        cache_hit_rate = cached_tokens / prompt_tokens if prompt_tokens else 0.0
         self.logger.info(
             f"Batch processing stats: emails processed: {batch_size}, "
             f"total_tokens: {total_tokens}, "
             f"avg_tokens: {total_tokens/batch_size:.1f}, "
-            f"total_cost: ${total_cost:.4f}"
+            f"total_cost: ${total_cost:.4f}, "
+            f"prompt_tokens: {prompt_tokens} actual / {budgeted_tokens} budgeted, "
+            f"prompt_cache_hit_rate: {cache_hit_rate:.1%}"
         )
         
         self.logger.debug(
             f"Batch processing stats:\n"
             f"    Emails processed: {batch_size}\n"
             f"    Total tokens: {total_tokens}\n"
+            f"    Cached prompt tokens: {cached_tokens}/{prompt_tokens}\n"
             f"    Total cost: ${total_cost:.4f}\n"
             f"    Average tokens per email: {total_tokens/batch_size:.1f}"
         )
@@ -259,13 +640,15 @@ class BatchProcessor:
     async def analyze_batch(
         self, 
         emails: List[Tuple[EmailMetadata, Dict]], 
-        max_batch_size: int = 20
+        max_batch_size: int = 20,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> List[Dict[str, Any]]:
-        """Analyze a batch of emails using a single LLM request.
+        """Analyze a batch of emails, packing several emails per LLM request.
         
         Args:
             emails: List of tuples containing (EmailMetadata, nlp_results).
             max_batch_size: Maximum number of emails to process in a single batch.
+            on_partial: Receives partial results while responses stream in.
             
         Returns:
             List of analysis results corresponding to input emails.
@@ -289,7 +672,7 @@ class BatchProcessor:
             results = []
             for i in range(0, len(emails), max_batch_size):
                 batch = emails[i:i + max_batch_size]
-                batch_results = await self.process_batch(batch)
+                batch_results = await self.process_batch(batch, on_partial)
                 results.extend(batch_results)
 
             return results
@@ -0,0 +1,263 @@
+"""
+Confidence-gated model cascade for the semantic analyzer.
+
+Every email used to be analyzed with the user's model, so a plain newsletter
+cost as much as a complex work thread. In cascade mode a cheap triage model
+analyzes the batch first, with a small response budget and a prompt asking
+for a self-reported confidence (0-1). Only the emails the triage can't settle
+are analyzed again with the user's model:
+
+- the triage failed or its result could not be parsed
+- the confidence is missing or below the threshold
+- the email is in an escalated category (Work by default)
+- the email needs action
+
+The other emails keep their triage result. An escalated email's result comes
+from the user's model and includes the triage cost, so per-email cost stays
+the true cost. Each run (one analyze_batch call) is logged and its stats are
+returned by analyze_batch_with_stats: escalation rate and reasons, cost and latency of
+both stages, and the estimated cost of analyzing every email with the user's
+model.
+
+Typical usage:
+    cascade = ModelCascade(batch_processor, triage_processor)
+    results = await cascade.analyze_batch(emails)
+"""
+import logging
+import time
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from ....parsing.parser import EmailMetadata
+from ....models.exceptions import LLMProcessingError
+from ..utilities import is_ai_enabled, calculate_cost
+from .batch_processor import BatchProcessor
+from .prompt_creator import CONFIDENCE_FIELD
+
+# Default model of the triage stage
+DEFAULT_TRIAGE_MODEL = 'gpt-4o-mini'
+
+# Default completion tokens per email allowed to the triage model
+DEFAULT_TRIAGE_RESPONSE_TOKENS = 200
+
+# Default confidence below which a triage result is escalated
+DEFAULT_CONFIDENCE_THRESHOLD = 0.8
+
+# Categories always escalated to the user's model
+ESCALATED_CATEGORIES = ('Work',)
+
+
+class ModelCascade:
+    """Analyzes emails with a cheap triage model, escalating uncertain ones.
+
+    Attributes:
+        logger (logging.Logger): Logger for logging information and errors.
+        batch_processor (BatchProcessor): Processor of the user's model.
+        triage_processor (BatchProcessor): Processor of the triage model; must
+            request a confidence with each result.
+        confidence_threshold (float): Confidence below which a result is escalated.
+        escalated_categories (Tuple[str, ...]): Categories always escalated.
+    """
+
+    def __init__(
+        self,
+        batch_processor: BatchProcessor,
+        triage_processor: BatchProcessor,
+        confidence_threshold: float = DEFAULT_CONFIDENCE_THRESHOLD,
+        escalated_categories: Tuple[str, ...] = ESCALATED_CATEGORIES
+    ):
+        """Initialize the cascade.
+
+        Args:
+            batch_processor: Processor of the user's model; its model and
+                content limit are configured from the user's settings.
+            triage_processor: Processor of the triage model, created with
+                request_confidence=True.
+            confidence_threshold: Confidence below which a result is escalated.
+            escalated_categories: Categories always escalated.
+        """
+        self.logger = logging.getLogger(__name__)
+        self.batch_processor = batch_processor
+        self.triage_processor = triage_processor
+        self.confidence_threshold = confidence_threshold
+        self.escalated_categories = tuple(escalated_categories)
+
+    def escalation_reasons(self, result: Dict[str, Any]) -> List[str]:
+        """Get the reasons to escalate a triage result.
+
+        Args:
+            result: Analysis result of the triage model
+
+        Returns:
+            Reasons to escalate ('failed', 'low_confidence', 'category',
+            'needs_action'); empty if the triage result is kept
+        """
+        if result.get('error'):
+            return ['failed']
+        reasons = []
+        confidence = result.get(CONFIDENCE_FIELD)
+        if confidence is None or confidence < self.confidence_threshold:
+            reasons.append('low_confidence')
+        if result.get('category') in self.escalated_categories:
+            reasons.append('category')
+        if result.get('needs_action'):
+            reasons.append('needs_action')
+        return reasons
+
+    async def analyze_batch(
+        self,
+        emails: List[Tuple[EmailMetadata, Dict]],
+        max_batch_size: int = 20,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Analyze a batch of emails through the cascade.
+
+        When the user's model is the triage model there is nothing to
+        escalate to, and the batch is analyzed by the batch processor alone.
+
+        Args:
+            emails: List of tuples containing (EmailMetadata, nlp_results).
+            max_batch_size: Maximum number of emails to process in a single batch.
+            on_partial: Receives partial results while responses stream in.
+                Escalated emails are reported again by the user's model.
+
+        Returns:
+            List of analysis results corresponding to input emails.
+
+        Raises:
+            LLMProcessingError: If the triage of a batch fails.
+        """
+        results, _ = await self.analyze_batch_with_stats(emails, max_batch_size, on_partial)
+        return results
+
+    async def analyze_batch_with_stats(
+        self,
+        emails: List[Tuple[EmailMetadata, Dict]],
+        max_batch_size: int = 20,
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Analyze a batch of emails through the cascade and report the run.
+
+        The stats belong to this run, so concurrent requests sharing the
+        cascade do not overwrite each other's figures.
+
+        Args:
+            emails: List of tuples containing (EmailMetadata, nlp_results).
+            max_batch_size: Maximum number of emails to process in a single batch.
+            on_partial: Receives partial results while responses stream in.
+
+        Returns:
+            Tuple of the analysis results and the run's escalation, cost and
+            latency stats; the stats are empty when the cascade is skipped.
+
+        Raises:
+            LLMProcessingError: If the triage of a batch fails.
+        """
+        if not is_ai_enabled() or self.batch_processor.model == self.triage_processor.model:
+            return await self.batch_processor.analyze_batch(emails, max_batch_size, on_partial), {}
+
+        self.triage_processor.max_content_tokens = self.batch_processor.max_content_tokens
+        stats = self._new_run_stats()
+        results = []
+        for i in range(0, len(emails), max_batch_size):
+            batch = emails[i:i + max_batch_size]
+            results.extend(await self._process_batch(batch, stats, on_partial))
+
+        stats['escalation_rate'] = stats['escalated'] / stats['emails'] if stats['emails'] else 0.0
+        stats['total_cost'] = stats['triage_cost'] + stats['escalation_cost']
+        self.logger.info(
+            f"Model cascade: {stats['escalated']}/{stats['emails']} emails escalated "
+            f"({stats['escalation_rate']:.0%}) from {stats['triage_model']} to {stats['escalation_model']}, "
+            f"reasons {stats['reasons']}, cost ${stats['total_cost']:.4f} "
+            f"(triage ${stats['triage_cost']:.4f}, escalation ${stats['escalation_cost']:.4f}; "
+            f"${stats['single_model_cost']:.4f} estimated with {stats['escalation_model']} only), "
+            f"latency {stats['triage_seconds']:.2f}s triage + {stats['escalation_seconds']:.2f}s escalation"
+        )
+        return results, stats
+
+    async def _process_batch(
+        self,
+        batch: List[Tuple[EmailMetadata, Dict]],
+        stats: Dict[str, Any],
+        on_partial: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """Triage one batch and escalate the emails it can't settle.
+
+        Args:
+            batch: List of tuples containing (EmailMetadata, nlp_results).
+            stats: Stats of the run, updated in place.
+            on_partial: Receives partial results while responses stream in.
+
+        Returns:
+            List of analysis results in input order.
+        """
+        start_time = time.time()
+        results = await self.triage_processor.process_batch(batch, on_partial)
+        stats['triage_seconds'] += time.time() - start_time
+        stats['emails'] += len(batch)
+
+        escalate = {}
+        for i, result in enumerate(results):
+            stats['triage_cost'] += result.get('cost', 0)
+            reasons = self.escalation_reasons(result)
+            if reasons:
+                escalate[i] = reasons
+            else:
+                # Price the kept triage result as if the user's model had analyzed it
+                stats['single_model_cost'] += calculate_cost(
+                    self.batch_processor.model, result.get('prompt_tokens', 0),
+                    result.get('completion_tokens', 0), result.get('cached_tokens', 0)
+                )[2]
+            results[i]['cascade'] = {
+                'triage_model': self.triage_processor.model,
+                'triage_confidence': result.get(CONFIDENCE_FIELD),
+                'escalated': bool(reasons),
+                'reasons': reasons
+            }
+        if not escalate:
+            return results
+
+        start_time = time.time()
+        try:
+            escalated = await self.batch_processor.process_batch([batch[i] for i in escalate], on_partial)
+        except LLMProcessingError as e:
+            # The triage results are still valid analyses (except failed ones)
+            self.logger.warning(f"Escalation of {len(escalate)} emails failed, keeping triage results: {e}")
+            escalated = [None] * len(escalate)
+        stats['escalation_seconds'] += time.time() - start_time
+
+        for (i, reasons), result in zip(escalate.items(), escalated):
+            if result is None or (result.get('error') and not results[i].get('error')):
+                continue
+            stats['escalated'] += 1
+            for reason in reasons:
+                stats['reasons'][reason] = stats['reasons'].get(reason, 0) + 1
+            stats['escalation_cost'] += result.get('cost', 0)
+            stats['single_model_cost'] += result.get('cost', 0)
+            triage = results[i]
+            result['cascade'] = dict(triage['cascade'], triage_cost=triage.get('cost', 0))
+            # An escalated email costs both requests
+            result['cost'] = result.get('cost', 0) + triage.get('cost', 0)
+            result['total_tokens'] = result.get('total_tokens', 0) + triage.get('total_tokens', 0)
+            results[i] = result
+        return results
+
+    def _new_run_stats(self) -> Dict[str, Any]:
+        """Create the stats of a run.
+
+        Returns:
+            Stats with zero counts, costs and latencies
+        """
+        return {
+            'triage_model': self.triage_processor.model,
+            'escalation_model': self.batch_processor.model,
+            'emails': 0,
+            'escalated': 0,
+            'escalation_rate': 0.0,
+            'reasons': {},
+            'triage_cost': 0.0,
+            'escalation_cost': 0.0,
+            'total_cost': 0.0,
+            'single_model_cost': 0.0,
+            'triage_seconds': 0.0,
+            'escalation_seconds': 0.0
+        }
@@ -0,0 +1,193 @@
+"""
+Incremental parser for streamed LLM analysis responses.
+
+When a completion is streamed, its JSON arrives a few characters at a time.
+PartialResponseParser reads the stream incrementally (each character is
+looked at once) and reports selected fields of the analysis objects as soon
+as they are known:
+
+- string fields listed in streamed_fields (e.g. summary) are reported while
+  they grow, and again when complete
+- other fields (category, needs_action) are reported once their value is
+  complete
+
+Records are the JSON objects at record_depth: 1 for a single analysis
+({"category": ...}), 3 for a packed response ({"results": [{...}, {...}]}).
+Nested values (action_items, custom_categories) are skipped.
+
+The parser doesn't validate the JSON; the complete response is still parsed
+by ResponseParser once the stream ends.
+
+Usage:
+    parser = PartialResponseParser()
+    for delta in deltas:
+        for record, fields in parser.feed(delta):
+            print(record, fields)  # 0 {'category': 'Work'}
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Fields reported by default
+PARTIAL_FIELDS = ('needs_action', 'category', 'summary')
+
+# Fields reported while their string value is still being streamed
+STREAMED_FIELDS = ('summary',)
+
+SIMPLE_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', '"': '"', '\\': '\\', '/': '/'}
+
+# Roles of the string being read
+_KEY, _VALUE, _OTHER = 0, 1, 2
+
+
+class PartialResponseParser:
+    """Extracts fields from a streamed JSON analysis response.
+
+    Attributes:
+        fields (set): Fields reported.
+        streamed_fields (set): String fields reported while incomplete.
+        record_depth (int): Nesting depth of the analysis objects.
+    """
+
+    def __init__(
+        self,
+        fields: Iterable[str] = PARTIAL_FIELDS,
+        streamed_fields: Iterable[str] = STREAMED_FIELDS,
+        record_depth: int = 1
+    ):
+        """Initialize the parser.
+
+        Args:
+            fields: Fields to report (include the key field of packed responses)
+            streamed_fields: String fields reported while incomplete
+            record_depth: Nesting depth of the analysis objects
+        """
+        self.fields = set(fields)
+        self.streamed_fields = set(streamed_fields)
+        self.record_depth = record_depth
+
+        self._stack: List[str] = []
+        self._record = -1
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._literal: List[str] = []
+        self._in_string = False
+        self._role = _OTHER
+        self._buffer: List[str] = []
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._reported_length = 0
+
+    def feed(self, text: str) -> List[Tuple[int, Dict[str, Any]]]:
+        """Parse the next piece of the response.
+
+        Args:
+            text: Next characters of the streamed response
+
+        Returns:
+            List of (record index, {field: value}) updates, in record order
+        """
+        updates: Dict[int, Dict[str, Any]] = {}
+        for char in text:
+            if self._in_string:
+                self._read_string_char(char, updates)
+            else:
+                self._read_structure_char(char, updates)
+
+        # Report a streamed field that grew during this piece
+        if (self._in_string and self._role == _VALUE and self._key in self.streamed_fields
+                and len(self._buffer) > self._reported_length):
+            self._reported_length = len(self._buffer)
+            updates.setdefault(self._record, {})[self._key] = ''.join(self._buffer)
+        return sorted(updates.items())
+
+    @property
+    def streaming_field(self) -> Optional[Tuple[int, str]]:
+        """(record index, field) of the streamed field being read, or None."""
+        if self._in_string and self._role == _VALUE and self._key in self.streamed_fields:
+            return self._record, self._key
+        return None
+
+    def _at_record_level(self) -> bool:
+        """Whether the parser is directly inside an analysis object."""
+        return len(self._stack) == self.record_depth and self._stack[-1] == '{'
+
+    def _read_string_char(self, char: str, updates: Dict[int, Dict[str, Any]]) -> None:
+        """Handle a character inside a string."""
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) == 4:
+                try:
+                    self._append(chr(int(self._unicode, 16)))
+                except ValueError:
+                    pass
+                self._unicode = None
+        elif self._escape:
+            self._escape = False
+            if char == 'u':
+                self._unicode = ''
+            else:
+                self._append(SIMPLE_ESCAPES.get(char, char))
+        elif char == '\\':
+            self._escape = True
+        elif char == '"':
+            self._in_string = False
+            if self._role == _KEY:
+                self._key = ''.join(self._buffer)
+            elif self._role == _VALUE and self._key in self.fields:
+                updates.setdefault(self._record, {})[self._key] = ''.join(self._buffer)
+        else:
+            self._append(char)
+
+    def _append(self, char: str) -> None:
+        """Add a decoded character to the current string, if it is kept."""
+        if self._role != _OTHER:
+            self._buffer.append(char)
+
+    def _read_structure_char(self, char: str, updates: Dict[int, Dict[str, Any]]) -> None:
+        """Handle a character outside strings."""
+        if char in ' \t\r\n':
+            return
+        at_record = self._at_record_level()
+        if char == '"':
+            self._in_string = True
+            self._buffer = []
+            self._reported_length = 0
+            if at_record and self._expect_key:
+                self._role = _KEY
+            elif at_record and self._key in self.fields:
+                self._role = _VALUE
+            else:
+                self._role = _OTHER
+        elif char in '{[':
+            self._stack.append(char)
+            if self._at_record_level():
+                self._record += 1
+                self._expect_key = True
+                self._key = None
+        elif char in '}]':
+            if at_record:
+                self._flush_literal(updates)
+            if self._stack:
+                self._stack.pop()
+            if self._at_record_level():
+                self._expect_key = False
+        elif not at_record:
+            return
+        elif char == ':':
+            self._expect_key = False
+        elif char == ',':
+            self._flush_literal(updates)
+            self._expect_key = True
+        elif not self._expect_key:
+            self._literal.append(char)
+
+    def _flush_literal(self, updates: Dict[int, Dict[str, Any]]) -> None:
+        """Report a completed true/false/null/number value of a reported field."""
+        if not self._literal:
+            return
+        literal, self._literal = ''.join(self._literal), []
+        if self._key in self.fields:
+            try:
+                updates.setdefault(self._record, {})[self._key] = json.loads(literal)
+            except ValueError:
+                pass
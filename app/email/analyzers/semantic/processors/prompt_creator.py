@@ -2,25 +2,138 @@
 Prompt creation functionality for the semantic analyzer.
 
 This module handles the creation of prompts for LLM analysis of emails.
+
+Prompts are laid out for provider-side prompt caching: the static part
+(instructions, field definitions, custom categories and output schema) comes
+first and the email's content and NLP context come last. The static part is
+compiled once per settings fingerprint (model, summary length, custom
+categories) into a PromptTemplate, so every email analyzed with the same
+settings shares an identical prompt prefix the provider can serve from its
+cache. Cache hits are reported in usage.prompt_tokens_details.cached_tokens.
+
+The per-email part is fitted to a token target by a TokenBudgetAllocator:
+each section is measured, empty NLP sections are left out, low-value ones are
+shrunk or dropped when the target is tight, and the body budget follows the
+email's length and predicted category.
+
+A creator made with request_confidence=True asks for an extra "confidence"
+field (0-1), used by the model cascade to decide which emails to escalate.
+Its templates are fingerprinted and cached apart from the regular ones.
 """
+import hashlib
 import json
 import logging
+import threading
 from typing import Dict, Any, List, Tuple
-from flask import g, current_app
+from flask import g, has_app_context
 
 from ....parsing.parser import EmailMetadata
 from ..utilities.text_processor import format_list, format_dict, sanitize_text, select_important_patterns
-from ..utilities.token_handler import TokenHandler
+from ..utilities.token_handler import TokenHandler, get_token_handler
+from ..utilities.token_budget import (
+    TokenBudgetAllocator, PromptBudget, predict_category, BODY_SECTION, DEFAULT_EMAIL_TOKEN_TARGET
+)
+
+
+# Keys of the JSON object returned for a packed (multi-email) prompt
+PACKED_RESULTS_KEY = 'results'
+PACKED_EMAIL_KEY = 'email_key'
+
+# Number of compiled templates kept, one per settings fingerprint
+TEMPLATE_CACHE_SIZE = 64
+
+# Shortest prompt prefix the provider caches (OpenAI caches prompts of 1024+ tokens)
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Optional sections ranked above the body by the budget allocator
+SECTIONS_BEFORE_BODY = ('questions', 'deadlines')
+
+# Order of the optional NLP sections in the CONTEXT section of a prompt
+CONTEXT_SECTION_ORDER = ('sentiment_indicators', 'entities', 'phrases', 'questions', 'deadlines')
+
+# Attribute of flask.g holding the template of the current request
+TEMPLATE_G_ATTR = 'prompt_template'
+
+# Field of the self-reported confidence requested by triage prompts
+CONFIDENCE_FIELD = 'confidence'
+
+# Field definition appended to the TASK section of triage prompts
+CONFIDENCE_TASK = f"""
+6. {CONFIDENCE_FIELD} (number 0-1):
+    - How sure you are of the category, needs_action and priority above
+    - Use 0.9 or more only when the email is unambiguous (e.g. a plain newsletter or receipt)
+    - Use less than 0.7 when the email is ambiguous, part of a complex thread, or could need a response
+"""
+
+
+class PromptTemplate:
+    """Prompt layout compiled for one settings fingerprint.
+    
+    Attributes:
+        fingerprint (str): Hash of the settings the template was compiled for.
+        prefix (str): Static part of single-email prompts.
+        packed_prefix (str): Static part of packed prompts.
+        prefix_tokens (int): Tokens in the static part of single-email prompts.
+    """
+
+    __slots__ = ('fingerprint', 'prefix', 'packed_prefix', 'prefix_tokens')
+
+    def __init__(self, fingerprint: str, prefix: str, packed_prefix: str, prefix_tokens: int = 0):
+        """Initialize the template.
+        
+        Args:
+            fingerprint: Hash of the settings the template was compiled for
+            prefix: Static part of single-email prompts
+            packed_prefix: Static part of packed prompts
+            prefix_tokens: Tokens in the static part of single-email prompts
+        """
+        self.fingerprint = fingerprint
+        self.prefix = prefix
+        self.packed_prefix = packed_prefix
+        self.prefix_tokens = prefix_tokens
+
+    def render(self, email_section: str) -> str:
+        """Create a single-email prompt.
+        
+        Args:
+            email_section: The email's content and NLP context
+            
+        Returns:
+            Prompt text, static part first
+        """
+        return self.prefix + email_section
+
+    def render_packed(self, sections: List[str]) -> str:
+        """Create a packed prompt.
+        
+        Args:
+            sections: Sections of the emails, from create_packed_email_section
+            
+        Returns:
+            Prompt text, static part first
+        """
+        return self.packed_prefix + f"The {len(sections)} emails follow.\n\n" + "".join(sections)
 
 
 class PromptCreator:
     """Creates prompts for LLM analysis of emails."""
     
-    def __init__(self, token_handler: TokenHandler = None):
+    # Compiled templates shared by all instances, by settings fingerprint
+    _templates: Dict[str, PromptTemplate] = {}
+    _templates_lock = threading.Lock()
+    
+    def __init__(
+        self,
+        token_handler: TokenHandler = None,
+        email_token_target: int = DEFAULT_EMAIL_TOKEN_TARGET,
+        request_confidence: bool = False
+    ):
         """Initialize the prompt creator.
         
         Args:
-            token_handler: TokenHandler instance for token counting and truncation
+            token_handler: TokenHandler for token counting and truncation (default: the shared one)
+            email_token_target: Prompt tokens for the per-email part of a prompt
+            request_confidence: Ask the model for a confidence field (triage prompts)
         """
         self.logger = logging.getLogger(__name__)
         
@@ -28,12 +141,16 @@ class PromptCreator:
         self.config = type('Config', (), {
             # Default values
             'CHARACTER_LIMIT': 3000,  # Default character limit for email body
+            'model': 'gpt-4o-mini',  # Default model
             'summary_length': 'medium',  # Default to medium summary length
             'custom_categories': []  # Default empty list for custom categories
         })
         
         # Use the provided token handler or create a new one
-        self.token_handler = token_handler or TokenHandler()
+        self.token_handler = token_handler or get_token_handler()
+        self.budget_allocator = TokenBudgetAllocator(email_token_target)
+        self.request_confidence = request_confidence
+        self._template_g_attr = f"{TEMPLATE_G_ATTR}_{CONFIDENCE_FIELD}" if request_confidence else TEMPLATE_G_ATTR
         
     def _load_settings(self):
         """
@@ -41,14 +158,105 @@ class PromptCreator:
         This should only be called when we know we're inside a Flask application context.
         """
         # Import settings utilities here to avoid circular imports
-        from ..utilities.settings_util import get_summary_length, get_custom_categories
+        from ..utilities.settings_util import get_model_type, get_summary_length, get_custom_categories
         
         try:
             # Fetch settings within application context
+            self.config.model = get_model_type() or self.config.model
             self.config.summary_length = get_summary_length() or self.config.summary_length
             self.config.custom_categories = get_custom_categories() or self.config.custom_categories
         except Exception as e:
             self.logger.warning(f"Error fetching settings, using defaults: {str(e)}")
+
+    def get_template(self) -> PromptTemplate:
+        """Get the prompt template for the current user's settings.
+        
+        Settings are read once per application context, and a template is
+        compiled once per settings fingerprint and shared by all instances.
+        
+        Returns:
+            The compiled prompt template
+        """
+        if has_app_context() and self._template_g_attr in g:
+            return getattr(g, self._template_g_attr)
+        
+        self._load_settings()
+        fingerprint = self._settings_fingerprint()
+        with self._templates_lock:
+            template = self._templates.get(fingerprint)
+        if template is None:
+            template = self._compile_template(fingerprint)
+            with self._templates_lock:
+                if len(self._templates) >= TEMPLATE_CACHE_SIZE:
+                    # Drop the oldest template
+                    self._templates.pop(next(iter(self._templates)))
+                self._templates[fingerprint] = template
+            self.logger.debug(f"Compiled prompt template {fingerprint} ({template.prefix_tokens} static tokens)")
+            if template.prefix_tokens < PROMPT_CACHE_MIN_TOKENS:
+                self.logger.info(
+                    f"Static prompt prefix of {template.prefix_tokens} tokens is below the "
+                    f"{PROMPT_CACHE_MIN_TOKENS}-token prompt caching minimum, so prompts won't hit the prompt cache"
+                )
+        
+        if has_app_context():
+            setattr(g, self._template_g_attr, template)
+        return template
+
+    def _settings_fingerprint(self) -> str:
+        """Hash the settings that shape the prompt.
+        
+        Returns:
+            Short hex digest of the model, summary length, custom categories and
+            whether confidence is requested
+        """
+        settings = json.dumps(
+            [self.config.model, self.config.summary_length, self.config.custom_categories, self.request_confidence],
+            sort_keys=True, default=str
+        )
+        return hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]
+
+    def _compile_template(self, fingerprint: str) -> PromptTemplate:
+        """Build the static parts of single-email and packed prompts.
+        
+        Args:
+            fingerprint: Fingerprint of the current settings
+            
+        Returns:
+            The compiled prompt template
+        """
+        selected_constraints = self._get_summary_constraints(self.config.summary_length)
+        custom_categories_prompt = self._format_custom_categories(self.config.custom_categories)
+        confidence_task = CONFIDENCE_TASK if self.request_confidence else ""
+        prefix = (
+            "You are an email analysis assistant. Analyze the email at the end of this prompt and provide a "
+            "structured assessment to help prioritize inbox management.\n\n"
+            + self._format_task_section(
+                "Analyze the email and provide a JSON response with the following fields:",
+                selected_constraints,
+                "    Consider the priority signals listed with the email.\n    "
+            )
+            + confidence_task
+            + self._format_output_section(custom_categories_prompt)
+            + "\n"
+        )
+        packed_prefix = (
+            "You are an email analysis assistant. Analyze each of the emails at the end of this prompt "
+            "independently and provide a structured assessment of each to help prioritize inbox management.\n\n"
+            + self._format_task_section(
+                "For EACH email, provide a JSON object with the following fields:",
+                selected_constraints,
+                "    Consider the priority signals listed with each email.\n    "
+            )
+            + confidence_task
+            + self._format_output_section(
+                custom_categories_prompt,
+                f'Return only valid JSON of the form {{"{PACKED_RESULTS_KEY}": [...]}} with exactly one object '
+                f'per email, in the order given. Each object starts with "{PACKED_EMAIL_KEY}" set to the email\'s key '
+                f'(e.g. "E1"), followed by the fields of this schema:'
+            )
+            + "\n"
+        )
+        return PromptTemplate(fingerprint, prefix, packed_prefix, self.token_handler.count_tokens(prefix))
         
     def create_prompt(self, email_data: EmailMetadata, nlp_results: Dict) -> str:
         """Create a prompt for the LLM analysis.
@@ -60,56 +268,196 @@ class PromptCreator:
         Returns:
             Prompt text for LLM analysis
         """
+        return self.create_prompt_with_budget(email_data, nlp_results)[0]
+
+    def create_prompt_with_budget(self, email_data: EmailMetadata, nlp_results: Dict) -> Tuple[str, PromptBudget]:
+        """Create a prompt for the LLM analysis, with its token budget.
+        
+        Args:
+            email_data: Email metadata for analysis
+            nlp_results: Dictionary containing NLP analysis results
+            
+        Returns:
+            Tuple of (prompt text, budget including the static prefix)
+        """
         try:
-            # Load settings now (within a request context) rather than during initialization
-            self._load_settings()
-            
-            # Get sanitized content (subject and body)
-            subject = sanitize_text(email_data.subject)
-            # Body is already truncated by preprocess_email, just sanitize
-            body = sanitize_text(email_data.body)
-            sender = sanitize_text(email_data.sender)
-            
-            # Format NLP results for prompt context
-            analysis_context = self._format_analysis_context(nlp_results)
-            
-            # Select the appropriate summary constraints based on content length
-            selected_constraints = self._select_summary_constraints(body)
-            
-            # Create custom categories prompt
-            custom_categories_prompt = self._format_custom_categories(self.config.custom_categories)
-            
-            # Create the prompt with validated data and limited content
-            prompt = f"""You are an email analysis assistant. Analyze the following email and provide a structured assessment to help prioritize inbox management.
-EMAIL CONTENT
--------------
-Subject: {subject}
-From: {sender}
-Content: {body}
-
-CONTEXT
--------
-NLP Analysis:
-1. Content Classification:
-   - Key Entities: {analysis_context['entities']}
-   - Main Phrases: {analysis_context['phrases']}
-   - Urgency: {analysis_context['urgency']}
-   - Email Type: {analysis_context['email_type']}
-
-2. Sentiment and Tone:
-   - Overall: {analysis_context['sentiment']}
-   - Key Indicators: {analysis_context['sentiment_indicators']}
-
-3. Interaction Patterns:
-   - Questions: {analysis_context['question_count']} detected
-   {analysis_context['questions']}
-
-4. Time Sensitivity:
-   {analysis_context['deadlines']}
-
-TASK
+            template = self.get_template()
+            email_block, budget = self._format_email_block("=== EMAIL ===", email_data, nlp_results)
+            budget.prefix = template.prefix_tokens
+            return template.render(email_block), budget
+
+        except Exception as e:
+            self.logger.error(f"Error creating prompt: {str(e)}")
+            from ....models.exceptions import LLMProcessingError
+            raise LLMProcessingError(f"Failed to create prompt: {str(e)}")
+            
+    def create_packed_email_section(
+        self,
+        key: str,
+        email_data: EmailMetadata,
+        nlp_results: Dict
+    ) -> Tuple[str, PromptBudget]:
+        """Create the section of a packed prompt for one email.
+        
+        Args:
+            key: Key identifying the email in the packed response (e.g. "E1")
+            email_data: Preprocessed email metadata
+            nlp_results: Dictionary containing NLP analysis results
+            
+        Returns:
+            Tuple of (email content, NLP context and priority signals headed by
+            the key, budget of the section)
+        """
+        try:
+            return self._format_email_block(f"=== EMAIL [{key}] ===", email_data, nlp_results)
+        except Exception as e:
+            self.logger.error(f"Error creating packed email section: {str(e)}")
+            from ....models.exceptions import LLMProcessingError
+            raise LLMProcessingError(f"Failed to create packed email section: {str(e)}")
+
+    def create_packed_prompt(self, sections: List[str]) -> str:
+        """Create one prompt analyzing several emails.
+        
+        The instructions and schema are stated once for all emails; the model
+        answers with {"results": [...]} holding one object per email, keyed by
+        "email_key".
+        
+        Args:
+            sections: Email sections from create_packed_email_section
+            
+        Returns:
+            Prompt text for LLM analysis
+        """
+        return self.get_template().render_packed(sections)
+
+    def _format_email_block(
+        self,
+        header: str,
+        email_data: EmailMetadata,
+        nlp_results: Dict
+    ) -> Tuple[str, PromptBudget]:
+        """Format the per-email part of a prompt within the per-email token target.
+        
+        Args:
+            header: Line introducing the email
+            email_data: Preprocessed email metadata
+            nlp_results: Dictionary containing NLP analysis results
+            
+        Returns:
+            Tuple of (email content, NLP context and priority signals headed by
+            header, budget of the block)
+        """
+        analysis_context = self._format_analysis_context(nlp_results)
+        head = (
+            f"{header}\nEMAIL CONTENT\n-------------\n"
+            f"Subject: {sanitize_text(email_data.subject)}\n"
+            f"From: {sanitize_text(email_data.sender)}\n"
+            "Content: "
+        )
+        signals = (
+            "\nCONTEXT\n-------\n"
+            f"- Urgency: {analysis_context['urgency']}\n"
+            f"- Email Type: {analysis_context['email_type']}\n"
+            f"- Sentiment: {analysis_context['sentiment']}\n"
+        )
+        priority_factors = "\n" + self._format_priority_factors(analysis_context).rstrip() + "\n\n"
+        optional = self._format_optional_sections(email_data, analysis_context)
+        
+        # Measure every section; the body's token IDs are memoized on the email
+        count = self.token_handler.count_tokens
+        if getattr(self.token_handler, 'encoding', None) is not None:
+            body_tokens = len(email_data.text.token_ids(self.token_handler))
+        else:
+            body_tokens = int(count(email_data.text.clean))
+        ranked = [(name, int(count(text)), shrinkable) for name, (text, shrinkable) in optional.items()]
+        ranked.insert(sum(1 for name in optional if name in SECTIONS_BEFORE_BODY), (BODY_SECTION, body_tokens, True))
+        required_tokens = int(count(head) + count(signals) + count(priority_factors)) + 1
+        budget = self.budget_allocator.allocate(
+            required_tokens, ranked, predict_category(nlp_results)
+        )
+        
+        # Body is already truncated by preprocess_email; sanitize it once per email and budget
+        text = email_data.text
+        if budget.body < body_tokens:
+            text = text.truncated(budget.body, self.token_handler)
+        body = text.view('prompt_body', sanitize_text)
+        
+        kept = {}
+        for name, (section, _) in optional.items():
+            if name in budget.shrunk:
+                kept[name] = self.token_handler.truncate_to_tokens(section, budget.sections[name])
+            elif name in budget.sections:
+                kept[name] = section
+        return (
+            head + body + "\n"
+            + kept.get('thread', '')
+            + signals
+            + "".join(kept.get(name, '') for name in CONTEXT_SECTION_ORDER)
+            + priority_factors
+        ), budget
+
+    def _format_optional_sections(self, email_data: EmailMetadata, analysis_context: Dict) -> Dict[str, Tuple[str, bool]]:
+        """Format the optional sections of an email's prompt, leaving out empty ones.
+        
+        Args:
+            email_data: Preprocessed email metadata
+            analysis_context: Formatted NLP context from _format_analysis_context
+            
+        Returns:
+            Dictionary mapping section names to (text, shrinkable), most valuable first
+        """
+        sections = {}
+        if analysis_context['question_count']:
+            lines = "".join(f"   - {line}\n" for line in analysis_context['question_info'])
+            sections['questions'] = (f"- Questions: {analysis_context['question_count']} detected\n{lines}", False)
+        if analysis_context['deadline_info']:
+            sections['deadlines'] = (
+                f"- Deadlines/Time References: {'; '.join(analysis_context['deadline_info'])}\n", False
+            )
+        thread_context = self._format_thread_context(email_data.thread_context)
+        if thread_context:
+            sections['thread'] = (thread_context, True)
+        if analysis_context['entities'] != "{}":
+            sections['entities'] = (f"- Key Entities: {analysis_context['entities']}\n", False)
+        if analysis_context['phrases'] != "[]":
+            sections['phrases'] = (f"- Main Phrases: {analysis_context['phrases']}\n", False)
+        if analysis_context['sentiment_indicators'] != "{}":
+            sections['sentiment_indicators'] = (
+                f"- Sentiment Indicators: {analysis_context['sentiment_indicators']}\n", False
+            )
+        return sections
+
+    def _format_priority_factors(self, analysis_context: Dict) -> str:
+        """Format an email's NLP signals to consider in priority scoring.
+        
+        Args:
+            analysis_context: Formatted NLP context from _format_analysis_context
+            
+        Returns:
+            Priority factors block of the TASK section
+        """
+        return f"""    Consider the following in priority scoring:
+    - Urgency indicators: {analysis_context['urgency']}
+    - Time sensitivity: {bool(analysis_context['has_deadlines'])}
+    - Question type: {analysis_context['question_type']}
+    - Sentiment: {analysis_context['sentiment_strength']}
+    - Email type: {analysis_context['email_type_raw']}
+    """
+
+    def _format_task_section(self, intro: str, selected_constraints: Dict, priority_factors: str) -> str:
+        """Format the TASK section describing the fields to return.
+        
+        Args:
+            intro: First line of the task
+            selected_constraints: Summary constraints from _get_summary_constraints
+            priority_factors: Signals to consider in priority scoring
+            
+        Returns:
+            The TASK section
+        """
+        return f"""TASK
 ----
-Analyze this email and provide a JSON response with the following fields:
+{intro}
 
 1. needs_action (boolean):
     - true if the email requires a response, action, or is worth the user's attention
@@ -152,13 +500,7 @@ Analyze this email and provide a JSON response with the following fields:
     - 61-80: High priority
     - 81-100: Urgent/immediate attention
     
-    Consider the following in priority scoring:
-    - Urgency indicators: {analysis_context['urgency']}
-    - Time sensitivity: {bool(analysis_context['has_deadlines'])}
-    - Question type: {analysis_context['question_type']}
-    - Sentiment: {analysis_context['sentiment_strength']}
-    - Email type: {analysis_context['email_type_raw']}
-    
+{priority_factors}
     Higher Priority Contexts (score 60-100):
     - ANY email requiring a meaningful response or action should be at least 60+
     - Emails requiring immediate action with deadlines should be 75+
@@ -177,20 +519,24 @@ Analyze this email and provide a JSON response with the following fields:
     - Newsletters
     - Routine notifications
     - Purely informational updates without action items
-
-{custom_categories_prompt}
-
-OUTPUT FORMAT
-------------
-{self._get_schema_template(bool(custom_categories_prompt))}
 """
-            return prompt
 
-        except Exception as e:
-            self.logger.error(f"Error creating prompt: {str(e)}")
-            from ....models.exceptions import LLMProcessingError
-            raise LLMProcessingError(f"Failed to create prompt: {str(e)}")
+    def _format_output_section(self, custom_categories_prompt: str, schema_intro: str = None) -> str:
+        """Format the custom categories and OUTPUT FORMAT sections.
+        
+        Args:
+            custom_categories_prompt: Formatted custom categories (may be empty)
+            schema_intro: Instruction placed before the schema, if not the default
             
+        Returns:
+            The closing sections of the prompt
+        """
+        if schema_intro:
+            schema = self._get_schema_template(bool(custom_categories_prompt), schema_intro)
+        else:
+            schema = self._get_schema_template(bool(custom_categories_prompt))
+        return f"\n{custom_categories_prompt}\n\nOUTPUT FORMAT\n------------\n{schema}\n"
+
     def _format_custom_categories(self, custom_categories: List[Dict]) -> str:
         """Format custom categories for inclusion in the prompt.
         
@@ -259,23 +605,21 @@ OUTPUT FORMAT
             })
         }
         
-    def _select_summary_constraints(self, body: str) -> Dict:
-        """Select the appropriate summary constraints based on content length.
-        
-        Uses the pre-fetched summary length setting to determine the appropriate
-        summary constraints.
+    def _format_thread_context(self, thread_context: str) -> str:
+        """Format earlier messages of the email's thread for the prompt.
         
         Args:
-            body: The email body content
+            thread_context: Compact description of earlier thread messages
             
         Returns:
-            Dictionary of summary constraints
+            Prompt section, or an empty string if there is no thread context
         """
-        # Use the summary length that was already fetched during initialization
-        summary_length = self.config.summary_length
-        
-        return self._get_summary_constraints(summary_length)
-        
+        if not thread_context:
+            return ""
+        lines = [sanitize_text(line) for line in thread_context.splitlines()]
+        context = '\n'.join(line for line in lines if line)
+        return f"\nEarlier in this thread (context only; analyze the email above):\n{context}\n"
+
     def _get_summary_constraints(self, summary_length: str) -> Dict:
         """Get summary constraints based on summary length preference.
         
@@ -377,7 +721,9 @@ Example format: "Quarterly strategy review for APAC expansion. Team reports 30%
                 'sentiment_indicators': format_dict(important_patterns),
                 'question_count': questions.get('question_count', 0),
                 'questions': chr(10).join(question_info) if question_info else "   - No questions detected",
+                'question_info': question_info,
                 'deadlines': "   - Deadlines/Time References: " + "; ".join(deadline_info) if deadline_info else "   - No specific deadlines detected",
+                'deadline_info': deadline_info,
                 'has_deadlines': bool(deadline_info),
                 'question_type': question_type,
                 'sentiment_strength': sentiment_strength,
@@ -396,7 +742,9 @@ Example format: "Quarterly strategy review for APAC expansion. Team reports 30%
                 'sentiment_indicators': "{}",
                 'question_count': 0,
                 'questions': "   - No questions detected",
+                'question_info': [],
                 'deadlines': "   - No specific deadlines detected",
+                'deadline_info': [],
                 'has_deadlines': False,
                 'question_type': "No questions",
                 'sentiment_strength': "Neutral",
@@ -516,11 +864,16 @@ Example format: "Quarterly strategy review for APAC expansion. Team reports 30%
         else:
             return "No questions"
             
-    def _get_schema_template(self, custom_categories_prompt: bool) -> str:
+    def _get_schema_template(
+        self,
+        custom_categories_prompt: bool,
+        intro: str = "Return only valid JSON matching this schema:"
+    ) -> str:
         """Get the JSON schema template.
         
         Args:
             custom_categories_prompt: Whether custom categories are included
+            intro: Instruction placed before the schema
             
         Returns:
             JSON schema template string
@@ -535,6 +888,9 @@ Example format: "Quarterly strategy review for APAC expansion. Team reports 30%
         
         if custom_categories_prompt:
             base_schema["custom_categories"] = "object"
+        
+        if self.request_confidence:
+            base_schema[CONFIDENCE_FIELD] = "number"
             
         schema_str = json.dumps(base_schema, indent=4)
-        return f"Return only valid JSON matching this schema:\n{schema_str}" 
\ No newline at end of file
+        return f"{intro}\n{schema_str}" 
\ No newline at end of file
@@ -5,7 +5,7 @@ This module handles the parsing and validation of LLM responses.
 """
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 from flask import g
 
 
@@ -29,15 +29,7 @@ class ResponseParser:
             LLMProcessingError: If the response cannot be parsed properly
         """
         try:
-            # First try to extract JSON if response is wrapped in markdown code blocks
-            if '```json' in response_text:
-                json_content = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                json_content = response_text.split('```')[1].split('```')[0].strip()
-            else:
-                json_content = response_text.strip()
-                
-            result = json.loads(json_content)
+            result = json.loads(self._extract_json(response_text))
             
             # Apply validation and normalization
             result = self._validate_and_normalize(result)
@@ -52,6 +44,69 @@ class ResponseParser:
             self.logger.error(f"Error parsing LLM response: {e}")
             from ....models.exceptions import LLMProcessingError
             raise LLMProcessingError(f"Error parsing response: {e}")
+
+    def parse_packed_response(
+        self,
+        response_text: str,
+        keys: List[str],
+        results_key: str = 'results',
+        email_key: str = 'email_key'
+    ) -> Dict[str, Dict[str, Any]]:
+        """Parse the response to a packed (multi-email) prompt.
+        
+        Entries that are not objects, have an unknown or repeated key, or fail
+        validation are left out, so the caller can retry those emails alone.
+        
+        Args:
+            response_text: The raw text response from the LLM
+            keys: Keys of the emails in the prompt
+            results_key: Key of the results array in the response object
+            email_key: Key of the email key field in each result
+            
+        Returns:
+            Dictionary mapping email keys to parsed results
+            
+        Raises:
+            LLMProcessingError: If the response is not a JSON results array
+        """
+        from ....models.exceptions import LLMProcessingError
+        try:
+            parsed = json.loads(self._extract_json(response_text))
+        except (json.JSONDecodeError, IndexError) as e:
+            raise LLMProcessingError(f"Invalid JSON response: {e}")
+        entries = parsed.get(results_key) if isinstance(parsed, dict) else parsed
+        if not isinstance(entries, list):
+            raise LLMProcessingError(f"Packed response has no '{results_key}' array")
+        
+        expected = set(keys)
+        results = {}
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            key = str(entry.pop(email_key, ''))
+            if key not in expected or key in results:
+                self.logger.warning(f"Ignoring packed result with unexpected key '{key}'")
+                continue
+            try:
+                results[key] = self._validate_and_normalize(entry)
+            except Exception as e:
+                self.logger.warning(f"Invalid packed result for {key}: {e}")
+        return results
+
+    def _extract_json(self, response_text: str) -> str:
+        """Extract the JSON content, unwrapping markdown code blocks.
+        
+        Args:
+            response_text: The raw text response from the LLM
+            
+        Returns:
+            The JSON text
+        """
+        if '```json' in response_text:
+            return response_text.split('```json')[1].split('```')[0].strip()
+        if '```' in response_text:
+            return response_text.split('```')[1].split('```')[0].strip()
+        return response_text.strip()
             
     def _validate_and_normalize(self, result: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and normalize parsed response.
@@ -127,7 +182,15 @@ class ResponseParser:
             except (ValueError, TypeError):
                 self.logger.warning(f"Invalid priority value: {result['priority']}, defaulting to 50")
                 result['priority'] = 50
-        
+
+        # Ensure a reported confidence (triage prompts) is a number in [0, 1]
+        if 'confidence' in result:
+            try:
+                result['confidence'] = max(0.0, min(1.0, float(result['confidence'])))
+            except (ValueError, TypeError):
+                self.logger.warning(f"Invalid confidence value: {result['confidence']}, treating as unknown")
+                result['confidence'] = None
+
         return result
         
     def create_disabled_response(self, email_id: str) -> Dict[str, Any]:
@@ -152,4 +215,28 @@ class ResponseParser:
             'cost': 0,
             'email_id': email_id,
             'ai_enabled': False
+        }
+
+    def create_failed_response(self, email_id: str, error: str) -> Dict[str, Any]:
+        """Create the result of an email whose LLM analysis failed.
+        
+        The response carries no analysis fields, so the email keeps the same
+        NLP-only defaults as when the whole batch falls back.
+        
+        Args:
+            email_id: The ID of the email
+            error: Description of the failure
+            
+        Returns:
+            Failed analysis response
+        """
+        return {
+            'model': None,
+            'total_tokens': 0,
+            'prompt_tokens': 0,
+            'completion_tokens': 0,
+            'cost': 0,
+            'email_id': email_id,
+            'ai_enabled': True,
+            'error': error
         } 
\ No newline at end of file
@@ -2,7 +2,8 @@
 Utility functions and classes for semantic analysis.
 
 This package provides various utility functions and classes for text processing,
-token handling, settings management, LLM client operations, and cost calculation.
+token handling, settings management, LLM client operations, request dispatching
+within rate limits, prompt token budgets, and cost calculation.
 """
 
 from .text_processor import (
@@ -15,7 +16,14 @@ from .text_processor import (
     select_important_patterns
 )
 
-from .token_handler import TokenHandler
+from .token_handler import TokenHandler, get_token_handler
+
+from .token_budget import (
+    TokenBudgetAllocator,
+    PromptBudget,
+    predict_category,
+    DEFAULT_EMAIL_TOKEN_TARGET
+)
 
 from .settings_util import (
     get_user_setting,
@@ -33,18 +41,29 @@ from .cost_calculator import (
     get_cost_per_1k,
     calculate_cost,
     calculate_total_cost,
-    format_cost_stats
+    format_cost_stats,
+    get_cached_tokens,
+    BATCH_API_PRICE_FACTOR,
+    CACHED_INPUT_PRICE_FACTOR
 )
 
 from .llm_client import (
     get_openai_client,
+    create_completion_body,
     send_completion_request,
     extract_response_content
 )
 
+from .llm_dispatcher import (
+    LLMDispatcher,
+    get_llm_dispatcher,
+    parse_reset_duration
+)
+
 from .email_validator import (
     validate_email_data,
-    preprocess_email
+    preprocess_email,
+    preprocess_emails
 )
 
 __all__ = [
@@ -59,6 +78,13 @@ __all__ = [
     
     # Token handler
     'TokenHandler',
+    'get_token_handler',
+    
+    # Token budget
+    'TokenBudgetAllocator',
+    'PromptBudget',
+    'predict_category',
+    'DEFAULT_EMAIL_TOKEN_TARGET',
     
     # Settings utilities
     'get_user_setting',
@@ -76,13 +102,23 @@ __all__ = [
     'calculate_cost',
     'calculate_total_cost',
     'format_cost_stats',
+    'get_cached_tokens',
+    'BATCH_API_PRICE_FACTOR',
+    'CACHED_INPUT_PRICE_FACTOR',
     
     # LLM client
     'get_openai_client',
+    'create_completion_body',
     'send_completion_request',
     'extract_response_content',
     
+    # LLM dispatcher
+    'LLMDispatcher',
+    'get_llm_dispatcher',
+    'parse_reset_duration',
+    
     # Email validator
     'validate_email_data',
-    'preprocess_email'
+    'preprocess_email',
+    'preprocess_emails'
 ] 
\ No newline at end of file
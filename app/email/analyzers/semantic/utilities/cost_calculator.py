@@ -3,7 +3,13 @@ Cost calculation utilities for LLM processing.
 
 This module provides utilities for calculating costs associated with LLM API calls.
 """
-from typing import Dict, Tuple, Union
+from typing import Any, Dict, Optional, Tuple, Union
+
+# Batch API requests are billed at half the synchronous price
+BATCH_API_PRICE_FACTOR = 0.5
+
+# Prompt tokens served from the provider's prompt cache are billed at half price
+CACHED_INPUT_PRICE_FACTOR = 0.5
 
 
 def get_cost_per_1k(model: str) -> Dict[str, float]:
@@ -36,10 +42,30 @@ def get_cost_per_1k(model: str) -> Dict[str, float]:
     })
 
 
+def get_cached_tokens(usage: Any) -> int:
+    """
+    Get the number of prompt tokens served from the prompt cache.
+    
+    Args:
+        usage: Usage of a response, as an object or a dictionary (Batch API output)
+        
+    Returns:
+        usage.prompt_tokens_details.cached_tokens, or 0 if not reported
+    """
+    if isinstance(usage, dict):
+        details = usage.get('prompt_tokens_details') or {}
+        cached = details.get('cached_tokens') if isinstance(details, dict) else None
+    else:
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached = getattr(details, 'cached_tokens', None)
+    return cached if isinstance(cached, int) else 0
+
+
 def calculate_cost(
     model: str, 
     prompt_tokens: int, 
-    completion_tokens: int
+    completion_tokens: int,
+    cached_tokens: int = 0
 ) -> Tuple[float, float, float]:
     """
     Calculate the cost of an LLM API call.
@@ -48,13 +74,17 @@ def calculate_cost(
         model: The model identifier
         prompt_tokens: Number of tokens in the prompt (input)
         completion_tokens: Number of tokens in the completion (output)
+        cached_tokens: Number of prompt tokens served from the prompt cache
         
     Returns:
         Tuple of (input_cost, output_cost, total_cost)
     """
     cost_per_1k = get_cost_per_1k(model)
     
-    input_cost = (prompt_tokens / 1000) * cost_per_1k["input"]
+    # Cached prompt tokens are part of prompt_tokens, billed at a discount
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    billed_prompt_tokens = prompt_tokens - cached_tokens * (1 - CACHED_INPUT_PRICE_FACTOR)
+    input_cost = (billed_prompt_tokens / 1000) * cost_per_1k["input"]
     output_cost = (completion_tokens / 1000) * cost_per_1k["output"]
     total_cost = input_cost + output_cost
     
@@ -81,7 +111,10 @@ def format_cost_stats(
     model: str,
     prompt_tokens: int,
     completion_tokens: int,
-    total_tokens: int = None
+    total_tokens: int = None,
+    price_factor: float = 1.0,
+    cached_tokens: int = 0,
+    budgeted_tokens: Optional[int] = None
 ) -> Dict[str, Union[str, int, float]]:
     """
     Format cost statistics into a dictionary for response.
@@ -91,19 +124,28 @@ def format_cost_stats(
         prompt_tokens: Number of tokens in the prompt
         completion_tokens: Number of tokens in the completion
         total_tokens: Total token count (if None, calculated from prompt + completion)
+        price_factor: Multiplier on the list price (e.g. BATCH_API_PRICE_FACTOR)
+        cached_tokens: Number of prompt tokens served from the prompt cache
+        budgeted_tokens: Prompt tokens the prompt was budgeted for, if known
         
     Returns:
-        Dictionary with model, token counts, and cost information
+        Dictionary with model, token counts, and cost information. With
+        budgeted_tokens, budgeted_prompt_tokens is reported next to the
+        actual prompt_tokens.
     """
     if total_tokens is None:
         total_tokens = prompt_tokens + completion_tokens
         
-    _, _, total_cost = calculate_cost(model, prompt_tokens, completion_tokens)
+    _, _, total_cost = calculate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
     
-    return {
+    stats = {
         'model': model,
         'total_tokens': total_tokens,
         'prompt_tokens': prompt_tokens,
+        'cached_tokens': cached_tokens,
         'completion_tokens': completion_tokens,
-        'cost': total_cost
-    } 
\ No newline at end of file
+        'cost': total_cost * price_factor
+    }
+    if budgeted_tokens is not None:
+        stats['budgeted_prompt_tokens'] = budgeted_tokens
+    return stats 
\ No newline at end of file
@@ -5,10 +5,10 @@ This module provides functions for validating and preparing
 email data for semantic analysis.
 """
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from ....parsing.parser import EmailMetadata
-from ..utilities.text_processor import strip_html
+from ....parsing.normalized_text import NormalizedText, truncate_all
 
 logger = logging.getLogger(__name__)
 
@@ -56,15 +56,36 @@ def preprocess_email(email_data: EmailMetadata, token_handler, max_tokens: int)
     Returns:
         EmailMetadata with processed content
     """
-    # Clean HTML and truncate content
-    clean_body = strip_html(email_data.body)
-    truncated_body = token_handler.truncate_to_tokens(clean_body, max_tokens)
+    # Clean HTML and truncate content, reusing the email's memoized text views
+    truncated = email_data.text.truncated(max_tokens, token_handler)
+    return _with_text(email_data, truncated)
+
+
+def preprocess_emails(emails: List[EmailMetadata], token_handler, max_tokens: int) -> List[EmailMetadata]:
+    """
+    Preprocess a batch of emails, encoding their bodies together.
     
-    # Create clean version of email metadata
+    Args:
+        emails: The email data to preprocess
+        token_handler: The token handler for truncation
+        max_tokens: Maximum number of tokens for each body
+        
+    Returns:
+        EmailMetadata objects with processed content, in order
+    """
+    truncated = truncate_all([email_data.text for email_data in emails], max_tokens, token_handler)
+    return [_with_text(email_data, text) for email_data, text in zip(emails, truncated)]
+
+
+def _with_text(email_data: EmailMetadata, truncated: NormalizedText) -> EmailMetadata:
+    """Create a clean version of email metadata with a truncated body."""
     return EmailMetadata(
         id=email_data.id,
         subject=email_data.subject,
         sender=email_data.sender,
-        body=truncated_body,
-        date=email_data.date
-    ) 
\ No newline at end of file
+        body=truncated.clean,
+        date=email_data.date,
+        thread_id=email_data.thread_id,
+        text=truncated,
+        thread_context=email_data.thread_context
+    )
@@ -5,10 +5,11 @@ This module provides functions for interacting with the OpenAI client
 for semantic analysis of emails.
 """
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Callable, Optional
 from flask import current_app
 
 from ....models.exceptions import LLMProcessingError
+from .llm_dispatcher import get_llm_dispatcher
 
 
 logger = logging.getLogger(__name__)
@@ -39,39 +40,79 @@ async def get_openai_client():
         raise LLMProcessingError(f"OpenAI client initialization failed: {e}")
 
 
+def create_completion_body(
+    model: str,
+    prompt: str,
+    max_tokens: int,
+    temperature: float = 0.1,
+    stream: bool = False
+) -> Dict[str, Any]:
+    """
+    Create the chat completion request body for an email analysis prompt.
+    
+    Used for live requests and for the request lines of Batch API jobs.
+    
+    Args:
+        model: The model to use for the completion
+        prompt: The prompt text
+        max_tokens: Maximum number of tokens to generate
+        temperature: Temperature for the completion (randomness)
+        stream: Stream the response, with usage reported in the final chunk
+        
+    Returns:
+        Request body for the chat completions endpoint
+    """
+    body = {
+        'model': model,
+        'messages': [
+            {"role": "system", "content": "You are an AI assistant analyzing emails."},
+            {"role": "user", "content": prompt}
+        ],
+        'temperature': temperature,
+        'max_tokens': max_tokens,
+        'response_format': {"type": "json_object"}  # Force JSON response
+    }
+    if stream:
+        body['stream'] = True
+        body['stream_options'] = {"include_usage": True}
+    return body
+
+
 async def send_completion_request(
     client, 
     model: str, 
     prompt: str, 
     max_tokens: int, 
-    temperature: float = 0.1
+    temperature: float = 0.1,
+    on_content: Optional[Callable[[str], None]] = None
 ):
     """
     Send a completion request to the OpenAI API.
     
+    The request goes through the process-wide LLM dispatcher, which keeps it
+    within the concurrency and rate limits and retries transient failures.
+    With on_content the response is streamed and each content delta is passed
+    to it as it arrives; the assembled response is returned either way.
+    
     Args:
         client: The OpenAI client instance
         model: The model to use for the completion
         prompt: The prompt text
         max_tokens: Maximum number of tokens to generate
         temperature: Temperature for the completion (randomness)
+        on_content: Callback receiving streamed content deltas
         
     Returns:
         The response from the OpenAI API
         
     Raises:
-        LLMProcessingError: If the API call fails
+        LLMProcessingError: If the API call fails after retries
     """
     try:
-        response = await client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are an AI assistant analyzing emails."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=temperature,
-            max_tokens=max_tokens,
-            response_format={"type": "json_object"}  # Force JSON response
+        response = await get_llm_dispatcher().complete(
+            client,
+            create_completion_body(model, prompt, max_tokens, temperature, stream=on_content is not None),
+            on_content=on_content
         )
         return response
         
@@ -0,0 +1,484 @@
+"""
+Rate-limit aware dispatcher for LLM requests.
+
+A batch of 20 emails used to fire 20 simultaneous completion requests. A burst
+like that trips the provider's per-minute limits, and a single 429 made the
+whole batch fall back to NLP-only results. The dispatcher sits in front of the
+chat completions endpoint and:
+
+- caps the number of requests in flight (max_concurrency)
+- admits a request only when the token and request budgets allow it. Both
+  budgets refill continuously up to tokens_per_minute / requests_per_minute
+  and are corrected from the x-ratelimit-* response headers, so several
+  workers sharing one API key slow down together.
+- retries 429, 408/409, 5xx, timeouts and connection errors with
+  full-jitter exponential backoff, honouring retry-after headers. A 429
+  pauses every caller, not just the one that received it.
+
+A request reserves its estimated prompt tokens plus max_tokens, which is how
+the provider counts it against the token limit; the unused part is refunded
+once the response reports its actual usage.
+
+Streamed requests (stream=True in the body) pass each content delta to an
+on_content callback as it arrives and return the assembled ChatCompletion, so
+callers handle both kinds of request alike. A stream that fails after content
+was delivered is not retried.
+
+The dispatcher also totals the prompt tokens it sends and the part served
+from the provider's prompt cache (usage.prompt_tokens_details.cached_tokens);
+cache_hit_rate is their ratio for the process.
+
+Each route runs its own event loop, so the dispatcher doesn't use asyncio
+locks or semaphores. Its state is guarded by a threading lock, and waiting
+callers poll with asyncio.sleep.
+
+Typical usage:
+    dispatcher = get_llm_dispatcher()
+    response = await dispatcher.complete(client, create_completion_body(model, prompt, 300))
+"""
+import asyncio
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+import openai
+from openai.types import CompletionUsage
+from openai.types.completion_usage import PromptTokensDetails
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+
+from .cost_calculator import get_cached_tokens
+
+logger = logging.getLogger(__name__)
+
+# Default budgets (gpt-4o-mini, usage tier 1)
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_TOKENS_PER_MINUTE = 200_000
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_MAX_RETRIES = 4
+
+# Status codes worth retrying besides 5xx
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Rough characters per token, used to estimate prompt size before sending
+CHARS_PER_TOKEN = 4
+
+# Longest single wait between admission checks, in seconds
+MAX_POLL_INTERVAL = 1.0
+
+DURATION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+DURATION_UNITS = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a rate limit reset duration such as '6m0s', '1.5s' or '20ms'.
+
+    Args:
+        value: Header value (plain numbers are read as seconds)
+
+    Returns:
+        Duration in seconds, or None if the value can't be parsed
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = DURATION_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    """Read an integer header, None when missing or invalid."""
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class LLMDispatcher:
+    """Bounded-concurrency, rate-limit aware sender of chat completion requests.
+
+    Attributes:
+        max_concurrency (int): Maximum number of requests in flight.
+        tokens_per_minute (int): Token budget per minute.
+        requests_per_minute (int): Request budget per minute.
+        max_retries (int): Retries per request after the first attempt.
+        base_delay (float): First backoff delay in seconds.
+        max_delay (float): Longest backoff delay in seconds.
+        stats (Dict[str, int]): Request, retry, rate limit and failure counts.
+        cache_stats (Dict[str, int]): Prompt tokens sent and served from the prompt cache.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0
+    ):
+        """Initialize the dispatcher.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight
+            tokens_per_minute: Token budget per minute
+            requests_per_minute: Request budget per minute
+            max_retries: Retries per request after the first attempt
+            base_delay: First backoff delay in seconds
+            max_delay: Longest backoff delay in seconds
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = max(1, tokens_per_minute)
+        self.requests_per_minute = max(1, requests_per_minute)
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._tokens = float(self.tokens_per_minute)
+        self._requests = float(self.requests_per_minute)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self.stats = {'requests': 0, 'retries': 0, 'rate_limited': 0, 'failures': 0}
+        self.cache_stats = {'prompt_tokens': 0, 'cached_tokens': 0}
+
+    @staticmethod
+    def estimate_tokens(body: Dict[str, Any]) -> int:
+        """Estimate the tokens a request counts against the token limit.
+
+        Args:
+            body: Chat completion request body
+
+        Returns:
+            Estimated prompt tokens plus max_tokens
+        """
+        prompt_chars = sum(len(message.get('content') or '') for message in body.get('messages', []))
+        return prompt_chars // CHARS_PER_TOKEN + body.get('max_tokens', 0)
+
+    async def complete(
+        self,
+        client,
+        body: Dict[str, Any],
+        estimated_tokens: Optional[int] = None,
+        on_content: Optional[Callable[[str], None]] = None
+    ):
+        """Send a chat completion request within the rate limits, retrying transient failures.
+
+        Args:
+            client: AsyncOpenAI client
+            body: Chat completion request body (see create_completion_body)
+            estimated_tokens: Tokens to reserve, estimated from the body if None
+            on_content: Called with each content delta of a streamed request
+
+        Returns:
+            The chat completion response
+
+        Raises:
+            Exception: The last error, once it isn't retryable or retries are exhausted
+        """
+        reserved = estimated_tokens if estimated_tokens is not None else self.estimate_tokens(body)
+        attempt = 0
+        while True:
+            await self._acquire(reserved)
+            delivered = [False]
+            try:
+                response, headers = await self._send(client, body, on_content, delivered)
+            except Exception as e:
+                headers = self._error_headers(e)
+                self._release(reserved, 0, headers)
+                if attempt >= self.max_retries or delivered[0] or not self.is_retryable(e):
+                    with self._lock:
+                        self.stats['failures'] += 1
+                    raise
+                delay = self._retry_delay(attempt, headers)
+                if getattr(e, 'status_code', None) == 429:
+                    self._pause(delay)
+                with self._lock:
+                    self.stats['retries'] += 1
+                logger.warning(
+                    f"LLM request failed ({type(e).__name__}: {e}), "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                )
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled (e.g. the client disconnected): free the slot, but keep the
+                # reservation since the provider may still count the request
+                self._release(reserved, reserved, None)
+                raise
+
+            usage = getattr(response, 'usage', None)
+            used = getattr(usage, 'total_tokens', None)
+            self._release(reserved, used if isinstance(used, int) else reserved, headers)
+            prompt_tokens = getattr(usage, 'prompt_tokens', None)
+            with self._lock:
+                self.stats['requests'] += 1
+                if isinstance(prompt_tokens, int):
+                    self.cache_stats['prompt_tokens'] += prompt_tokens
+                    self.cache_stats['cached_tokens'] += get_cached_tokens(usage)
+            return response
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens served from the provider's prompt cache."""
+        with self._lock:
+            prompt_tokens, cached_tokens = self.cache_stats['prompt_tokens'], self.cache_stats['cached_tokens']
+        return cached_tokens / prompt_tokens if prompt_tokens else 0.0
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """Whether a failed request is worth retrying.
+
+        Args:
+            error: Exception raised by the client
+
+        Returns:
+            True for timeouts, connection errors, 408/409/429 and 5xx responses
+        """
+        if isinstance(error, openai.APIConnectionError):
+            return True
+        status = getattr(error, 'status_code', None)
+        return isinstance(status, int) and (status in RETRYABLE_STATUS_CODES or status >= 500)
+
+    async def _send(
+        self,
+        client,
+        body: Dict[str, Any],
+        on_content: Optional[Callable[[str], None]],
+        delivered: List[bool]
+    ):
+        """Send one attempt, returning the response and its headers.
+
+        The client's own retries are disabled so only the dispatcher retries.
+        Clients without raw response support (e.g. test doubles) are called
+        directly and report no headers.
+        """
+        if hasattr(client, 'with_options'):
+            client = client.with_options(max_retries=0)
+        completions = client.chat.completions
+        raw_api = getattr(completions, 'with_raw_response', None)
+        if raw_api is None:
+            response, headers = await completions.create(**body), None
+        else:
+            raw = await raw_api.create(**body)
+            response, headers = raw.parse(), raw.headers
+        if body.get('stream'):
+            response = await self._collect_stream(response, body, on_content, delivered)
+        return response, headers
+
+    async def _collect_stream(
+        self,
+        stream,
+        body: Dict[str, Any],
+        on_content: Optional[Callable[[str], None]],
+        delivered: List[bool]
+    ) -> ChatCompletion:
+        """Read a streamed completion, passing content deltas on as they arrive.
+
+        Args:
+            stream: Async iterator of chat completion chunks
+            body: The request body
+            on_content: Called with each content delta
+            delivered: Set to [True] once a delta was passed on
+
+        Returns:
+            ChatCompletion assembled from the chunks. Usage comes from the final
+            chunk (stream_options.include_usage), or is estimated if missing.
+        """
+        parts: List[str] = []
+        usage = None
+        finish_reason = None
+        first = None
+        async for chunk in stream:
+            first = first or chunk
+            usage = getattr(chunk, 'usage', None) or usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            delta = choice.delta.content if choice.delta else None
+            if not delta:
+                continue
+            parts.append(delta)
+            if on_content is not None:
+                delivered[0] = True
+                try:
+                    on_content(delta)
+                except Exception as e:
+                    logger.warning(f"Streamed content callback failed: {e}")
+
+        content = ''.join(parts)
+        if usage is None:
+            prompt_tokens = self.estimate_tokens(body) - body.get('max_tokens', 0)
+            completion_tokens = len(content) // CHARS_PER_TOKEN
+            logger.debug("Streamed response reported no usage, using estimated token counts")
+            usage = CompletionUsage(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                                    total_tokens=prompt_tokens + completion_tokens)
+        return ChatCompletion(
+            id=getattr(first, 'id', None) or '',
+            object='chat.completion',
+            created=getattr(first, 'created', None) or int(time.time()),
+            model=getattr(first, 'model', None) or body.get('model', ''),
+            choices=[Choice(
+                index=0,
+                finish_reason=finish_reason or 'stop',
+                message=ChatCompletionMessage(role='assistant', content=content)
+            )],
+            usage=CompletionUsage(
+                prompt_tokens=usage.prompt_tokens,
+                completion_tokens=usage.completion_tokens,
+                total_tokens=usage.total_tokens,
+                prompt_tokens_details=PromptTokensDetails(cached_tokens=get_cached_tokens(usage))
+            )
+        )
+
+    @staticmethod
+    def _error_headers(error: Exception) -> Optional[Mapping[str, str]]:
+        """Headers of the response behind an API error, if any."""
+        response = getattr(error, 'response', None)
+        return getattr(response, 'headers', None)
+
+    def _refill(self, now: float) -> None:
+        """Refill both budgets for the time passed. Caller holds the lock."""
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+        self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Admit a request if the budgets allow it.
+
+        A request larger than the whole token budget waits for a full budget.
+
+        Args:
+            tokens: Tokens to reserve
+
+        Returns:
+            0 if admitted, otherwise seconds to wait before trying again
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self._in_flight >= self.max_concurrency:
+                return 0.05
+            tokens = min(tokens, self.tokens_per_minute)
+            if self._tokens < tokens:
+                return (tokens - self._tokens) * 60 / self.tokens_per_minute
+            if self._requests < 1:
+                return (1 - self._requests) * 60 / self.requests_per_minute
+            self._tokens -= tokens
+            self._requests -= 1
+            self._in_flight += 1
+            return 0.0
+
+    async def _acquire(self, tokens: int) -> None:
+        """Wait until a request is admitted."""
+        waited = False
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            if not waited and wait > 0.05:
+                logger.debug(f"LLM request waiting {wait:.2f}s for rate limit budget")
+            waited = True
+            await asyncio.sleep(min(wait, MAX_POLL_INTERVAL))
+
+    def _release(self, reserved: int, used: int, headers: Optional[Mapping[str, str]]) -> None:
+        """Finish a request: refund unused tokens and apply the rate limit headers.
+
+        Args:
+            reserved: Tokens reserved at admission
+            used: Tokens the request actually consumed
+            headers: Response headers, or None
+        """
+        with self._lock:
+            self._in_flight -= 1
+            self._tokens = min(self.tokens_per_minute, self._tokens + reserved - used)
+            if headers is not None:
+                self._apply_headers(headers)
+
+    def _apply_headers(self, headers: Mapping[str, str]) -> None:
+        """Align the budgets with the provider's view. Caller holds the lock.
+
+        The remaining counts cover every client of the API key, so they can
+        only lower the local budgets. An exhausted budget pauses admission
+        until the provider's reset time.
+        """
+        now = time.monotonic()
+        remaining_tokens = _header_int(headers, 'x-ratelimit-remaining-tokens')
+        if remaining_tokens is not None:
+            self._tokens = min(self._tokens, remaining_tokens)
+            if remaining_tokens <= 0:
+                reset = parse_reset_duration(headers.get('x-ratelimit-reset-tokens'))
+                if reset:
+                    self._paused_until = max(self._paused_until, now + reset)
+        remaining_requests = _header_int(headers, 'x-ratelimit-remaining-requests')
+        if remaining_requests is not None:
+            self._requests = min(self._requests, remaining_requests)
+            if remaining_requests <= 0:
+                reset = parse_reset_duration(headers.get('x-ratelimit-reset-requests'))
+                if reset:
+                    self._paused_until = max(self._paused_until, now + reset)
+
+    def _retry_delay(self, attempt: int, headers: Optional[Mapping[str, str]]) -> float:
+        """Delay before the next attempt.
+
+        A retry-after-ms or retry-after header wins; otherwise full jitter
+        over an exponentially growing window.
+
+        Args:
+            attempt: Number of the failed attempt (0 for the first)
+            headers: Headers of the failed response, or None
+
+        Returns:
+            Delay in seconds
+        """
+        if headers is not None:
+            retry_after_ms = headers.get('retry-after-ms')
+            if retry_after_ms is not None:
+                try:
+                    return min(float(retry_after_ms) / 1000, self.max_delay)
+                except ValueError:
+                    pass
+            retry_after = parse_reset_duration(headers.get('retry-after'))
+            if retry_after is not None:
+                return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _pause(self, seconds: float) -> None:
+        """Stop admitting requests for a while (after a 429)."""
+        with self._lock:
+            self.stats['rate_limited'] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+_default_dispatcher: Optional[LLMDispatcher] = None
+_default_dispatcher_lock = threading.Lock()
+
+
+def get_llm_dispatcher(**kwargs) -> LLMDispatcher:
+    """Get or create the process-wide LLM dispatcher.
+
+    Args:
+        **kwargs: LLMDispatcher arguments used when the dispatcher is created
+
+    Returns:
+        LLMDispatcher: The shared dispatcher
+    """
+    global _default_dispatcher
+    with _default_dispatcher_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = LLMDispatcher(**kwargs)
+        return _default_dispatcher
@@ -7,55 +7,8 @@ used by the semantic analyzer.
 import re
 from typing import Dict, List
 
-
-def strip_html(html_content: str) -> str:
-    """Extract readable text from HTML content.
-    
-    This method:
-    1. Removes script and style elements
-    2. Converts <br> and </p> to newlines
-    3. Strips all other HTML tags
-    4. Normalizes whitespace
-    5. Preserves important line breaks
-    
-    Args:
-        html_content: The HTML content to process
-        
-    Returns:
-        Clean text extracted from HTML
-    """
-    from html import unescape
-    
-    # First unescape any HTML entities
-    text = unescape(html_content)
-    
-    # Remove script and style elements
-    text = re.sub(r'<script.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    text = re.sub(r'<style.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
-    
-    # Replace <br> and </p> with newlines
-    text = re.sub(r'<br[^>]*>', '\n', text, flags=re.IGNORECASE)
-    text = re.sub(r'</p>', '\n\n', text, flags=re.IGNORECASE)
-    
-    # Remove all other HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # Fix common HTML entities that might have been missed
-    text = text.replace('&nbsp;', ' ')
-    text = text.replace('&amp;', '&')
-    text = text.replace('&lt;', '<')
-    text = text.replace('&gt;', '>')
-    
-    # Normalize whitespace while preserving paragraph breaks
-    text = re.sub(r'\n\s*\n', '\n\n', text)  # Normalize paragraph breaks
-    text = re.sub(r'[ \t]+', ' ', text)  # Normalize spaces and tabs
-    text = re.sub(r' *\n *', '\n', text)  # Clean up spaces around newlines
-    
-    # Remove extra whitespace while preserving paragraph structure
-    lines = [line.strip() for line in text.splitlines()]
-    text = '\n'.join(line for line in lines if line)
-    
-    return text.strip()
+# HTML-to-text conversion is shared with the parser; re-exported for analyzers
+from app.email.parsing.utils.html_utils import html_to_text, strip_html
 
 
 def sanitize_text(text: str) -> str:
@@ -0,0 +1,172 @@
+"""
+Token budget allocation for the per-email part of a prompt.
+
+The static part of a prompt (instructions, schema) is shared by every email,
+but the per-email part used to be assembled blindly: the body got a fixed
+max_content_tokens and the NLP context was appended whole, even when most of
+it was empty. The allocator measures each section and fits them into a total
+per-email target:
+
+- required sections (subject, sender, the headline signals and priority
+  factors) are always kept
+- optional sections are offered the remaining budget in order of value
+  (questions, deadlines, body, thread context, entities, key phrases,
+  sentiment indicators). A section that doesn't fit is shrunk if it is
+  shrinkable and dropped otherwise. Empty sections never reach the allocator.
+- the body is budgeted from its length and the email's predicted category:
+  bulk mail and automated notifications get a smaller share of the target
+  than conversational email, and a body shorter than its share keeps only
+  what it needs
+
+A body floor (MIN_BODY_TOKENS) is reserved before any optional section so
+context never crowds out the email itself.
+
+Typical usage:
+    allocator = TokenBudgetAllocator(email_token_target=1400)
+    budget = allocator.allocate(required_tokens, [('questions', 40, False), (BODY_SECTION, 900, True)])
+    body_budget = budget.body
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default prompt tokens for the per-email part of a prompt
+DEFAULT_EMAIL_TOKEN_TARGET = 1400
+
+# Body tokens always reserved ahead of optional sections (or the whole body if shorter)
+MIN_BODY_TOKENS = 120
+
+# Name of the body in the ranked sections passed to allocate
+BODY_SECTION = 'body'
+
+# Smallest useful size of a shrunk section
+MIN_SECTION_TOKENS = 24
+
+# Share of the target a body may use, by predicted category (default 1.0)
+CATEGORY_BODY_SHARE = {
+    'Promotions': 0.25,
+    'Informational': 0.5
+}
+
+
+@dataclass
+class PromptBudget:
+    """Token allocation of the per-email part of one prompt.
+
+    Attributes:
+        target: Total per-email token target.
+        category: Predicted category the body budget was picked for, or None.
+        body: Body tokens allowed.
+        sections: Tokens allotted to each kept section, by name.
+        shrunk: Names of sections shrunk to fit.
+        dropped: Names of sections left out.
+        budgeted: Tokens allotted to the per-email part in total.
+        prefix: Tokens of the static prompt prefix counted for this email.
+    """
+    target: int
+    category: Optional[str] = None
+    body: int = 0
+    sections: Dict[str, int] = field(default_factory=dict)
+    shrunk: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    budgeted: int = 0
+    prefix: int = 0
+
+    @property
+    def budgeted_prompt_tokens(self) -> int:
+        """Budgeted prompt tokens, static prefix included."""
+        return self.prefix + self.budgeted
+
+
+def predict_category(nlp_results: Dict) -> Optional[str]:
+    """Predict an email's category from its NLP signals, before the LLM runs.
+
+    Args:
+        nlp_results: NLP analysis results (see format_nlp_result)
+
+    Returns:
+        'Promotions' for bulk mail, 'Informational' for automated mail, or None
+    """
+    patterns = nlp_results.get('email_patterns') or {}
+    if patterns.get('is_bulk'):
+        return 'Promotions'
+    if patterns.get('is_automated'):
+        return 'Informational'
+    return None
+
+
+class TokenBudgetAllocator:
+    """Fits the sections of a per-email prompt into a token target.
+
+    Attributes:
+        email_token_target (int): Total tokens for the per-email part of a prompt.
+    """
+
+    def __init__(self, email_token_target: int = DEFAULT_EMAIL_TOKEN_TARGET):
+        """Initialize the allocator.
+
+        Args:
+            email_token_target: Total tokens for the per-email part of a prompt
+        """
+        self.email_token_target = max(MIN_BODY_TOKENS, email_token_target)
+
+    def body_cap(self, category: Optional[str]) -> int:
+        """Most body tokens an email of a predicted category may use.
+
+        Args:
+            category: Predicted category, or None for conversational email
+
+        Returns:
+            Body token cap
+        """
+        share = CATEGORY_BODY_SHARE.get(category, 1.0)
+        return max(MIN_BODY_TOKENS, int(self.email_token_target * share))
+
+    def allocate(
+        self,
+        required_tokens: int,
+        sections: List[Tuple[str, int, bool]],
+        category: Optional[str] = None
+    ) -> PromptBudget:
+        """Allocate the per-email target among the body and optional sections.
+
+        Args:
+            required_tokens: Tokens of the sections that are always kept
+            sections: (name, tokens, shrinkable) of each optional section, most
+                valuable first. The body is the BODY_SECTION entry, with the
+                tokens of the full (preprocessed) body.
+            category: Predicted category of the email
+
+        Returns:
+            PromptBudget with the body budget and the sections kept
+        """
+        budget = PromptBudget(target=self.email_token_target, category=category)
+        body_tokens = next((tokens for name, tokens, _ in sections if name == BODY_SECTION), 0)
+        body_want = min(body_tokens, self.body_cap(category))
+        body_floor = min(body_want, MIN_BODY_TOKENS)
+        remaining = self.email_token_target - required_tokens - body_floor
+
+        for name, tokens, shrinkable in sections:
+            if name == BODY_SECTION:
+                extra = min(body_want - body_floor, max(0, remaining))
+                budget.body = body_floor + extra
+                remaining -= extra
+            elif tokens <= remaining:
+                budget.sections[name] = tokens
+                remaining -= tokens
+            elif shrinkable and remaining >= MIN_SECTION_TOKENS:
+                budget.sections[name] = remaining
+                budget.shrunk.append(name)
+                remaining = 0
+            else:
+                budget.dropped.append(name)
+
+        budget.budgeted = required_tokens + sum(budget.sections.values()) + budget.body
+        if budget.dropped or budget.shrunk or budget.body < body_tokens:
+            logger.debug(
+                f"Prompt budget: body {budget.body}/{body_tokens} tokens "
+                f"(category {category or 'conversational'}), shrunk {budget.shrunk}, dropped {budget.dropped}"
+            )
+        return budget
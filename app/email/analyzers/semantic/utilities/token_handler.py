@@ -3,19 +3,36 @@ Token handling utilities for the semantic analyzer.
 
 This module contains utility functions for handling token counting and text truncation
 used by the semantic analyzer.
+
+One TokenHandler is shared by the whole process (get_token_handler): the
+analyzer, its prompt creators, the batch processors and the body reducer's
+count_tokens all encode with the same tiktoken encoding, which is loaded once
+and is safe to use from several threads. Truncation encodes only the character prefix that can fit in the
+token budget, so its cost is bounded by the budget rather than the body size,
+and encode_batch encodes the texts of a whole batch at once on a thread pool.
+Special-token text (e.g. "<|endoftext|>" in a body) is encoded as plain text.
 """
 import re
 import logging
+import threading
 import tiktoken
-from typing import Optional
+from typing import Dict, List, Tuple
+
+from ....parsing.normalized_text import MAX_CHARS_PER_TOKEN
+
+# Encoding used for every model we call
+DEFAULT_ENCODING = "cl100k_base"
+
+# Threads used to encode a batch of texts
+ENCODE_BATCH_THREADS = 4
 
 
 class TokenHandler:
     """Handles token counting and text truncation for LLM processing."""
-    
-    def __init__(self, encoding_name: str = "cl100k_base"):
+
+    def __init__(self, encoding_name: str = DEFAULT_ENCODING):
         """Initialize the token handler.
-        
+
         Args:
             encoding_name: The name of the tiktoken encoding to use
         """
@@ -25,28 +42,71 @@ class TokenHandler:
         except Exception as e:
             self.logger.error(f"Failed to get tiktoken encoding: {e}")
             self.encoding = None
-            
+
+    def encode(self, text: str) -> List[int]:
+        """Encode text, treating special-token text as plain text.
+
+        Args:
+            text: The text to encode
+
+        Returns:
+            Token IDs
+        """
+        encode = getattr(self.encoding, 'encode_ordinary', None) or self.encoding.encode
+        return encode(text)
+
+    def encode_batch(self, texts: List[str], num_threads: int = ENCODE_BATCH_THREADS) -> List[List[int]]:
+        """Encode several texts at once on a thread pool.
+
+        Args:
+            texts: The texts to encode
+            num_threads: Threads to encode with
+
+        Returns:
+            Token IDs of each text, in order
+        """
+        encode_batch = getattr(self.encoding, 'encode_ordinary_batch', None)
+        if encode_batch is None or len(texts) < 2:
+            return [self.encode(text) for text in texts]
+        return encode_batch(texts, num_threads=num_threads)
+
+    def encode_prefix(self, text: str, max_tokens: int) -> Tuple[str, List[int]]:
+        """Encode only the part of text that can fit in a token budget.
+
+        Args:
+            text: The text to encode
+            max_tokens: Token budget
+
+        Returns:
+            Tuple of (character prefix of text, its token IDs). The prefix is
+            text itself when text is short enough.
+        """
+        prefix = text[:max_tokens * MAX_CHARS_PER_TOKEN]
+        return prefix, self.encode(prefix)
+
     def count_tokens(self, text: str) -> int:
         """Count the number of tokens in a text string.
-        
+
         Args:
             text: The text to count tokens for
-            
+
         Returns:
             Number of tokens
         """
         if not self.encoding:
             # Fallback method if tiktoken fails
             return len(text.split()) * 1.5  # Rough estimate
-        return len(self.encoding.encode(text))
-        
+        return len(self.encode(text))
+
     def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
         """Truncate text to a maximum number of tokens while preserving sentence boundaries.
-        
+
+        Only the prefix of text that can fit in the budget is encoded.
+
         Args:
             text: The text to truncate
             max_tokens: Maximum number of tokens to keep
-            
+
         Returns:
             Truncated text ending at a sentence boundary, with a [truncated] marker if needed
         """
@@ -54,62 +114,108 @@ class TokenHandler:
             # Fallback for when tiktoken isn't available (uses character-based truncation)
             self.logger.warning("Tiktoken unavailable, falling back to character-based truncation")
             return self._truncate_by_chars(text, max_tokens * 4)  # Rough estimate
-            
-        # First encode the entire text
-        tokens = self.encoding.encode(text)
-        
+
+        prefix, tokens = self.encode_prefix(text, max_tokens)
+        return self.truncate_tokens(prefix, tokens, max_tokens, complete=len(prefix) == len(text))
+
+    def truncate_tokens(self, text: str, tokens: List[int], max_tokens: int, complete: bool = True) -> str:
+        """Truncate already encoded text to a maximum number of tokens.
+
+        Callers that hold the token IDs of text (e.g. from NormalizedText) use
+        this to avoid encoding the same text again.
+
+        Args:
+            text: The text the tokens were encoded from
+            tokens: Token IDs of text
+            max_tokens: Maximum number of tokens to keep
+            complete: Whether text is the whole text, rather than a prefix of it
+
+        Returns:
+            text itself if it is complete and fits, otherwise the truncated
+            text ending at a sentence boundary with a [truncated] marker
+        """
         # If we're already under the limit, return the full text
         if len(tokens) <= max_tokens:
-            return text
-            
+            return text if complete else self._end_at_sentence(text)
+
         # Get the text from the truncated tokens
-        truncated_text = self.encoding.decode(tokens[:max_tokens])
-        
+        return self._end_at_sentence(self.encoding.decode(tokens[:max_tokens]))
+
+    def _end_at_sentence(self, truncated_text: str) -> str:
+        """End truncated text at a sentence boundary and mark it as truncated.
+
+        Args:
+            truncated_text: Text cut at an arbitrary point
+
+        Returns:
+            The text up to its last complete sentence (unless that loses too
+            much), followed by a [truncated] marker
+        """
         # Split into sentences (accounting for common sentence endings)
         sentences = re.split(r'(?<=[.!?])\s+', truncated_text)
-        
+
         # If we only have one sentence or empty text, return the truncated text as is
         if len(sentences) <= 1:
             return truncated_text + " [truncated]"
-            
+
         # Remove the last (potentially incomplete) sentence
         complete_text = ' '.join(sentences[:-1])
-        
-        # Verify we haven't removed too much
-        final_tokens = self.encoding.encode(complete_text)
-        if len(final_tokens) < max_tokens * 0.7:  # If we've lost too much text
+
+        # Verify we haven't removed too much (by length, rather than re-encoding)
+        if len(complete_text) < len(truncated_text) * 0.7:  # If we've lost too much text
             # Use the original truncated text but try to end at a punctuation mark
             for punct in ['. ', '! ', '? ', '. \n', '! \n', '? \n']:
                 last_punct = truncated_text.rfind(punct)
                 if last_punct > len(truncated_text) * 0.7:  # Don't cut off too much
                     return truncated_text[:last_punct + 1] + " [truncated]"
             return truncated_text + " [truncated]"
-            
+
         return complete_text + " [truncated]"
-        
+
     def _truncate_by_chars(self, text: str, max_chars: int) -> str:
         """Fallback method to truncate by character count when tiktoken is unavailable.
-        
+
         Args:
             text: The text to truncate
             max_chars: Maximum number of characters
-            
+
         Returns:
             Truncated text
         """
         if len(text) <= max_chars:
             return text
-            
+
         # Try to truncate at sentence boundary
         truncated = text[:max_chars]
         for punct in ['. ', '! ', '? ', '. \n', '! \n', '? \n']:
             last_punct = truncated.rfind(punct)
             if last_punct > max_chars * 0.7:  # Don't cut off too much
                 return text[:last_punct + 1] + " [truncated]"
-                
+
         # If no good sentence boundary, truncate at word boundary
         last_space = truncated.rfind(' ')
         if last_space > max_chars * 0.8:
             return text[:last_space] + " [truncated]"
-            
-        return truncated + " [truncated]" 
\ No newline at end of file
+
+        return truncated + " [truncated]"
+
+
+_default_handlers: Dict[str, TokenHandler] = {}
+_default_handlers_lock = threading.Lock()
+
+
+def get_token_handler(encoding_name: str = DEFAULT_ENCODING) -> TokenHandler:
+    """Get or create the process-wide token handler of an encoding.
+
+    Args:
+        encoding_name: The name of the tiktoken encoding
+
+    Returns:
+        TokenHandler: The shared handler
+    """
+    with _default_handlers_lock:
+        handler = _default_handlers.get(encoding_name)
+        if handler is None:
+            handler = TokenHandler(encoding_name)
+            _default_handlers[encoding_name] = handler
+        return handler
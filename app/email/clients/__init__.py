@@ -4,12 +4,14 @@ This module provides various email client implementations for different
 email service providers, all implementing a consistent interface.
 """
 
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Tuple, Union
+
+from flask import current_app, has_app_context
 
 # Import specific clients based on need
 from .gmail.client import GmailClient
 from .gmail.client_subprocess import GmailClientSubprocess
-from .imap.client import EmailConnection
+from .imap.client import EmailConnection, DEFAULT_MAX_CONNECTIONS, DEFAULT_IDLE_TIMEOUT
 
 __all__ = ["GmailClient", "GmailClientSubprocess", "EmailConnection"]
 
@@ -28,12 +30,28 @@ def create_gmail_client(credentials: Optional[Dict[str, Any]] = None) -> GmailCl
     return client
 
 
+def _mail_pool_settings() -> Tuple[int, float]:
+    """Read the mail connection pool settings from the application config.
+
+    Returns:
+        (max_connections, idle_timeout) from MAIL_POOL_MAX_CONNECTIONS and
+        MAIL_POOL_IDLE_TIMEOUT, or the defaults outside an application context
+    """
+    config = current_app.config if has_app_context() else {}
+    return (
+        int(config.get('MAIL_POOL_MAX_CONNECTIONS') or DEFAULT_MAX_CONNECTIONS),
+        float(config.get('MAIL_POOL_IDLE_TIMEOUT') or DEFAULT_IDLE_TIMEOUT)
+    )
+
+
 def create_imap_client(
     server: str,
     email: str,
     password: str,
     port: int = 993,
-    use_ssl: bool = True
+    use_ssl: bool = True,
+    max_connections: Optional[int] = None,
+    idle_timeout: Optional[float] = None
 ) -> EmailConnection:
     """Create a configured IMAP client.
 
@@ -43,16 +61,23 @@ def create_imap_client(
         password: User's email password
         port: IMAP server port (default 993)
         use_ssl: Whether to use SSL connection (default True)
+        max_connections: Maximum pooled connections for the account
+            (default: MAIL_POOL_MAX_CONNECTIONS)
+        idle_timeout: Seconds an idle pooled connection is kept open
+            (default: MAIL_POOL_IDLE_TIMEOUT)
 
     Returns:
         A configured EmailConnection instance.
     """
+    configured_max, configured_idle = _mail_pool_settings()
     return EmailConnection(
         server=server,
         email=email,
         password=password,
         port=port,
-        use_ssl=use_ssl
+        use_ssl=use_ssl,
+        max_connections=max_connections if max_connections is not None else configured_max,
+        idle_timeout=idle_timeout if idle_timeout is not None else configured_idle
     )
 
 
@@ -22,10 +22,11 @@ from datetime import datetime, timedelta, timezone
 import platform
 from zoneinfo import ZoneInfo
 
-from flask import session
+from flask import session, has_request_context
 from google.oauth2.credentials import Credentials
 
 from ..base import BaseEmailClient
+from .core.token_cache import token_cache, serialize_expiry, parse_expiry
 from app.utils.memory_profiling import log_memory_usage, log_memory_cleanup
 from .utils import (
     GmailAPIError,
@@ -67,30 +68,109 @@ class GmailClientSubprocess(BaseEmailClient):
             self.logger.error(f"Gmail subprocess script not found: {self._script_path}")
             raise FileNotFoundError(f"Gmail subprocess script not found: {self._script_path}")
     
-    async def connect(self, user_email: str):
-        """Establish a connection to Gmail API using OAuth credentials."""
+    async def connect(self, user_email: str, credentials: Optional[Dict[str, Any]] = None):
+        """Establish a connection to Gmail API using OAuth credentials.
+        
+        Args:
+            user_email: The user's email address
+            credentials: Credential dictionary to use instead of the session's,
+                for callers running outside a request (e.g. the send queue)
+        """
         # Store the user email
         self._user_email = user_email
         
-        # Verify we have credentials for this user
-        if 'credentials' not in session:
-            raise GmailAPIError("No credentials found. Please authenticate first.")
+        if credentials is not None:
+            creds_dict = dict(credentials)
+        else:
+            # Verify we have credentials for this user
+            if not has_request_context() or 'credentials' not in session:
+                raise GmailAPIError("No credentials found. Please authenticate first.")
+            creds_dict = dict(session['credentials'])
         
-        creds_dict = session['credentials']
+        # Prefer a token refreshed by an earlier worker run or background refresh
+        cached = token_cache.get(user_email)
+        if cached and cached['token'] != creds_dict.get('token'):
+            self.logger.debug(f"Using cached access token for {user_email}")
+            creds_dict.update(cached)
+            self._store_session_credentials(creds_dict)
         
         # Create credentials object
         self._credentials = Credentials(
             token=creds_dict['token'],
-            refresh_token=creds_dict['refresh_token'],
+            refresh_token=creds_dict.get('refresh_token'),  # Not kept with queued sends
             token_uri=creds_dict['token_uri'],
             client_id=creds_dict['client_id'],
             client_secret=creds_dict['client_secret'],
-            scopes=creds_dict['scopes']
+            scopes=creds_dict['scopes'],
+            expiry=parse_expiry(creds_dict.get('expiry'))
         )
         
+        # Refresh ahead of expiry in the background; this run keeps the current token
+        if token_cache.needs_refresh(self._credentials.expiry):
+            if token_cache.schedule_refresh(user_email, creds_dict):
+                self.logger.debug(f"Scheduled background token refresh for {user_email}")
+        
         self.logger.info(f"Connected to Gmail API for user {user_email}")
         return True
     
+    def _build_credentials_data(self, user: str) -> Dict[str, Any]:
+        """Serialize the current credentials for the worker subprocess.
+        
+        Args:
+            user: Email address the worker acts for
+            
+        Returns:
+            Dict[str, Any]: Credential dictionary written to the worker's temp file
+        """
+        return {
+            'token': self._credentials.token,
+            'refresh_token': self._credentials.refresh_token,
+            'token_uri': self._credentials.token_uri,
+            'client_id': self._credentials.client_id,
+            'client_secret': self._credentials.client_secret,
+            'scopes': self._credentials.scopes,
+            'expiry': serialize_expiry(self._credentials.expiry),
+            'user_email': user
+        }
+    
+    def _store_session_credentials(self, creds_dict: Dict[str, Any]) -> None:
+        """Write credentials back to the Flask session when one is available.
+        
+        Streaming responses cannot update the session cookie once the response
+        has started, so the process-wide token cache remains the source of truth.
+        
+        Args:
+            creds_dict: Full credential dictionary to store
+        """
+        if not has_request_context() or 'credentials' not in session:
+            return
+        try:
+            session['credentials'] = {
+                **session['credentials'],
+                'token': creds_dict['token'],
+                'expiry': creds_dict.get('expiry')
+            }
+        except Exception as e:
+            self.logger.debug(f"Could not update session credentials: {e}")
+    
+    def _apply_refreshed_credentials(self, result: Dict[str, Any], user: str) -> None:
+        """Adopt a token refreshed by the worker subprocess.
+        
+        Args:
+            result: Parsed worker response
+            user: Email address the worker acted for
+        """
+        refreshed = result.pop('refreshed_credentials', None)
+        if not refreshed or not refreshed.get('token'):
+            return
+        
+        self.logger.info(f"Worker refreshed access token for {user}, storing for reuse")
+        token_cache.update(user, refreshed['token'], refreshed.get('expiry'))
+        if self._credentials is not None:
+            self._credentials.token = refreshed['token']
+            self._credentials.expiry = parse_expiry(refreshed.get('expiry'))
+        self._store_session_credentials(refreshed)
+    
     async def fetch_emails(self, days_back: int = 1, user_email: str = None, label_ids: List[str] = None,
                        query: str = None, include_spam_trash: bool = False, user_timezone: str = 'US/Pacific') -> List[Dict]:
         """
@@ -126,15 +206,7 @@ class GmailClientSubprocess(BaseEmailClient):
         # Use TempFileManager to handle file cleanup
         with TempFileManager(self.logger) as temp_files:
             # Create temporary credentials file with properly serialized credentials
-            creds_data = {
-                'token': self._credentials.token,
-                'refresh_token': self._credentials.refresh_token,
-                'token_uri': self._credentials.token_uri,
-                'client_id': self._credentials.client_id,
-                'client_secret': self._credentials.client_secret,
-                'scopes': self._credentials.scopes,
-                'user_email': user
-            }
+            creds_data = self._build_credentials_data(user)
             credentials_path = temp_files.create_file(
                 json.dumps(creds_data),
                 suffix=".json"
@@ -171,7 +243,10 @@ class GmailClientSubprocess(BaseEmailClient):
             stdout_data, stderr_lines, return_code = await run_subprocess(command, self.logger)
             
             # Process result using standardized error handling
-            email_data = handle_subprocess_result(stdout_data, stderr_lines, return_code, "fetch emails", self.logger)
+            email_data = handle_subprocess_result(
+                stdout_data, stderr_lines, return_code, "fetch emails", self.logger,
+                result_hook=lambda data: self._apply_refreshed_credentials(data, user)
+            )
             
             # Verify we have emails data
             if 'emails' not in email_data:
@@ -219,15 +294,7 @@ class GmailClientSubprocess(BaseEmailClient):
         # Use the TempFileManager context manager to handle file cleanup
         with TempFileManager(self.logger) as temp_files:
             # Create temporary credentials file with properly serialized credentials
-            creds_data = {
-                'token': self._credentials.token,
-                'refresh_token': self._credentials.refresh_token,
-                'token_uri': self._credentials.token_uri,
-                'client_id': self._credentials.client_id,
-                'client_secret': self._credentials.client_secret,
-                'scopes': self._credentials.scopes,
-                'user_email': user
-            }
+            creds_data = self._build_credentials_data(user)
             credentials_path = temp_files.create_file(
                 json.dumps(creds_data),
                 suffix=".json"
@@ -261,7 +328,10 @@ class GmailClientSubprocess(BaseEmailClient):
             stdout_data, stderr_lines, return_code = await run_subprocess(cmd_parts, self.logger)
             
             # Process result using standardized error handling
-            result = handle_subprocess_result(stdout_data, stderr_lines, return_code, "send email", self.logger)
+            result = handle_subprocess_result(
+                stdout_data, stderr_lines, return_code, "send email", self.logger,
+                result_hook=lambda data: self._apply_refreshed_credentials(data, user)
+            )
             
             # Verify success flag
             if not result.get('success', False):
@@ -8,6 +8,7 @@ including authentication, API service, quota management, etc.
 from .exceptions import GmailAPIError, RateLimitError, AuthenticationError
 from .auth import create_credentials, update_session_credentials, ensure_valid_credentials
 from .quota import QuotaManager
+from .token_cache import TokenCache, token_cache, serialize_expiry, parse_expiry
 from .api import GmailAPIService, MemoryCache
 from .email_utils import parse_date, create_email_data
 
@@ -22,6 +23,12 @@ __all__ = [
     'update_session_credentials',
     'ensure_valid_credentials',
     
+    # Token cache
+    'TokenCache',
+    'token_cache',
+    'serialize_expiry',
+    'parse_expiry',
+    
     # Quota
     'QuotaManager',
     
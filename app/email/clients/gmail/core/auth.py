@@ -12,6 +12,7 @@ from google.auth.transport.requests import Request as AuthRequest
 from google.oauth2 import id_token
 
 from .exceptions import GmailAPIError, AuthenticationError
+from .token_cache import serialize_expiry, parse_expiry
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +38,8 @@ def create_credentials(creds_dict: Dict) -> Credentials:
         token_uri=creds_dict['token_uri'],
         client_id=creds_dict['client_id'],
         client_secret=creds_dict['client_secret'],
-        scopes=creds_dict['scopes']
+        scopes=creds_dict['scopes'],
+        expiry=parse_expiry(creds_dict.get('expiry'))
     )
 
 
@@ -56,7 +58,8 @@ def update_session_credentials(credentials: Credentials, user_email: str):
             'client_id': credentials.client_id,
             'client_secret': credentials.client_secret,
             'scopes': credentials.scopes,
-            'id_token': credentials.id_token
+            'id_token': credentials.id_token,
+            'expiry': serialize_expiry(credentials.expiry)
         }
 
 
@@ -105,6 +108,7 @@ async def ensure_valid_credentials(user_email: str) -> Credentials:
                 temp_creds.refresh(AuthRequest())
                 creds_dict['token'] = temp_creds.token
                 creds_dict['id_token'] = temp_creds.id_token
+                creds_dict['expiry'] = serialize_expiry(temp_creds.expiry)
                 session['credentials'] = creds_dict
                 # Try verification again
                 id_info = id_token.verify_oauth2_token(
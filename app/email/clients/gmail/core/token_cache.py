@@ -0,0 +1,233 @@
+"""Server-side OAuth access token cache for Gmail API.
+
+This module keeps the most recent access token and expiry per user in the
+main process, so that tokens refreshed by a Gmail worker subprocess (or by a
+background refresh) are reused by subsequent worker runs instead of every run
+refreshing the same expired token against Google's token endpoint.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+
+from google.auth.transport.requests import Request as AuthRequest
+from google.oauth2.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_expiry(expiry: Optional[datetime]) -> Optional[str]:
+    """Serialize a credentials expiry for JSON transport.
+
+    Args:
+        expiry: Expiry datetime as stored on google Credentials (naive UTC)
+
+    Returns:
+        ISO 8601 string, or None if no expiry is known
+    """
+    if expiry is None:
+        return None
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry.isoformat()
+
+
+def parse_expiry(value: Optional[str]) -> Optional[datetime]:
+    """Parse a serialized expiry back into the naive UTC form google-auth uses.
+
+    Args:
+        value: ISO 8601 string produced by serialize_expiry
+
+    Returns:
+        Naive UTC datetime, or None if the value is missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        expiry = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    return expiry
+
+
+class TokenCache:
+    """Process-wide cache of OAuth access tokens keyed by user email.
+
+    Tokens are written back whenever a worker reports a refreshed token, and
+    can be refreshed ahead of expiry on a background thread so that email
+    fetches never block on Google's token endpoint.
+    """
+
+    def __init__(self, refresh_margin: int = 300, max_workers: int = 2):
+        """Initialize the token cache.
+
+        Args:
+            refresh_margin: Seconds before expiry at which a token is refreshed
+                in the background
+            max_workers: Maximum number of concurrent background refreshes
+        """
+        self._tokens: Dict[str, Dict[str, Any]] = {}
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+        self._refresh_margin = timedelta(seconds=refresh_margin)
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @staticmethod
+    def _key(user_email: str) -> str:
+        """Normalize a user email into a cache key."""
+        return user_email.lower()
+
+    @staticmethod
+    def _now() -> datetime:
+        """Current time as naive UTC, matching google-auth's expiry format."""
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    def get(self, user_email: str) -> Optional[Dict[str, Any]]:
+        """Get the cached token for a user if it is still valid.
+
+        Args:
+            user_email: The user's email address
+
+        Returns:
+            Dictionary with 'token' and 'expiry' (ISO string), or None if no
+            unexpired token is cached
+        """
+        if not user_email:
+            return None
+        with self._lock:
+            entry = self._tokens.get(self._key(user_email))
+        if not entry:
+            return None
+        expiry = entry.get('expiry')
+        if expiry is not None and expiry <= self._now():
+            return None
+        return {'token': entry['token'], 'expiry': serialize_expiry(expiry)}
+
+    def update(self, user_email: str, token: str, expiry: Optional[Any]) -> bool:
+        """Store a token for a user unless a longer-lived one is already cached.
+
+        Args:
+            user_email: The user's email address
+            token: The OAuth access token
+            expiry: Token expiry as datetime or ISO string
+
+        Returns:
+            bool: True if the cached token was replaced
+        """
+        if not user_email or not token:
+            return False
+        if isinstance(expiry, str):
+            expiry = parse_expiry(expiry)
+        with self._lock:
+            key = self._key(user_email)
+            current = self._tokens.get(key)
+            if current and current.get('expiry') and expiry and current['expiry'] >= expiry:
+                return False
+            self._tokens[key] = {'token': token, 'expiry': expiry}
+        logger.debug(f"Cached access token for {user_email} (expires {serialize_expiry(expiry)})")
+        return True
+
+    def invalidate(self, user_email: str) -> None:
+        """Remove any cached token for a user.
+
+        Args:
+            user_email: The user's email address
+        """
+        with self._lock:
+            self._tokens.pop(self._key(user_email), None)
+
+    def needs_refresh(self, expiry: Optional[Any]) -> bool:
+        """Check whether a token expiry falls inside the refresh margin.
+
+        Args:
+            expiry: Token expiry as datetime or ISO string
+
+        Returns:
+            bool: True if the token expires within the refresh margin
+        """
+        if isinstance(expiry, str):
+            expiry = parse_expiry(expiry)
+        if expiry is None:
+            return False
+        return expiry - self._refresh_margin <= self._now()
+
+    def schedule_refresh(self, user_email: str, creds_dict: Dict[str, Any]) -> bool:
+        """Refresh a user's token on a background thread.
+
+        Only one refresh per user runs at a time; callers keep using the
+        current token while the refresh is in flight.
+
+        Args:
+            user_email: The user's email address
+            creds_dict: Credential dictionary as stored in the session
+
+        Returns:
+            bool: True if a refresh was scheduled
+        """
+        if not user_email or not creds_dict.get('refresh_token'):
+            return False
+        key = self._key(user_email)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="gmail-token-refresh"
+                )
+            executor = self._executor
+        executor.submit(self._refresh, user_email, dict(creds_dict))
+        return True
+
+    def refresh(self, user_email: str, creds_dict: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Refresh a user's token against Google's token endpoint now and cache it.
+
+        Args:
+            user_email: The user's email address
+            creds_dict: Credential dictionary as stored in the session
+
+        Returns:
+            Dictionary with 'token' and 'expiry' (ISO string), or None if the
+            refresh failed
+        """
+        try:
+            credentials = Credentials(
+                token=creds_dict.get('token'),
+                refresh_token=creds_dict.get('refresh_token'),
+                token_uri=creds_dict.get('token_uri'),
+                client_id=creds_dict.get('client_id'),
+                client_secret=creds_dict.get('client_secret'),
+                scopes=creds_dict.get('scopes')
+            )
+            credentials.refresh(AuthRequest())
+        except Exception as e:
+            logger.warning(f"Token refresh failed for {user_email}: {e}")
+            return None
+        self.update(user_email, credentials.token, credentials.expiry)
+        logger.info(f"Refreshed access token ahead of expiry for {user_email}")
+        return {'token': credentials.token, 'expiry': serialize_expiry(credentials.expiry)}
+
+    def _refresh(self, user_email: str, creds_dict: Dict[str, Any]) -> None:
+        """Refresh a token on the background executor."""
+        try:
+            self.refresh(user_email, creds_dict)
+        finally:
+            with self._lock:
+                self._refreshing.discard(self._key(user_email))
+
+    def shutdown(self) -> None:
+        """Stop the background refresh executor."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+# Process-wide token cache shared by all Gmail clients
+token_cache = TokenCache()
@@ -9,7 +9,7 @@ import json
 import logging
 import os
 import sys
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
 
 from ..core.exceptions import GmailAPIError
 
@@ -149,7 +149,8 @@ def parse_json_response(stdout_data: bytes, logger: Optional[logging.Logger] = N
 
 
 def handle_subprocess_result(stdout_data: bytes, stderr_lines: List[bytes], return_code: int, 
-                           operation_name: str, logger: Optional[logging.Logger] = None) -> Dict[str, Any]:
+                           operation_name: str, logger: Optional[logging.Logger] = None,
+                           result_hook: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
     """Handle subprocess result with standardized error handling.
     
     Args:
@@ -158,6 +159,9 @@ def handle_subprocess_result(stdout_data: bytes, stderr_lines: List[bytes], retu
         return_code: Subprocess return code
         operation_name: Name of the operation (for error messages)
         logger: Optional logger for output
+        result_hook: Optional callback invoked with the parsed response before
+            error checking, so side-channel data (e.g. refreshed tokens) is
+            consumed even when the operation itself failed
             
     Returns:
         Parsed JSON response from subprocess
@@ -179,6 +183,9 @@ def handle_subprocess_result(stdout_data: bytes, stderr_lines: List[bytes], retu
     # Parse the JSON output
     result = parse_json_response(stdout_data, logger)
     
+    if result_hook:
+        result_hook(result)
+    
     # Check for error in response
     if 'error' in result:
         if logger:
@@ -30,10 +30,11 @@ from .utils import (
     filter_emails_by_date,
     track_message_processing
 )
-from .email_parser import process_message
+from .email_parser import process_message, to_metadata_record
 
 # Import quota manager 
 from app.email.clients.gmail.core.quota import QuotaManager
+from app.email.clients.gmail.core.token_cache import serialize_expiry, parse_expiry
 
 # Ensure httplib2 caching is disabled to prevent memory leaks
 httplib2.RETRIES = 1
@@ -115,7 +116,38 @@ class MemoryCache(Cache):
         self._CACHE[url] = content
 
 
-async def create_gmail_service(creds_data: Dict[str, Any], logger: Optional[logging.Logger] = None) -> Any:
+def build_credentials(creds_data: Dict[str, Any], logger: Optional[logging.Logger] = None) -> Credentials:
+    """Build an OAuth credentials object from a credentials dictionary.
+    
+    The expiry forwarded by the parent process lets google-auth refresh an
+    expired token before the first request instead of after a 401.
+    
+    Args:
+        creds_data: Dict[str, Any]: OAuth credentials dictionary containing
+            token, refresh_token, client_id, client_secret, and optional expiry
+        logger: Optional[logging.Logger]: Logger instance for debug output
+        
+    Returns:
+        Credentials: Google OAuth credentials object
+    """
+    if logger is None:
+        logger = get_logger()
+        
+    logger.debug(f"Creating credentials with token: {(creds_data.get('token') or '')[:10]}...")
+    
+    return Credentials(
+        token=creds_data.get('token'),
+        refresh_token=creds_data.get('refresh_token'),
+        token_uri=creds_data.get('token_uri'),
+        client_id=creds_data.get('client_id'),
+        client_secret=creds_data.get('client_secret'),
+        scopes=creds_data.get('scopes'),
+        expiry=parse_expiry(creds_data.get('expiry'))
+    )
+
+
+async def create_gmail_service(creds_data: Dict[str, Any], logger: Optional[logging.Logger] = None,
+                               credentials: Optional[Credentials] = None) -> Any:
     """Create a Gmail API service client.
     
     Initializes and returns a Gmail API service object using the provided
@@ -126,6 +158,8 @@ async def create_gmail_service(creds_data: Dict[str, Any], logger: Optional[logg
             token, refresh_token, client_id, client_secret, and other required fields
         logger: Optional[logging.Logger]: Logger instance for output messages
             and debugging. If None, a default logger will be obtained.
+        credentials: Optional[Credentials]: Prebuilt credentials object. If None,
+            one is built from creds_data.
         
     Returns:
         Any: Gmail API service object from googleapiclient.discovery
@@ -145,16 +179,8 @@ async def create_gmail_service(creds_data: Dict[str, Any], logger: Optional[logg
     
     # Create credentials object - token should already be refreshed by parent process
     try:
-        logger.debug(f"Creating credentials with token: {creds_data.get('token', '')[:10]}...")
-        
-        credentials = Credentials(
-            token=creds_data.get('token'),
-            refresh_token=creds_data.get('refresh_token'),
-            token_uri=creds_data.get('token_uri'),
-            client_id=creds_data.get('client_id'),
-            client_secret=creds_data.get('client_secret'),
-            scopes=creds_data.get('scopes')
-        )
+        if credentials is None:
+            credentials = build_credentials(creds_data, logger)
         
         # Log credential status but don't rely on it for actual validity
         # The Google Auth library will handle refreshing if needed
@@ -214,6 +240,7 @@ class GmailService:
         self.service = None
         self.user_email = None
         self.credentials_data = None
+        self.credentials = None
         
     async def initialize(self) -> None:
         """Initialize the service.
@@ -236,7 +263,28 @@ class GmailService:
         self.user_email = self.credentials_data.get('user_email')
         
         # Create service
-        self.service = await create_gmail_service(self.credentials_data, self.logger)
+        self.credentials = build_credentials(self.credentials_data, self.logger)
+        self.service = await create_gmail_service(self.credentials_data, self.logger, self.credentials)
+        
+    def get_refreshed_credentials(self) -> Optional[Dict[str, Any]]:
+        """Get the access token if it was refreshed during this run.
+        
+        google-auth refreshes expired tokens transparently while executing
+        requests. Reporting the new token lets the parent process reuse it
+        for later worker runs instead of refreshing again.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Dictionary with 'token' and 'expiry'
+                if the token changed, None otherwise
+        """
+        if self.credentials is None or not self.credentials.token:
+            return None
+        if self.credentials.token == (self.credentials_data or {}).get('token'):
+            return None
+        return {
+            "token": self.credentials.token,
+            "expiry": serialize_expiry(self.credentials.expiry)
+        }
         
     async def get_message(self, msg_id: str) -> Dict[str, Any]:
         """Fetch a single message by ID.
@@ -488,8 +536,8 @@ class GmailService:
             max_results: int: Maximum number of results to return. Defaults to 100.
             
         Returns:
-            List[Dict[str, Any]]: List of processed email dictionaries with standardized
-                fields including headers, body content, and metadata
+            List[Dict[str, Any]]: List of compact metadata records (id, thread_id,
+                subject, sender, body, UTC date) as built by to_metadata_record
             
         Raises:
             ValueError: If the service is not initialized
@@ -533,8 +581,9 @@ class GmailService:
             # Apply cutoff time filter if specified
             if cutoff_time:
                 emails = filter_emails_by_date(emails, cutoff_time)
-                
-            all_emails.extend(emails)
+            
+            # Send only the final metadata fields back to the main process
+            all_emails.extend(to_metadata_record(email) for email in emails)
             
             # Log batch progress
             batch_time = time.time() - batch_start
@@ -11,7 +11,7 @@ import quopri
 import re
 from email.utils import parsedate_to_datetime
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
+from datetime import datetime, timezone
 from functools import lru_cache
 
 from .utils.logging_utils import get_logger
@@ -386,4 +386,43 @@ def process_message(message_data: Dict[str, Any]) -> Dict[str, Any]:
         'labels': message_data.get('labelIds', []),
         'snippet': message_data.get('snippet', ''),
         'headers': headers
-    } 
\ No newline at end of file
+    }
+
+
+def to_metadata_record(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce a processed message to a compact EmailMetadata-compatible record.
+    
+    Selects the display body (HTML preferred, plain text otherwise) and
+    normalizes the date to UTC, so the main process can build EmailMetadata
+    without re-parsing and only the fields it uses cross the process boundary.
+    
+    Args:
+        message: Dict[str, Any]: Structured message as returned by process_message
+        
+    Returns:
+        Dict[str, Any]: Record with the keys:
+            - id: Message ID
+            - thread_id: Thread ID
+            - subject: Email subject
+            - sender: Sender address
+            - body: Best available body content
+            - date: ISO format UTC date string, or None if unknown
+    """
+    date_str = message.get('date')
+    if date_str:
+        try:
+            date = datetime.fromisoformat(date_str)
+            if date.tzinfo is not None:
+                date = date.astimezone(timezone.utc)
+            date_str = date.isoformat()
+        except (ValueError, TypeError):
+            date_str = None
+    
+    return {
+        'id': message.get('id', ''),
+        'thread_id': message.get('thread_id', ''),
+        'subject': message.get('subject', ''),
+        'sender': message.get('from', ''),
+        'body': message.get('body_html') or message.get('body_text') or '',
+        'date': date_str
+    }
@@ -49,6 +49,28 @@ logger = get_logger()
 logger.info(f"Gmail worker logging to: {LOG_FILE}")
 
 
+def with_refreshed_credentials(result: Dict[str, Any], gmail: Optional[GmailService]) -> Dict[str, Any]:
+    """Attach a refreshed OAuth token to a worker result.
+    
+    If google-auth refreshed the access token during this run, the new token
+    and its expiry are reported back to the parent process so it can be reused
+    by later worker runs instead of being refreshed again.
+    
+    Args:
+        result: Dict[str, Any]: Result dictionary to be printed to stdout
+        gmail: Optional[GmailService]: The service used for this run, if created
+        
+    Returns:
+        Dict[str, Any]: The result, with 'refreshed_credentials' added if the
+            token was refreshed
+    """
+    refreshed = gmail.get_refreshed_credentials() if gmail is not None else None
+    if refreshed:
+        logger.info("Access token was refreshed during this run, reporting it to parent")
+        result["refreshed_credentials"] = refreshed
+    return result
+
+
 async def main(credentials_json: str, user_email: str, query: str, 
               include_spam_trash: bool, days_back: int, 
               max_results: int = 100, user_timezone: str = 'US/Pacific') -> Dict[str, Any]:
@@ -74,8 +96,10 @@ async def main(credentials_json: str, user_email: str, query: str,
             - query: The query that was used
             - user_email: The user email that was queried
             - days_back: Number of days back that were queried
+            - refreshed_credentials: New token and expiry (only present if refreshed)
             - error: Error message if an error occurred (only present on error)
     """
+    gmail = None
     try:
         # Initialize the Gmail service
         gmail = GmailService(credentials_json, logger)
@@ -96,19 +120,19 @@ async def main(credentials_json: str, user_email: str, query: str,
         )
         
         # Return results as JSON
-        return {
+        return with_refreshed_credentials({
             "emails": emails,
             "count": len(emails),
             "query": query,
             "user_email": user_email,
             "days_back": days_back
-        }
+        }, gmail)
     except Exception as e:
         logger.error(f"Error in main function: {e}")
-        return {
+        return with_refreshed_credentials({
             "error": str(e),
             "emails": []
-        }
+        }, gmail)
 
 
 async def send_email_task(credentials_json: str, user_email: str, to: str, 
@@ -136,8 +160,10 @@ async def send_email_task(credentials_json: str, user_email: str, to: str,
             - message_id: str: ID of the sent message (if successful)
             - thread_id: str: ID of the thread the message belongs to (if successful)
             - user_email: str: The email address that sent the message (if successful)
+            - refreshed_credentials: New token and expiry (only present if refreshed)
             - error: str: Error message (only present on error)
     """
+    gmail = None
     try:
         # Initialize the Gmail service
         gmail = GmailService(credentials_json, logger)
@@ -148,7 +174,7 @@ async def send_email_task(credentials_json: str, user_email: str, to: str,
         bcc_list = bcc.split(',') if bcc else None
         
         # Send email
-        return await gmail.send_email(
+        result = await gmail.send_email(
             to=to,
             subject=subject,
             content=content,
@@ -156,12 +182,13 @@ async def send_email_task(credentials_json: str, user_email: str, to: str,
             bcc=bcc_list,
             html_content=html_content
         )
+        return with_refreshed_credentials(result, gmail)
     except Exception as e:
         logger.error(f"Error in send_email_task: {e}")
-        return {
+        return with_refreshed_credentials({
             "success": False,
             "error": str(e)
-        }
+        }, gmail)
 
 
 if __name__ == "__main__":
@@ -5,5 +5,6 @@ IMAP email servers.
 """
 
 from .client import EmailConnection
+from .sync_state import SyncState, SyncStateStore
 
-__all__ = ["EmailConnection"] 
\ No newline at end of file
+__all__ = ["EmailConnection", "SyncState", "SyncStateStore"] 
\ No newline at end of file
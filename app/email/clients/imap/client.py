@@ -13,11 +13,18 @@ Typical usage:
 
 import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from imapclient import IMAPClient
 from datetime import datetime, timedelta, timezone
 
 from ..base import BaseEmailClient
+from .sync_state import SyncState, SyncStateStore, sync_state_store
+from app.email.utils.connection_pool import ConnectionPool, get_pool
+
+
+# Pool defaults, matching MAIL_POOL_MAX_CONNECTIONS / MAIL_POOL_IDLE_TIMEOUT
+DEFAULT_MAX_CONNECTIONS = 2
+DEFAULT_IDLE_TIMEOUT = 120.0
 
 
 class IMAPConnectionError(Exception):
@@ -38,6 +45,9 @@ class EmailConnection(BaseEmailClient):
         password (str): User's email password
         port (int): IMAP server port
         use_ssl (bool): Whether to use SSL connection
+        folder (str): Mailbox folder to sync
+        max_body_bytes (int): Maximum bytes of message text fetched per email
+        sync_store (Optional[SyncStateStore]): Incremental sync checkpoint store
     """
 
     def __init__(
@@ -46,7 +56,14 @@ class EmailConnection(BaseEmailClient):
         email: str, 
         password: str, 
         port: int = 993, 
-        use_ssl: bool = True
+        use_ssl: bool = True,
+        folder: str = 'INBOX',
+        max_body_bytes: int = 65536,
+        batch_size: int = 50,
+        sync_store: Optional[SyncStateStore] = sync_state_store,
+        use_pool: bool = True,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT
     ):
         """
         Initialize the IMAP email client.
@@ -57,6 +74,15 @@ class EmailConnection(BaseEmailClient):
             password: User's email password
             port: IMAP server port (default 993)
             use_ssl: Whether to use SSL connection (default True)
+            folder: Mailbox folder to sync (default INBOX)
+            max_body_bytes: Maximum bytes of message text fetched per email
+            batch_size: Number of messages requested per FETCH command
+            sync_store: Store for incremental sync checkpoints; None disables
+                incremental sync
+            use_pool: Whether to reuse authenticated connections across
+                operations (default True)
+            max_connections: Maximum concurrent connections for this account
+            idle_timeout: Seconds an idle pooled connection is kept open
             
         Raises:
             ValueError: If any required parameters are missing or invalid
@@ -69,8 +95,76 @@ class EmailConnection(BaseEmailClient):
         self.password = password
         self.port = port
         self.use_ssl = use_ssl
+        self.folder = folder
+        self.max_body_bytes = max_body_bytes
+        self.batch_size = batch_size
+        self.sync_store = sync_store
         self._client = None
+        # SELECT responses keyed by (connection, folder); pooled connections
+        # come and go, so status from one must never be read through another
+        self._folder_info: Dict[Tuple[int, str], Dict] = {}
+        self._condstore = False
+        self.use_pool = use_pool
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self._pool: Optional[ConnectionPool] = None
+        self._discard = False
         self.logger = logging.getLogger(__name__)
+    
+    def _open_client(self) -> IMAPClient:
+        """
+        Open and authenticate a new IMAP connection.
+        
+        Returns:
+            IMAPClient: A logged-in client
+        """
+        client = IMAPClient(self.server, port=self.port, use_uid=True, ssl=self.use_ssl)
+        try:
+            client.login(self.email, self.password)
+        except Exception:
+            client.shutdown()
+            raise
+        return client
+    
+    @staticmethod
+    def _probe(client: IMAPClient) -> bool:
+        """Check that a pooled IMAP connection is still alive with NOOP."""
+        client.noop()
+        return True
+    
+    @staticmethod
+    def _logout(client: IMAPClient) -> None:
+        """Log out of a pooled IMAP connection."""
+        client.logout()
+    
+    def _get_pool(self) -> ConnectionPool:
+        """Get the shared IMAP connection pool for this account."""
+        return get_pool(
+            ("imap", self.server, self.port, self.email),
+            factory=self._open_client,
+            probe=self._probe,
+            closer=self._logout,
+            max_size=self.max_connections,
+            idle_timeout=self.idle_timeout
+        )
+    
+    async def _select_folder(self) -> Dict:
+        """
+        Select the configured folder on the current connection.
+        
+        Returns:
+            The SELECT response (UIDVALIDITY, HIGHESTMODSEQ, ...), which is
+            also recorded for this connection and folder
+        """
+        folder_info = await asyncio.to_thread(self._client.select_folder, self.folder)
+        folder_info = folder_info if isinstance(folder_info, dict) else {}
+        self._folder_info[(id(self._client), self.folder)] = folder_info
+        return folder_info
+    
+    def _forget_connection(self, client: IMAPClient) -> None:
+        """Drop the folder status recorded for a connection being released."""
+        for key in [key for key in self._folder_info if key[0] == id(client)]:
+            del self._folder_info[key]
         
     async def connect(self, user_email: Optional[str] = None) -> None:
         """
@@ -89,30 +183,41 @@ class EmailConnection(BaseEmailClient):
             
             self.logger.info(f"Connecting to IMAP server {self.server} for {email_to_use}")
             
-            # Create a new client in a thread to avoid blocking the event loop
-            self._client = await asyncio.to_thread(
-                IMAPClient, 
-                self.server, 
-                port=self.port, 
-                use_uid=True, 
-                ssl=self.use_ssl
-            )
-            
-            # Login in a thread
-            await asyncio.to_thread(self._client.login, self.email, self.password)
+            if self.use_pool:
+                # Check out an already authenticated connection for this account
+                self._pool = self._get_pool()
+                self._client = await asyncio.to_thread(self._pool.acquire)
+            else:
+                # Create a new client in a thread to avoid blocking the event loop
+                self._client = await asyncio.to_thread(
+                    IMAPClient, 
+                    self.server, 
+                    port=self.port, 
+                    use_uid=True, 
+                    ssl=self.use_ssl
+                )
+                
+                # Login in a thread
+                await asyncio.to_thread(self._client.login, self.email, self.password)
+            self._discard = False
             
-            # Select inbox in a thread
-            await asyncio.to_thread(self._client.select_folder, 'INBOX')
+            # Select folder in a thread; the response carries UIDVALIDITY/HIGHESTMODSEQ
+            self._condstore = await asyncio.to_thread(self._client.has_capability, 'CONDSTORE')
+            await self._select_folder()
             
             self.logger.info("IMAP connection established")
             
         except Exception as e:
             self.logger.error(f"Failed to connect to IMAP server: {str(e)}")
             if self._client:
-                try:
-                    await asyncio.to_thread(self._client.logout)
-                except:
-                    pass
+                self._forget_connection(self._client)
+                if self._pool:
+                    await asyncio.to_thread(self._pool.release, self._client, True)
+                else:
+                    try:
+                        await asyncio.to_thread(self._client.logout)
+                    except:
+                        pass
                 self._client = None
             raise IMAPConnectionError(f"Failed to connect to IMAP server: {str(e)}")
 
@@ -120,6 +225,13 @@ class EmailConnection(BaseEmailClient):
         """
         Fetch emails from the IMAP server.
         
+        The first call for a mailbox runs a ``SINCE <date>`` search. Later calls
+        reuse the stored sync checkpoint: while UIDVALIDITY is unchanged only
+        UIDs above the highest one already fetched are requested, plus (on
+        CONDSTORE servers) messages whose MODSEQ advanced. Headers and a
+        size-capped prefix of the text are fetched with ``BODY.PEEK`` so that
+        large messages are never downloaded in full and flags are untouched.
+        
         Args:
             days_back: Number of days to fetch emails for, where 1 means today.
             user_email: Optional override for the email address.
@@ -134,73 +246,147 @@ class EmailConnection(BaseEmailClient):
             if not self._client:
                 await self.connect(user_email)
                 
+            account = user_email or self.email
+                
             # Calculate date for search
             date_limit = datetime.now() - timedelta(days=days_back)  # Removed timezone.utc to match original
             date_str = date_limit.strftime('%d-%b-%Y')
             
-            # Search for all messages since date_limit
-            search_criteria = ['SINCE', date_str]
-            self.logger.info(f"Searching for emails since {date_str}")
+            # Use each SELECT response once, so a later fetch on this connection
+            # re-selects and sees mail that arrived in between
+            key = (id(self._client), self.folder)
+            if key not in self._folder_info:
+                await self._select_folder()
+            folder_info = self._folder_info.pop(key)
+            uidvalidity = folder_info.get(b'UIDVALIDITY')
+            highest_modseq = folder_info.get(b'HIGHESTMODSEQ')
+            state = self.sync_store.get(account, self.folder) if self.sync_store else None
             
-            # Use asyncio.to_thread for blocking operations, with lambda to match original style
-            message_ids = await asyncio.to_thread(
-                lambda: self._client.search(search_criteria)
-            )
+            if state and uidvalidity is not None and state.uidvalidity == uidvalidity:
+                message_ids = await self._search_incremental(state, date_str)
+            else:
+                if state:
+                    self.logger.info(f"UIDVALIDITY changed ({state.uidvalidity} -> {uidvalidity}), running full sync")
+                # Search for all messages since date_limit
+                search_criteria = ['SINCE', date_str]
+                self.logger.info(f"Searching for emails since {date_str}")
+                
+                # Use asyncio.to_thread for blocking operations, with lambda to match original style
+                message_ids = await asyncio.to_thread(
+                    lambda: self._client.search(search_criteria)
+                )
             self.logger.info(f"Found {len(message_ids)} messages")
             
-            if not message_ids:
-                return []
-            
-            # Fetch message data
             emails = []
-            # Process in batches of 50 to avoid memory issues
-            batch_size = 50
+            if message_ids:
+                emails = await self._fetch_messages(sorted(message_ids))
             
-            for i in range(0, len(message_ids), batch_size):
-                batch_ids = message_ids[i:i+batch_size]
-                
-                # Fetch messages in a thread, using BODY[] to match the original
-                response = await asyncio.to_thread(
-                    lambda: self._client.fetch(batch_ids, ['BODY[]', 'FLAGS', 'INTERNALDATE'])
-                )
-                
-                # Process each message
-                for msg_id, data in response.items():
-                    # Extract email data
-                    raw_email = data[b'BODY[]']  # Changed from RFC822 to BODY[] to match original
-                    
-                    # Create a dict with the same structure as the original
-                    email_dict = {
-                        'id': msg_id,  # Not converting to string to match original
-                        'raw_message': raw_email  # Using 'raw_message' key to match original
-                    }
-                    
-                    # Optionally add additional fields that weren't in the original
-                    # but might be useful for enhanced functionality
-                    email_dict['flags'] = data[b'FLAGS']
-                    email_dict['date'] = data[b'INTERNALDATE']
-                    
-                    emails.append(email_dict)
-                
-                self.logger.info(f"Processed {len(emails)}/{len(message_ids)} emails")
+            # Advance the checkpoint even if nothing new arrived
+            if self.sync_store and uidvalidity is not None:
+                fetched_max = max(message_ids) if message_ids else 0
+                self.sync_store.set(account, SyncState(
+                    uidvalidity=uidvalidity,
+                    highest_uid=max(fetched_max, state.highest_uid if state and state.uidvalidity == uidvalidity else 0),
+                    highest_modseq=highest_modseq
+                ), self.folder)
             
             return emails
             
         except Exception as e:
             self.logger.error(f"Error fetching emails: {e}")
+            # The connection may be mid-command; don't hand it back to the pool
+            self._discard = True
             raise IMAPConnectionError(f"Failed to fetch emails: {e}")
 
+    async def _search_incremental(self, state: SyncState, date_str: str) -> List[int]:
+        """
+        Find UIDs that are new or changed since the stored checkpoint.
+        
+        Args:
+            state: Sync checkpoint for the selected folder
+            date_str: IMAP date string bounding the search window
+            
+        Returns:
+            List of UIDs to fetch
+        """
+        # UID ranges ending in '*' always match the last message, so filter explicitly
+        new_ids = await asyncio.to_thread(
+            lambda: self._client.search(['UID', f'{state.highest_uid + 1}:*', 'SINCE', date_str])
+        )
+        uids = {uid for uid in new_ids if uid > state.highest_uid}
+        
+        if state.highest_modseq and self._condstore:
+            changed = await asyncio.to_thread(
+                lambda: self._client.search(['MODSEQ', state.highest_modseq + 1, 'SINCE', date_str])
+            )
+            uids.update(changed)
+        
+        self.logger.info(f"Incremental sync from UID {state.highest_uid}: {len(uids)} new or changed messages")
+        return list(uids)
+
+    async def _fetch_messages(self, message_ids: List[int]) -> List[Dict]:
+        """
+        Fetch headers and a size-capped body prefix for the given UIDs.
+        
+        Args:
+            message_ids: UIDs to fetch
+            
+        Returns:
+            A list of email dictionaries with 'id' and 'raw_message' keys
+        """
+        emails = []
+        text_item = f'BODY.PEEK[TEXT]<0.{self.max_body_bytes}>'
+        
+        # Process in batches to avoid memory issues
+        for i in range(0, len(message_ids), self.batch_size):
+            batch_ids = message_ids[i:i+self.batch_size]
+            
+            response = await asyncio.to_thread(
+                lambda: self._client.fetch(
+                    batch_ids,
+                    ['BODY.PEEK[HEADER]', text_item, 'FLAGS', 'INTERNALDATE', 'RFC822.SIZE']
+                )
+            )
+            
+            # Process each message
+            for msg_id, data in response.items():
+                header = data.get(b'BODY[HEADER]') or b''
+                text = data.get(b'BODY[TEXT]<0>') or b''
+                size = data.get(b'RFC822.SIZE') or 0
+                
+                email_dict = {
+                    'id': msg_id,  # Not converting to string to match original
+                    'raw_message': header + text,
+                    'flags': data.get(b'FLAGS'),
+                    'date': data.get(b'INTERNALDATE'),
+                    'size': size,
+                    'truncated': size > len(header) + len(text)
+                }
+                
+                emails.append(email_dict)
+            
+            self.logger.info(f"Processed {len(emails)}/{len(message_ids)} emails")
+        
+        return emails
+
     async def close(self) -> None:
         """
         Close the connection to the IMAP server.
         
-        Releases any resources used by the client.
+        Releases any resources used by the client. Pooled connections are
+        returned to the pool and stay logged in for the next operation.
         
         Raises:
             IMAPConnectionError: If unable to close the connection cleanly.
         """
         try:
             if self._client:
+                self._forget_connection(self._client)
+            if self._client and self._pool:
+                await asyncio.to_thread(self._pool.release, self._client, self._discard)
+                self._client = None
+                self.logger.info("IMAP connection returned to pool")
+            elif self._client:
                 await asyncio.to_thread(self._client.logout)
                 self._client = None
                 self.logger.info("IMAP connection closed")
@@ -0,0 +1,85 @@
+"""Incremental sync state for IMAP mailboxes.
+
+This module tracks, per user and folder, the IMAP UIDVALIDITY, the highest UID
+already fetched and (on CONDSTORE servers) the highest MODSEQ seen, so later
+fetches only request messages that are new or changed since the last run.
+"""
+
+import threading
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class SyncState:
+    """Sync checkpoint for a single mailbox folder.
+
+    Attributes:
+        uidvalidity (int): UIDVALIDITY of the folder when the checkpoint was taken
+        highest_uid (int): Highest UID already fetched
+        highest_modseq (Optional[int]): HIGHESTMODSEQ at the checkpoint, if the
+            server supports CONDSTORE
+    """
+    uidvalidity: int
+    highest_uid: int = 0
+    highest_modseq: Optional[int] = None
+
+    def dict(self) -> Dict:
+        """Convert the state to a dictionary.
+
+        Returns:
+            Dict: Dictionary representation of the sync state
+        """
+        return asdict(self)
+
+
+class SyncStateStore:
+    """Process-wide store of IMAP sync checkpoints keyed by user and folder."""
+
+    def __init__(self):
+        """Initialize an empty sync state store."""
+        self._states: Dict[Tuple[str, str], SyncState] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(user_email: str, folder: str) -> Tuple[str, str]:
+        """Build the store key for a user's folder."""
+        return (user_email.lower(), folder)
+
+    def get(self, user_email: str, folder: str = 'INBOX') -> Optional[SyncState]:
+        """Get the sync checkpoint for a user's folder.
+
+        Args:
+            user_email: The account's email address
+            folder: Mailbox folder name
+
+        Returns:
+            Optional[SyncState]: The stored checkpoint, or None if never synced
+        """
+        with self._lock:
+            return self._states.get(self._key(user_email, folder))
+
+    def set(self, user_email: str, state: SyncState, folder: str = 'INBOX') -> None:
+        """Store the sync checkpoint for a user's folder.
+
+        Args:
+            user_email: The account's email address
+            state: The new checkpoint
+            folder: Mailbox folder name
+        """
+        with self._lock:
+            self._states[self._key(user_email, folder)] = state
+
+    def clear(self, user_email: str, folder: str = 'INBOX') -> None:
+        """Forget the sync checkpoint for a user's folder, forcing a full sync.
+
+        Args:
+            user_email: The account's email address
+            folder: Mailbox folder name
+        """
+        with self._lock:
+            self._states.pop(self._key(user_email, folder), None)
+
+
+# Default store shared by all IMAP connections in this process
+sync_state_store = SyncStateStore()
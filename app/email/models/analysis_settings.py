@@ -45,6 +45,9 @@ class ProcessingConfig:
         # Caps
         MAX_PRIORITY: Maximum possible priority score
         MIN_PRIORITY: Minimum possible priority score
+        
+        # Content analysis
+        NLP_PROFILE: SpaCy pipeline profile ('full', 'fast' or 'minimal')
     """
     URGENCY_KEYWORDS: set = field(default_factory=lambda: {'urgent', 'asap', 'deadline', 'immediate', 'priority'})
     BASE_PRIORITY_SCORE: int = 30
@@ -75,4 +78,7 @@ class ProcessingConfig:
     
     # Caps
     MAX_PRIORITY: int = 100
-    MIN_PRIORITY: int = 0 
\ No newline at end of file
+    MIN_PRIORITY: int = 0
+    
+    # Content analysis
+    NLP_PROFILE: str = 'full'      # 'full', 'fast' (NER + senter) or 'minimal' (rule-based) 
\ No newline at end of file
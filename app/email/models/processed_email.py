@@ -8,6 +8,11 @@ from dataclasses import dataclass, asdict
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 
+# Where an email's category and needs_action labels came from
+LABEL_SOURCE_LLM = 'llm'
+LABEL_SOURCE_LOCAL = 'local_classifier'
+LABEL_SOURCE_THREAD = 'thread'
+
 @dataclass
 class ProcessedEmail:
     """Represents a fully processed email with all extracted information.
@@ -35,6 +40,10 @@ class ProcessedEmail:
         custom_categories: Custom categorization tags applied to email
         priority: Numeric priority score (0-100)
         priority_level: Text representation of priority (Low/Medium/High)
+        removed_sections: Quoted, signature and footer sections left out of analysis
+        thread_id: Provider thread/conversation ID, if known
+        label_source: Where category and needs_action came from (LABEL_SOURCE_*);
+            None when the email was not analyzed or was cached before it was recorded
     """
     # Basic email metadata
     id: str
@@ -62,6 +71,15 @@ class ProcessedEmail:
     priority: Optional[int] = 50
     priority_level: Optional[str] = "Medium"
 
+    # Body reduction
+    removed_sections: Optional[List[Dict[str, str]]] = None
+
+    # Threading
+    thread_id: Optional[str] = None
+
+    # Provenance of the LLM analysis fields
+    label_source: Optional[str] = None
+
     def __post_init__(self):
         """Initialize default values for optional fields and normalize date.
         
@@ -82,6 +100,8 @@ class ProcessedEmail:
             self.action_items = []
         if self.custom_categories is None:
             self.custom_categories = {}
+        if self.removed_sections is None:
+            self.removed_sections = []
             
         # Ensure date is datetime with timezone
         if isinstance(self.date, str):
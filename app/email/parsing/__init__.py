@@ -11,6 +11,8 @@ for specific email processing tasks.
 
 Modules:
     parser: Main parsing functionality and metadata extraction
+    normalized_text: Memoized clean, lowercase and token views of a body
+    body_reducer: Quoted-reply, signature and footer removal before analysis
     utils: Utility functions organized by purpose (date, header, HTML, etc.)
 
 Example:
@@ -32,16 +34,21 @@ Example:
 Classes:
     EmailParser: Main parser class for extracting email metadata
     EmailMetadata: Structured container for email metadata
+    NormalizedText: Lazily derived text views shared by all analyzers
+    BodyReducer: Pluggable body reduction stage run before analysis
     EmailParsingError: Exception raised for parsing errors
 """
 
 from .parser import EmailParser, EmailMetadata, EmailParsingError
+from .normalized_text import NormalizedText, as_normalized
+from .body_reducer import BodyReducer, ReductionRule, RemovedSpan, default_body_reducer
 from .utils import (
     decode_header,
     normalize_date,
     parse_email_date,
     safe_extract_header,
     sanitize_text,
+    html_to_text,
     strip_html,
     extract_body_content,
     has_attachments
@@ -51,11 +58,18 @@ __all__ = [
     'EmailParser',
     'EmailMetadata',
     'EmailParsingError',
+    'NormalizedText',
+    'as_normalized',
+    'BodyReducer',
+    'ReductionRule',
+    'RemovedSpan',
+    'default_body_reducer',
     'decode_header',
     'normalize_date',
     'parse_email_date',
     'safe_extract_header',
     'sanitize_text',
+    'html_to_text',
     'strip_html',
     'extract_body_content',
     'has_attachments'
@@ -0,0 +1,416 @@
+"""
+Body reduction for email analysis.
+
+Reply chains, quoted history, signatures and bulk-mail footers often make up
+most of an email body while adding nothing the analyzers need. This module
+removes them from the text that is analyzed, between parsing and analysis,
+and keeps what was removed so it can still be shown. The displayed body
+itself is never modified.
+
+Reduction is rule based and pluggable: each ReductionRule reports the line
+ranges it wants removed, and BodyReducer applies every registered rule.
+
+Example:
+    ```python
+    reducer = BodyReducer()
+    result = reducer.reduce(email_metadata)
+    print(result.tokens_removed, [span.kind for span in result.removed])
+    ```
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .normalized_text import NormalizedText
+
+logger = logging.getLogger(__name__)
+
+# Line range [start, end) within the split body
+LineRange = Tuple[int, int]
+
+REPLY_HEADER_PATTERN = re.compile(
+    r'^(?:on\b.{0,300}\bwrote|le\b.{0,300}\ba écrit|am\b.{0,300}\bschrieb)\s*:?\s*$',
+    re.IGNORECASE
+)
+ORIGINAL_MESSAGE_PATTERN = re.compile(r'^-{3,}\s*original message\s*-{3,}$|^_{10,}$', re.IGNORECASE)
+FORWARD_MARKER_PATTERN = re.compile(
+    r'^-{2,}\s*forwarded message\s*-{2,}$|^begin forwarded message\s*:?$', re.IGNORECASE
+)
+HEADER_LINE_PATTERN = re.compile(r'^(?:from|sent|date|to|cc|bcc|subject|reply-to)\s*:', re.IGNORECASE)
+SIGNATURE_PATTERN = re.compile(
+    r'^(?:--|—|__)\s*$|^sent from my \w+|^get outlook for \w+', re.IGNORECASE
+)
+FOOTER_PATTERN = re.compile(
+    r'unsubscribe|manage (?:your )?(?:email |subscription |notification )?preferences'
+    r'|you(?:\'re| are) receiving this|you received this (?:email|message)'
+    r'|this (?:e-?mail|message) was sent to|all rights reserved|^(?:©|copyright\b)'
+    r'|this (?:e-?mail|message)(?: and any attachments)? (?:is|are|may be) confidential'
+    r'|intended (?:only|solely) for the (?:use of the )?(?:individual|addressee|recipient)',
+    re.IGNORECASE
+)
+
+
+@dataclass
+class RemovedSpan:
+    """A section of the body removed before analysis.
+
+    Attributes:
+        kind (str): Rule that removed it (e.g. 'quoted_reply', 'signature')
+        text (str): The removed text
+    """
+    kind: str
+    text: str
+
+    def dict(self) -> Dict[str, str]:
+        """Convert the span to a dictionary.
+
+        Returns:
+            Dict[str, str]: Dictionary representation of the span
+        """
+        return asdict(self)
+
+
+@dataclass
+class ReductionResult:
+    """Outcome of reducing a single body.
+
+    Attributes:
+        text (str): The reduced text used for analysis
+        removed (List[RemovedSpan]): Removed sections, in body order
+        tokens_removed (int): Tokens no longer sent to the analyzers
+    """
+    text: str
+    removed: List[RemovedSpan] = field(default_factory=list)
+    tokens_removed: int = 0
+
+
+class ReductionRule:
+    """Base class for body reduction rules.
+
+    Subclasses set kind and implement find().
+    """
+
+    kind = ''
+
+    def find(self, lines: Sequence[str]) -> List[LineRange]:
+        """Find the line ranges this rule removes.
+
+        Args:
+            lines: Body lines with surrounding whitespace stripped
+
+        Returns:
+            List[LineRange]: [start, end) line ranges to remove
+        """
+        raise NotImplementedError
+
+
+class ReplyHeaderRule(ReductionRule):
+    """Removes quoted history from an 'On ... wrote:' or Original Message header onwards."""
+
+    kind = 'quoted_reply'
+
+    def find(self, lines: Sequence[str]) -> List[LineRange]:
+        seen_content = False
+        for i, line in enumerate(lines):
+            if not line:
+                continue
+            if not seen_content:
+                seen_content = True
+                continue
+            # Clients often wrap the attribution line, so also try it joined with the next
+            joined = f"{line} {lines[i + 1]}" if i + 1 < len(lines) else line
+            if (line[:2].lower() in ('on', 'le', 'am') and
+                    (REPLY_HEADER_PATTERN.match(line) or REPLY_HEADER_PATTERN.match(joined))):
+                return [(i, len(lines))]
+            if ORIGINAL_MESSAGE_PATTERN.match(line) and self._headers_follow(lines, i):
+                return [(i, len(lines))]
+        return []
+
+    @staticmethod
+    def _headers_follow(lines: Sequence[str], index: int) -> bool:
+        """Check that a separator line is followed by message headers."""
+        following = [line for line in lines[index + 1:index + 4] if line]
+        return bool(following) and bool(HEADER_LINE_PATTERN.match(following[0]))
+
+
+class QuotedLineRule(ReductionRule):
+    """Removes runs of '>'-quoted lines."""
+
+    kind = 'quoted_line'
+
+    def find(self, lines: Sequence[str]) -> List[LineRange]:
+        ranges = []
+        start = None
+        for i, line in enumerate(lines):
+            if line.startswith('>'):
+                if start is None:
+                    start = i
+            elif start is not None and line:
+                ranges.append((start, i))
+                start = None
+        if start is not None:
+            ranges.append((start, len(lines)))
+        return ranges
+
+
+class ForwardedHeaderRule(ReductionRule):
+    """Removes forwarded-message markers and their header blocks, keeping the forwarded body."""
+
+    kind = 'forwarded_header'
+
+    def find(self, lines: Sequence[str]) -> List[LineRange]:
+        ranges = []
+        for i, line in enumerate(lines):
+            if not FORWARD_MARKER_PATTERN.match(line):
+                continue
+            end = i + 1
+            while end < len(lines) and (not lines[end] or HEADER_LINE_PATTERN.match(lines[end])):
+                end += 1
+            ranges.append((i, end))
+        return ranges
+
+
+class SignatureRule(ReductionRule):
+    """Removes signatures from a standard delimiter ('-- ') or mobile sign-off onwards.
+
+    The signature ends where quoted history starts, and is removed only when
+    that trailing block is short, so '--' or '__' used as a section divider in
+    the message keeps the content after it.
+    """
+
+    kind = 'signature'
+
+    def __init__(self, max_signature_lines: int = 8):
+        """Initialize the rule.
+
+        Args:
+            max_signature_lines: Non-empty lines after a delimiter that a
+                signature may have
+        """
+        self.max_signature_lines = max_signature_lines
+
+    def find(self, lines: Sequence[str]) -> List[LineRange]:
+        seen_content = False
+        for i, line in enumerate(lines):
+            if not line:
+                continue
+            if seen_content and SIGNATURE_PATTERN.match(line):
+                end = self._history_start(lines, i + 1)
+                if sum(1 for signature_line in lines[i + 1:end] if signature_line) <= self.max_signature_lines:
+                    return [(i, end)]
+            seen_content = True
+        return []
+
+    @staticmethod
+    def _history_start(lines: Sequence[str], start: int) -> int:
+        """Index of the first line from start that begins quoted or forwarded history."""
+        for i in range(start, len(lines)):
+            line = lines[i]
+            if (line.startswith('>') or REPLY_HEADER_PATTERN.match(line)
+                    or ORIGINAL_MESSAGE_PATTERN.match(line) or FORWARD_MARKER_PATTERN.match(line)):
+                return i
+        return len(lines)
+
+
+class BulkFooterRule(ReductionRule):
+    """Removes unsubscribe, copyright and legal footers near the end of the body.
+
+    Only the tail of the body is searched, and a block is removed only when
+    most of its lines look like footer lines and the body is long enough to
+    have a footer, so an 'unsubscribe' mention in the message itself is kept.
+    """
+
+    kind = 'footer'
+
+    def __init__(
+        self,
+        tail_fraction: float = 0.4,
+        min_tail_lines: int = 12,
+        min_footer_ratio: float = 0.5,
+        min_body_lines: int = 6
+    ):
+        """Initialize the rule.
+
+        Args:
+            tail_fraction: Fraction of lines at the end searched for footers
+            min_tail_lines: Minimum number of lines searched regardless of length
+            min_footer_ratio: Share of a trailing block's non-empty lines that
+                must look like footer lines for the block to be removed
+            min_body_lines: Non-empty lines a body needs before footers are removed
+        """
+        self.tail_fraction = tail_fraction
+        self.min_tail_lines = min_tail_lines
+        self.min_footer_ratio = min_footer_ratio
+        self.min_body_lines = min_body_lines
+
+    def find(self, lines: Sequence[str]) -> List[LineRange]:
+        if sum(1 for line in lines if line) < self.min_body_lines:
+            return []
+        tail = max(self.min_tail_lines, int(len(lines) * self.tail_fraction))
+        start = max(1, len(lines) - tail)
+        # Counts of non-empty and footer lines from each line to the end
+        content = footer = 0
+        blocks = []
+        for i in range(len(lines) - 1, start - 1, -1):
+            if not lines[i]:
+                continue
+            content += 1
+            is_footer = bool(FOOTER_PATTERN.search(lines[i]))
+            footer += is_footer
+            if is_footer:
+                blocks.append((i, footer / content))
+        # Remove the longest trailing block that is mostly footer
+        for i, ratio in reversed(blocks):
+            if ratio >= self.min_footer_ratio:
+                return [(i, len(lines))]
+        return []
+
+
+DEFAULT_RULES = (ReplyHeaderRule, ForwardedHeaderRule, QuotedLineRule, SignatureRule, BulkFooterRule)
+
+
+def count_tokens(text: str) -> int:
+    """Count LLM tokens in text with the analyzer's shared token handler.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        int: Number of tokens (estimated if the tokenizer is unavailable)
+    """
+    # Imported here: the semantic analyzer package imports this one
+    from ..analyzers.semantic.utilities.token_handler import get_token_handler
+    return int(get_token_handler().count_tokens(text))
+
+
+class BodyReducer:
+    """Applies reduction rules to email bodies before analysis.
+
+    Attributes:
+        rules: Rules applied in priority order; earlier rules label shared lines
+    """
+
+    def __init__(
+        self,
+        rules: Optional[List[ReductionRule]] = None,
+        token_counter: Callable[[str], int] = count_tokens
+    ):
+        """Initialize the reducer.
+
+        Args:
+            rules: Rules to apply, defaults to all built-in rules
+            token_counter: Function measuring the tokens in removed text
+        """
+        self.rules = list(rules) if rules is not None else [rule() for rule in DEFAULT_RULES]
+        self.token_counter = token_counter
+
+    def add_rule(self, rule: ReductionRule) -> None:
+        """Register an additional rule.
+
+        Args:
+            rule: Rule to apply after the existing ones
+        """
+        self.rules.append(rule)
+
+    def reduce_text(self, text: str) -> ReductionResult:
+        """Reduce a clean text body.
+
+        If the rules would remove every line (e.g. a bare forward of quoted
+        content), the text is kept unchanged.
+
+        Args:
+            text: Clean plain text body
+
+        Returns:
+            ReductionResult: Reduced text and removed spans
+        """
+        raw_lines = text.split('\n')
+        lines = [line.strip() for line in raw_lines]
+        kinds: List[Optional[str]] = [None] * len(lines)
+        for rule in self.rules:
+            for start, end in rule.find(lines):
+                for i in range(start, end):
+                    if kinds[i] is None:
+                        kinds[i] = rule.kind
+
+        if not any(kinds) or not any(line for line, kind in zip(lines, kinds) if kind is None):
+            return ReductionResult(text=text)
+
+        kept: List[str] = []
+        removed: List[RemovedSpan] = []
+        span_kind, span_lines = None, []
+        for line, kind in zip(raw_lines, kinds):
+            if kind != span_kind and span_lines:
+                removed.append(RemovedSpan(span_kind, '\n'.join(span_lines).strip()))
+                span_lines = []
+            if kind is None and span_kind is not None and kept:
+                kept.append('')  # Keep a paragraph break where a section was removed
+            span_kind = kind
+            if kind is None:
+                kept.append(line)
+            else:
+                span_lines.append(line)
+        if span_lines:
+            removed.append(RemovedSpan(span_kind, '\n'.join(span_lines).strip()))
+
+        reduced = re.sub(r'\n{3,}', '\n\n', '\n'.join(kept)).strip()
+        removed = [span for span in removed if span.text]
+        tokens_removed = sum(self.token_counter(span.text) for span in removed)
+        return ReductionResult(text=reduced, removed=removed, tokens_removed=tokens_removed)
+
+    def reduce(self, email) -> ReductionResult:
+        """Reduce an email's analysis text in place.
+
+        The email's text is replaced by one over the reduced content and the
+        removed spans are kept on email.removed_spans; email.body is unchanged.
+
+        Args:
+            email: Parsed EmailMetadata
+
+        Returns:
+            ReductionResult: Reduced text and removed spans
+        """
+        result = self.reduce_text(email.text.clean)
+        if result.removed:
+            email.text = NormalizedText(email.body, clean=result.text)
+            email.removed_spans = result.removed
+        return result
+
+    def reduce_batch(self, emails: List, stats: Optional[Dict] = None) -> Dict:
+        """Reduce a batch of emails and record token savings.
+
+        Args:
+            emails: Parsed EmailMetadata objects
+            stats: Optional pipeline stats updated under 'body_reduction'
+
+        Returns:
+            Dict: Reduction stats with per-email token savings
+        """
+        reduction = stats.setdefault('body_reduction', {}) if stats is not None else {}
+        reduction.setdefault('emails_reduced', 0)
+        reduction.setdefault('tokens_removed', 0)
+        per_email = reduction.setdefault('tokens_removed_per_email', {})
+
+        for email in emails:
+            try:
+                result = self.reduce(email)
+            except Exception as e:
+                logger.warning(f"Body reduction failed for email {email.id}: {e}")
+                continue
+            if result.removed:
+                reduction['emails_reduced'] += 1
+                reduction['tokens_removed'] += result.tokens_removed
+                per_email[email.id] = result.tokens_removed
+
+        if reduction['emails_reduced']:
+            logger.info(
+                f"Body reduction: {reduction['emails_reduced']}/{len(emails)} emails reduced, "
+                f"{reduction['tokens_removed']} tokens removed"
+            )
+        return reduction
+
+
+# Default reducer shared by pipelines
+default_body_reducer = BodyReducer()
@@ -0,0 +1,231 @@
+"""
+Normalized email text shared by every analysis stage.
+
+The parser wraps each email body in a NormalizedText once. Analyzers then ask
+it for the view they need (clean text, lowercase text, character-budgeted
+prefixes, token IDs or a token-budgeted truncation) instead of re-deriving
+their own copy from the raw body. Every view is computed lazily on first use
+and memoized, so an email that is analyzed by the NLP stage and then prompted
+to the LLM converts its HTML and encodes its tokens at most once.
+
+Example:
+    ```python
+    text = NormalizedText(email.body)
+    text.lower_prefix(30000)                  # pattern matching input
+    text.truncated(2000, token_handler).clean  # LLM prompt body
+    ```
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from .utils.html_utils import html_to_text
+
+# Upper bound on characters per token, used to stop HTML conversion early
+MAX_CHARS_PER_TOKEN = 8
+
+
+class NormalizedText:
+    """Lazily computed, memoized views of a single email body.
+
+    Attributes:
+        raw (str): The body as parsed (HTML or plain text)
+    """
+
+    __slots__ = ('raw', '_clean', '_lower', '_prefixes', '_lower_prefixes',
+                 '_token_ids', '_truncations', '_views')
+
+    def __init__(self, raw: str, clean: Optional[str] = None):
+        """Initialize the normalized text.
+
+        Args:
+            raw: The body as parsed (HTML or plain text)
+            clean: Already converted plain text, if the caller has it
+        """
+        self.raw = raw or ''
+        self._clean = clean
+        self._lower: Optional[str] = None
+        self._prefixes: Dict[int, str] = {}
+        self._lower_prefixes: Dict[int, str] = {}
+        self._token_ids: Optional[List[int]] = None
+        self._truncations: Dict[int, 'NormalizedText'] = {}
+        self._views: Dict[Hashable, Any] = {}
+
+    def __str__(self) -> str:
+        return self.clean
+
+    def __len__(self) -> int:
+        return len(self.clean)
+
+    @property
+    def clean(self) -> str:
+        """Plain text with markup removed and whitespace normalized."""
+        if self._clean is None:
+            self._clean = html_to_text(self.raw)
+        return self._clean
+
+    @property
+    def lower(self) -> str:
+        """Lowercase copy of the clean text."""
+        if self._lower is None:
+            self._lower = self.clean.lower()
+        return self._lower
+
+    def clean_prefix(self, max_chars: int) -> str:
+        """Get at most max_chars characters of clean text.
+
+        When the full clean text has not been needed yet, only as much of the
+        raw body is converted as is required to fill the budget.
+
+        Args:
+            max_chars: Maximum number of characters to return
+
+        Returns:
+            str: Prefix of the clean text
+        """
+        if self._clean is not None:
+            return self._clean[:max_chars]
+        prefix = self._prefixes.get(max_chars)
+        if prefix is None:
+            prefix = html_to_text(self.raw, max_chars=max_chars)
+            self._prefixes[max_chars] = prefix
+        return prefix
+
+    def lower_prefix(self, max_chars: int) -> str:
+        """Get at most max_chars characters of lowercase clean text.
+
+        Args:
+            max_chars: Maximum number of characters to return
+
+        Returns:
+            str: Prefix of the lowercase text
+        """
+        if self._lower is not None:
+            return self._lower[:max_chars]
+        prefix = self._lower_prefixes.get(max_chars)
+        if prefix is None:
+            prefix = self.clean_prefix(max_chars).lower()
+            self._lower_prefixes[max_chars] = prefix
+        return prefix
+
+    def token_ids(self, encoder) -> List[int]:
+        """Get the token IDs of the clean text.
+
+        Args:
+            encoder: TokenHandler (or tiktoken encoding) used to tokenize the text
+
+        Returns:
+            List[int]: Token IDs, encoded once and reused
+        """
+        if self._token_ids is None:
+            self._token_ids = encoder.encode(self.clean)
+        return self._token_ids
+
+    def _budget_prefix(self, max_tokens: int) -> str:
+        """Get the clean text prefix that can possibly fit in a token budget."""
+        return self.clean_prefix(max_tokens * MAX_CHARS_PER_TOKEN)
+
+    def _prefix_tokens(self, text: str, encoder) -> Optional[List[int]]:
+        """Get already known token IDs of a budget prefix, if it is the whole text."""
+        if self._clean is not None and len(text) == len(self._clean):
+            return self.token_ids(encoder)
+        return None
+
+    def truncated(self, max_tokens: int, token_handler, tokens: Optional[List[int]] = None) -> 'NormalizedText':
+        """Get the text truncated to a token budget.
+
+        Only the prefix of the body that can possibly fit in the budget is
+        converted and encoded. The result is memoized per budget and carries
+        its own clean text, so later stages read it without converting again.
+
+        Args:
+            max_tokens: Maximum number of tokens to keep
+            token_handler: TokenHandler providing the encoding and truncation rules
+            tokens: Token IDs of the budget prefix, if the caller encoded it already
+
+        Returns:
+            NormalizedText: The truncated text
+        """
+        truncated = self._truncations.get(max_tokens)
+        if truncated is not None:
+            return truncated
+
+        text = self._budget_prefix(max_tokens)
+        if getattr(token_handler, 'encoding', None) is None:
+            truncated = NormalizedText(text, clean=token_handler.truncate_to_tokens(text, max_tokens))
+        else:
+            if tokens is None:
+                tokens = self._prefix_tokens(text, token_handler)
+            if tokens is None:
+                tokens = token_handler.encode(text)
+            # The prefix is the whole text unless conversion stopped at the budget
+            # (a stopped prefix loses at most a stripped trailing line break)
+            if self._clean is not None:
+                complete = len(text) == len(self._clean)
+            else:
+                complete = len(text) < max_tokens * MAX_CHARS_PER_TOKEN - 2
+            body = token_handler.truncate_tokens(text, tokens, max_tokens, complete=complete)
+            truncated = NormalizedText(body, clean=body)
+            if body is text:
+                truncated._token_ids = tokens
+
+        self._truncations[max_tokens] = truncated
+        return truncated
+
+    def view(self, key: Hashable, transform: Callable[[str], Any]) -> Any:
+        """Get a derived view of the clean text, computing it once.
+
+        Args:
+            key: Name identifying the view, e.g. 'prompt_body'
+            transform: Function applied to the clean text on first use
+
+        Returns:
+            Any: The memoized result of transform(clean)
+        """
+        if key not in self._views:
+            self._views[key] = transform(self.clean)
+        return self._views[key]
+
+
+def as_normalized(text: Any) -> NormalizedText:
+    """Wrap a raw string in a NormalizedText, passing existing ones through.
+
+    Args:
+        text: A NormalizedText or a raw body string
+
+    Returns:
+        NormalizedText: The normalized text
+    """
+    if isinstance(text, NormalizedText):
+        return text
+    return NormalizedText(text or '')
+
+
+def truncate_all(texts: List[NormalizedText], max_tokens: int, token_handler) -> List[NormalizedText]:
+    """Truncate the texts of a whole batch to a token budget.
+
+    The budget prefixes that still need encoding are encoded together with
+    TokenHandler.encode_batch, then each text is truncated as by
+    NormalizedText.truncated.
+
+    Args:
+        texts: Texts to truncate
+        max_tokens: Maximum number of tokens to keep per text
+        token_handler: TokenHandler providing the encoding and truncation rules
+
+    Returns:
+        List[NormalizedText]: The truncated texts, in order
+    """
+    pending = []
+    if getattr(token_handler, 'encoding', None) is not None:
+        for text in texts:
+            if max_tokens in text._truncations:
+                continue
+            prefix = text._budget_prefix(max_tokens)
+            if text._prefix_tokens(prefix, token_handler) is None:
+                pending.append((text, prefix))
+
+    tokens = {}
+    if pending:
+        encoded = token_handler.encode_batch([prefix for _, prefix in pending])
+        tokens = {id(text): ids for (text, _), ids in zip(pending, encoded)}
+    return [text.truncated(max_tokens, token_handler, tokens.get(id(text))) for text in texts]
@@ -23,7 +23,7 @@ import email
 from email.parser import BytesParser
 from email.policy import default
 from email.utils import parseaddr
-from typing import Dict, Union, Optional, Any
+from typing import Dict, List, Union, Optional, Any
 from datetime import datetime
 from dataclasses import dataclass, field
 import re
@@ -34,6 +34,7 @@ from .utils.date_utils import normalize_date, parse_email_date
 from .utils.header_utils import decode_header, safe_extract_header, sanitize_text
 from .utils.html_utils import strip_html
 from .utils.body_extractor import extract_body_content, get_best_body_content, has_attachments
+from .normalized_text import NormalizedText
 
 # Constants
 MIN_EMAIL_LENGTH = 20
@@ -66,12 +67,23 @@ class EmailMetadata:
         sender (str): Email sender
         body (str): Email body text
         date (datetime): Email received/sent date
+        thread_id (str): Provider thread/conversation ID, if known
+        text (NormalizedText): Memoized clean/lowercase/token views of the body,
+            created once here and shared by every analyzer
+        removed_spans (List): Quoted, signature and footer sections removed from
+            the analyzed text by the body reduction stage
+        thread_context (str): Compact description of earlier messages in the
+            thread, set when this is the newest message analyzed for its thread
     """
     id: str = ''
     subject: str = ''
     sender: str = ''
     body: str = ''
     date: datetime = field(default_factory=datetime.now)
+    thread_id: str = ''
+    text: Optional[NormalizedText] = field(default=None, repr=False, compare=False)
+    removed_spans: List[Any] = field(default_factory=list, repr=False, compare=False)
+    thread_context: str = field(default='', repr=False, compare=False)
     
     def __post_init__(self) -> None:
         """Validate metadata after initialization.
@@ -86,6 +98,8 @@ class EmailMetadata:
             raise ValueError("date must be a datetime object")
         # Clean the Message-ID by removing angle brackets and whitespace
         self.id = self.id.strip().strip('<>') if self.id else ''
+        if self.text is None:
+            self.text = NormalizedText(self.body)
 
 class EmailParser:
     """
@@ -218,16 +232,40 @@ class EmailParser:
             subject=raw_email.get('subject', ''),
             sender=raw_email.get('from', ''),
             body=body,
-            date=email_date
+            date=email_date,
+            thread_id=raw_email.get('thread_id', '')
+        )
+
+    def _create_metadata_from_record(self, record: Dict[str, Any]) -> EmailMetadata:
+        """
+        Wrap a metadata record produced by the Gmail worker.
+        
+        The worker has already selected the body and normalized the date to
+        UTC, so no content is re-parsed here.
+        
+        Args:
+            record: Compact record with id, thread_id, subject, sender, body and date
+            
+        Returns:
+            EmailMetadata: Structured email metadata object
+        """
+        return EmailMetadata(
+            id=record.get('id', ''),
+            subject=record.get('subject', ''),
+            sender=record.get('sender', ''),
+            body=record.get('body', ''),
+            date=normalize_date(record.get('date')),
+            thread_id=record.get('thread_id', '')
         )
 
     def extract_metadata(self, raw_email: Dict[str, Any]) -> Optional[EmailMetadata]:
         """
         Extract metadata from an email dictionary.
         
-        This method processes email data in two ways:
-        1. For pre-parsed emails: Uses the already extracted fields
-        2. For raw emails: Parses the raw_message data to extract metadata
+        This method processes email data in three ways:
+        1. For metadata records from the Gmail worker: Wraps them directly
+        2. For pre-parsed emails: Uses the already extracted fields
+        3. For raw emails: Parses the raw_message data to extract metadata
         
         The method prioritizes using pre-parsed data when available.
         
@@ -243,7 +281,11 @@ class EmailParser:
             relying instead on pre-processed content when available.
         """
         try:
-            # First check if this is a pre-parsed email with all fields already extracted
+            # Records from the Gmail worker are already in final form
+            if raw_email and 'id' in raw_email and 'sender' in raw_email and 'body' in raw_email:
+                return self._create_metadata_from_record(raw_email)
+            
+            # Check if this is a pre-parsed email with all fields already extracted
             # This is the optimized path that avoids raw message processing
             if raw_email and 'id' in raw_email and ('body_text' in raw_email or 'body_html' in raw_email):
                 self.logger.debug(f"Processing pre-parsed email: {raw_email.get('id')}")
@@ -21,7 +21,7 @@ Example:
 
 from .date_utils import normalize_date, parse_email_date
 from .header_utils import decode_header, safe_extract_header, sanitize_text
-from .html_utils import strip_html, convert_urls_to_links, text_to_html
+from .html_utils import html_to_text, strip_html, convert_urls_to_links, text_to_html
 from .body_extractor import extract_body_content, get_best_body_content, has_attachments
 
 __all__ = [
@@ -30,6 +30,7 @@ __all__ = [
     'decode_header',
     'safe_extract_header',
     'sanitize_text',
+    'html_to_text',
     'strip_html',
     'convert_urls_to_links',
     'text_to_html',
@@ -2,14 +2,14 @@
 Utilities for processing HTML content in email messages.
 
 This module provides functions for handling HTML content in email messages,
-including stripping HTML tags, converting plain text to HTML, and processing
-URLs within content.
+including converting HTML to plain text, converting plain text to HTML, and
+processing URLs within content.
 
 Example:
     ```python
-    from app.email.parsing.utils.html_utils import strip_html, text_to_html
+    from app.email.parsing.utils.html_utils import html_to_text, text_to_html
     
-    plain_text = strip_html("<p>Hello <b>World</b></p>")
+    plain_text = html_to_text("<p>Hello <b>World</b></p>")
     # Returns: "Hello World"
     
     html_content = text_to_html("Visit https://example.com")
@@ -19,70 +19,218 @@ Example:
 
 import re
 import html
-from typing import Match
+from itertools import chain
+from typing import List, Match, Optional, Tuple
 
-# Regular expression to match content between HTML tags
-HTML_TAG_PATTERN = re.compile(r'<[^>]*>')
-# Match common HTML entities
-HTML_ENTITY_PATTERN = re.compile(r'&[a-zA-Z]+;|&#\d+;')
+# Elements whose content is never visible text
+SKIPPED_TAGS = ('script', 'style', 'head', 'title', 'template', 'noscript')
+# Elements that start a new paragraph (blank line) or a new line
+PARAGRAPH_TAGS = frozenset({
+    'p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'blockquote', 'pre',
+    'table', 'ul', 'ol', 'dl', 'hr', 'section', 'article', 'header', 'footer'
+})
+LINE_TAGS = frozenset({'br', 'div', 'li', 'tr', 'dt', 'dd', 'center', 'address'})
+CELL_TAGS = frozenset({'td', 'th'})
+# Detects markup; text without it is treated as plain text
+MARKUP_PATTERN = re.compile(r'<[a-zA-Z/!?]')
+# Splits a document into text runs and markup. Alternatives, in order:
+# comments, skipped elements with their content, start/end tags (capturing
+# the '/', the tag name and any whitespace after the tag), and doctypes and
+# processing instructions. Only the tag names are matched case-insensitively;
+# a global IGNORECASE flag slows down every character of the scan.
+MARKUP_SPLIT_PATTERN = re.compile(
+    r'<!--.*?(?:-->|\Z)'
+    + ''.join(r'|<(?i:%s)\b[^>]*>.*?(?:</(?i:%s)\s*>|\Z)' % (tag, tag) for tag in SKIPPED_TAGS)
+    + r'|<(?:(/?)([a-zA-Z][a-zA-Z0-9]*)\b|[!?])[^>]*>(\s*)',
+    re.DOTALL
+)
+# How each structural tag separates the text around it
+PARAGRAPH_BREAK, LINE_BREAK, BR_BREAK, CELL_BREAK = 1, 2, 3, 4
+TAG_BREAKS = {
+    **dict.fromkeys(PARAGRAPH_TAGS, PARAGRAPH_BREAK),
+    **dict.fromkeys(LINE_TAGS, LINE_BREAK),
+    **dict.fromkeys(CELL_TAGS, CELL_BREAK),
+    'br': BR_BREAK
+}
+# Entities common in email text, decoded with str.replace before falling back
+# to html.unescape. None of them decodes to '&', so they can be replaced in
+# any order without creating new entities.
+COMMON_ENTITIES = (
+    ('&nbsp;', '\xa0'), ('&quot;', '"'), ('&#39;', "'"), ('&rsquo;', '\u2019'),
+    ('&mdash;', '\u2014'), ('&ndash;', '\u2013'), ('&hellip;', '\u2026'),
+    ('&zwnj;', '\u200c'), ('&copy;', '\xa9')
+)
+# Characters of HTML parsed per requested character of text before a budgeted
+# conversion looks further into the document; marketing mail is mostly markup
+BUDGET_PREFIX_RATIO = 16
 
-def strip_html(html_content: str) -> str:
+
+def _plain_text_to_text(text: str, max_chars: Optional[int] = None) -> str:
+    """Normalize whitespace in text that contains no markup.
+    
+    Runs of spaces collapse to one, blank-line runs collapse to a single
+    paragraph break, and entities are decoded.
     """
-    Remove HTML tags and convert common HTML entities to text.
+    if max_chars is not None:
+        text = text[:max_chars * 2]
+    if '&' in text:
+        text = html.unescape(text)
+    lines: List[str] = []
+    blank = False
+    for line in text.splitlines():
+        line = ' '.join(line.split())
+        if not line:
+            blank = bool(lines)
+            continue
+        if blank:
+            lines.append('')
+            blank = False
+        lines.append(line)
+    result = '\n'.join(lines)
+    return result[:max_chars].rstrip() if max_chars is not None else result
+
+
+def _decode_entities(text: str) -> str:
+    """Decode HTML entities in a text run, same as html.unescape.
     
-    Converts HTML content to plain text by removing tags and
-    replacing HTML entities with their character equivalents.
+    Common entities are replaced directly; html.unescape (one Python call
+    per entity) only runs for whatever else is left.
+    """
+    for entity, char in COMMON_ENTITIES:
+        if entity in text:
+            text = text.replace(entity, char)
+            if '&' not in text:
+                return text
+    # '&amp;' is decoded last so that e.g. '&amp;lt;' stays '&lt;'
+    if text.count('&') == text.count('&amp;'):
+        return text.replace('&amp;', '&')
+    return html.unescape(text)
+
+
+def _markup_to_text(html_content: str, max_chars: Optional[int] = None) -> Tuple[str, int]:
+    """Convert HTML to text with a single split of the document.
     
     Args:
-        html_content: HTML content string to process
+        html_content: HTML content to convert
+        max_chars: Stop once this many characters of text have been produced
         
     Returns:
-        str: Plain text with HTML tags removed and entities converted
+        Tuple of (text, length) before the final strip
+    """
+    parts: List[str] = []
+    length = 0
+    pending_break = 0
+    pending_space = False
+    tag_break = TAG_BREAKS.get
+    
+    # Pieces come as text, then (slash, tag, trailing space, text) per markup
+    # match; comments, skipped elements and doctypes leave the groups None
+    tokens = chain((None, None, None), MARKUP_SPLIT_PATTERN.split(html_content))
+    for slash, tag, space, data in zip(tokens, tokens, tokens, tokens):
+        if tag and length:
+            kind = tag_break(tag) or tag_break(tag.lower())
+            if kind == PARAGRAPH_BREAK:
+                pending_break = 2
+            elif kind == LINE_BREAK:
+                if not pending_break:
+                    pending_break = 1
+            elif kind == CELL_BREAK:
+                pending_space = True
+            elif kind == BR_BREAK:
+                # <br> breaks the line; </br> only separates blocks
+                if not slash:
+                    pending_break = min(pending_break + 1, 2)
+                elif not pending_break:
+                    pending_break = 1
+        if space:
+            pending_space = True
+        if not data:
+            continue
+        
+        # Text run: decode entities, then collapse whitespace
+        if '&' in data:
+            data = _decode_entities(data)
+        words = data.split()
+        if not words:
+            pending_space = True
+            continue
+        if length:
+            if pending_break:
+                parts.append('\n' * pending_break)
+                length += pending_break
+            elif pending_space or data[0].isspace():
+                parts.append(' ')
+                length += 1
+        text = ' '.join(words)
+        parts.append(text)
+        length += len(text)
+        pending_break = 0
+        pending_space = data[-1].isspace()
+        if max_chars is not None and length >= max_chars:
+            break
+    
+    return ''.join(parts), length
+
+
+def html_to_text(html_content: str, max_chars: Optional[int] = None) -> str:
+    """
+    Convert HTML (or plain text) email content to readable plain text.
+    
+    Splits the document once on a compiled markup pattern: script and style
+    content is skipped, block-level elements become line or paragraph
+    breaks, entities are decoded and whitespace is collapsed as the text is
+    produced. With max_chars, only a prefix of the document is converted,
+    grown until it yields enough text, so a large message is not parsed in
+    full for a short budget.
+    
+    Args:
+        html_content: HTML or plain text content to convert
+        max_chars: Optional maximum length of the returned text
+        
+    Returns:
+        str: Plain text with paragraph breaks preserved
         
     Examples:
-        >>> strip_html("<p>Hello <b>World</b></p>")
-        "Hello World"
-        >>> strip_html("&lt;tag&gt; with entities")
-        "< tag > with entities"
+        >>> html_to_text("<p>Hello <b>World</b></p><p>Bye</p>")
+        "Hello World\n\nBye"
+        >>> html_to_text("&lt;tag&gt; &amp; entities")
+        "<tag> & entities"
     """
     if not html_content:
         return ""
+    if not MARKUP_PATTERN.search(html_content):
+        return _plain_text_to_text(html_content, max_chars)
+    if max_chars is None:
+        return _markup_to_text(html_content)[0].strip()
+    
+    # Cutting just after a '>' never splits a tag, and a comment or skipped
+    # element cut open is dropped to the end, so the prefix converts to a
+    # prefix of the full text
+    prefix_length = max_chars * BUDGET_PREFIX_RATIO
+    while prefix_length < len(html_content):
+        end = html_content.rfind('>', 0, prefix_length) + 1
+        text, length = _markup_to_text(html_content[:end], max_chars)
+        if length >= max_chars:
+            return text[:max_chars].strip()
+        prefix_length *= 2
+    text, _ = _markup_to_text(html_content, max_chars)
+    return text[:max_chars].strip()
+
+
+def strip_html(html_content: str, max_chars: Optional[int] = None) -> str:
+    """
+    Remove HTML tags and convert HTML entities to text.
+    
+    Alias of html_to_text, kept for existing callers.
+    
+    Args:
+        html_content: HTML content string to process
+        max_chars: Optional maximum length of the returned text
         
-    # Replace common HTML entities with characters
-    text = html_content
-    
-    # Replace <br>, <p>, <div> tags with newlines for better readability
-    text = re.sub(r'<br[^>]*>', '\n', text, flags=re.IGNORECASE)
-    text = re.sub(r'<\/p>\s*<p[^>]*>', '\n\n', text, flags=re.IGNORECASE)
-    text = re.sub(r'<\/div>\s*<div[^>]*>', '\n', text, flags=re.IGNORECASE)
-    
-    # Remove all remaining HTML tags
-    text = HTML_TAG_PATTERN.sub('', text)
-    
-    # Replace common HTML entities
-    entities = {
-        '&nbsp;': ' ',
-        '&lt;': '<',
-        '&gt;': '>',
-        '&amp;': '&',
-        '&quot;': '"',
-        '&apos;': "'",
-        '&#39;': "'",
-        '&mdash;': '—',
-        '&ndash;': '–',
-        '&hellip;': '…'
-    }
-    
-    for entity, char in entities.items():
-        text = text.replace(entity, char)
-    
-    # Replace numeric entities (like &#8212;)
-    text = re.sub(r'&#(\d+);', lambda m: chr(int(m.group(1))), text)
-    
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    return text.strip()
+    Returns:
+        str: Plain text with HTML tags removed and entities converted
+    """
+    return html_to_text(html_content, max_chars)
 
 def convert_urls_to_links(text: str) -> str:
     """
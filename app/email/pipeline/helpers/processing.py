@@ -4,6 +4,7 @@ This module provides functions for processing and filtering emails,
 including AI analysis, batch processing, and criteria-based filtering.
 """
 
+import asyncio
 import logging
 import gc
 from typing import List, Dict, Set, Tuple, Optional, AsyncGenerator, Any
@@ -15,6 +16,7 @@ from app.email.pipeline.orchestrator import AnalysisCommand
 from app.email.parsing.parser import EmailMetadata
 from app.email.processing.processor import EmailProcessor
 from app.utils.memory_profiling import log_memory_usage
+from app.email.pipeline.helpers.threads import expand_thread_results, store_thread_summaries
 
 
 async def process_without_ai(
@@ -69,7 +71,9 @@ async def process_without_ai(
             action_items=[],
             summary='No summary available',
             priority=30,
-            priority_level='LOW'
+            priority_level='LOW',
+            removed_sections=[span.dict() for span in parsed_email.removed_spans],
+            thread_id=parsed_email.thread_id or None
         )
         basic_emails.append(processed_email)
         
@@ -103,7 +107,8 @@ async def process_in_batches(
     stats: Dict,
     processor: Optional[EmailProcessor] = None,
     cache: Optional[EmailCache] = None,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    thread_emails: Optional[Dict[str, List[EmailMetadata]]] = None
 ) -> AsyncGenerator[Dict, None]:
     """Process emails in batches with AI features.
     
@@ -118,9 +123,12 @@ async def process_in_batches(
         processor: Email processor implementation
         cache: Optional email cache implementation
         logger: Optional logger for logging events
+        thread_emails: Earlier thread messages keyed by the ID of the newest
+            message in parsed_emails; they receive results derived from it
         
     Yields:
-        Status updates and batches of processed emails
+        Status updates, partial LLM results of the batch being analyzed,
+        and batches of processed emails
         
     Raises:
         RuntimeError: If processor is None
@@ -143,27 +151,76 @@ async def process_in_batches(
         f"    Total Batches: {batch_count}"
     )
     
+    thread_emails = thread_emails or {}
+    earlier_done = 0
     for i in range(0, len(parsed_emails), command.batch_size):
         logger.info(f"===========Batch {i // command.batch_size + 1} of {batch_count}===========")
         batch = parsed_emails[i:i + command.batch_size]
-        batch_results = await processor.analyze_parsed_emails(batch, user_id=user_id, ai_enabled=ai_enabled)
+        
+        # Forward partial LLM results while the batch is analyzed
+        partials: asyncio.Queue = asyncio.Queue()
+        analysis = asyncio.ensure_future(processor.analyze_parsed_emails(
+            batch, user_id=user_id, ai_enabled=ai_enabled, on_partial=partials.put_nowait,
+            user_email=user_email, cache_duration=cache_duration
+        ))
+        try:
+            async for partial in drain_partial_results(analysis, partials):
+                yield {'type': 'partial', 'data': partial}
+        finally:
+            # The client disconnected; cancelled LLM requests free their dispatcher slots
+            if not analysis.done():
+                analysis.cancel()
+        batch_results = analysis.result()
+        
+        # Derive results for earlier messages of the analyzed threads
+        if thread_emails and batch_results:
+            await store_thread_summaries(batch_results, user_email, cache, cache_duration, logger)
+            analyzed_count = len(batch_results)
+            batch_results = expand_thread_results(batch_results, thread_emails)
+            earlier_done += len(batch_results) - analyzed_count
         
         # Cache batch results
         if cache and batch_results:
             await cache.store_many(batch_results, user_email, ttl_days=cache_duration)
         
         # Process and yield batch results
-        async for result in process_batch_results(batch_results, i, command.batch_size, len(parsed_emails), stats):
+        async for result in process_batch_results(batch_results, i, command.batch_size, len(parsed_emails), stats,
+                                                  extra_processed=earlier_done):
             yield result
 
 
+async def drain_partial_results(
+    analysis: asyncio.Future,
+    partials: asyncio.Queue
+) -> AsyncGenerator[Dict, None]:
+    """Yield partial results as they are queued, until the analysis finishes.
+    
+    Args:
+        analysis: The running batch analysis
+        partials: Queue the analysis puts partial results on
+        
+    Yields:
+        Partial results, in the order they were queued
+    """
+    while True:
+        getter = asyncio.ensure_future(partials.get())
+        await asyncio.wait({analysis, getter}, return_when=asyncio.FIRST_COMPLETED)
+        if not getter.done():
+            getter.cancel()
+            break
+        yield getter.result()
+    while not partials.empty():
+        yield partials.get_nowait()
+
+
 async def process_batch_results(
     batch_results: List[ProcessedEmail],
     batch_start_index: int,
     batch_size: int,
     total_emails: int,
     stats: Dict,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    extra_processed: int = 0
 ) -> AsyncGenerator[Dict, None]:
     """Process and yield batch results.
     
@@ -174,6 +231,8 @@ async def process_batch_results(
         total_emails: Total number of emails to process
         stats: Dictionary to track stats
         logger: Optional logger for logging events
+        extra_processed: Emails completed without their own analysis so far
+            (earlier thread messages), added to the processed count
         
     Yields:
         Batch results and status updates
@@ -213,7 +272,7 @@ async def process_batch_results(
     emails_to_process = None
     
     # Yield batch completion status
-    stats["processed"] = batch_start_index + min(batch_size, total_emails - batch_start_index if total_emails else 0)
+    stats["processed"] = batch_start_index + min(batch_size, total_emails - batch_start_index if total_emails else 0) + extra_processed
     yield {
         'type': 'status',
         'data': {
@@ -232,7 +291,8 @@ async def process_all_at_once(
     stats: Dict,
     processor: Optional[EmailProcessor] = None,
     cache: Optional[EmailCache] = None,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    thread_emails: Optional[Dict[str, List[EmailMetadata]]] = None
 ) -> AsyncGenerator[Dict, None]:
     """Process all emails at once without batching.
     
@@ -246,6 +306,8 @@ async def process_all_at_once(
         processor: Email processor implementation
         cache: Optional email cache implementation
         logger: Optional logger for logging events
+        thread_emails: Earlier thread messages keyed by the ID of the newest
+            message in parsed_emails; they receive results derived from it
         
     Yields:
         Status updates and processed emails
@@ -261,9 +323,17 @@ async def process_all_at_once(
     # Log memory before processing all emails at once
     log_memory_usage(logger, "Before Processing All Emails")
     
-    analyzed_emails = await processor.analyze_parsed_emails(parsed_emails, user_id=user_id, ai_enabled=ai_enabled)
+    analyzed_emails = await processor.analyze_parsed_emails(parsed_emails, user_id=user_id, ai_enabled=ai_enabled,
+                                                            user_email=user_email, cache_duration=cache_duration)
     stats["batches"] = 1
     
+    # Derive results for earlier messages of the analyzed threads
+    total_emails = len(parsed_emails)
+    if thread_emails and analyzed_emails:
+        await store_thread_summaries(analyzed_emails, user_email, cache, cache_duration, logger)
+        analyzed_emails = expand_thread_results(analyzed_emails, thread_emails)
+        total_emails += sum(len(emails) for emails in thread_emails.values())
+    
     # Log memory after processing all emails
     log_memory_usage(logger, "After Processing All Emails")
     
@@ -283,7 +353,7 @@ async def process_all_at_once(
     
     stats.update({
         "successfully_analyzed": stats.get("processed", 0),  # Use processed count from stats
-        "failed_analysis": len(parsed_emails) - stats.get("processed", 0)
+        "failed_analysis": max(0, total_emails - stats.get("processed", 0))
     })
 
 
@@ -46,6 +46,14 @@ async def generate_final_stats(
         f"        Analysis: {success_rate_analyze}"
     )
 
+    # Token savings from removing quoted replies, signatures and footers
+    body_reduction = stats.get('body_reduction', {})
+    if body_reduction.get('emails_reduced'):
+        logger.info(
+            f"Body reduction saved {body_reduction['tokens_removed']} tokens "
+            f"across {body_reduction['emails_reduced']} emails"
+        )
+
     # Log memory at end of pipeline
     log_memory_usage(logger, "Pipeline End")
 
@@ -72,7 +80,12 @@ async def generate_final_stats(
             'success_rate_parse': success_rate_parse,
             'success_rate_analyze': success_rate_analyze,
             'batches': stats.get('batches', 0),
-            'total': stats.get('cached', 0) + stats.get('processed', 0)
+            'total': stats.get('cached', 0) + stats.get('processed', 0),
+            'emails_reduced': body_reduction.get('emails_reduced', 0),
+            'tokens_saved': body_reduction.get('tokens_removed', 0),
+            'tokens_saved_per_email': body_reduction.get('tokens_removed_per_email', {}),
+            'thread_messages_skipped': stats.get('threads', {}).get('skipped_earlier_messages', 0),
+            'threads_with_context': stats.get('threads', {}).get('with_context', 0)
         }
     }
 
@@ -0,0 +1,236 @@
+"""Thread-aware analysis helpers.
+
+This module groups newly fetched emails by Gmail thread so that only the
+newest message of each thread is analyzed. Earlier messages in the thread are
+summarized into a compact context for that analysis (from cached summaries,
+the stored thread summary and short snippets of earlier new messages), and
+receive a lightweight result derived from the thread's analysis. The newest
+message's summary is stored in the cache as the thread-level summary, to be
+used as context the next time the thread grows.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.email.models.processed_email import ProcessedEmail, LABEL_SOURCE_THREAD
+from app.email.parsing.parser import EmailMetadata
+from app.email.storage.base_cache import EmailCache
+
+# Budget for the context passed with the newest message of a thread
+THREAD_CONTEXT_MAX_CHARS = 600
+# Characters of an earlier, unanalyzed message included as a snippet
+EARLIER_SNIPPET_CHARS = 160
+# Maximum number of earlier messages described in the context
+MAX_CONTEXT_ENTRIES = 3
+
+
+def _sort_key(email) -> datetime:
+    """Sort key putting emails in chronological order, tolerating naive dates."""
+    date = email.date
+    if isinstance(date, datetime) and date.tzinfo is None:
+        return date.replace(tzinfo=timezone.utc)
+    return date
+
+
+def group_by_thread(
+    emails: List[EmailMetadata]
+) -> Tuple[List[EmailMetadata], Dict[str, List[EmailMetadata]]]:
+    """Split emails into the newest message of each thread and earlier messages.
+
+    Emails without a thread_id are treated as single-message threads.
+
+    Args:
+        emails: Parsed emails
+
+    Returns:
+        Tuple containing:
+            - The newest email of each thread, in input order
+            - Earlier emails of each thread (oldest first), keyed by the newest email's ID
+    """
+    threads: Dict[str, List[EmailMetadata]] = {}
+    for email in emails:
+        threads.setdefault(email.thread_id or f"single:{id(email)}", []).append(email)
+
+    newest_ids = set()
+    earlier: Dict[str, List[EmailMetadata]] = {}
+    for members in threads.values():
+        members.sort(key=_sort_key)
+        newest = members[-1]
+        newest_ids.add(id(newest))
+        if len(members) > 1:
+            earlier[newest.id] = members[:-1]
+
+    leaders = [email for email in emails if id(email) in newest_ids]
+    return leaders, earlier
+
+
+def build_thread_context(
+    thread_summary: Optional[Dict],
+    cached_emails: List[ProcessedEmail],
+    earlier_emails: List[EmailMetadata]
+) -> str:
+    """Build the compact context describing earlier messages of a thread.
+
+    Args:
+        thread_summary: Stored thread-level summary, if any
+        cached_emails: Already analyzed emails of the thread
+        earlier_emails: Earlier new emails of the thread that will not be analyzed
+
+    Returns:
+        str: Context of at most THREAD_CONTEXT_MAX_CHARS characters, or '' if none
+    """
+    lines = []
+    if thread_summary and thread_summary.get('summary'):
+        lines.append(f"Thread so far: {thread_summary['summary']}")
+
+    entries = [
+        (_sort_key(email), f"{email.sender}: {email.summary}")
+        for email in cached_emails
+        if email.summary and email.summary != 'No summary available'
+    ]
+    entries += [
+        (_sort_key(email), f"{email.sender}: {email.text.clean_prefix(EARLIER_SNIPPET_CHARS)}")
+        for email in earlier_emails
+    ]
+    entries.sort(key=lambda entry: entry[0])
+    lines.extend(f"- {text}" for _, text in entries[-MAX_CONTEXT_ENTRIES:])
+
+    return '\n'.join(lines)[:THREAD_CONTEXT_MAX_CHARS]
+
+
+async def prepare_thread_analysis(
+    parsed_emails: List[EmailMetadata],
+    cached_emails: List[ProcessedEmail],
+    user_email: str,
+    stats: Dict,
+    cache: Optional[EmailCache] = None,
+    logger: Optional[logging.Logger] = None
+) -> Tuple[List[EmailMetadata], Dict[str, List[EmailMetadata]]]:
+    """Select the emails to analyze and attach thread context to them.
+
+    Args:
+        parsed_emails: Newly parsed emails
+        cached_emails: Emails already in the cache
+        user_email: The user's email address
+        stats: Dictionary to track stats, updated under 'threads'
+        cache: Optional email cache holding thread summaries
+        logger: Optional logger for logging events
+
+    Returns:
+        Tuple of (emails to analyze, earlier emails keyed by the analyzed email's ID)
+    """
+    logger = logger or logging.getLogger(__name__)
+    leaders, earlier = group_by_thread(parsed_emails)
+
+    thread_ids = [email.thread_id for email in leaders if email.thread_id]
+    summaries: Dict[str, Dict] = {}
+    if cache and thread_ids:
+        try:
+            summaries = await cache.get_thread_summaries(user_email, thread_ids)
+        except Exception as e:
+            logger.warning(f"Could not load thread summaries: {e}")
+
+    cached_by_thread: Dict[str, List[ProcessedEmail]] = {}
+    for email in cached_emails:
+        if email.thread_id:
+            cached_by_thread.setdefault(email.thread_id, []).append(email)
+
+    with_context = 0
+    for email in leaders:
+        if not email.thread_id:
+            continue
+        email.thread_context = build_thread_context(
+            summaries.get(email.thread_id),
+            cached_by_thread.get(email.thread_id, []),
+            earlier.get(email.id, [])
+        )
+        with_context += bool(email.thread_context)
+
+    skipped = len(parsed_emails) - len(leaders)
+    stats['threads'] = {
+        'analyzed': len(leaders),
+        'skipped_earlier_messages': skipped,
+        'with_context': with_context
+    }
+    if skipped or with_context:
+        logger.info(
+            f"Thread-aware analysis: {len(leaders)} emails to analyze, "
+            f"{skipped} earlier thread messages skipped, {with_context} with thread context"
+        )
+    return leaders, earlier
+
+
+def expand_thread_results(
+    results: List[ProcessedEmail],
+    earlier: Dict[str, List[EmailMetadata]]
+) -> List[ProcessedEmail]:
+    """Add results for earlier thread messages that were not analyzed.
+
+    Earlier messages take the category and priority of the thread's newest
+    message and its summary as thread context; actions belong to the newest one.
+
+    Args:
+        results: Results for the analyzed emails
+        earlier: Earlier emails keyed by the analyzed email's ID
+
+    Returns:
+        List[ProcessedEmail]: results followed by results for earlier messages
+    """
+    expanded = list(results)
+    for result in results:
+        for email in earlier.get(result.id, []):
+            expanded.append(ProcessedEmail(
+                id=email.id,
+                subject=email.subject,
+                sender=email.sender,
+                body=email.body,
+                date=email.date,
+                category=result.category,
+                summary=f"Earlier message in thread. Latest: {result.summary}",
+                priority=result.priority,
+                priority_level=result.priority_level,
+                thread_id=email.thread_id,
+                removed_sections=[span.dict() for span in email.removed_spans],
+                label_source=LABEL_SOURCE_THREAD
+            ))
+    return expanded
+
+
+async def store_thread_summaries(
+    results: List[ProcessedEmail],
+    user_email: str,
+    cache: Optional[EmailCache] = None,
+    ttl_days: Optional[int] = None,
+    logger: Optional[logging.Logger] = None
+) -> None:
+    """Store the newest message's summary as each thread's summary.
+
+    Args:
+        results: Results for the analyzed (newest) emails
+        user_email: The user's email address
+        cache: Optional email cache
+        ttl_days: Optional TTL override in days
+        logger: Optional logger for logging events
+    """
+    if not cache:
+        return
+    logger = logger or logging.getLogger(__name__)
+
+    summaries = {
+        result.thread_id: {
+            'summary': result.summary,
+            'latest_email_id': result.id,
+            'subject': result.subject,
+            'category': result.category,
+            'updated_at': datetime.now(timezone.utc).isoformat()
+        }
+        for result in results
+        if result.thread_id and result.summary and result.summary != 'No summary available'
+    }
+    if not summaries:
+        return
+    try:
+        await cache.store_thread_summaries(user_email, summaries, ttl_days=ttl_days)
+    except Exception as e:
+        logger.warning(f"Could not store thread summaries: {e}")
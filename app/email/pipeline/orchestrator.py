@@ -16,7 +16,7 @@ The implementation of many helper methods has been moved to dedicated modules:
 """
 
 from dataclasses import dataclass
-from typing import List, Optional, Dict, AsyncGenerator, Set
+from typing import List, Optional, Dict, AsyncGenerator, Set, Tuple
 import logging
 import gc
 
@@ -24,7 +24,8 @@ from ..processing.processor import EmailProcessor
 from ..models.processed_email import ProcessedEmail
 from ..storage.base_cache import EmailCache
 from ..clients.gmail.client import GmailClient
-from ..parsing.parser import EmailParser
+from ..parsing.parser import EmailParser, EmailMetadata
+from ..parsing.body_reducer import BodyReducer, default_body_reducer
 from ..models.analysis_command import AnalysisCommand
 from app.utils.memory_profiling import log_memory_usage
 
@@ -38,6 +39,7 @@ from .helpers.processing import (
     process_without_ai, process_in_batches, 
     process_all_at_once, apply_filters
 )
+from .helpers.threads import prepare_thread_analysis
 from .helpers.stats import generate_final_stats, log_activity as log_pipeline_activity
 
 @dataclass
@@ -67,6 +69,8 @@ class EmailPipeline:
         parser: EmailParser,
         processor: EmailProcessor,
         cache: Optional[EmailCache] = None,
+        body_reducer: Optional[BodyReducer] = default_body_reducer,
+        thread_aware: bool = True,
     ):
         """Initialize the email processing pipeline.
         
@@ -75,13 +79,58 @@ class EmailPipeline:
             parser: Email parser for converting raw emails to structured data
             processor: Email processor for analyzing email content
             cache: Optional cache for storing processed emails
+            body_reducer: Stage removing quoted replies, signatures and footers
+                before analysis; None disables it
+            thread_aware: Analyze only the newest new message of each thread,
+                with earlier messages passed as context
         """
         self.connection = connection
         self.parser = parser
         self.processor = processor
         self.cache = cache
+        self.body_reducer = body_reducer
+        self.thread_aware = thread_aware
         self.logger = logging.getLogger(__name__)
 
+    def _parse_emails(self, raw_emails: List[Dict], stats: Dict) -> List[EmailMetadata]:
+        """Parse raw emails and reduce their bodies for analysis.
+        
+        Args:
+            raw_emails: Raw emails fetched from the provider
+            stats: Statistics dictionary updated with body reduction savings
+            
+        Returns:
+            Successfully parsed emails
+        """
+        parsed_emails = [email for email in [self.parser.extract_metadata(email) for email in raw_emails] if email is not None]
+        if self.body_reducer is not None:
+            self.body_reducer.reduce_batch(parsed_emails, stats)
+        return parsed_emails
+
+    async def _prepare_analysis(
+        self,
+        parsed_emails: List[EmailMetadata],
+        cached_emails: List[ProcessedEmail],
+        user_email: str,
+        stats: Dict
+    ) -> Tuple[List[EmailMetadata], Dict[str, List[EmailMetadata]]]:
+        """Select the emails to analyze, grouping by thread when enabled.
+        
+        Args:
+            parsed_emails: Newly parsed emails
+            cached_emails: Emails already in the cache
+            user_email: The user's email address
+            stats: Statistics dictionary updated with thread stats
+            
+        Returns:
+            Tuple of (emails to analyze, earlier thread messages keyed by analyzed email ID)
+        """
+        if not self.thread_aware:
+            return parsed_emails, {}
+        return await prepare_thread_analysis(
+            parsed_emails, cached_emails, user_email, stats, self.cache, self.logger
+        )
+
     # Helper methods for streaming responses
 
     def _yield_status(self, message: str) -> Dict:
@@ -237,7 +286,7 @@ class EmailPipeline:
             yield self._yield_status(f'Found {len(new_raw_emails)} new emails to process')
             
             # Parse emails
-            parsed_emails = [email for email in [self.parser.extract_metadata(email) for email in new_raw_emails] if email is not None]
+            parsed_emails = self._parse_emails(new_raw_emails, stats)
             
             # Process emails based on AI settings
             if not ai_enabled:
@@ -247,19 +296,26 @@ class EmailPipeline:
                 ):
                     yield result
             else:
+                # Analyze only the newest message of each thread
+                analysis_emails, thread_emails = await self._prepare_analysis(
+                    parsed_emails, cached_emails, user_email, stats
+                )
+                
                 # Process with AI using helpers
                 if command.batch_size:
                     # Process in batches
                     async for result in process_in_batches(
-                        parsed_emails, command, user_id, user_email, ai_enabled,
-                        cache_duration, stats, self.processor, self.cache, self.logger
+                        analysis_emails, command, user_id, user_email, ai_enabled,
+                        cache_duration, stats, self.processor, self.cache, self.logger,
+                        thread_emails=thread_emails
                     ):
                         yield result
                 else:
                     # Process all at once
                     async for result in process_all_at_once(
-                        parsed_emails, user_id, user_email, ai_enabled,
-                        cache_duration, stats, self.processor, self.cache, self.logger
+                        analysis_emails, user_id, user_email, ai_enabled,
+                        cache_duration, stats, self.processor, self.cache, self.logger,
+                        thread_emails=thread_emails
                     ):
                         yield result
             
@@ -339,7 +395,7 @@ class EmailPipeline:
             # Only process new emails if there are any
             analyzed_emails = []
             if new_raw_emails:
-                parsed_emails = [email for email in [self.parser.extract_metadata(email) for email in new_raw_emails] if email is not None]
+                parsed_emails = self._parse_emails(new_raw_emails, stats)
                 
                 # Process emails based on AI settings
                 if not ai_enabled:
@@ -357,23 +413,30 @@ class EmailPipeline:
                         "failed_analysis": 0
                     })
                 else:
+                    # Analyze only the newest message of each thread
+                    analysis_emails, thread_emails = await self._prepare_analysis(
+                        parsed_emails, cached_emails, user_email, stats
+                    )
+                    
                     # Process emails with AI based on batch configuration
                     if command.batch_size:
                         # Use the batch processing helper
                         log_memory_usage(self.logger, "Before Starting Batch Processing")
-                        self.logger.info(f"Starting batch processing with {len(parsed_emails)} emails")
+                        self.logger.info(f"Starting batch processing with {len(analysis_emails)} emails")
                         
                         async for result in process_in_batches(
-                            parsed_emails, command, user_id, user_email, ai_enabled,
-                            cache_duration, stats, self.processor, self.cache, self.logger
+                            analysis_emails, command, user_id, user_email, ai_enabled,
+                            cache_duration, stats, self.processor, self.cache, self.logger,
+                            thread_emails=thread_emails
                         ):
                             if result.get('type') == 'emails':
                                 analyzed_emails = result.get('data', [])
                     else:
                         # Use all-at-once processing helper
                         async for result in process_all_at_once(
-                            parsed_emails, user_id, user_email, ai_enabled,
-                            cache_duration, stats, self.processor, self.cache, self.logger
+                            analysis_emails, user_id, user_email, ai_enabled,
+                            cache_duration, stats, self.processor, self.cache, self.logger,
+                            thread_emails=thread_emails
                         ):
                             if result.get('type') == 'emails':
                                 analyzed_emails = result.get('data', [])
@@ -445,7 +508,9 @@ def create_pipeline(
     connection: GmailClient,
     parser: EmailParser,
     processor: EmailProcessor,
-    cache: Optional[EmailCache] = None
+    cache: Optional[EmailCache] = None,
+    body_reducer: Optional[BodyReducer] = default_body_reducer,
+    thread_aware: bool = True
 ) -> EmailPipeline:
     """Factory function to create an email processing pipeline.
     
@@ -458,6 +523,9 @@ def create_pipeline(
         parser: Email parser for converting raw emails to structured data
         processor: Email processor for analysis and processing
         cache: Optional email cache for storing processed emails
+        body_reducer: Body reduction stage run between parsing and analysis;
+            None disables it
+        thread_aware: Analyze only the newest new message of each thread
         
     Returns:
         EmailPipeline: A configured pipeline instance ready for use
@@ -466,4 +534,4 @@ def create_pipeline(
         pipeline = create_pipeline(gmail_client, parser, processor, redis_cache)
         results = await pipeline.get_analyzed_emails(command)
     """
-    return EmailPipeline(connection, parser, processor, cache) 
\ No newline at end of file
+    return EmailPipeline(connection, parser, processor, cache, body_reducer, thread_aware) 
\ No newline at end of file
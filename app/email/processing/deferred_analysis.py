@@ -0,0 +1,416 @@
+"""Deferred email analysis through the OpenAI Batch API.
+
+A backfill that reaches far back (a large days_back) doesn't need its older
+emails analyzed interactively. EmailProcessor hands emails older than
+defer_after_days to DeferredAnalysisPoller.submit, which sends them to the
+Batch API as one batch (half the synchronous price, outside the live rate
+limits). They are returned with their NLP analysis only, so the pipeline
+caches and shows them straight away. The batch ID, and what is needed to
+finish each email, is saved in a DeferredBatchStore.
+
+A background poller checks the saved batches every poll_interval seconds on
+its own event loop. When a batch finishes, its results are applied to the
+saved emails, the emails are written to the email cache over their NLP-only
+entries, and the batch record is removed. Records are kept in Redis, so a
+batch submitted before a restart is still collected after it. Emails the
+batch has no result for keep their NLP-only analysis.
+
+Typical usage:
+    store = create_deferred_batch_store(app)
+    poller = DeferredAnalysisPoller(store, cache, processor.complete_deferred_email, app=app)
+    poller.start()
+    batch_id = await poller.submit(batch_processor, emails, pending, user_email)
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.email.analyzers.semantic.processors.batch_api import DeferredBatchProcessor
+from app.email.models.processed_email import ProcessedEmail
+from app.email.parsing.parser import EmailMetadata
+from app.services.redis_service import create_sync_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Seconds after which a batch that still can't be checked is given up on;
+# the Batch API completion window is 24 hours
+DEFAULT_RECORD_MAX_AGE = 2 * 86400
+
+
+class DeferredBatchStore(ABC):
+    """Storage for submitted batches that have not been collected yet.
+
+    A record is a JSON-serializable dictionary with the batch_id,
+    user_email, model, submitted_at, priority_threshold and cache_duration
+    of the batch, and under 'emails' one {'email', 'nlp_result'} entry per
+    email, where 'email' is the NLP-only ProcessedEmail as a dictionary.
+    """
+
+    @abstractmethod
+    def add(self, record: Dict[str, Any]) -> None:
+        """Save the record of a submitted batch.
+
+        Args:
+            record: Batch record
+        """
+        pass
+
+    @abstractmethod
+    def pending(self) -> List[Dict[str, Any]]:
+        """Get the records of all batches not collected yet.
+
+        Returns:
+            List[Dict[str, Any]]: Batch records
+        """
+        pass
+
+    @abstractmethod
+    def remove(self, batch_id: str) -> None:
+        """Remove the record of a collected batch.
+
+        Args:
+            batch_id: The batch ID
+        """
+        pass
+
+
+class InMemoryDeferredBatchStore(DeferredBatchStore):
+    """Process-local batch store for development and tests."""
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._lock = threading.Lock()
+        self._records: Dict[str, str] = {}
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Save the record of a submitted batch."""
+        with self._lock:
+            self._records[record['batch_id']] = json.dumps(record, default=str)
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Get the records of all batches not collected yet."""
+        with self._lock:
+            return [json.loads(payload) for payload in self._records.values()]
+
+    def remove(self, batch_id: str) -> None:
+        """Remove the record of a collected batch."""
+        with self._lock:
+            self._records.pop(batch_id, None)
+
+    def __len__(self) -> int:
+        """Number of batches not collected yet."""
+        return len(self._records)
+
+
+class RedisDeferredBatchStore(DeferredBatchStore):
+    """Batch store kept in a Redis hash, shared between workers and restarts.
+
+    Attributes:
+        key: Hash mapping batch IDs to JSON records
+    """
+
+    def __init__(self, client, key: str = 'deferred_analysis:batches'):
+        """Initialize the store.
+
+        Args:
+            client: Synchronous Redis client (redis-py or upstash_redis)
+            key: Hash mapping batch IDs to JSON records
+        """
+        self._client = client
+        self.key = key
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """Save the record of a submitted batch."""
+        self._client.hset(self.key, record['batch_id'], json.dumps(record, default=str))
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Get the records of all batches not collected yet."""
+        records = []
+        for payload in self._client.hvals(self.key) or []:
+            try:
+                records.append(json.loads(payload))
+            except ValueError:
+                logger.warning(f"Skipping invalid deferred batch record in {self.key}")
+        return records
+
+    def remove(self, batch_id: str) -> None:
+        """Remove the record of a collected batch."""
+        self._client.hdel(self.key, batch_id)
+
+    def __len__(self) -> int:
+        """Number of batches not collected yet."""
+        return int(self._client.hlen(self.key))
+
+
+def create_deferred_batch_store(app) -> DeferredBatchStore:
+    """Create the batch store configured for an application.
+
+    Uses Redis when DEFERRED_ANALYSIS_BACKEND is 'redis' (the default outside
+    of testing) and falls back to an in-memory store if Redis is unreachable.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        DeferredBatchStore: The configured store
+    """
+    backend = app.config.get('DEFERRED_ANALYSIS_BACKEND') or ('memory' if app.config.get('TESTING') else 'redis')
+    if backend != 'redis':
+        return InMemoryDeferredBatchStore()
+    try:
+        client = create_sync_redis_client(app)
+        logger.info("Deferred analysis batches stored in Redis")
+        return RedisDeferredBatchStore(client)
+    except Exception as e:
+        logger.warning(f"Redis unavailable for deferred analysis, batches won't survive a restart: {e}")
+        return InMemoryDeferredBatchStore()
+
+
+class DeferredAnalysisPoller:
+    """Submits older emails as Batch API batches and collects the results.
+
+    The poller runs its own event loop on a daemon thread, like the outbound
+    sender. Requests submit batches from their own loop; the poller's loop
+    only checks and collects them.
+
+    Attributes:
+        store: Records of the batches not collected yet
+        cache: Email cache the finished analyses are written to
+        build_email: Completes an NLP-only email with its analysis:
+            (email, nlp_result, llm_result, priority_threshold) -> ProcessedEmail
+        app: Flask application; provides the OpenAI client, and an
+            application context for the cache's Redis client
+        poll_interval: Seconds between checks of the pending batches
+        defer_after_days: Emails older than this many days are deferred
+        min_emails: Fewest old emails in an analysis worth a batch
+        max_age: Seconds after which a batch that can't be checked is dropped
+    """
+
+    def __init__(
+        self,
+        store: DeferredBatchStore,
+        cache: Any,
+        build_email: Callable[[ProcessedEmail, Dict, Dict, Optional[int]], ProcessedEmail],
+        app=None,
+        client=None,
+        poll_interval: float = 60.0,
+        defer_after_days: int = 3,
+        min_emails: int = 20,
+        max_age: float = DEFAULT_RECORD_MAX_AGE
+    ):
+        """Initialize the poller.
+
+        Args:
+            store: Records of the batches not collected yet
+            cache: Email cache the finished analyses are written to
+            build_email: Completes an NLP-only email with its analysis
+            app: Flask application
+            client: AsyncOpenAI client; defaults to app.get_openai_client()
+            poll_interval: Seconds between checks of the pending batches
+            defer_after_days: Emails older than this many days are deferred
+            min_emails: Fewest old emails in an analysis worth a batch
+            max_age: Seconds after which a batch that can't be checked is dropped
+        """
+        self.store = store
+        self.cache = cache
+        self.build_email = build_email
+        self.app = app
+        self.client = client
+        self.poll_interval = poll_interval
+        self.defer_after_days = defer_after_days
+        self.min_emails = min_emails
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def deferrable(self, emails: List[EmailMetadata]) -> List[int]:
+        """Select the emails of an analysis to defer.
+
+        Args:
+            emails: Emails about to be analyzed
+
+        Returns:
+            List[int]: Positions of the emails older than defer_after_days, or
+                an empty list if there are fewer than min_emails of them
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.defer_after_days)
+        indexes = [
+            i for i, email in enumerate(emails)
+            if email.date is not None and self._utc(email.date) < cutoff
+        ]
+        return indexes if len(indexes) >= max(1, self.min_emails) else []
+
+    @staticmethod
+    def _utc(date: datetime) -> datetime:
+        """Get a datetime in UTC, treating naive datetimes as UTC."""
+        return date.replace(tzinfo=timezone.utc) if date.tzinfo is None else date.astimezone(timezone.utc)
+
+    async def submit(
+        self,
+        processor: DeferredBatchProcessor,
+        emails: List[Tuple[EmailMetadata, Dict]],
+        pending: List[ProcessedEmail],
+        user_email: str,
+        priority_threshold: Optional[int] = None,
+        cache_duration: Optional[int] = None
+    ) -> str:
+        """Submit emails as a batch and save its record for the poller.
+
+        Args:
+            processor: Batch API processor configured from the user's settings
+            emails: List of tuples containing (EmailMetadata, nlp_results)
+            pending: The NLP-only processed emails, in the same order
+            user_email: The user's email address
+            priority_threshold: The user's priority threshold
+            cache_duration: Cache duration in days for the finished emails
+
+        Returns:
+            str: The batch ID
+
+        Raises:
+            LLMProcessingError: If the batch can't be submitted
+        """
+        batch_id = await processor.submit(emails, metadata={'purpose': 'email-analysis'})
+        record = {
+            'batch_id': batch_id,
+            'user_email': user_email,
+            'model': processor.model,
+            'submitted_at': time.time(),
+            'priority_threshold': priority_threshold,
+            'cache_duration': cache_duration,
+            'emails': [
+                {'email': email.dict(), 'nlp_result': nlp_result}
+                for email, (_, nlp_result) in zip(pending, emails)
+            ]
+        }
+        await asyncio.to_thread(self.store.add, record)
+        logger.info(f"Deferred analysis of {len(pending)} emails for {user_email} to batch {batch_id}")
+        self.start()
+        return batch_id
+
+    async def poll_once(self) -> int:
+        """Check every pending batch once and collect the finished ones.
+
+        Returns:
+            int: Number of batches collected
+        """
+        collected = 0
+        for record in await asyncio.to_thread(self.store.pending):
+            try:
+                if await self._collect(record):
+                    collected += 1
+            except Exception as e:
+                logger.error(f"Error collecting deferred batch {record.get('batch_id')}: {e}")
+        return collected
+
+    async def _collect(self, record: Dict[str, Any]) -> bool:
+        """Collect a batch if it has finished.
+
+        The record is removed only once the results are in the cache, so a
+        failed write is retried on the next poll.
+
+        Args:
+            record: Batch record
+
+        Returns:
+            bool: True if the batch was finished and its record removed
+        """
+        batch_id = record['batch_id']
+        processor = DeferredBatchProcessor(self._client(), model=record.get('model') or 'gpt-4o-mini')
+        try:
+            batch = await processor.poll(batch_id)
+        except Exception as e:
+            if time.time() - record.get('submitted_at', 0) <= self.max_age:
+                raise
+            logger.warning(f"Dropping deferred batch {batch_id}, still not reachable after {self.max_age}s: {e}")
+            await asyncio.to_thread(self.store.remove, batch_id)
+            return True
+        if batch is None:
+            return False
+
+        results = await processor.fetch_results(batch)
+        completed = []
+        for entry in record['emails']:
+            email = ProcessedEmail(**entry['email'])
+            if email.id in results:
+                completed.append(self.build_email(
+                    email, entry['nlp_result'], results[email.id], record.get('priority_threshold')
+                ))
+        missing = len(record['emails']) - len(completed)
+        if missing:
+            logger.warning(f"Batch {batch_id}: {missing} of {len(record['emails'])} emails have no result")
+        if completed:
+            await self._store(completed, record['user_email'], record.get('cache_duration'))
+        await asyncio.to_thread(self.store.remove, batch_id)
+        logger.info(
+            f"Batch {batch_id}: stored {len(completed)} emails for {record['user_email']}, "
+            f"total cost ${sum(results[email.id]['cost'] for email in completed):.4f}"
+        )
+        return True
+
+    def _client(self):
+        """Get the OpenAI client batches are checked with."""
+        if self.client is not None:
+            return self.client
+        return self.app.get_openai_client()
+
+    async def _store(self, emails: List[ProcessedEmail], user_email: str, cache_duration: Optional[int]) -> None:
+        """Write finished emails to the cache.
+
+        The cache's Redis client is created per application context, so the
+        poller opens one for the write and closes the client after it.
+
+        Args:
+            emails: Finished processed emails
+            user_email: The user's email address
+            cache_duration: Cache duration in days
+        """
+        if self.app is None:
+            await self.cache.store_many(emails, user_email, ttl_days=cache_duration)
+            return
+        with self.app.app_context():
+            try:
+                await self.cache.store_many(emails, user_email, ttl_days=cache_duration)
+            finally:
+                if hasattr(self.app, 'close_redis_client'):
+                    await self.app.close_redis_client()
+
+    def start(self) -> None:
+        """Start the background thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self._run()),
+                name="deferred-analysis-poller",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the background thread.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    async def _run(self) -> None:
+        """Poll the pending batches every poll_interval seconds until stopped."""
+        while not await asyncio.to_thread(self._stop.wait, self.poll_interval):
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Error reading deferred analysis batches: {e}")
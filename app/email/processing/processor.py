@@ -1,7 +1,9 @@
 """Email processing module with analytics tracking."""
 
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from collections import defaultdict, deque
+from dataclasses import replace
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime, timezone
 import time
 from flask import session, current_app
@@ -12,7 +14,7 @@ from ..parsing.parser import EmailMetadata
 from ..analyzers.semantic.analyzer import SemanticAnalyzer
 from ..analyzers.content.core.nlp_analyzer import ContentAnalyzer
 from ..utils.priority_scorer import PriorityScorer
-from ..models.processed_email import ProcessedEmail
+from ..models.processed_email import ProcessedEmail, LABEL_SOURCE_LLM
 from ..models.exceptions import EmailProcessingError
 from ..models.analysis_command import AnalysisCommand
 from app.utils.memory_profiling import log_memory_usage, log_memory_cleanup
@@ -32,6 +34,9 @@ class EmailProcessor:
         parser: Component for parsing raw emails into structured metadata
         logger: Logger instance for tracking processing events
         processed_count: Counter for total emails processed
+        deferred_analysis: Optional DeferredAnalysisPoller; when set, the older
+            emails of a large analysis are sent to the Batch API instead of
+            being analyzed live
     """
     
     def __init__(
@@ -58,6 +63,7 @@ class EmailProcessor:
         self.parser = parser
         self.logger = logging.getLogger(__name__)
         self.processed_count = 0  # Track number of processed emails
+        self.deferred_analysis = None
 
     # =========================================================================
     # Public Methods
@@ -110,16 +116,25 @@ class EmailProcessor:
             self.logger.error(f"Email processing failed: {e}")
             raise EmailProcessingError(f"Email processing failed: {str(e)}")
 
-    async def analyze_parsed_emails(self, parsed_emails: List[EmailMetadata], user_id: Optional[int] = None, ai_enabled: Optional[bool] = None) -> List[ProcessedEmail]:
+    async def analyze_parsed_emails(self, parsed_emails: List[EmailMetadata], user_id: Optional[int] = None, ai_enabled: Optional[bool] = None,
+                                    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None, user_email: Optional[str] = None,
+                                    cache_duration: Optional[int] = None) -> List[ProcessedEmail]:
         """Analyze already parsed emails using NLP and LLM models.
         
         Processes a list of parsed email metadata objects through the analysis pipeline,
         including NLP analysis, LLM analysis (if enabled), and fallback processing if needed.
+        With deferred analysis configured and a user_email given, older emails are
+        submitted to the Batch API and returned with their NLP analysis only; the
+        poller writes their full analysis to the cache when the batch finishes.
         
         Args:
             parsed_emails: List of parsed email metadata objects
             user_id: Optional user ID for tracking and personalization
             ai_enabled: Whether to enable AI features (defaults to True if None)
+            on_partial: Optional callback receiving partial LLM results (id, subject,
+                category, needs_action, summary so far) while responses stream in
+            user_email: The user's email address, needed to defer analysis
+            cache_duration: Cache duration in days for deferred emails
             
         Returns:
             List of processed emails with full analysis results
@@ -164,14 +179,26 @@ class EmailProcessor:
             # Step 1: Run NLP analysis
             nlp_results = await self._perform_nlp_analysis(email_batch)
             
-            # Step 2: Run LLM analysis if enabled
+            # Step 2: Hand older emails to the Batch API if configured
+            deferred = {}
+            if ai_enabled is not False and user_email:
+                deferred = await self._defer_llm_analysis(email_batch, nlp_results, user_priority_threshold,
+                                                          user_email, cache_duration)
+            live_batch = [email for i, email in enumerate(email_batch) if i not in deferred]
+            live_nlp = [nlp_results[i] if i < len(nlp_results) else {}
+                        for i in range(len(email_batch)) if i not in deferred]
+            
+            # Step 3: Run LLM analysis if enabled
             processed_emails = []
-            if ai_enabled is not False:  # Default to True if not specified
-                processed_emails = await self._perform_llm_analysis(email_batch, nlp_results, user_priority_threshold)
+            if ai_enabled is not False and live_batch:  # Default to True if not specified
+                processed_emails = await self._perform_llm_analysis(live_batch, live_nlp, user_priority_threshold, on_partial)
+            
+            # Step 4: Fall back to basic processing if needed
+            if not processed_emails and live_batch:
+                processed_emails = self._perform_fallback_processing(live_batch, live_nlp, user_priority_threshold)
             
-            # Step 3: Fall back to basic processing if needed
-            if not processed_emails and email_batch:
-                processed_emails = self._perform_fallback_processing(email_batch, nlp_results, user_priority_threshold)
+            if deferred:
+                processed_emails = self._merge_deferred(email_batch, deferred, processed_emails)
         
         except Exception as e:
             self.logger.error(f"Email batch processing failed: {e}")
@@ -240,8 +267,8 @@ class EmailProcessor:
             List of NLP analysis results dictionaries
         """
         try:
-            # Process all bodies together for efficiency
-            email_bodies = [email.body for email in email_batch]
+            # Process all bodies together for efficiency, sharing each email's normalized text
+            email_bodies = [email.text for email in email_batch]
             nlp_start = time.time()
             
             # Execute NLP analysis asynchronously
@@ -260,7 +287,8 @@ class EmailProcessor:
             # Create default response for failed NLP processing
             return [{}] * len(email_batch)
 
-    async def _perform_llm_analysis(self, email_batch: List[EmailMetadata], nlp_results: List[Dict], user_priority_threshold: Optional[int]) -> List[ProcessedEmail]:
+    async def _perform_llm_analysis(self, email_batch: List[EmailMetadata], nlp_results: List[Dict], user_priority_threshold: Optional[int],
+                                    on_partial: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[ProcessedEmail]:
         """Perform LLM analysis on emails with their NLP results.
         
         Uses large language models to analyze emails for deeper semantic understanding,
@@ -270,6 +298,7 @@ class EmailProcessor:
             email_batch: List of email metadata objects
             nlp_results: List of NLP analysis results
             user_priority_threshold: User-defined priority threshold for LLM analysis
+            on_partial: Optional callback receiving partial LLM results
             
         Returns:
             List of processed emails with full analysis
@@ -286,7 +315,10 @@ class EmailProcessor:
             
             # Process with LLM in a batch
             llm_start = time.time()
-            llm_results = await self.llm_analyzer.analyze_batch(llm_batch)
+            if on_partial is not None:
+                llm_results = await self.llm_analyzer.analyze_batch(llm_batch, on_partial=on_partial)
+            else:
+                llm_results = await self.llm_analyzer.analyze_batch(llm_batch)
             
             # Log memory after LLM - this is a critical point to track
             log_memory_usage(self.logger, "After LLM Analysis")
@@ -308,6 +340,65 @@ class EmailProcessor:
         
         return processed_emails
 
+    async def _defer_llm_analysis(self, email_batch: List[EmailMetadata], nlp_results: List[Dict], user_priority_threshold: Optional[int],
+                                  user_email: str, cache_duration: Optional[int]) -> Dict[int, ProcessedEmail]:
+        """Submit the older emails of a batch for deferred analysis.
+        
+        Args:
+            email_batch: List of email metadata objects
+            nlp_results: List of NLP analysis results
+            user_priority_threshold: User-defined priority threshold for LLM analysis
+            user_email: The user's email address
+            cache_duration: Cache duration in days for the finished emails
+            
+        Returns:
+            NLP-only processed emails keyed by their position in email_batch;
+            empty if nothing was deferred and every email is analyzed live
+        """
+        if self.deferred_analysis is None:
+            return {}
+        indexes = self.deferred_analysis.deferrable(email_batch)
+        if not indexes:
+            return {}
+        
+        emails = [(email_batch[i], nlp_results[i] if i < len(nlp_results) else {}) for i in indexes]
+        pending = {
+            i: self._create_processed_email(email, nlp_result, {}, user_priority_threshold)
+            for i, (email, nlp_result) in zip(indexes, emails)
+        }
+        try:
+            batch_processor = await self.llm_analyzer.create_deferred_processor()
+            await self.deferred_analysis.submit(batch_processor, emails, list(pending.values()), user_email,
+                                                user_priority_threshold, cache_duration)
+        except Exception as e:
+            self.logger.warning(f"Could not defer {len(indexes)} older emails, analyzing them now: {e}")
+            return {}
+        return pending
+
+    @staticmethod
+    def _merge_deferred(email_batch: List[EmailMetadata], deferred: Dict[int, ProcessedEmail],
+                        live_results: List[ProcessedEmail]) -> List[ProcessedEmail]:
+        """Put deferred and live results back in the order of the batch.
+        
+        Args:
+            email_batch: List of email metadata objects
+            deferred: NLP-only processed emails keyed by position in email_batch
+            live_results: Processed emails of the other emails
+            
+        Returns:
+            All processed emails, in batch order
+        """
+        live_by_id = defaultdict(deque)
+        for result in live_results:
+            live_by_id[result.id].append(result)
+        merged = []
+        for i, email in enumerate(email_batch):
+            if i in deferred:
+                merged.append(deferred[i])
+            elif live_by_id[email.id]:
+                merged.append(live_by_id[email.id].popleft())
+        return merged
+
     def _perform_fallback_processing(self, email_batch: List[EmailMetadata], nlp_results: List[Dict], user_priority_threshold: Optional[int]) -> List[ProcessedEmail]:
         """Process emails with just NLP results when LLM processing fails.
         
@@ -363,17 +454,7 @@ class EmailProcessor:
         email_date = self._ensure_utc_date(email.date)
         
         # Get priority score and level
-        try:
-            priority_score, priority_level = self.priority_calculator.score(
-                email.sender,
-                nlp_result,
-                llm_result,
-                priority_threshold=user_priority_threshold
-            )
-        except Exception as e:
-            self.logger.warning(f"Priority calculation failed for email {email.id}, using defaults: {e}")
-            priority_score = 30
-            priority_level = "LOW"
+        priority_score, priority_level = self._score_priority(email.id, email.sender, nlp_result, llm_result, user_priority_threshold)
             
         return ProcessedEmail(
             id=email.id,
@@ -387,15 +468,96 @@ class EmailProcessor:
             sentence_count=nlp_result.get('sentence_count', 0),
             sentiment_indicators=nlp_result.get('sentiment_indicators', {}),
             structural_elements=nlp_result.get('structural_elements', {}),
-            needs_action=llm_result.get('needs_action', False),
-            category=llm_result.get('category', 'Informational'),
-            action_items=llm_result.get('action_items', []),
-            summary=llm_result.get('summary', 'No summary available'),
             priority=priority_score,
             priority_level=priority_level,
-            custom_categories=llm_result.get('custom_categories', {})
+            removed_sections=[span.dict() for span in email.removed_spans],
+            thread_id=email.thread_id or None,
+            label_source=self._label_source(llm_result),
+            **self._llm_fields(llm_result)
         )
 
+    def complete_deferred_email(self, email: ProcessedEmail, nlp_result: Dict, llm_result: Dict,
+                                user_priority_threshold: Optional[int]) -> ProcessedEmail:
+        """Apply a deferred analysis result to an email returned without one.
+        
+        Args:
+            email: The NLP-only processed email
+            nlp_result: Results from NLP analysis
+            llm_result: Results from the Batch API analysis
+            user_priority_threshold: User-defined priority threshold for LLM analysis
+            
+        Returns:
+            The processed email with the analysis and a recalculated priority
+        """
+        priority_score, priority_level = self._score_priority(email.id, email.sender, nlp_result, llm_result, user_priority_threshold)
+        return replace(
+            email,
+            priority=priority_score,
+            priority_level=priority_level,
+            label_source=self._label_source(llm_result),
+            **self._llm_fields(llm_result)
+        )
+
+    def _score_priority(self, email_id: str, sender: str, nlp_result: Dict, llm_result: Dict,
+                        user_priority_threshold: Optional[int]) -> Tuple[int, str]:
+        """Score an email's priority, falling back to LOW if scoring fails.
+        
+        Args:
+            email_id: The email's ID, for logging
+            sender: The email's sender
+            nlp_result: Results from NLP analysis
+            llm_result: Results from LLM analysis (may be empty)
+            user_priority_threshold: User-defined priority threshold for LLM analysis
+            
+        Returns:
+            Tuple of priority score and level
+        """
+        try:
+            return self.priority_calculator.score(
+                sender,
+                nlp_result,
+                llm_result,
+                priority_threshold=user_priority_threshold
+            )
+        except Exception as e:
+            self.logger.warning(f"Priority calculation failed for email {email_id}, using defaults: {e}")
+            return 30, "LOW"
+
+    @staticmethod
+    def _llm_fields(llm_result: Dict) -> Dict[str, Any]:
+        """Get the ProcessedEmail fields that come from LLM analysis.
+        
+        Args:
+            llm_result: Results from LLM analysis (may be empty)
+            
+        Returns:
+            Field values, with defaults for an email without analysis
+        """
+        return {
+            'needs_action': llm_result.get('needs_action', False),
+            'category': llm_result.get('category', 'Informational'),
+            'action_items': llm_result.get('action_items', []),
+            'summary': llm_result.get('summary', 'No summary available'),
+            'custom_categories': llm_result.get('custom_categories', {})
+        }
+
+    @staticmethod
+    def _label_source(llm_result: Dict) -> Optional[str]:
+        """Get where an analysis result's labels came from.
+
+        Args:
+            llm_result: Results from LLM analysis (may be empty)
+
+        Returns:
+            The result's own label_source, LABEL_SOURCE_LLM for an analysis by
+            a model, or None when the email has no analysis
+        """
+        if llm_result.get('label_source'):
+            return llm_result['label_source']
+        if llm_result.get('model') and 'category' in llm_result:
+            return LABEL_SOURCE_LLM
+        return None
+
     def _ensure_utc_date(self, date: datetime) -> datetime:
         """Ensure a datetime is in UTC timezone.
         
@@ -0,0 +1,839 @@
+"""Asynchronous outbound email queue.
+
+This module decouples the send_email route from mail delivery. The route
+validates a message, enqueues it and immediately returns a tracking ID; a
+background sender drains the queue on a long-lived event loop, reusing pooled
+SMTP sessions, retrying transient failures with backoff and recording each
+job's status so the client can poll for the outcome.
+
+Two queue backends are provided: a Redis-backed queue that survives worker
+restarts and is shared between workers, and an in-memory queue used in
+development and tests. A dequeued job stays claimed by its worker until it is
+acknowledged (sent, failed or scheduled for retry); the Redis queue returns
+jobs whose worker stopped before acknowledging them to the queue. A worker
+renews its claim while a send is in progress, and a job whose status is
+already 'sent' is acknowledged without being sent again, so a requeued copy
+of a slow or interrupted send is not delivered twice.
+
+An idle sender backs off exponentially between polls, up to
+max_poll_interval, so an empty queue costs a few commands a minute instead
+of several a second; submit wakes the sender's own consumers at once.
+
+Typical usage:
+    queue = create_outbound_queue(app)
+    sender = OutboundSender(queue, app)
+    tracking_id = sender.submit({'to': ..., 'subject': ..., 'content': ...})
+    status = queue.get_status(tracking_id)
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from app.email.processing.sender import EmailSender, EmailSendingError
+from app.services.redis_service import create_sync_redis_client
+
+logger = logging.getLogger(__name__)
+
+# Job statuses reported by the status endpoint
+STATUS_QUEUED = 'queued'
+STATUS_SENDING = 'sending'
+STATUS_RETRYING = 'retrying'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+
+# Credential fields kept with a queued job; the refresh token and client
+# secret never leave the session
+QUEUED_CREDENTIAL_FIELDS = ('token', 'expiry', 'token_uri', 'scopes')
+
+# Seconds a queued access token is kept when its expiry is unknown
+DEFAULT_ACCESS_TOKEN_TTL = 3600
+
+# Minimum seconds an access token must stay valid for a job to use it
+MIN_ACCESS_TOKEN_TTL = 300
+
+
+class PermanentSendError(EmailSendingError):
+    """Exception raised for send failures that retrying cannot fix."""
+    pass
+
+
+def _now_iso() -> str:
+    """Current time as an ISO 8601 UTC string."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+class OutboundQueue(ABC):
+    """Interface for durable outbound email queues.
+
+    A queue stores pending jobs, jobs scheduled for a delayed retry, and a
+    status record per job. Implementations must be safe to use from both
+    request threads and the background sender thread.
+    """
+
+    @abstractmethod
+    def enqueue(self, job: Dict[str, Any]) -> None:
+        """Add a job to the end of the queue.
+
+        Args:
+            job: Job dictionary; must contain an 'id'
+        """
+        pass
+
+    @abstractmethod
+    def dequeue(self) -> Optional[Dict[str, Any]]:
+        """Claim the next due job, promoting delayed retries that are due.
+
+        The job stays claimed until it is acknowledged with ack().
+
+        Returns:
+            Optional[Dict[str, Any]]: The next job, or None if nothing is due
+        """
+        pass
+
+    def renew_claim(self, job: Dict[str, Any]) -> None:
+        """Extend the claim on a job whose send is still in progress.
+
+        Args:
+            job: Job dictionary returned by dequeue
+        """
+        pass
+
+    def requeue_stale(self) -> None:
+        """Return jobs whose claim has expired to the queue.
+
+        Called on its own, slower timer rather than on every dequeue. Queues
+        whose jobs can't outlive their worker have nothing to do.
+        """
+        pass
+
+    @abstractmethod
+    def ack(self, job: Dict[str, Any]) -> None:
+        """Release a claimed job once it was sent, failed or scheduled for retry.
+
+        Args:
+            job: Job dictionary returned by dequeue
+        """
+        pass
+
+    @abstractmethod
+    def schedule_retry(self, job: Dict[str, Any], delay: float) -> None:
+        """Re-queue a job after a delay.
+
+        Args:
+            job: Job dictionary to retry
+            delay: Seconds to wait before the job becomes due again
+        """
+        pass
+
+    @abstractmethod
+    def set_status(self, job_id: str, status: str, **fields: Any) -> None:
+        """Update a job's status record.
+
+        Args:
+            job_id: Tracking ID of the job
+            status: New status, one of the STATUS_* constants
+            **fields: Additional fields to store (attempts, sent_via, error, ...)
+        """
+        pass
+
+    @abstractmethod
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status record.
+
+        Args:
+            job_id: Tracking ID of the job
+
+        Returns:
+            Optional[Dict[str, Any]]: The status record, or None if unknown or expired
+        """
+        pass
+
+    @abstractmethod
+    def store_credentials(self, ref: str, credentials: Dict[str, Any], ttl: int) -> None:
+        """Store the Gmail access token a job refers to by credentials_ref.
+
+        Args:
+            ref: Credential reference carried by the job (its tracking ID)
+            credentials: Access token and expiry (QUEUED_CREDENTIAL_FIELDS)
+            ttl: Seconds until the token expires
+        """
+        pass
+
+    @abstractmethod
+    def get_credentials(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Get the Gmail access token stored under a reference.
+
+        Args:
+            ref: Credential reference carried by a job
+
+        Returns:
+            Optional[Dict[str, Any]]: The credentials, or None if unknown or expired
+        """
+        pass
+
+    @abstractmethod
+    def delete_credentials(self, ref: str) -> None:
+        """Delete the Gmail access token stored under a reference.
+
+        Args:
+            ref: Credential reference carried by a finished job
+        """
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of jobs waiting, including delayed retries."""
+        pass
+
+
+class InMemoryOutboundQueue(OutboundQueue):
+    """Process-local outbound queue for development and tests.
+
+    Jobs are lost when the process exits; use RedisOutboundQueue in production.
+    """
+
+    def __init__(self):
+        """Initialize an empty queue."""
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._delayed: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._statuses: Dict[str, Dict[str, Any]] = {}
+        self._claimed: Dict[str, Dict[str, Any]] = {}
+        self._credentials: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def enqueue(self, job: Dict[str, Any]) -> None:
+        """Add a job to the end of the queue."""
+        with self._lock:
+            self._pending.append(job)
+
+    def dequeue(self) -> Optional[Dict[str, Any]]:
+        """Claim the next due job, promoting delayed retries that are due."""
+        now = time.time()
+        with self._lock:
+            while self._delayed and self._delayed[0][0] <= now:
+                self._pending.append(heapq.heappop(self._delayed)[2])
+            if not self._pending:
+                return None
+            job = self._pending.popleft()
+            self._claimed[job['id']] = job
+            return job
+
+    def ack(self, job: Dict[str, Any]) -> None:
+        """Release a claimed job."""
+        with self._lock:
+            self._claimed.pop(job['id'], None)
+
+    def schedule_retry(self, job: Dict[str, Any], delay: float) -> None:
+        """Re-queue a job after a delay."""
+        with self._lock:
+            self._counter += 1
+            heapq.heappush(self._delayed, (time.time() + delay, self._counter, job))
+
+    def set_status(self, job_id: str, status: str, **fields: Any) -> None:
+        """Update a job's status record."""
+        with self._lock:
+            record = self._statuses.setdefault(job_id, {'id': job_id})
+            record.update(fields, status=status, updated_at=_now_iso())
+
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status record."""
+        with self._lock:
+            record = self._statuses.get(job_id)
+            return dict(record) if record else None
+
+    def store_credentials(self, ref: str, credentials: Dict[str, Any], ttl: int) -> None:
+        """Store the Gmail access token a job refers to by credentials_ref."""
+        with self._lock:
+            self._credentials[ref] = (time.time() + ttl, dict(credentials))
+
+    def get_credentials(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Get the Gmail access token stored under a reference."""
+        with self._lock:
+            expires_at, credentials = self._credentials.get(ref, (0, None))
+            return dict(credentials) if credentials and expires_at > time.time() else None
+
+    def delete_credentials(self, ref: str) -> None:
+        """Delete the Gmail access token stored under a reference."""
+        with self._lock:
+            self._credentials.pop(ref, None)
+
+    def __len__(self) -> int:
+        """Number of jobs waiting, including delayed retries."""
+        with self._lock:
+            return len(self._pending) + len(self._delayed)
+
+
+class RedisOutboundQueue(OutboundQueue):
+    """Redis-backed outbound queue shared by all workers.
+
+    Pending jobs live in a list, delayed retries in a sorted set scored by
+    due time, and status records in per-job keys that expire after
+    status_ttl seconds. A job's Gmail access token is kept under its own key,
+    expiring with the token and deleted when the job finishes, so any worker
+    can send the job and the job payload itself never contains it. dequeue moves a job atomically (LMOVE) onto a
+    processing list and records its claim time; ack removes it. Jobs claimed
+    longer than claim_timeout seconds ago, e.g. by a worker that crashed, are
+    moved back to the front of the pending list. A synchronous client is used
+    because the queue is accessed from request threads and the sender's own
+    event loop.
+
+    Attributes:
+        prefix: Key prefix for all queue keys
+        status_ttl: Seconds a status record is kept after its last update
+        claim_timeout: Seconds after which an unacknowledged job is requeued
+    """
+
+    def __init__(self, client: Any, prefix: str = 'outbound', status_ttl: int = 86400,
+                 claim_timeout: float = 300.0):
+        """Initialize the queue.
+
+        Args:
+            client: Synchronous Redis client (redis.Redis or upstash_redis.Redis)
+                returning decoded strings
+            prefix: Key prefix for all queue keys
+            status_ttl: Seconds a status record is kept after its last update
+            claim_timeout: Seconds after which an unacknowledged job is requeued;
+                must exceed the longest send
+        """
+        self._client = client
+        self.prefix = prefix
+        self.status_ttl = status_ttl
+        self.claim_timeout = claim_timeout
+        self._pending_key = f"{prefix}:pending"
+        self._delayed_key = f"{prefix}:delayed"
+        self._processing_key = f"{prefix}:processing"
+        self._claims_key = f"{prefix}:claims"
+
+    def _status_key(self, job_id: str) -> str:
+        """Build the Redis key for a job's status record."""
+        return f"{self.prefix}:status:{job_id}"
+
+    def _credentials_key(self, ref: str) -> str:
+        """Build the Redis key for a job's Gmail access token."""
+        return f"{self.prefix}:credentials:{ref}"
+
+    def enqueue(self, job: Dict[str, Any]) -> None:
+        """Add a job to the end of the queue."""
+        self._client.lpush(self._pending_key, json.dumps(job))
+
+    def _promote_due(self) -> None:
+        """Move delayed jobs whose retry time has passed onto the pending list."""
+        due = self._client.zrangebyscore(self._delayed_key, 0, time.time())
+        for payload in due or []:
+            # Only the worker that removes the entry re-queues it
+            if self._client.zrem(self._delayed_key, payload):
+                self._client.lpush(self._pending_key, payload)
+
+    @staticmethod
+    def _job_id(payload: str) -> Optional[str]:
+        """Read the job ID of a queued payload, or None if it is malformed."""
+        try:
+            return json.loads(payload)['id']
+        except (TypeError, ValueError, KeyError):
+            return None
+
+    def requeue_stale(self) -> None:
+        """Move jobs claimed longer than claim_timeout ago back onto the pending list."""
+        now = time.time()
+        for payload in self._client.lrange(self._processing_key, 0, -1) or []:
+            job_id = self._job_id(payload)
+            claimed_at = self._client.zscore(self._claims_key, job_id or payload)
+            if claimed_at is None:
+                # Claimed by a worker that stopped before recording the claim time
+                self._client.zadd(self._claims_key, {job_id or payload: now}, nx=True)
+                continue
+            if now - float(claimed_at) < self.claim_timeout:
+                continue
+            # Only the worker that removes the entry re-queues it
+            if self._client.lrem(self._processing_key, 1, payload):
+                self._client.zrem(self._claims_key, job_id or payload)
+                self._client.rpush(self._pending_key, payload)
+                logger.warning(f"Requeued outbound job {job_id} not acknowledged within {self.claim_timeout}s")
+
+    def dequeue(self) -> Optional[Dict[str, Any]]:
+        """Claim the next due job, promoting delayed retries that are due."""
+        self._promote_due()
+        payload = self._client.lmove(self._pending_key, self._processing_key, 'RIGHT', 'LEFT')
+        if not payload:
+            return None
+        job_id = self._job_id(payload)
+        if job_id is None:
+            logger.error("Dropping malformed outbound job")
+            self._client.lrem(self._processing_key, 1, payload)
+            return None
+        self._client.zadd(self._claims_key, {job_id: time.time()})
+        return json.loads(payload)
+
+    def renew_claim(self, job: Dict[str, Any]) -> None:
+        """Reset a claimed job's claim time; a claim already swept is not recreated."""
+        self._client.zadd(self._claims_key, {job['id']: time.time()}, xx=True)
+
+    def ack(self, job: Dict[str, Any]) -> None:
+        """Release a claimed job."""
+        for payload in self._client.lrange(self._processing_key, 0, -1) or []:
+            if self._job_id(payload) == job['id']:
+                self._client.lrem(self._processing_key, 1, payload)
+                break
+        self._client.zrem(self._claims_key, job['id'])
+
+    def schedule_retry(self, job: Dict[str, Any], delay: float) -> None:
+        """Re-queue a job after a delay."""
+        self._client.zadd(self._delayed_key, {json.dumps(job): time.time() + delay})
+
+    def set_status(self, job_id: str, status: str, **fields: Any) -> None:
+        """Update a job's status record."""
+        record = self.get_status(job_id) or {'id': job_id}
+        record.update(fields, status=status, updated_at=_now_iso())
+        self._client.set(self._status_key(job_id), json.dumps(record), ex=self.status_ttl)
+
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status record."""
+        payload = self._client.get(self._status_key(job_id))
+        if not payload:
+            return None
+        try:
+            return json.loads(payload)
+        except (TypeError, ValueError):
+            return None
+
+    def store_credentials(self, ref: str, credentials: Dict[str, Any], ttl: int) -> None:
+        """Store the Gmail access token a job refers to by credentials_ref."""
+        self._client.set(self._credentials_key(ref), json.dumps(credentials), ex=max(1, int(ttl)))
+
+    def get_credentials(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Get the Gmail access token stored under a reference."""
+        payload = self._client.get(self._credentials_key(ref))
+        if not payload:
+            return None
+        try:
+            return json.loads(payload)
+        except (TypeError, ValueError):
+            return None
+
+    def delete_credentials(self, ref: str) -> None:
+        """Delete the Gmail access token stored under a reference."""
+        self._client.delete(self._credentials_key(ref))
+
+    def __len__(self) -> int:
+        """Number of jobs waiting, including delayed retries."""
+        return int(self._client.llen(self._pending_key) or 0) + int(self._client.zcard(self._delayed_key) or 0)
+
+
+def create_outbound_queue(app) -> OutboundQueue:
+    """Create the outbound queue configured for an application.
+
+    Uses Redis when SEND_QUEUE_BACKEND is 'redis' (the default outside of
+    testing) and falls back to an in-memory queue if Redis is unreachable.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        OutboundQueue: The configured queue
+    """
+    backend = app.config.get('SEND_QUEUE_BACKEND') or ('memory' if app.config.get('TESTING') else 'redis')
+    if backend != 'redis':
+        return InMemoryOutboundQueue()
+
+    try:
+        client = create_sync_redis_client(app)
+        logger.info("Outbound email queue using Redis")
+        return RedisOutboundQueue(
+            client,
+            status_ttl=app.config.get('SEND_QUEUE_STATUS_TTL', 86400),
+            claim_timeout=app.config.get('SEND_QUEUE_CLAIM_TIMEOUT', 300)
+        )
+    except Exception as e:
+        logger.warning(f"Redis unavailable for outbound queue, using in-memory queue: {e}")
+        return InMemoryOutboundQueue()
+
+
+class OutboundSender:
+    """Background sender that drains an outbound queue.
+
+    The sender runs its own event loop on a daemon thread, so SMTP sessions
+    stay pooled across sends and Gmail credentials refreshed by one send are
+    reused by the next. Several consumer tasks run on that loop to overlap
+    network waits.
+
+    Only the user's current Gmail access token and its expiry are queued,
+    stored in the queue backend under a reference the job carries as
+    credentials_ref, so a worker in another process, or after a restart,
+    sends as the user. The refresh token and client secret stay in the
+    session; the worker reads the OAuth client from the application config
+    (GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET). The stored token expires with
+    the access token and is deleted once the job is sent or has failed. A job
+    whose token has expired fails with an error in its status instead of
+    silently changing how it is sent. A Gmail API error still falls back to
+    SMTP, as the route did before the queue.
+
+    Attributes:
+        queue: The outbound queue being drained
+        concurrency: Number of concurrent consumer tasks
+        max_attempts: Attempts per job before it is marked failed
+        base_delay: Initial retry delay in seconds, doubled per attempt
+        poll_interval: Seconds to sleep after the first empty poll
+        max_poll_interval: Upper bound for the sleep, doubled per empty poll
+        sweep_interval: Seconds between checks for expired claims
+        heartbeat_interval: Seconds between claim renewals during a send
+    """
+
+    def __init__(
+        self,
+        queue: OutboundQueue,
+        app=None,
+        concurrency: int = 2,
+        max_attempts: int = 4,
+        base_delay: float = 2.0,
+        max_delay: float = 120.0,
+        poll_interval: float = 0.5,
+        max_poll_interval: float = 30.0,
+        sweep_interval: float = 60.0,
+        heartbeat_interval: float = 60.0
+    ):
+        """Initialize the sender.
+
+        Args:
+            queue: The outbound queue to drain
+            app: Flask application, used for SMTP configuration and activity logging
+            concurrency: Number of concurrent consumer tasks
+            max_attempts: Attempts per job before it is marked failed
+            base_delay: Initial retry delay in seconds, doubled per attempt
+            max_delay: Upper bound for the retry delay
+            poll_interval: Seconds to sleep after the first empty poll
+            max_poll_interval: Upper bound for the sleep, doubled per empty poll
+            sweep_interval: Seconds between checks for expired claims
+            heartbeat_interval: Seconds between claim renewals during a send;
+                must be well below the queue's claim timeout
+        """
+        self.queue = queue
+        self.app = app
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max(poll_interval, max_poll_interval)
+        self.sweep_interval = sweep_interval
+        self.heartbeat_interval = heartbeat_interval
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def submit(self, message: Dict[str, Any], credentials: Optional[Dict[str, Any]] = None) -> str:
+        """Enqueue a message for delivery and make sure the sender is running.
+
+        Args:
+            message: Message fields: to, subject, content, and optionally cc
+                (list), user_email, user_id and original_email_id
+            credentials: Gmail OAuth credentials for message['user_email'];
+                only the access token and its expiry are stored, apart from
+                the job, which refers to them
+
+        Returns:
+            str: Tracking ID for the status endpoint
+        """
+        job_id = uuid.uuid4().hex
+        job = {**message, 'id': job_id, 'attempts': 0, 'queued_at': time.time()}
+        user_email = message.get('user_email')
+        if credentials and user_email:
+            access_token, ttl = self._access_token(user_email, credentials)
+            job['credentials_ref'] = job_id
+            if access_token is not None:
+                self.queue.store_credentials(job_id, access_token, ttl)
+
+        self.queue.set_status(job_id, STATUS_QUEUED, attempts=0, user_id=message.get('user_id'))
+        self.queue.enqueue(job)
+        self.start()
+        self._wake.set()
+        logger.info(f"Queued email {job_id} to {message.get('to')}")
+        return job_id
+
+    @staticmethod
+    def _access_token(user_email: str, credentials: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Get the access token to queue with a job and the seconds it stays valid.
+
+        A token refreshed by an earlier Gmail run is preferred; a token about
+        to expire is refreshed now, while the session's refresh token is at hand.
+
+        Args:
+            user_email: The user's email address
+            credentials: Gmail OAuth credentials from the session
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], int]: The QUEUED_CREDENTIAL_FIELDS
+                of the credentials and their time to live, or (None, 0) if no
+                valid token could be obtained
+        """
+        from app.email.clients.gmail.core.token_cache import token_cache, parse_expiry
+
+        creds = dict(credentials)
+        creds.update(token_cache.get(user_email) or {})
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        expiry = parse_expiry(creds.get('expiry'))
+        if expiry is not None and (expiry - now).total_seconds() < MIN_ACCESS_TOKEN_TTL:
+            creds.update(token_cache.refresh(user_email, creds) or {})
+            expiry = parse_expiry(creds.get('expiry'))
+        ttl = int((expiry - now).total_seconds()) if expiry is not None else DEFAULT_ACCESS_TOKEN_TTL
+        if not creds.get('token') or ttl < MIN_ACCESS_TOKEN_TTL:
+            logger.warning(f"No valid Gmail access token to queue for {user_email}")
+            return None, 0
+        return {field: creds.get(field) for field in QUEUED_CREDENTIAL_FIELDS}, ttl
+
+    def start(self) -> None:
+        """Start the background thread if it is not already running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._wake.clear()
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self._run()),
+                name="outbound-sender",
+                daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the background thread after in-flight sends finish.
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    async def _run(self) -> None:
+        """Run the consumer tasks and the claim sweep until stopped."""
+        await asyncio.gather(self._sweep(), *(self._consume() for _ in range(self.concurrency)))
+
+    async def _consume(self) -> None:
+        """Pull and process jobs until the sender is stopped.
+
+        Each empty poll doubles the sleep before the next one, up to
+        max_poll_interval; a job, or a submit in this process, resets it.
+        """
+        delay = self.poll_interval
+        while not self._stop.is_set():
+            try:
+                job = await asyncio.to_thread(self.queue.dequeue)
+            except Exception as e:
+                logger.error(f"Error reading outbound queue: {e}")
+                job = None
+            if job is None:
+                woken = await self._idle(delay)
+                delay = self.poll_interval if woken else min(self.max_poll_interval, delay * 2)
+                continue
+            delay = self.poll_interval
+            await self.process_job(job)
+
+    async def _idle(self, delay: float) -> bool:
+        """Sleep until the delay passes or a job is submitted.
+
+        Args:
+            delay: Seconds to sleep
+
+        Returns:
+            bool: True if woken by submit or stop
+        """
+        woken = await asyncio.to_thread(self._wake.wait, delay)
+        if woken and not self._stop.is_set():
+            self._wake.clear()
+        return woken
+
+    async def _sweep(self) -> None:
+        """Return jobs with expired claims to the queue every sweep_interval seconds."""
+        while not await asyncio.to_thread(self._stop.wait, self.sweep_interval):
+            try:
+                await asyncio.to_thread(self.queue.requeue_stale)
+            except Exception as e:
+                logger.error(f"Error requeuing stale outbound jobs: {e}")
+
+    def _retry_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given attempt count."""
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def process_job(self, job: Dict[str, Any]) -> str:
+        """Deliver a single job and record its outcome.
+
+        Args:
+            job: Job dictionary from the queue
+
+        Returns:
+            str: The job's resulting status
+        """
+        job_id = job['id']
+        record = self.queue.get_status(job_id)
+        if record and record.get('status') == STATUS_SENT:
+            # A copy requeued after its send completed
+            logger.warning(f"Email {job_id} was already sent, not sending it again")
+            self._finish(job)
+            return STATUS_SENT
+
+        job['attempts'] = job.get('attempts', 0) + 1
+        self.queue.set_status(job_id, STATUS_SENDING, attempts=job['attempts'])
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            sent_via = await self._deliver(job)
+        except Exception as e:
+            permanent = isinstance(e, PermanentSendError)
+            if permanent or job['attempts'] >= self.max_attempts:
+                logger.error(f"Giving up on email {job_id} after {job['attempts']} attempt(s): {e}")
+                self.queue.set_status(job_id, STATUS_FAILED, attempts=job['attempts'], error=str(e))
+                self._finish(job)
+                return STATUS_FAILED
+            delay = self._retry_delay(job['attempts'])
+            logger.warning(f"Email {job_id} failed (attempt {job['attempts']}), retrying in {delay:.1f}s: {e}")
+            self.queue.set_status(job_id, STATUS_RETRYING, attempts=job['attempts'], error=str(e))
+            self.queue.schedule_retry(job, delay)
+            self.queue.ack(job)
+            return STATUS_RETRYING
+        finally:
+            heartbeat.cancel()
+
+        self.queue.set_status(job_id, STATUS_SENT, attempts=job['attempts'], sent_via=sent_via, error=None)
+        self._finish(job)
+        logger.info(f"Email {job_id} sent to {job.get('to')} via {sent_via}")
+        self._log_activity(job, sent_via)
+        return STATUS_SENT
+
+    async def _heartbeat(self, job: Dict[str, Any]) -> None:
+        """Renew a job's claim every heartbeat_interval seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await asyncio.to_thread(self.queue.renew_claim, job)
+            except Exception as e:
+                logger.warning(f"Could not renew the claim on email {job['id']}: {e}")
+
+    def _finish(self, job: Dict[str, Any]) -> None:
+        """Acknowledge a sent or failed job and delete its access token."""
+        self.queue.ack(job)
+        if job.get('credentials_ref'):
+            self.queue.delete_credentials(job['credentials_ref'])
+
+    async def _deliver(self, job: Dict[str, Any]) -> str:
+        """Send a job via the Gmail API when possible, otherwise via SMTP.
+
+        Args:
+            job: Job dictionary from the queue
+
+        Returns:
+            str: 'gmail_api' or 'smtp'
+
+        Raises:
+            EmailSendingError: If the SMTP send fails
+            PermanentSendError: If SMTP is not configured, or the job's Gmail
+                access token is no longer available
+        """
+        user_email = job.get('user_email')
+        credentials = None
+        if job.get('credentials_ref'):
+            credentials = self.queue.get_credentials(job['credentials_ref'])
+            if not credentials:
+                raise PermanentSendError(
+                    f"Gmail credentials for {user_email} are no longer available; sign in again and resend"
+                )
+            config = self.app.config if self.app is not None else {}
+            credentials.update(
+                refresh_token=None,
+                client_id=config.get('GOOGLE_CLIENT_ID'),
+                client_secret=config.get('GOOGLE_CLIENT_SECRET')
+            )
+
+        if credentials:
+            try:
+                from app.email.clients.gmail.client_subprocess import GmailClientSubprocess
+                gmail_client = GmailClientSubprocess()
+                await gmail_client.connect(user_email, credentials=credentials)
+                result = await gmail_client.send_email(
+                    to=job['to'],
+                    subject=job['subject'],
+                    content=job['content'],
+                    cc=job.get('cc'),
+                    html_content=job['content'],  # Content comes from CKEditor
+                    user_email=user_email
+                )
+                if isinstance(result, dict) and result.get('success', False):
+                    if 'label_ids' in result and 'SENT' not in result['label_ids']:
+                        logger.warning("Warning: Message was not automatically labeled as SENT")
+                    return 'gmail_api'
+                logger.error(f"Invalid response from Gmail API: {result}")
+            except Exception as e:
+                logger.error(f"Failed to send email via Gmail API, falling back to SMTP: {e}")
+
+        sender = EmailSender(**self._smtp_config())
+        success = await sender.send_email(
+            to=job['to'],
+            subject=job['subject'],
+            content=job['content'],
+            cc=job.get('cc'),
+            html_content=job['content'],
+            reply_to=user_email
+        )
+        if not success:
+            raise EmailSendingError("Failed to send email")
+        return 'smtp'
+
+    def _smtp_config(self) -> Dict[str, Any]:
+        """Build the SMTP sender configuration from the application config.
+
+        Raises:
+            PermanentSendError: If required SMTP settings are missing
+        """
+        config = self.app.config if self.app is not None else {}
+        email_config = {
+            'server': config.get('SMTP_SERVER'),
+            'email': config.get('SMTP_EMAIL'),
+            'password': config.get('SMTP_PASSWORD'),
+            'port': config.get('SMTP_PORT') or 587,
+            'use_tls': config.get('SMTP_USE_TLS', True),
+            'max_connections': config.get('MAIL_POOL_MAX_CONNECTIONS', 2),
+            'idle_timeout': config.get('MAIL_POOL_IDLE_TIMEOUT', 120)
+        }
+        missing = [name for name, key in (('SMTP_SERVER', 'server'), ('SMTP_EMAIL', 'email'), ('SMTP_PASSWORD', 'password'))
+                   if not email_config[key]]
+        if missing:
+            raise PermanentSendError(f"Email service not configured: missing {', '.join(missing)}")
+        return email_config
+
+    def _log_activity(self, job: Dict[str, Any], sent_via: str) -> None:
+        """Record an 'email_sent' user activity for a delivered job."""
+        user_id = job.get('user_id')
+        if self.app is None or user_id is None:
+            return
+        try:
+            from app.models.activity import log_activity
+            with self.app.app_context():
+                log_activity(
+                    user_id=user_id,
+                    activity_type='email_sent',
+                    description="Email sent",
+                    metadata={
+                        'to': job['to'],
+                        'subject': job['subject'],
+                        'original_email_id': job.get('original_email_id'),
+                        'sent_via': sent_via,
+                        'tracking_id': job['id']
+                    }
+                )
+        except Exception as e:
+            logger.error(f"Failed to log activity: {e}")
@@ -8,11 +8,14 @@ error handling and support for HTML content.
 import smtplib
 import logging
 import asyncio
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.utils import formataddr
 from typing import Optional, Dict, Any, List
 
+from app.email.utils.connection_pool import get_pool
+
 logger = logging.getLogger(__name__)
 
 class EmailSendingError(Exception):
@@ -34,6 +37,7 @@ class EmailSender:
         password (str): Sender's email password
         port (int): SMTP server port
         use_tls (bool): Whether to use TLS connection
+        use_pool (bool): Whether to reuse authenticated SMTP sessions
     """
     
     def __init__(
@@ -42,7 +46,10 @@ class EmailSender:
         email: str,
         password: str,
         port: int = 587,
-        use_tls: bool = True
+        use_tls: bool = True,
+        use_pool: bool = True,
+        max_connections: int = 2,
+        idle_timeout: float = 120.0
     ):
         """
         Initialize the SMTP email client.
@@ -53,6 +60,10 @@ class EmailSender:
             password: Sender's email password
             port: SMTP server port (default 587)
             use_tls: Whether to use TLS connection (default True)
+            use_pool: Whether to reuse authenticated SMTP sessions across sends
+                (default True)
+            max_connections: Maximum concurrent SMTP sessions for this account
+            idle_timeout: Seconds an idle pooled session is kept open
             
         Raises:
             ValueError: If any required parameters are missing or invalid
@@ -65,10 +76,90 @@ class EmailSender:
         self.password = password
         self.port = port
         self.use_tls = use_tls
+        self.use_pool = use_pool
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
         
         # Configure logging
         self.logger = logging.getLogger(__name__)
     
+    def _connect(self) -> smtplib.SMTP:
+        """
+        Open an SMTP session, upgrade it to TLS and log in.
+        
+        Returns:
+            smtplib.SMTP: An authenticated SMTP session
+        """
+        server = smtplib.SMTP(self.server, self.port)
+        try:
+            if self.use_tls:
+                server.starttls()
+            server.login(self.email, self.password)
+        except Exception:
+            server.close()
+            raise
+        return server
+    
+    @staticmethod
+    def _probe(server: smtplib.SMTP) -> bool:
+        """Check that a pooled SMTP session is still alive with NOOP."""
+        return server.noop()[0] == 250
+    
+    @staticmethod
+    def _quit(server: smtplib.SMTP) -> None:
+        """Close an SMTP session, falling back to closing the socket."""
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def _get_pool(self):
+        """Get the shared SMTP session pool for this account."""
+        return get_pool(
+            ("smtp", self.server, self.port, self.email),
+            factory=self._connect,
+            probe=self._probe,
+            closer=self._quit,
+            max_size=self.max_connections,
+            idle_timeout=self.idle_timeout
+        )
+    
+    def _build_message(
+        self,
+        to: str,
+        subject: str,
+        content: str,
+        cc: Optional[List[str]] = None,
+        reply_to: Optional[str] = None,
+        html_content: Optional[str] = None
+    ) -> MIMEMultipart:
+        """
+        Build the MIME message for an email.
+        
+        Args:
+            to: Recipient email address
+            subject: Email subject
+            content: Plain text email content
+            cc: Optional list of CC recipients
+            reply_to: Optional reply-to email address
+            html_content: Optional HTML content (if not provided, content will be used)
+            
+        Returns:
+            MIMEMultipart: The assembled message
+        """
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = formataddr(("Beacon", self.email))
+        msg['To'] = to
+        
+        msg['Cc'] = ', '.join(cc) if cc else None
+        msg['Reply-To'] = reply_to if reply_to else None
+            
+        # Add plain text and HTML parts
+        msg.attach(MIMEText(content, 'plain'))
+        msg.attach(MIMEText(html_content or content, 'html'))
+        return msg
+    
     async def send_email(
         self,
         to: str,
@@ -99,17 +190,7 @@ class EmailSender:
         """
         try:
             # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = formataddr(("Beacon", self.email))
-            msg['To'] = to
-            
-            msg['Cc'] = ', '.join(cc) if cc else None
-            msg['Reply-To'] = reply_to if reply_to else None
-                
-            # Add plain text and HTML parts
-            msg.attach(MIMEText(content, 'plain'))
-            msg.attach(MIMEText(html_content or content, 'html'))
+            msg = self._build_message(to, subject, content, cc, reply_to, html_content)
             
             # Get all recipients
             recipients = [to] + (cc or []) + (bcc or [])
@@ -122,6 +203,84 @@ class EmailSender:
             self.logger.error(error_msg)
             raise EmailSendingError(error_msg)
     
+    async def send_many(self, emails: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Send several emails over a single authenticated SMTP session.
+        
+        Args:
+            emails: List of dictionaries with the keyword arguments accepted by
+                send_email (to, subject, content, cc, bcc, reply_to, html_content)
+                
+        Returns:
+            List[bool]: Per-email delivery result, in input order
+            
+        Raises:
+            EmailSendingError: If no SMTP session could be established
+        """
+        batch = []
+        for email in emails:
+            msg = self._build_message(
+                email['to'], email['subject'], email['content'],
+                email.get('cc'), email.get('reply_to'), email.get('html_content')
+            )
+            recipients = [email['to']] + (email.get('cc') or []) + (email.get('bcc') or [])
+            batch.append((msg, recipients))
+        
+        try:
+            return await asyncio.to_thread(self._send_many_sync, batch)
+        except Exception as e:
+            error_msg = f"SMTP sending failed: {str(e)}"
+            self.logger.error(error_msg)
+            raise EmailSendingError(error_msg)
+    
+    def _send_many_sync(self, batch) -> List[bool]:
+        """
+        Synchronously deliver a batch of messages over one SMTP session.
+        
+        A message rejected by the server is reported as False without
+        aborting the rest of the batch.
+        
+        Args:
+            batch: List of (message, recipients) tuples
+            
+        Returns:
+            List[bool]: Per-message delivery result
+        """
+        results = []
+        with self._session() as server:
+            for msg, recipients in batch:
+                try:
+                    server.sendmail(self.email, recipients, msg.as_string())
+                    results.append(True)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError,
+                        smtplib.SMTPSenderRefused) as e:
+                    self.logger.error(f"SMTP rejected message to {', '.join(recipients)}: {e}")
+                    results.append(False)
+        self.logger.info(f"Sent {sum(results)}/{len(results)} emails over one SMTP session")
+        return results
+    
+    @contextmanager
+    def _session(self):
+        """
+        Check out an authenticated SMTP session.
+        
+        Uses the shared per-account pool when pooling is enabled, otherwise
+        opens a dedicated session that is closed afterwards.
+        
+        Yields:
+            smtplib.SMTP: An authenticated SMTP session
+        """
+        if not self.use_pool:
+            server = self._connect()
+            try:
+                yield server
+            finally:
+                self._quit(server)
+            return
+        
+        with self._get_pool().connection() as server:
+            yield server
+
     async def _send_message(self, msg, recipients):
         """
         Send the email message via SMTP.
@@ -156,13 +315,16 @@ class EmailSender:
             bool: True if email was sent successfully
         """
         try:
-            with smtplib.SMTP(self.server, self.port) as server:
-                if self.use_tls:
-                    server.starttls()
-                server.login(self.email, self.password)
-                server.sendmail(self.email, recipients, msg.as_string())
-                self.logger.info(f"Email sent successfully to {', '.join(recipients)}")
-                return True
+            try:
+                with self._session() as server:
+                    server.sendmail(self.email, recipients, msg.as_string())
+            except smtplib.SMTPServerDisconnected:
+                # A pooled session dropped between probe and use; retry on a fresh one
+                self.logger.debug("Pooled SMTP session disconnected, retrying once")
+                with self._session() as server:
+                    server.sendmail(self.email, recipients, msg.as_string())
+            self.logger.info(f"Email sent successfully to {', '.join(recipients)}")
+            return True
         except Exception as e:
             self.logger.error(f"SMTP error: {str(e)}")
             raise 
\ No newline at end of file
@@ -66,6 +66,32 @@ class EmailCache(ABC):
         """
         pass
 
+    async def get_thread_summaries(self, user_email: str, thread_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve stored thread-level summaries.
+        
+        Caches that do not store thread summaries return an empty mapping.
+        
+        Args:
+            user_email: The user's email address.
+            thread_ids: Provider thread IDs to look up.
+            
+        Returns:
+            Mapping of thread ID to its stored summary record.
+        """
+        return {}
+
+    async def store_thread_summaries(self, user_email: str, summaries: Dict[str, Dict[str, Any]], ttl_days: Optional[int] = None) -> None:
+        """Store thread-level summaries.
+        
+        Caches that do not store thread summaries ignore the call.
+        
+        Args:
+            user_email: The user's email address.
+            summaries: Mapping of thread ID to summary record.
+            ttl_days: Optional override for the TTL in days. Defaults to None.
+        """
+        return None
+
 # Factory function to get the appropriate cache implementation
 def get_email_cache(config: Dict[str, Any]) -> 'EmailCache':
     """Get an email cache implementation based on configuration.
@@ -49,6 +49,7 @@ class RedisEmailCache(EmailCache):
         self.get_redis_client = get_redis_client
         self.ttl = timedelta(days=ttl_days)
         self._base_prefix = "email:"
+        self._thread_prefix = "thread:"
         self.logger = logging.getLogger(__name__)
         
     def _get_key_prefix(self, user_email: str) -> str:
@@ -69,6 +70,21 @@ class RedisEmailCache(EmailCache):
         email_hash = hashlib.sha256(user_email.lower().encode()).hexdigest()[:12]
         return f"{self._base_prefix}{email_hash}:"
 
+    def _get_thread_key(self, user_email: str, thread_id: str) -> str:
+        """Get the cache key for a user's thread summary.
+        
+        Thread keys use their own prefix so email scans never see them.
+        
+        Args:
+            user_email: The user's email address.
+            thread_id: Provider thread ID.
+            
+        Returns:
+            Redis key for the thread summary.
+        """
+        email_hash = self._get_key_prefix(user_email)[len(self._base_prefix):]
+        return f"{self._thread_prefix}{email_hash}{thread_id}"
+
     async def _ensure_redis_connection(self, user_email: str) -> Redis:
         """Ensure Redis connection is active and working.
         
@@ -273,6 +289,32 @@ class RedisEmailCache(EmailCache):
             self.logger.error(f"Error fetching emails from Redis: {e}")
             return []
 
+    async def get_all_emails(self, limit: Optional[int] = None) -> List[ProcessedEmail]:
+        """Read the cached emails of all users, e.g. to train the local classifier.
+
+        Entries are read as they are; nothing is expired or deleted.
+
+        Args:
+            limit: Maximum number of emails to read. Defaults to all.
+
+        Returns:
+            List of cached processed emails.
+
+        Raises:
+            Exception: If Redis operations fail.
+        """
+        redis = self.get_redis_client()
+        if not redis:
+            raise ValueError("Failed to get Redis client")
+        keys = await self._scan_keys(redis, f"{self._base_prefix}*")
+        emails = []
+        for key in keys[:limit] if limit else keys:
+            email, _ = await self._process_cache_entry(redis, key)
+            if email:
+                emails.append(email)
+        self.logger.info(f"Read {len(emails)} cached emails from {len(keys)} entries")
+        return emails
+
     async def store_many(self, emails: List[ProcessedEmail], user_email: str, ttl_days: Optional[int] = None) -> None:
         """Store multiple emails in cache for a specific user.
         
@@ -336,6 +378,53 @@ class RedisEmailCache(EmailCache):
             self.logger.error(f"Error in store_many: {e}")
             raise
 
+    async def get_thread_summaries(self, user_email: str, thread_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Retrieve stored thread-level summaries for a user.
+        
+        Args:
+            user_email: The user's email address.
+            thread_ids: Provider thread IDs to look up.
+            
+        Returns:
+            Mapping of thread ID to its stored summary record; missing or
+            unreadable entries are omitted.
+        """
+        validate_user_email(user_email)
+        if not thread_ids:
+            return {}
+        
+        redis = await self._ensure_redis_connection(user_email)
+        summaries = {}
+        for thread_id in thread_ids:
+            try:
+                data = await redis.get(self._get_thread_key(user_email, thread_id))
+                if data:
+                    summaries[thread_id] = json.loads(data)
+            except Exception as e:
+                self.logger.warning(f"Failed to read thread summary {thread_id}: {e}")
+        return summaries
+
+    async def store_thread_summaries(self, user_email: str, summaries: Dict[str, Dict[str, Any]], ttl_days: Optional[int] = None) -> None:
+        """Store thread-level summaries for a user.
+        
+        Args:
+            user_email: The user's email address.
+            summaries: Mapping of thread ID to summary record.
+            ttl_days: Optional override for the TTL in days. Defaults to None.
+        """
+        validate_user_email(user_email)
+        if not summaries or ttl_days == 0:
+            return
+        
+        redis = await self._ensure_redis_connection(user_email)
+        ttl_seconds = int(timedelta(days=(ttl_days or self.ttl.days)).total_seconds())
+        for thread_id, summary in summaries.items():
+            try:
+                await redis.setex(self._get_thread_key(user_email, thread_id), ttl_seconds, json.dumps(summary))
+            except Exception as e:
+                self.logger.warning(f"Failed to store thread summary {thread_id}: {e}")
+        self.logger.debug(f"Stored {len(summaries)} thread summaries")
+
     async def clear_cache(self, user_email: str) -> None:
         """Flush all cached emails for a specific user.
         
@@ -350,9 +439,10 @@ class RedisEmailCache(EmailCache):
         try:
             redis = await self._ensure_redis_connection(user_email)
             
-            # Only clear keys for the specific user
+            # Only clear keys for the specific user, including thread summaries
             pattern = f"{self._get_key_prefix(user_email)}*"
             keys = await self._scan_keys(redis, pattern)
+            keys += await self._scan_keys(redis, f"{self._get_thread_key(user_email, '')}*")
             
             deleted_count, failed_count = await self._delete_keys(redis, keys)
                 
@@ -0,0 +1,239 @@
+"""Connection pooling for blocking mail protocol clients.
+
+This module provides a small thread-safe pool for authenticated IMAP and SMTP
+connections. Both protocols are driven through blocking client libraries run
+in worker threads, so the pool hands out connections synchronously and keeps
+them logged in between operations. Idle connections are probed with NOOP
+before reuse and closed after an idle timeout, and a semaphore caps how many
+connections a single account may hold open at once.
+
+Typical usage:
+    pool = get_pool(("smtp", server, port, email), factory=connect, probe=noop, closer=quit)
+    with pool.connection() as conn:
+        conn.sendmail(...)
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPoolTimeout(Exception):
+    """Exception raised when no pooled connection becomes available in time."""
+    pass
+
+
+@dataclass
+class _PooledConnection:
+    """A pooled connection and its bookkeeping timestamps."""
+    conn: Any
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class ConnectionPool:
+    """Thread-safe pool of authenticated connections for a single account.
+
+    Attributes:
+        max_size: Maximum number of connections open at once
+        idle_timeout: Seconds after which an idle connection is closed
+        probe_interval: Idle seconds after which a connection is probed before reuse
+        acquire_timeout: Seconds to wait for a free connection before failing
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        probe: Optional[Callable[[Any], bool]] = None,
+        closer: Optional[Callable[[Any], None]] = None,
+        max_size: int = 4,
+        idle_timeout: float = 300.0,
+        probe_interval: float = 30.0,
+        acquire_timeout: float = 30.0
+    ):
+        """Initialize the pool.
+
+        Args:
+            factory: Creates a new connected and authenticated connection
+            probe: Returns True if an idle connection is still usable (e.g. NOOP)
+            closer: Closes a connection (e.g. LOGOUT/QUIT); errors are ignored
+            max_size: Maximum number of connections open at once
+            idle_timeout: Seconds after which an idle connection is closed
+            probe_interval: Idle seconds after which a connection is probed before reuse
+            acquire_timeout: Seconds to wait for a free connection before failing
+        """
+        self._factory = factory
+        self._probe = probe
+        self._closer = closer
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.probe_interval = probe_interval
+        self.acquire_timeout = acquire_timeout
+        self._idle: List[_PooledConnection] = []
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, idle or in use."""
+        with self._lock:
+            return len(self._idle) + len(self._in_use)
+
+    def _close_quietly(self, pooled: _PooledConnection) -> None:
+        """Close a connection, ignoring errors from an already broken socket."""
+        if self._closer is None:
+            return
+        try:
+            self._closer(pooled.conn)
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+    def _is_usable(self, pooled: _PooledConnection) -> bool:
+        """Check whether an idle connection can be handed out again."""
+        idle_for = time.monotonic() - pooled.last_used
+        if idle_for > self.idle_timeout:
+            return False
+        if self._probe is None or idle_for < self.probe_interval:
+            return True
+        try:
+            return bool(self._probe(pooled.conn))
+        except Exception as e:
+            logger.debug(f"Pooled connection failed keep-alive probe: {e}")
+            return False
+
+    def acquire(self) -> Any:
+        """Check out a connection, reusing an idle one when possible.
+
+        Returns:
+            A connected, authenticated connection
+
+        Raises:
+            ConnectionPoolTimeout: If the pool stays exhausted for acquire_timeout
+            Exception: Any error raised by the factory when opening a connection
+        """
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            raise ConnectionPoolTimeout(
+                f"No pooled connection available after {self.acquire_timeout}s (max {self.max_size})"
+            )
+        try:
+            while True:
+                with self._lock:
+                    pooled = self._idle.pop() if self._idle else None
+                if pooled is None:
+                    break
+                if self._is_usable(pooled):
+                    pooled.last_used = time.monotonic()
+                    with self._lock:
+                        self._in_use[id(pooled.conn)] = pooled
+                    return pooled.conn
+                self._close_quietly(pooled)
+
+            pooled = _PooledConnection(self._factory())
+            with self._lock:
+                self._in_use[id(pooled.conn)] = pooled
+            return pooled.conn
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Return a connection to the pool.
+
+        Args:
+            conn: A connection previously returned by acquire()
+            discard: Close the connection instead of keeping it, e.g. after an
+                error left it in an unknown state
+        """
+        with self._lock:
+            pooled = self._in_use.pop(id(conn), None)
+        if pooled is None:
+            return
+        try:
+            if discard or self._closed:
+                self._close_quietly(pooled)
+            else:
+                pooled.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        """Context manager that checks out a connection and returns it afterwards.
+
+        The connection is discarded if the block raises.
+
+        Yields:
+            A connected, authenticated connection
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        else:
+            self.release(conn)
+
+    def prune(self) -> int:
+        """Close idle connections that exceeded the idle timeout.
+
+        Returns:
+            int: Number of connections closed
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [p for p in self._idle if now - p.last_used > self.idle_timeout]
+            self._idle = [p for p in self._idle if now - p.last_used <= self.idle_timeout]
+        for pooled in expired:
+            self._close_quietly(pooled)
+        return len(expired)
+
+    def close(self) -> None:
+        """Close all idle connections; in-use ones are closed when released."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for pooled in idle:
+            self._close_quietly(pooled)
+
+
+_pools: Dict[Hashable, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key: Hashable, factory: Callable[[], Any], **kwargs) -> ConnectionPool:
+    """Get or create the process-wide pool for an account.
+
+    Args:
+        key: Identifies the account, e.g. ("smtp", server, port, email)
+        factory: Creates a new connection for this account
+        **kwargs: Additional ConnectionPool arguments used when the pool is created
+
+    Returns:
+        ConnectionPool: The shared pool for this key
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(factory, **kwargs)
+            _pools[key] = pool
+    pool.prune()
+    return pool
+
+
+def close_all_pools() -> None:
+    """Close every pooled connection in this process."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
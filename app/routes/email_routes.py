@@ -197,6 +197,8 @@ def stream_email_analysis():
                                 yield f'event: status\ndata: {json.dumps(msg_data)}\n\n'
                             elif msg_type == 'cached':
                                 yield f'event: cached\ndata: {json.dumps(msg_data)}\n\n'
+                            elif msg_type == 'partial':
+                                yield f'event: partial\ndata: {json.dumps(msg_data)}\n\n'
                             elif msg_type == 'batch':
                                 yield f'event: batch\ndata: {json.dumps(msg_data)}\n\n'
                             elif msg_type == 'initial_stats':
@@ -233,15 +235,8 @@ def stream_email_analysis():
                         if hasattr(current_app.pipeline.connection, 'disconnect'):
                             loop.run_until_complete(current_app.pipeline.connection.disconnect())
                         
-                        # Ensure any OpenAI client connections are properly closed
-                        # Get the OpenAI client and close it
-                        if hasattr(current_app, 'get_openai_client'):
-                            openai_client = current_app.get_openai_client()
-                            if openai_client and hasattr(openai_client, 'close'):
-                                loop.run_until_complete(openai_client.close())
-                            elif openai_client and hasattr(openai_client.http_client, 'aclose'):
-                                # If the client has an internal httpx client, close that too
-                                loop.run_until_complete(openai_client.http_client.aclose()) 
+                        # The OpenAI client is shared by the worker and stays open
+                        # (closed on lifespan shutdown) to keep its connections warm
                         
                         # Run a final garbage collection to clean up any remaining resources
                         gc.collect()
@@ -312,22 +307,22 @@ def run_async(coroutine):
 def send_email():
     """API endpoint to send an email response.
     
-    Processes the email data from the request and sends it using either
-    the Gmail API (if connected) or SMTP. Logs the activity upon success.
+    Validates the email data from the request and queues it for delivery.
+    A background sender delivers it using either the Gmail API (if connected)
+    or SMTP and logs the activity upon success, so the request returns as
+    soon as the message is queued.
     
     Returns:
-        JSON response: Success status and message.
+        JSON response: Success status, tracking ID and initial status (202).
         
     Raises:
-        Exception: If there's an error sending the email, returns a 500 error with details.
+        Exception: If the email cannot be queued, returns a 500 error with details.
     """
     try:
-        # Log the request details
         logger.debug(f"Request to send_email: {request.path}, method: {request.method}")
-        logger.debug(f"Request headers: {dict(request.headers)}")
         
         # Get data from request
-        data = request.json
+        data = request.json or {}
         to = data.get('to')
         subject = data.get('subject')
         content = data.get('content')
@@ -341,188 +336,76 @@ def send_email():
                 'message': 'Missing required fields'
             }), 400
         
-        # Log the email sending attempt
-        logger.info(f"Sending email to: {to}, subject: {subject}")
-        
         # Process CC recipients if provided
         cc_list = None
         if cc:
             cc_list = [email.strip() for email in cc.split(',') if email.strip()]
         
-        # Check if user is authenticated with Gmail
-        user_email = None
-        send_via_gmail = False
-        gmail_client = None
-        
-        if 'user' in session and 'email' in session['user']:
-            user_email = session['user']['email']
-            
-            # Check if Gmail credentials are available
-            if 'credentials' in session:
-                send_via_gmail = True
-                
-                # Initialize Gmail client
-                try:
-                    from app.email.clients.gmail.client_subprocess import GmailClientSubprocess
-                    gmail_client = GmailClientSubprocess()
-                    # Connect to Gmail API using our async runner
-                    run_async(gmail_client.connect(user_email))
-                    logger.debug(f"Will send email via Gmail API as {user_email}")
-                except Exception as e:
-                    import traceback
-                    logger.error(f"Failed to initialize Gmail client: {e}")
-                    logger.error(f"Gmail client initialization traceback: {traceback.format_exc()}")
-                    send_via_gmail = False
+        user = session.get('user', {})
+        user_email = user.get('email')
         
-        success = False
-        
-        if send_via_gmail and gmail_client:
-            try:
-                # Send email via Gmail API using our async runner
-                result = run_async(gmail_client.send_email(
-                    to=to,
-                    subject=subject,
-                    content=content,
-                    cc=cc_list,
-                    html_content=content,  # Use the same content for HTML (it's from CKEditor)
-                    user_email=user_email
-                ))
-                
-                # Log detailed information about the result
-                logger.debug(f"Gmail API send result: {result}")
-                
-                # If we get here, email was sent successfully - but double check the result
-                if isinstance(result, dict) and result.get('success', False):
-                    success = True
-                    logger.info(f"Email sent successfully via Gmail API to {to}\n")
-                    if 'message_id' in result:
-                        logger.debug(f"Message ID: {result['message_id']}")
-                        logger.debug(f"Thread ID: {result.get('thread_id')}")
-                        logger.debug(f"Label IDs: {result.get('label_ids', [])}")
-                        
-                        # Check if the message was properly labeled as SENT
-                        if 'label_ids' in result and 'SENT' not in result['label_ids']:
-                            logger.warning(f"Warning: Message was not automatically labeled as SENT")
-                else:
-                    logger.error(f"Invalid response from Gmail API: {result}")
-                    success = False
-                    
-            except Exception as e:
-                import traceback
-                logger.error(f"Failed to send email via Gmail API: {e}")
-                logger.error(f"Gmail API traceback: {traceback.format_exc()}")
-                # Fall back to SMTP if Gmail API fails
-                send_via_gmail = False
-                success = False
+        # Gmail credentials are stored apart from the queued job, which refers to them
+        credentials = session.get('credentials') if user_email else None
         
-        # Fall back to SMTP if not using Gmail or if Gmail API failed
-        if not send_via_gmail:
-            # Initialize email sender with SMTP configuration
-            email_config = {
-                'server': current_app.config.get('SMTP_SERVER'),
-                'email': current_app.config.get('SMTP_EMAIL'),
-                'password': current_app.config.get('SMTP_PASSWORD'),
-                'port': current_app.config.get('SMTP_PORT'),
-                'use_tls': current_app.config.get('SMTP_USE_TLS')
-            }
-            
-            # Log the SMTP configuration (without sensitive info)
-            logger.info(f"SMTP configuration: server={email_config['server']}, email={email_config['email']}, port={email_config['port']}, use_tls={email_config['use_tls']}")
-            
-            # Check if email configuration is complete
-            if not all([email_config['server'], email_config['email'], email_config['password']]):
-                missing_fields = []
-                if not email_config['server']:
-                    missing_fields.append('SMTP_SERVER')
-                if not email_config['email']:
-                    missing_fields.append('SMTP_EMAIL')
-                if not email_config['password']:
-                    missing_fields.append('SMTP_PASSWORD')
-                    
-                logger.error(f"Missing SMTP configuration: {', '.join(missing_fields)}")
-                
-                # Check if fallbacks are configured correctly
-                logger.error(f"Checking fallbacks - SMTP_EMAIL fallback to EMAIL: {current_app.config.get('EMAIL')}")
-                logger.error(f"Checking fallbacks - SMTP_PASSWORD fallback to IMAP_PASSWORD: {current_app.config.get('IMAP_PASSWORD') is not None}")
-                
-                return jsonify({
-                    'success': False,
-                    'message': f'Email service not configured: missing {", ".join(missing_fields)}'
-                }), 500
-            
-            try:
-                # Create email sender and send the email
-                from app.email.processing.sender import EmailSender, EmailSendingError
-                sender = EmailSender(**email_config)
-                
-                # Set reply-to as the user's email if available
-                reply_to = user_email if user_email else None
-                
-                # Run the async send_email method using our async runner
-                success = run_async(sender.send_email(
-                    to=to,
-                    subject=subject,
-                    content=content,
-                    cc=cc_list,
-                    html_content=content,  # Use the same content for HTML (it's from CKEditor)
-                    reply_to=reply_to
-                ))
-                
-                if not success:
-                    raise EmailSendingError("Failed to send email")
-                    
-            except EmailSendingError as e:
-                import traceback
-                logger.error(f"Failed to send email via SMTP: {str(e)}")
-                logger.error(f"SMTP traceback: {traceback.format_exc()}")
-                return jsonify({
-                    'success': False,
-                    'message': f'Failed to send email: {str(e)}'
-                }), 500
-        
-        # # If this is a response to an existing email, update its status.
-        # if original_email_id:
-        #     # In a real app, you would update the database
-        #     logger.debug(f"Marking email {original_email_id} as responded")
-        
-        # Log user activity
-        if 'user' in session and 'id' in session['user']:
-            user_id = session['user']['id']
-            try:
-                # Direct call to log_activity
-                log_activity(
-                    user_id=user_id,
-                    activity_type='email_sent',
-                    description="Email sent",
-                    metadata={
-                        'to': to,
-                        'subject': subject,
-                        'original_email_id': original_email_id,
-                        'sent_via': 'gmail_api' if send_via_gmail else 'smtp'
-                    }
-                )
-            except Exception as log_error:
-                logger.error(f"Failed to log activity: {log_error}")
-                # Don't fail the request if logging fails
+        tracking_id = current_app.outbound_sender.submit(
+            {
+                'to': to,
+                'subject': subject,
+                'content': content,
+                'cc': cc_list,
+                'original_email_id': original_email_id,
+                'user_email': user_email,
+                'user_id': user.get('id')
+            },
+            credentials=credentials
+        )
+        logger.info(f"Queued email to: {to}, subject: {subject} (tracking ID {tracking_id})")
         
-        # Return success response
         return jsonify({
             'success': True,
-            'message': 'Email sent successfully',
-            'sent_via': 'gmail_api' if send_via_gmail else 'smtp'
-        })
+            'message': 'Email queued for delivery',
+            'tracking_id': tracking_id,
+            'status': 'queued'
+        }), 202
         
     except Exception as e:
         import traceback
         logger.error(f"Error in send_email route: {e}")
         logger.error(f"Complete traceback: {traceback.format_exc()}")
         
-        # Check configuration state
-        logger.error(f"App config SMTP_SERVER: {current_app.config.get('SMTP_SERVER')}")
-        logger.error(f"App config SMTP_EMAIL: {current_app.config.get('SMTP_EMAIL')}")
-        logger.error(f"App config SMTP_PASSWORD exists: {current_app.config.get('SMTP_PASSWORD') is not None}")
-        
         return jsonify({
             'success': False,
             'message': f'An unexpected error occurred: {str(e)}'
-        }), 500
\ No newline at end of file
+        }), 500
+
+@email_bp.route('/api/emails/send_status/<tracking_id>', methods=['GET'])
+@login_required
+def send_status(tracking_id):
+    """API endpoint to check the delivery status of a queued email.
+    
+    Args:
+        tracking_id: Tracking ID returned by the send_email endpoint.
+    
+    Returns:
+        JSON response: The job's status ('queued', 'sending', 'retrying',
+        'sent' or 'failed'), attempts, and sent_via/error when known.
+        Returns 404 if the tracking ID is unknown, expired, or belongs to
+        another user.
+    """
+    record = current_app.send_queue.get_status(tracking_id)
+    user_id = session.get('user', {}).get('id')
+    if not record or record.get('user_id') != user_id:
+        return jsonify({
+            'success': False,
+            'message': 'Unknown tracking ID'
+        }), 404
+    
+    return jsonify({
+        'success': record['status'] != 'failed',
+        'tracking_id': tracking_id,
+        'status': record['status'],
+        'attempts': record.get('attempts', 0),
+        'sent_via': record.get('sent_via'),
+        'error': record.get('error'),
+        'updated_at': record.get('updated_at')
+    })
\ No newline at end of file
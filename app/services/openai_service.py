@@ -1,107 +1,282 @@
 """OpenAI client service.
 
-This module provides initialization and management of OpenAI client instances,
-ensuring proper resource cleanup and connection handling.
+This module provides one persistent AsyncOpenAI client per worker process,
+with a tuned httpx connection pool (keep-alive, HTTP/2 when the h2 package is
+installed, limits from the configuration), so LLM requests reuse warm
+connections instead of paying TCP and TLS handshakes on every analysis run.
+
+Routes run their async work on a new event loop per request, and httpx
+connections can't be shared across event loops. The client therefore lives on
+a dedicated event loop thread owned by OpenAIClientManager. Callers get a thin
+proxy: API calls made through it run on the client loop, and the caller's loop
+awaits the result, so the client can be used from any route as before.
+
+The manager starts at ASGI lifespan startup (or on first use) and closes the
+client on lifespan shutdown. A forked worker starts its own client.
 
 Typical usage example:
     from app.services.openai_service import init_openai_client
     init_openai_client(app)
+    client = app.get_openai_client()
+    response = await client.chat.completions.create(...)
 """
 
 import os
 import logging
 import asyncio
+import importlib.util
+import inspect
 import multiprocessing
-from flask import g, current_app
+import threading
+from typing import Any, Optional
+
+import httpx
+from flask import current_app
 from openai import AsyncOpenAI
 
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the client loop to start or shut down
+LOOP_TIMEOUT = 10.0
+
+# Modules of objects reached through the client that are proxied: API
+# resources, and raw responses whose parse() returns a stream
+PROXIED_MODULES = ('openai.resources', 'openai._legacy_response', 'openai._response')
+
+
+def _bind(value: Any, loop: asyncio.AbstractEventLoop) -> Any:
+    """Wrap a value reached through a client proxy.
+
+    Coroutines are run on the client loop; streams, client objects, API
+    resources, raw responses and their methods are proxied; everything else
+    (data, models) is returned unchanged.
+
+    Args:
+        value: Attribute value or call result
+        loop: The client's event loop
+
+    Returns:
+        The value, a proxy, or an awaitable running on the client loop
+    """
+    if inspect.iscoroutine(value):
+        return _run_on_loop(value, loop)
+    if hasattr(value, '__aiter__'):
+        return _LoopBoundStream(value, loop)
+    if (isinstance(value, AsyncOpenAI) or callable(value)
+            or type(value).__module__.startswith(PROXIED_MODULES)):
+        return _LoopBoundProxy(value, loop)
+    return value
+
+
+async def _run_on_loop(coro, loop: asyncio.AbstractEventLoop) -> Any:
+    """Run a coroutine on the client loop and await it from the caller's loop.
+
+    Args:
+        coro: Coroutine created by the client
+        loop: The client's event loop
+
+    Returns:
+        The coroutine's result, proxied if it is a stream or raw response
+    """
+    result = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+    return _bind(result, loop)
+
+
+class _LoopBoundProxy:
+    """Proxy forwarding attribute access and calls to an object on the client loop."""
+
+    __slots__ = ('_target', '_loop')
+
+    def __init__(self, target: Any, loop: asyncio.AbstractEventLoop):
+        self._target = target
+        self._loop = loop
+
+    def __getattr__(self, name: str) -> Any:
+        return _bind(getattr(self._target, name), self._loop)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return _bind(self._target(*args, **kwargs), self._loop)
+
+    def __repr__(self) -> str:
+        return f"<loop-bound {self._target!r}>"
+
+
+class _LoopBoundStream:
+    """Async iterator over a response stream that is read on the client loop."""
+
+    def __init__(self, stream: Any, loop: asyncio.AbstractEventLoop):
+        self._stream = stream
+        self._loop = loop
+
+    def __getattr__(self, name: str) -> Any:
+        return _bind(getattr(self._stream, name), self._loop)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(self._stream.__anext__(), self._loop)
+        )
+
+
+class OpenAIClientManager:
+    """Owns a worker's persistent AsyncOpenAI client and the loop it runs on.
+
+    Attributes:
+        api_key (str): OpenAI API key.
+        timeout (float): Request timeout in seconds.
+        max_connections (int): Maximum open connections.
+        max_keepalive_connections (int): Maximum idle connections kept alive.
+        keepalive_expiry (float): Seconds an idle connection is kept.
+        http2 (bool): Whether HTTP/2 is used (requires the h2 package).
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 60.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        http2: bool = True,
+        base_url: Optional[str] = None
+    ):
+        """Initialize the manager; the client is created by start().
+
+        Args:
+            api_key: OpenAI API key
+            timeout: Request timeout in seconds
+            max_connections: Maximum open connections
+            max_keepalive_connections: Maximum idle connections kept alive
+            keepalive_expiry: Seconds an idle connection is kept
+            http2: Use HTTP/2 if the h2 package is installed
+            base_url: API base URL, or None for the default
+        """
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and importlib.util.find_spec('h2') is not None
+        self.base_url = base_url
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._proxy: Optional[_LoopBoundProxy] = None
+        self._pid: Optional[int] = None
+
+    def start(self) -> None:
+        """Start the client loop and create the client, if not already running in this process."""
+        with self._lock:
+            if self._proxy is not None and self._pid == os.getpid():
+                return
+            # After a fork the parent's loop thread doesn't exist in this process
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run_loop, name='openai-client-loop', daemon=True)
+            thread.start()
+            if not ready.wait(LOOP_TIMEOUT):
+                raise RuntimeError("OpenAI client loop did not start")
+
+            http_client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                )
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self.timeout,
+                http_client=http_client
+            )
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            self._proxy = _LoopBoundProxy(self._client, loop)
+        logger.info(
+            f"OpenAI client started (PID: {os.getpid()}, http2: {self.http2}, "
+            f"max_connections: {self.max_connections}, keepalive: {self.max_keepalive_connections})"
+        )
+
+    def get_client(self) -> _LoopBoundProxy:
+        """Get the persistent client, starting it on first use.
+
+        Returns:
+            Proxy to the AsyncOpenAI client, usable from any event loop
+        """
+        if self._proxy is None or self._pid != os.getpid():
+            self.start()
+        return self._proxy
+
+    def close(self) -> None:
+        """Close the client and stop its loop."""
+        with self._lock:
+            client, loop, thread = self._client, self._loop, self._thread
+            owned = self._pid == os.getpid()
+            self._client = self._loop = self._thread = self._proxy = self._pid = None
+        if client is None or not owned:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(client.close(), loop).result(LOOP_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Error closing OpenAI client: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(LOOP_TIMEOUT)
+        loop.close()
+        logger.info("OpenAI client closed")
+
+
 def init_openai_client(app):
-    """Initialize OpenAI client with API key configuration.
-    
+    """Initialize the OpenAI client manager for the application.
+
     Args:
         app: Flask application instance
-    
+
     Raises:
         ValueError: If OpenAI API key is missing or invalid
         Exception: For other initialization errors
     """
-
-    # Initialize logger at module level
-    logger = logging.getLogger(__name__)
-
     try:
         # Check for API key
         openai_api_key = app.config.get('OPENAI_API_KEY')
         if not openai_api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY in the configuration.")
-            
+
         logger.info("Initializing OpenAI client")
-        
-        # Create a function to get or create the OpenAI client
-        def get_openai_client():
-            """Get or create an OpenAI client for the current request context.
-            
-            This function returns an AsyncOpenAI client from the Flask application
-            context or creates a new one if it doesn't exist. The client is configured
-            with the application's API key and a reasonable timeout setting.
-            
-            Returns:
-                AsyncOpenAI: A configured OpenAI client instance
-            """
-            if 'async_openai_client' not in g:
-                g.async_openai_client = AsyncOpenAI(
-                    api_key=app.config['OPENAI_API_KEY'],
-                    timeout=60.0  # Set a reasonable timeout
-                )
-            return g.async_openai_client
-        
-        # Modified teardown function to run the async cleanup
-        def teardown_openai_client(e=None):
-            """
-            Flask teardown function that handles the async cleanup of OpenAI client.
-            
-            This function is registered with Flask's teardown_appcontext to ensure
-            proper cleanup of OpenAI client resources when the application context ends.
-            
-            Args:
-                e: Optional exception that caused the context to end
-            """
-            try:
-                # In a Flask context, we need to perform a non-async cleanup
-                # since we can't rely on the event loop being available or active
-                client = g.pop('async_openai_client', None)
-                if client is not None:
-                    try:
-                        # For HTTPX clients and other clients with async methods,
-                        # we can access the underlying client but we can't await its methods
-                        # So we manually close the synchronous resources and log the rest
-                        if hasattr(client._client, '_pool'):
-                            client._client._pool.close()
-                        logger.debug("OpenAI client resources released")
-                    except Exception as ex:
-                        logger.warning(f"Error during OpenAI client cleanup: {ex}")
-                    finally:
-                        try:
-                            asyncio.create_task(client.aclose())
-                        except Exception as e:
-                            logger.debug(f"Error closing OpenAI client: {e}")
-                        client = None
-            except Exception as ex:
-                logger.warning(f"Error during OpenAI client cleanup: {ex}")
-        
-        # Store the getter and closer functions in the app
-        app.get_openai_client = get_openai_client
-        app.close_openai_client = teardown_openai_client
+
+        manager = OpenAIClientManager(
+            api_key=openai_api_key,
+            timeout=app.config.get('OPENAI_TIMEOUT', 60.0),
+            max_connections=app.config.get('OPENAI_MAX_CONNECTIONS', 20),
+            max_keepalive_connections=app.config.get('OPENAI_MAX_KEEPALIVE_CONNECTIONS', 10),
+            keepalive_expiry=app.config.get('OPENAI_KEEPALIVE_EXPIRY', 60.0),
+            http2=app.config.get('OPENAI_HTTP2', True)
+        )
+
+        # Store the manager and its getter and closer in the app
+        app.openai_client_manager = manager
+        app.get_openai_client = manager.get_client
+        app.close_openai_client = manager.close
 
         # Log initialization status based on process type
         if multiprocessing.parent_process():
             logger.debug(f"OpenAI client initialized successfully for worker process (PID: {os.getpid()})")
-        
+
     except ValueError as e:
-        logger = getattr(current_app, 'logger', logging.getLogger(__name__))
-        logger.error(f"Failed to initialize OpenAI client: {str(e)}")
+        app_logger = getattr(current_app, 'logger', logger)
+        app_logger.error(f"Failed to initialize OpenAI client: {str(e)}")
         raise
     except Exception as e:
-        logger = getattr(current_app, 'logger', logging.getLogger(__name__))
-        logger.error(f"Unexpected error initializing OpenAI client: {str(e)}")
-        raise 
\ No newline at end of file
+        app_logger = getattr(current_app, 'logger', logger)
+        app_logger.error(f"Unexpected error initializing OpenAI client: {str(e)}")
+        raise
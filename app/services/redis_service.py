@@ -6,6 +6,9 @@ ensuring proper connection pooling and resource cleanup.
 Typical usage example:
     from app.services.redis_service import init_redis_client
     init_redis_client(app)
+
+    # Synchronous client for background threads
+    client = create_sync_redis_client(app)
 """
 
 import os
@@ -15,6 +18,31 @@ from flask import g
 
 logger = logging.getLogger(__name__)
 
+def create_sync_redis_client(app):
+    """Create a synchronous Redis client for work outside a request.
+
+    Background services (the outbound send queue, the deferred analysis
+    poller) run on their own threads and event loops, so they use a blocking
+    client of their own rather than the per-request async client.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        A connected Upstash (production) or redis-py client
+
+    Raises:
+        Exception: If the client can't be created or Redis is unreachable
+    """
+    redis_url = app.config.get('REDIS_URL') or 'redis://localhost:6379'
+    if os.environ.get('RENDER'):
+        from upstash_redis import Redis as UpstashRedis
+        return UpstashRedis(url=redis_url, token=app.config.get('REDIS_TOKEN'))
+    from redis import Redis
+    client = Redis.from_url(redis_url, decode_responses=True, socket_timeout=5.0, socket_keepalive=True)
+    client.ping()
+    return client
+
 def init_redis_client(app):
     """Initialize Redis client with appropriate configuration.
     
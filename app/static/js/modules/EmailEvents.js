@@ -463,6 +463,20 @@ export const EmailEvents = {
             this._updateLoadingIndicators(progress, message);
         });
         
+        // Partial analysis of an email whose batch is still running
+        source.addEventListener('partial', (event) => {
+            const data = JSON.parse(event.data);
+
+            // Show what the model has produced so far for this email
+            const label = data.category ? `${data.category}: ` : '';
+            const summary = data.summary ? data.summary : (data.subject || '');
+            const message = `Analyzing "${data.subject || data.id}" - ${label}${summary}`;
+            this._updateLoadingIndicators(
+                Math.min(85, 50 + Math.floor((EmailState.emails.length / Math.max(1, this.newEmails + this.cachedEmails)) * 35)),
+                message.length > 160 ? `${message.slice(0, 157)}...` : message
+            );
+        });
+
         // Batch of emails
         source.addEventListener('batch', (event) => {
             const data = JSON.parse(event.data);
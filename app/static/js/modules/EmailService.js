@@ -114,14 +114,8 @@ export const EmailService = {
             const data = await response.json();
 
             if (data.success) {
-                // Show success message with information about which method was used
-                let successMessage = 'Email sent successfully';
-                if (data.sent_via === 'gmail_api') {
-                    successMessage += ' via your Gmail account';
-                } else {
-                    successMessage += ' via Beacon mail server';
-                }
-                showToast(successMessage, 'success');
+                // The server queues the email and delivers it in the background
+                showToast('Email queued for delivery', 'success');
                 
                 // Reset form
                 window.editor.setData('');
@@ -130,6 +124,10 @@ export const EmailService = {
                 if (originalEmailId) {
                     EmailUI.updateEmailItemUI(originalEmailId);
                 }
+                
+                if (data.tracking_id) {
+                    EmailService.trackDelivery(data.tracking_id);
+                }
             } else {
                 throw new Error(data.message || 'Failed to send email');
             }
@@ -143,5 +141,39 @@ export const EmailService = {
                 sendButton.innerHTML = '<svg class="button-icon" viewBox="0 0 24 24" width="18" height="18"><path d="M2.01 21L23 12 2.01 3 2 10l15 2-15 2z" fill="currentColor"></path></svg> Send';
             }
         }
+    },
+
+    /**
+     * Polls the delivery status of a queued email until it is sent or fails.
+     * Shows a toast with the final outcome.
+     *
+     * @param {string} trackingId Tracking ID returned by the send endpoint
+     * @param {number} [intervalMs=2000] Delay between status checks
+     * @param {number} [maxChecks=30] Number of checks before giving up
+     * @return {Promise<string|null>} The final status, or null if still pending
+     */
+    async trackDelivery(trackingId, intervalMs = 2000, maxChecks = 30) {
+        for (let i = 0; i < maxChecks; i++) {
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+            try {
+                const response = await fetch(`/email/api/emails/send_status/${encodeURIComponent(trackingId)}`);
+                if (!response.ok) {
+                    return null;
+                }
+                const data = await response.json();
+                if (data.status === 'sent') {
+                    const via = data.sent_via === 'gmail_api' ? 'your Gmail account' : 'Beacon mail server';
+                    showToast(`Email sent successfully via ${via}`, 'success');
+                    return data.status;
+                }
+                if (data.status === 'failed') {
+                    showToast(`Failed to send email: ${data.error || 'unknown error'}`, 'error');
+                    return data.status;
+                }
+            } catch (error) {
+                console.warn('Failed to check email delivery status:', error);
+            }
+        }
+        return null;
     }
-}; 
\ No newline at end of file
+};
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""HTML-to-Text Benchmark Script
+
+This script compares the single-pass html_to_text converter against the two
+multi-pass regex implementations it replaced, on synthetic marketing-style
+HTML (nested layout tables, inline styles, large style blocks, tracking
+pixels, entities and long whitespace runs).
+
+Example usage:
+    # Default benchmark (200 KB document, 20 repetitions)
+    python scripts/benchmark_html_to_text.py
+
+    # Larger document with a character budget, as used for LLM prompts
+    python scripts/benchmark_html_to_text.py --size-kb 1000 --max-chars 16000
+"""
+
+import argparse
+import html
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.email.parsing.utils.html_utils import html_to_text
+
+
+def legacy_parsing_strip_html(html_content: str) -> str:
+    """Previous app.email.parsing.utils.html_utils.strip_html implementation."""
+    text = html_content
+    text = re.sub(r'<br[^>]*>', '\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'<\/p>\s*<p[^>]*>', '\n\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'<\/div>\s*<div[^>]*>', '\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'<[^>]*>', '', text)
+    for entity, char in {'&nbsp;': ' ', '&lt;': '<', '&gt;': '>', '&amp;': '&', '&quot;': '"',
+                         '&apos;': "'", '&#39;': "'", '&mdash;': '—', '&ndash;': '–', '&hellip;': '…'}.items():
+        text = text.replace(entity, char)
+    text = re.sub(r'&#(\d+);', lambda m: chr(int(m.group(1))), text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def legacy_semantic_strip_html(html_content: str) -> str:
+    """Previous app.email.analyzers.semantic.utilities.text_processor.strip_html implementation."""
+    text = html.unescape(html_content)
+    text = re.sub(r'<script.*?</script>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<style.*?</style>', '', text, flags=re.DOTALL | re.IGNORECASE)
+    text = re.sub(r'<br[^>]*>', '\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'</p>', '\n\n', text, flags=re.IGNORECASE)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = text.replace('&nbsp;', ' ').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    text = re.sub(r'[ \t]+', ' ', text)
+    text = re.sub(r' *\n *', '\n', text)
+    lines = [line.strip() for line in text.splitlines()]
+    text = '\n'.join(line for line in lines if line)
+    return text.strip()
+
+
+def build_marketing_html(size_kb: int) -> str:
+    """Build a synthetic marketing email of roughly size_kb kilobytes.
+
+    Args:
+        size_kb: Approximate document size in kilobytes
+
+    Returns:
+        str: HTML document
+    """
+    style = "<style>" + "".join(
+        f".c{i} {{ color: #{i % 999:03d}; padding: {i % 20}px; }}\n" for i in range(300)
+    ) + "</style>"
+    block = (
+        '<table role="presentation" width="100%" cellpadding="0" cellspacing="0" border="0">\n'
+        '  <tr>\n    <td class="c1" style="font-family: Arial, sans-serif; font-size: 14px;">\n'
+        '      <p>Save&nbsp;up&nbsp;to&nbsp;50%&nbsp;&mdash; this week only &amp; while supplies last.</p>\n'
+        + ' ' * 400 + '\n' + '\t' * 50 + '\n'
+        '      <p>Shop the collection&hellip; <a href="https://example.com/?utm_source=email">Shop now</a></p>\n'
+        '      <img src="https://example.com/pixel.gif" width="1" height="1" alt="">\n'
+        + '\n' * 40 +
+        '    </td>\n  </tr>\n</table>\n'
+    )
+    head = f"<!DOCTYPE html><html><head><title>Offer</title>{style}</head><body>"
+    body = []
+    size = len(head)
+    while size < size_kb * 1024:
+        body.append(block)
+        size += len(block)
+    return head + ''.join(body) + "<script>track();</script></body></html>"
+
+
+def time_call(func, *args, repeat: int = 20) -> float:
+    """Return the median wall time of func(*args) in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Benchmark HTML-to-text conversion")
+    parser.add_argument('--size-kb', type=int, default=200, help="Document size in KB")
+    parser.add_argument('--repeat', type=int, default=20, help="Repetitions per implementation")
+    parser.add_argument('--max-chars', type=int, default=16000, help="Character budget for the budgeted run")
+    args = parser.parse_args()
+
+    document = build_marketing_html(args.size_kb)
+    print(f"Document: {len(document) / 1024:.0f} KB, {args.repeat} repetitions (median)\n")
+
+    rows = [
+        ("legacy parsing strip_html", lambda: legacy_parsing_strip_html(document)),
+        ("legacy semantic strip_html", lambda: legacy_semantic_strip_html(document)),
+        ("html_to_text", lambda: html_to_text(document)),
+        (f"html_to_text (max_chars={args.max_chars})", lambda: html_to_text(document, args.max_chars)),
+    ]
+    for name, func in rows:
+        output = func()
+        print(f"{name:<42} {time_call(func, repeat=args.repeat):9.2f} ms   {len(output):>8} chars")
+
+
+if __name__ == '__main__':
+    main()
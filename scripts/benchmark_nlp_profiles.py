@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""SpaCy Pipeline Profile Benchmark Script
+
+This script compares the full, fast and minimal spaCy pipeline profiles on
+the demo email corpus. For each profile it reports throughput (documents per
+second, median of several runs through ContentAnalyzer in throughput mode) and
+agreement with the full profile on the features used downstream: entities,
+key phrases, question counts and deadline detection.
+
+Profiles whose model is not installed are reported as unavailable; the
+minimal profile needs no trained model.
+
+Example usage:
+    # Default benchmark (demo corpus repeated 10 times, 5 runs per profile)
+    python scripts/benchmark_nlp_profiles.py
+
+    # Larger corpus
+    python scripts/benchmark_nlp_profiles.py --repeat-corpus 50 --runs 3
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.demo.data import get_demo_email_bodies
+from app.email.analyzers.content.core.nlp_analyzer import ContentAnalyzer, THROUGHPUT_MODE
+from app.email.analyzers.content.utils.spacy_utils import NLP_PROFILES, PROFILE_FULL
+from app.email.parsing.normalized_text import NormalizedText
+
+
+def jaccard(a: set, b: set) -> float:
+    """Jaccard similarity of two sets, 1.0 when both are empty."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def agreement(results: List[Dict], reference: List[Dict]) -> Dict[str, float]:
+    """Compare a profile's results with the full profile's.
+
+    Args:
+        results: Results of the profile under test
+        reference: Results of the full profile for the same texts
+
+    Returns:
+        Dict[str, float]: Mean agreement per feature (0-1)
+    """
+    pairs = list(zip(results, reference))
+    return {
+        'entities': sum(jaccard(set(r['entities']), set(f['entities'])) for r, f in pairs) / len(pairs),
+        'key_phrases': sum(jaccard(set(r['key_phrases']), set(f['key_phrases'])) for r, f in pairs) / len(pairs),
+        'questions': sum(r['questions']['question_count'] == f['questions']['question_count']
+                         for r, f in pairs) / len(pairs),
+        'deadline': sum(r['time_sensitivity']['has_deadline'] == f['time_sensitivity']['has_deadline']
+                        for r, f in pairs) / len(pairs),
+    }
+
+
+def run_profile(profile: str, texts: List[NormalizedText], runs: int) -> Optional[Dict]:
+    """Analyze the corpus with one profile.
+
+    Args:
+        profile: Pipeline profile name
+        texts: Corpus texts
+        runs: Number of timed runs
+
+    Returns:
+        Dict with docs_per_second and results, or None if the model is unavailable
+    """
+    try:
+        analyzer = ContentAnalyzer(mode=THROUGHPUT_MODE, profile=profile)
+    except OSError as e:
+        print(f"{profile:<8} unavailable: {e}")
+        return None
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = loop.run_until_complete(analyzer.analyze_batch(texts))  # Warm-up
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            loop.run_until_complete(analyzer.analyze_batch(texts))
+            timings.append(time.perf_counter() - start)
+    finally:
+        loop.close()
+    timings.sort()
+    return {'docs_per_second': len(texts) / timings[len(timings) // 2], 'results': results}
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description="Compare spaCy pipeline profiles")
+    parser.add_argument('--repeat-corpus', type=int, default=10, help="Times the demo corpus is repeated")
+    parser.add_argument('--runs', type=int, default=5, help="Timed runs per profile")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    bodies = list(get_demo_email_bodies().values())
+    texts = [NormalizedText(body) for body in bodies] * args.repeat_corpus
+    print(f"Corpus: {len(bodies)} demo emails x {args.repeat_corpus} = {len(texts)} documents, "
+          f"{args.runs} runs (median)\n")
+
+    measured = {profile: run_profile(profile, texts, args.runs) for profile in NLP_PROFILES}
+    reference = measured.get(PROFILE_FULL)
+
+    print(f"\n{'profile':<8} {'docs/s':>9} {'entities':>9} {'phrases':>9} {'questions':>10} {'deadline':>9}")
+    for profile, data in measured.items():
+        if data is None:
+            continue
+        if reference is None:
+            print(f"{profile:<8} {data['docs_per_second']:9.1f}   (no full-profile reference for quality)")
+            continue
+        scores = agreement(data['results'], reference['results'])
+        print(f"{profile:<8} {data['docs_per_second']:9.1f} {scores['entities']:9.2f} {scores['key_phrases']:9.2f} "
+              f"{scores['questions']:10.2f} {scores['deadline']:9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""Local Classifier Training Script
+
+This script trains the local classifier (hashed n-gram features with a linear
+model) from the category and needs_action labels the LLM assigned to cached
+emails, evaluates it on a held-out split and saves it as a versioned artifact.
+
+The evaluation reports agreement with the LLM on both labels and, for the
+fast path gate used at run time, the fraction of LLM calls avoided and the
+agreement on the emails it would settle. The report is stored in the
+artifact's metadata.
+
+Emails are read from the Redis email cache (REDIS_URL) or from a JSON Lines
+file of ProcessedEmail records. Point LOCAL_CLASSIFIER_PATH at the artifact
+to enable the fast path.
+
+Example usage:
+    # Train from the Redis cache
+    python scripts/train_local_classifier.py
+
+    # Train from an export, with a stricter fast path gate
+    python scripts/train_local_classifier.py --input emails.jsonl --threshold 0.95
+
+    # Evaluate an existing artifact only
+    python scripts/train_local_classifier.py --input emails.jsonl --evaluate instance/classifiers/local-classifier-20260101000000.npz
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.email.models.processed_email import ProcessedEmail
+from app.email.analyzers.semantic.classifier import (
+    HashedFeaturizer, LocalClassifier, LocalFastPath, DEFAULT_FAST_PATH_THRESHOLD,
+    examples_from_emails, split_examples, train_classifier, evaluate_fast_path
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = os.path.join('instance', 'classifiers')
+
+
+def load_emails_from_file(path: str) -> List[ProcessedEmail]:
+    """Load ProcessedEmail records from a JSON Lines file.
+
+    Args:
+        path: File with one ProcessedEmail JSON object per line
+
+    Returns:
+        List[ProcessedEmail]: The records that could be read
+    """
+    emails = []
+    with open(path, encoding='utf-8') as records:
+        for line in records:
+            if not line.strip():
+                continue
+            try:
+                emails.append(ProcessedEmail(**json.loads(line)))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable record: {e}")
+    return emails
+
+
+async def load_emails_from_cache(limit: Optional[int]) -> List[ProcessedEmail]:
+    """Load the cached emails of all users from Redis.
+
+    Args:
+        limit: Maximum number of emails to read
+
+    Returns:
+        List[ProcessedEmail]: The cached emails
+    """
+    from redis.asyncio import Redis
+    from app.email.storage.redis_cache import RedisEmailCache
+
+    client = Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379'), decode_responses=True)
+    try:
+        return await RedisEmailCache(lambda: client).get_all_emails(limit)
+    finally:
+        await client.close()
+
+
+def print_report(report: Dict, threshold: float) -> None:
+    """Print an evaluation report.
+
+    Args:
+        report: Report from evaluate_fast_path
+        threshold: Fast path confidence threshold used
+    """
+    print(f"\nHoldout emails: {report['emails']}")
+    print(f"Category agreement with LLM:     {report['category_agreement']:.1%}")
+    print(f"needs_action agreement with LLM: {report['needs_action_agreement']:.1%}")
+    print(f"LLM calls avoided (threshold {threshold}): {report['calls_avoided']} "
+          f"({report['calls_avoided_rate']:.1%}), agreement on those {report['avoided_agreement']:.1%}")
+    print(f"\n{'LLM category':<15} {'emails':>8} {'agreement':>10} {'avoided':>8}")
+    for category, stats in report['per_category'].items():
+        print(f"{category:<15} {stats['emails']:>8} {stats['agreement']:>10.1%} {stats['avoided']:>8}")
+
+
+def main() -> int:
+    """Train or evaluate the local classifier.
+
+    Returns:
+        int: 0 for success, 1 for error
+    """
+    parser = argparse.ArgumentParser(description="Train the local classifier from cached LLM labels")
+    parser.add_argument('--input', help="JSON Lines file of ProcessedEmail records (default: Redis cache)")
+    parser.add_argument('--limit', type=int, help="Maximum number of cached emails to read")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR, help="Directory of the artifact")
+    parser.add_argument('--evaluate', metavar='ARTIFACT', help="Evaluate an existing artifact instead of training")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_FAST_PATH_THRESHOLD,
+                        help="Fast path confidence threshold to evaluate")
+    parser.add_argument('--holdout', type=float, default=0.2, help="Fraction of emails held out for evaluation")
+    parser.add_argument('--epochs', type=int, default=5, help="Training passes")
+    parser.add_argument('--n-features', type=int, default=2 ** 18, help="Hash buckets")
+    args = parser.parse_args()
+
+    try:
+        emails = load_emails_from_file(args.input) if args.input else asyncio.run(load_emails_from_cache(args.limit))
+        examples = examples_from_emails(emails)
+        logger.info(f"{len(examples)} labeled examples from {len(emails)} emails")
+
+        if args.evaluate:
+            report = evaluate_fast_path(LocalFastPath(LocalClassifier.load(args.evaluate), args.threshold), examples)
+            print_report(report, args.threshold)
+            return 0
+
+        train, holdout = split_examples(examples, args.holdout)
+        classifier = train_classifier(train, HashedFeaturizer(args.n_features), epochs=args.epochs)
+        report = evaluate_fast_path(LocalFastPath(classifier, args.threshold), holdout)
+        print_report(report, args.threshold)
+
+        classifier.metadata['evaluation'] = dict(report, threshold=args.threshold)
+        os.makedirs(args.output_dir, exist_ok=True)
+        path = os.path.join(args.output_dir, f"local-classifier-{classifier.version}.npz")
+        classifier.save(path)
+        print(f"\nSaved {path}")
+        return 0
+    except Exception as e:
+        logger.error(f"Local classifier training failed: {e}")
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
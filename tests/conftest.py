@@ -17,6 +17,7 @@ except Exception as e:
     sys.exit(1)
 
 import pytest
+from unittest.mock import patch
 from app import create_app
 from app.config import Config
 
@@ -44,4 +45,19 @@ def imap_config():
         'server': TestConfig.IMAP_SERVER,
         'email': TestConfig.EMAIL,
         'password': TestConfig.IMAP_PASSWORD
-    }
\ No newline at end of file
+    }
+class CharEncoding:
+    """Character-level stand-in for a tiktoken encoding: one token per character."""
+
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return ''.join(chr(t) for t in tokens)
+
+@pytest.fixture
+def char_encoding():
+    """Make token handlers created during the test use CharEncoding instead of tiktoken."""
+    with patch('app.email.analyzers.semantic.utilities.token_handler.tiktoken.get_encoding',
+               return_value=CharEncoding()) as get_encoding:
+        yield get_encoding.return_value
@@ -0,0 +1,259 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from flask import Flask
+from openai import AsyncOpenAI
+
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.semantic.processors.batch_api import DeferredBatchProcessor
+from app.email.analyzers.semantic.utilities import TokenHandler
+from app.email.models.processed_email import ProcessedEmail
+from app.email.parsing import EmailMetadata
+from app.email.processing.deferred_analysis import DeferredAnalysisPoller, InMemoryDeferredBatchStore
+from app.email.processing.processor import EmailProcessor
+
+
+class BatchServer:
+    """Local stand-in for the OpenAI files and batches endpoints.
+
+    A batch is 'in_progress' on its first status check and 'completed' on the
+    next; requests whose custom_id contains 'fail' get a 500 response.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.batches = {}
+        self.requests = []
+        self.app = web.Application()
+        self.app.add_routes([
+            web.post('/v1/files', self.create_file),
+            web.get('/v1/files/{file_id}/content', self.file_content),
+            web.post('/v1/batches', self.create_batch),
+            web.get('/v1/batches/{batch_id}', self.retrieve_batch),
+        ])
+
+    def _file(self, content, purpose):
+        file_id = f"file-{len(self.files) + 1}"
+        self.files[file_id] = content
+        return {'id': file_id, 'object': 'file', 'bytes': len(content), 'created_at': int(time.time()),
+                'filename': f'{file_id}.jsonl', 'purpose': purpose, 'status': 'processed'}
+
+    async def create_file(self, request):
+        form = await request.post()
+        return web.json_response(self._file(form['file'].file.read(), form['purpose']))
+
+    async def file_content(self, request):
+        return web.Response(body=self.files[request.match_info['file_id']])
+
+    async def create_batch(self, request):
+        body = await request.json()
+        batch_id = f"batch-{len(self.batches) + 1}"
+        self.batches[batch_id] = {
+            'id': batch_id, 'object': 'batch', 'endpoint': body['endpoint'], 'input_file_id': body['input_file_id'],
+            'completion_window': body['completion_window'], 'status': 'validating', 'created_at': int(time.time()),
+            'output_file_id': None, 'error_file_id': None, 'metadata': body.get('metadata'), 'checks': 0
+        }
+        return web.json_response(self._public(self.batches[batch_id]))
+
+    async def retrieve_batch(self, request):
+        batch = self.batches[request.match_info['batch_id']]
+        batch['checks'] += 1
+        if batch['checks'] == 1:
+            batch['status'] = 'in_progress'
+        elif batch['status'] == 'in_progress':
+            self._complete(batch)
+        return web.json_response(self._public(batch))
+
+    def _public(self, batch):
+        return {key: value for key, value in batch.items() if key != 'checks'}
+
+    def _complete(self, batch):
+        lines = []
+        for raw in self.files[batch['input_file_id']].decode().splitlines():
+            request = json.loads(raw)
+            self.requests.append(request)
+            if 'fail' in request['custom_id']:
+                response = {'status_code': 500, 'body': {'error': {'message': 'server error'}}}
+            else:
+                content = json.dumps({'needs_action': True, 'category': 'work', 'action_items': ['Reply'],
+                                      'summary': f"Summary of {request['custom_id']}", 'priority': 80})
+                response = {'status_code': 200, 'body': {
+                    'id': 'chatcmpl-1', 'object': 'chat.completion', 'model': request['body']['model'],
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'stop'}],
+                    'usage': {'prompt_tokens': 1000, 'completion_tokens': 100, 'total_tokens': 1100}}}
+            lines.append(json.dumps({'id': 'req', 'custom_id': request['custom_id'], 'response': response,
+                                     'error': None}))
+        batch['output_file_id'] = self._file('\n'.join(lines).encode(), 'batch_output')['id']
+        batch['status'] = 'completed'
+
+
+class RecordingCache:
+    def __init__(self):
+        self.stored = []
+
+    async def store_many(self, emails, user_email, ttl_days=None):
+        self.stored.extend((user_email, email) for email in emails)
+
+
+@pytest_asyncio.fixture
+async def server():
+    stand_in = BatchServer()
+    runner = web.AppRunner(stand_in.app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    stand_in.client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key='test', max_retries=0)
+    yield stand_in
+    await stand_in.client.close()
+    await runner.cleanup()
+
+
+@pytest.fixture
+def processor_factory(char_encoding):
+    def factory(client):
+        return DeferredBatchProcessor(client, token_handler=TokenHandler())
+    return factory
+
+
+def make_emails(ids, date=datetime(2024, 1, 5, tzinfo=timezone.utc)):
+    return [
+        (EmailMetadata(id=email_id, subject='Review', sender='a@example.com',
+                       body='Can you review the draft by Friday?', date=date),
+         format_nlp_result({'questions': ['Can you review the draft by Friday?']}))
+        for email_id in ids
+    ]
+
+
+def nlp_only(email):
+    return ProcessedEmail(id=email.id, subject=email.subject, sender=email.sender, body=email.body, date=email.date,
+                          priority=30, priority_level='LOW')
+
+
+def build_email(email, nlp_result, llm_result, priority_threshold):
+    return ProcessedEmail(id=email.id, subject=email.subject, sender=email.sender, body=email.body, date=email.date,
+                          summary=llm_result['summary'], category=llm_result['category'],
+                          priority=llm_result['priority'], priority_level='HIGH')
+
+
+async def poll_until_done(processor, batch_id, attempts=5):
+    for _ in range(attempts):
+        batch = await processor.poll(batch_id)
+        if batch is not None:
+            return batch
+    raise AssertionError(f"Batch {batch_id} did not finish")
+
+
+def test_requests_match_live_completion_body(processor_factory):
+    processor = processor_factory(client=None)
+
+    with Flask(__name__).app_context():
+        requests = processor.build_requests(make_emails(['a', 'b', 'a']))
+
+    assert [r['custom_id'] for r in requests] == ['a', 'b']
+    assert requests[0]['url'] == '/v1/chat/completions'
+    assert requests[0]['body']['response_format'] == {'type': 'json_object'}
+    assert 'Can you review the draft by Friday?' in requests[0]['body']['messages'][1]['content']
+    assert len(processor.to_jsonl(requests).splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_results_are_collected_by_the_poller_and_cached(server, processor_factory):
+    processor = processor_factory(server.client)
+    store = InMemoryDeferredBatchStore()
+    cache = RecordingCache()
+    poller = DeferredAnalysisPoller(store, cache, build_email, client=server.client, poll_interval=3600)
+    emails = make_emails(['m1', 'm2', 'fail-3'])
+
+    try:
+        with Flask(__name__).app_context():
+            batch_id = await poller.submit(processor, emails, [nlp_only(email) for email, _ in emails],
+                                           'user@example.com', cache_duration=7)
+        record, = store.pending()
+        assert record['batch_id'] == batch_id
+        assert [entry['email']['id'] for entry in record['emails']] == ['m1', 'm2', 'fail-3']
+
+        # The batch is still running on the first check
+        assert await poller.poll_once() == 0
+        assert cache.stored == []
+        assert await poller.poll_once() == 1
+    finally:
+        poller.stop()
+
+    assert [email.id for _, email in cache.stored] == ['m1', 'm2']
+    assert {user for user, _ in cache.stored} == {'user@example.com'}
+    assert cache.stored[0][1].category == 'Work'
+    assert cache.stored[0][1].summary == 'Summary of m1'
+    assert len(store) == 0
+    assert len(server.requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_cost_uses_batch_price(server, processor_factory):
+    processor = processor_factory(server.client)
+
+    with Flask(__name__).app_context():
+        batch = await poll_until_done(processor, await processor.submit(make_emails(['m1'])))
+        results = await processor.fetch_results(batch)
+
+    assert results['m1']['prompt_tokens'] == 1000
+    assert results['m1']['cost'] == pytest.approx((1000 * 0.00015 + 100 * 0.0006) / 1000 * 0.5)
+
+
+@pytest.mark.asyncio
+async def test_older_emails_of_a_backfill_are_deferred_and_completed_in_the_cache(server, processor_factory):
+    recent = make_emails(['new-1'], date=datetime.now(timezone.utc))
+    old = make_emails(['old-1', 'old-2'], date=datetime.now(timezone.utc) - timedelta(days=30))
+    emails = [old[0], recent[0], old[1]]
+    llm_analyzer = SimpleNamespace(
+        analyze_batch=AsyncMock(return_value=[{'category': 'Personal', 'summary': 'Live', 'model': 'gpt-4o-mini'}]),
+        create_deferred_processor=AsyncMock(return_value=processor_factory(server.client))
+    )
+    priority_calculator = Mock()
+    priority_calculator.score.side_effect = lambda sender, nlp, llm, priority_threshold: (
+        (llm['priority'], 'HIGH') if llm.get('priority') else (30, 'LOW')
+    )
+    processor = EmailProcessor(
+        email_client=None,
+        text_analyzer=SimpleNamespace(analyze_batch=AsyncMock(return_value=[nlp for _, nlp in emails])),
+        llm_analyzer=llm_analyzer,
+        priority_calculator=priority_calculator,
+        parser=None
+    )
+    store = InMemoryDeferredBatchStore()
+    cache = RecordingCache()
+    processor.deferred_analysis = DeferredAnalysisPoller(
+        store, cache, processor.complete_deferred_email, client=server.client, poll_interval=3600,
+        defer_after_days=3, min_emails=2
+    )
+
+    try:
+        with Flask(__name__).app_context():
+            results = await processor.analyze_parsed_emails([email for email, _ in emails],
+                                                            user_email='user@example.com', cache_duration=7)
+
+        # Only the recent email is analyzed live; the others are returned with NLP only
+        assert [email.id for email in results] == ['old-1', 'new-1', 'old-2']
+        assert [email.summary for email in results] == ['No summary available', 'Live', 'No summary available']
+        assert [email.id for email, _ in llm_analyzer.analyze_batch.await_args.args[0]] == ['new-1']
+        assert len(store) == 1
+
+        assert await processor.deferred_analysis.poll_once() == 0
+        assert await processor.deferred_analysis.poll_once() == 1
+    finally:
+        processor.deferred_analysis.stop()
+
+    stored = [email for _, email in cache.stored]
+    assert [email.id for email in stored] == ['old-1', 'old-2']
+    assert stored[0].summary == 'Summary of old-1'
+    assert stored[0].needs_action is True
+    assert (stored[0].priority, stored[0].priority_level) == (80, 'HIGH')
+    assert stored[0].label_source == 'llm'
+    assert len(store) == 0
@@ -0,0 +1,126 @@
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.semantic.processors.batch_processor import BatchProcessor
+from app.email.analyzers.semantic.utilities import TokenHandler
+from app.email.models.exceptions import LLMProcessingError
+from app.email.parsing import EmailMetadata
+
+
+class FakeCompletions:
+    """Answers packed and single prompts; drop_keys are left out of packed answers."""
+
+    def __init__(self, drop_keys=(), malformed=False):
+        self.prompts = []
+        self.drop_keys = set(drop_keys)
+        self.malformed = malformed
+
+    async def create(self, model, messages, **kwargs):
+        prompt = messages[-1]['content']
+        self.prompts.append(prompt)
+        keys = re.findall(r'=== EMAIL \[(E\d+)\] ===', prompt)
+        analysis = {'needs_action': True, 'category': 'Work', 'action_items': [], 'summary': 'S', 'priority': 70}
+        if not keys:
+            content = json.dumps(analysis)
+        elif self.malformed:
+            content = '{"results": [{"email_key": "E1"'
+        else:
+            content = json.dumps({'results': [dict(analysis, email_key=key)
+                                              for key in keys if key not in self.drop_keys]})
+        usage = SimpleNamespace(prompt_tokens=len(prompt) // 4, completion_tokens=50 * max(1, len(keys)))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+
+@pytest.fixture
+def run_batch(char_encoding):
+    app = Flask(__name__)
+
+    async def run(completions, count=6, **kwargs):
+        client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        app.get_openai_client = lambda: client
+        processor = BatchProcessor(TokenHandler(), **kwargs)
+        batch = [
+            (EmailMetadata(id=f'id-{i}', subject=f'Subject {i}', sender='a@example.com',
+                           body=f'Can you review document {i} by Friday?'),
+             format_nlp_result({'questions': [f'Can you review document {i} by Friday?']}))
+            for i in range(count)
+        ]
+        with app.app_context():
+            results, stats = await processor.process_batch_with_stats(batch)
+        return stats, results
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_emails_are_packed_into_fewer_requests(run_batch):
+    completions = FakeCompletions()
+
+    stats, results = await run_batch(completions, count=6, pack_token_budget=100_000, max_pack_size=3)
+
+    assert len(completions.prompts) == 2
+    assert [r['email_id'] for r in results] == [f'id-{i}' for i in range(6)]
+    assert all(r['category'] == 'Work' and r['priority'] == 70 for r in results)
+    assert stats == {'emails': 6, 'requests': 2, 'packed_requests': 2, 'fallback_emails': 0}
+    assert sum(r['prompt_tokens'] for r in results) == sum(len(p) // 4 for p in completions.prompts)
+
+
+@pytest.mark.asyncio
+async def test_packed_prompt_is_smaller_than_individual_prompts(run_batch):
+    packed, individual = FakeCompletions(), FakeCompletions()
+
+    await run_batch(packed, count=8, pack_token_budget=100_000)
+    await run_batch(individual, count=8, pack_emails=False)
+
+    assert len(packed.prompts) == 1
+    assert len(individual.prompts) == 8
+    assert sum(map(len, individual.prompts)) > 3 * sum(map(len, packed.prompts))
+
+
+@pytest.mark.asyncio
+async def test_pack_size_follows_token_budget(run_batch):
+    completions = FakeCompletions()
+
+    large_budget_stats, _ = await run_batch(completions, count=6, pack_token_budget=100_000)
+    small_budget_stats, _ = await run_batch(completions, count=6, pack_token_budget=6000)
+
+    assert large_budget_stats['requests'] == 1
+    assert small_budget_stats['requests'] > 1
+
+
+@pytest.mark.asyncio
+async def test_missing_packed_entries_fall_back_to_single_requests(run_batch):
+    completions = FakeCompletions(drop_keys={'E2'})
+
+    stats, results = await run_batch(completions, count=3, pack_token_budget=100_000)
+
+    assert stats['fallback_emails'] == 1
+    assert len(completions.prompts) == 2
+    assert '=== EMAIL [' not in completions.prompts[-1]
+    assert [r['email_id'] for r in results] == ['id-0', 'id-1', 'id-2']
+
+
+@pytest.mark.asyncio
+async def test_malformed_packed_response_falls_back_for_whole_pack(run_batch):
+    completions = FakeCompletions(malformed=True)
+
+    stats, results = await run_batch(completions, count=3, pack_token_budget=100_000)
+
+    assert stats['fallback_emails'] == 3
+    assert len(completions.prompts) == 4
+    assert all(r['ai_enabled'] for r in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_fails_as_a_whole_only_when_every_request_fails(run_batch):
+    class FailingCompletions(FakeCompletions):
+        async def create(self, model, messages, **kwargs):
+            raise ValueError('bad request')
+
+    with pytest.raises(LLMProcessingError, match='All 3 LLM requests failed: OpenAI API call failed: bad request'):
+        await run_batch(FailingCompletions(), count=3, pack_emails=False)
@@ -0,0 +1,153 @@
+import pytest
+
+from app.email.parsing import BodyReducer, EmailMetadata, ReductionRule
+
+
+@pytest.fixture
+def reducer():
+    return BodyReducer(token_counter=len)
+
+
+def test_reply_history_is_removed(reducer):
+    text = (
+        "Sounds good, see you then.\n\n"
+        "On Mon, Jan 1, 2024 at 10:00 AM Alice Smith <alice@example.com>\n"
+        "wrote:\n"
+        "> Can we meet at 3pm?\n"
+        "> Thanks"
+    )
+
+    result = reducer.reduce_text(text)
+
+    assert result.text == "Sounds good, see you then."
+    assert [span.kind for span in result.removed] == ['quoted_reply']
+    assert 'Can we meet' in result.removed[0].text
+    assert result.tokens_removed == len(result.removed[0].text)
+
+
+def test_inline_quotes_signature_and_footer(reducer):
+    text = "\n".join([
+        "> earlier point",
+        "My answer is yes.",
+        "",
+        "--",
+        "Bob Jones | Acme",
+    ])
+
+    result = reducer.reduce_text(text)
+
+    assert result.text == "My answer is yes."
+    assert [span.kind for span in result.removed] == ['quoted_line', 'signature']
+
+
+def test_section_divider_is_not_taken_for_a_signature(reducer):
+    sections = ["Agenda:", "1. Budget review", "--"] + [f"{n}. Follow-up item" for n in range(2, 12)]
+    text = "\n".join(sections + ["", "--", "Bob Jones | Acme"])
+
+    result = reducer.reduce_text(text)
+
+    assert result.text.endswith("11. Follow-up item")
+    assert [span.text for span in result.removed] == ["--\nBob Jones | Acme"]
+
+
+def test_signature_ends_where_quoted_history_starts(reducer):
+    text = "\n".join(["Works for me.", "", "Sent from my iPhone", "",
+                      "On Mon, Jan 1, 2024 at 10:00 AM Alice <alice@example.com> wrote:"] +
+                     [f"> line {n}" for n in range(20)])
+
+    result = reducer.reduce_text(text)
+
+    assert result.text == "Works for me."
+    assert [span.kind for span in result.removed] == ['signature', 'quoted_reply']
+
+
+def test_footer_only_matched_near_end(reducer):
+    text = "\n".join(["Please unsubscribe me from the old list."] + ["Body line"] * 30 +
+                     ["You are receiving this email because you signed up.", "Unsubscribe here"])
+
+    result = reducer.reduce_text(text)
+
+    assert result.text.startswith("Please unsubscribe me")
+    assert result.removed[0].kind == 'footer'
+    assert result.removed[0].text.startswith("You are receiving this")
+
+
+def test_unsubscribe_mention_in_short_personal_email_is_kept(reducer):
+    text = "\n".join([
+        "Hi Sam,",
+        "I tried to unsubscribe from the club newsletter but it keeps coming.",
+        "Could you check the mailing list settings before Friday?",
+        "The invoice for March is attached as well.",
+        "Thanks,",
+        "Dana",
+    ])
+
+    result = reducer.reduce_text(text)
+
+    assert result.text == text
+    assert result.removed == []
+
+
+def test_forwarded_headers_keep_forwarded_body(reducer):
+    text = "\n".join([
+        "FYI",
+        "---------- Forwarded message ---------",
+        "From: Carol <carol@example.com>",
+        "Date: Tue, Jan 2, 2024",
+        "Subject: Budget",
+        "",
+        "The budget is approved.",
+    ])
+
+    result = reducer.reduce_text(text)
+
+    assert result.text == "FYI\n\nThe budget is approved."
+    assert result.removed[0].kind == 'forwarded_header'
+
+
+def test_fully_quoted_body_is_kept(reducer):
+    text = "> only quoted\n> content"
+
+    result = reducer.reduce_text(text)
+
+    assert result.text == text
+    assert result.removed == []
+
+
+def test_reduce_batch_updates_email_and_stats(reducer):
+    email = EmailMetadata(id='m1', body="<p>Thanks!</p><p>--<br>Sig line</p>")
+    untouched = EmailMetadata(id='m2', body="Nothing to strip")
+    stats = {}
+
+    reducer.reduce_batch([email, untouched], stats)
+
+    assert email.text.clean == "Thanks!"
+    assert email.body == "<p>Thanks!</p><p>--<br>Sig line</p>"
+    assert email.removed_spans[0].dict() == {'kind': 'signature', 'text': '--\nSig line'}
+    assert untouched.removed_spans == []
+    assert stats['body_reduction']['emails_reduced'] == 1
+    assert stats['body_reduction']['tokens_removed_per_email'] == {'m1': len('--\nSig line')}
+
+
+def test_custom_rule_can_be_added(reducer):
+    class TicketNoiseRule(ReductionRule):
+        kind = 'ticket_noise'
+
+        def find(self, lines):
+            return [(i, i + 1) for i, line in enumerate(lines) if line.startswith('##-')]
+
+    reducer.add_rule(TicketNoiseRule())
+    result = reducer.reduce_text("##- Please type your reply above this line -##\nIssue resolved.")
+
+    assert result.text == "Issue resolved."
+    assert result.removed[0].kind == 'ticket_noise'
+
+
+def test_savings_are_counted_with_the_shared_token_handler(char_encoding, monkeypatch):
+    from app.email.analyzers.semantic.utilities import token_handler
+    from app.email.parsing.body_reducer import count_tokens
+
+    monkeypatch.setattr(token_handler, '_default_handlers', {})
+
+    assert count_tokens('Hello <|endoftext|>') == len('Hello <|endoftext|>')
+    assert token_handler.get_token_handler().encoding is char_encoding
@@ -470,4 +470,134 @@ async def test_reconnection_after_failure(imap_config):
         
         # Second attempt should succeed
         await client.connect()
-        mock_instance.login.assert_called()
\ No newline at end of file
+        mock_instance.login.assert_called()
+
+
+def _sync_client(imap_config, store, folder_info, search_results, fetch_response):
+    """Build an EmailConnection wired to a mocked, connected IMAP client."""
+    mock_instance = Mock()
+    mock_instance.select_folder = Mock(return_value=folder_info)
+    mock_instance.search = Mock(side_effect=search_results)
+    mock_instance.fetch = Mock(return_value=fetch_response)
+
+    client = EmailConnection(**imap_config, sync_store=store, max_body_bytes=1024)
+    client._client = mock_instance
+    client._condstore = b'HIGHESTMODSEQ' in folder_info
+    return client, mock_instance
+
+
+def _fetch_data(header, text, size):
+    return {
+        b'BODY[HEADER]': header,
+        b'BODY[TEXT]<0>': text,
+        b'FLAGS': (),
+        b'INTERNALDATE': None,
+        b'RFC822.SIZE': size
+    }
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_fetches_only_new_uids(imap_config):
+    """Tests that a second fetch only requests UIDs above the stored checkpoint."""
+    from app.email.clients.imap.sync_state import SyncStateStore
+
+    store = SyncStateStore()
+    header, text = b'Subject: Hi\r\n\r\n', b'body'
+    client, mock_instance = _sync_client(
+        imap_config, store, {b'UIDVALIDITY': 7},
+        [[10, 11], [11, 12]],
+        {10: _fetch_data(header, text, 100), 11: _fetch_data(header, text, 18)}
+    )
+
+    emails = await client.fetch_emails(days_back=1)
+    assert [e['id'] for e in emails] == [10, 11]
+    assert emails[0]['raw_message'] == header + text
+    assert emails[0]['truncated'] is True
+    assert emails[1]['truncated'] is False
+    assert store.get(imap_config['email']).highest_uid == 11
+
+    mock_instance.fetch.return_value = {12: _fetch_data(header, text, 18)}
+    emails = await client.fetch_emails(days_back=1)
+
+    incremental_criteria = mock_instance.search.call_args_list[1][0][0]
+    assert incremental_criteria[:2] == ['UID', '12:*']
+    assert mock_instance.fetch.call_args[0][0] == [12]
+    assert [e['id'] for e in emails] == [12]
+    assert 'BODY.PEEK[TEXT]<0.1024>' in mock_instance.fetch.call_args[0][1]
+    assert mock_instance.select_folder.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_resets_on_uidvalidity_change(imap_config):
+    """Tests that a changed UIDVALIDITY falls back to a full SINCE search."""
+    from app.email.clients.imap.sync_state import SyncState, SyncStateStore
+
+    store = SyncStateStore()
+    store.set(imap_config['email'], SyncState(uidvalidity=1, highest_uid=500))
+    client, mock_instance = _sync_client(
+        imap_config, store, {b'UIDVALIDITY': 2}, [[3]], {3: _fetch_data(b'', b'', 0)}
+    )
+
+    emails = await client.fetch_emails(days_back=1)
+
+    assert mock_instance.search.call_args[0][0][0] == 'SINCE'
+    assert [e['id'] for e in emails] == [3]
+    assert store.get(imap_config['email']) == SyncState(uidvalidity=2, highest_uid=3)
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync_includes_condstore_changes(imap_config):
+    """Tests that CONDSTORE servers also refetch messages with a newer MODSEQ."""
+    from app.email.clients.imap.sync_state import SyncState, SyncStateStore
+
+    store = SyncStateStore()
+    store.set(imap_config['email'], SyncState(uidvalidity=5, highest_uid=20, highest_modseq=900))
+    client, mock_instance = _sync_client(
+        imap_config, store, {b'UIDVALIDITY': 5, b'HIGHESTMODSEQ': 950},
+        [[20], [4]], {4: _fetch_data(b'', b'', 0)}
+    )
+
+    await client.fetch_emails(days_back=1)
+
+    assert mock_instance.search.call_args_list[1][0][0][:2] == ['MODSEQ', 901]
+    assert mock_instance.fetch.call_args[0][0] == [4]
+    assert store.get(imap_config['email']).highest_modseq == 950
+
+
+class _FakePool:
+    """Hands out the given connections in turn and records releases."""
+
+    def __init__(self, connections):
+        self.connections = list(connections)
+        self.released = []
+
+    def acquire(self):
+        return self.connections.pop(0)
+
+    def release(self, connection, discard=False):
+        self.released.append(connection)
+
+
+@pytest.mark.asyncio
+async def test_folder_status_is_not_reused_across_pooled_connections(imap_config):
+    """Tests that a fetch reads UIDVALIDITY from the connection it runs on."""
+    from app.email.clients.imap.sync_state import SyncStateStore
+
+    store = SyncStateStore()
+    first, second = Mock(), Mock()
+    first.select_folder = Mock(return_value={b'UIDVALIDITY': 1})
+    second.select_folder = Mock(return_value={b'UIDVALIDITY': 2})
+    second.search = Mock(return_value=[])
+    pool = _FakePool([first, second])
+
+    client = EmailConnection(**imap_config, sync_store=store)
+    with patch.object(client, '_get_pool', return_value=pool):
+        await client.connect()
+        await client.close()
+        assert client._folder_info == {}
+
+        await client.connect()
+        await client.fetch_emails(days_back=1)
+
+    assert pool.released == [first]
+    assert store.get(imap_config['email']).uidvalidity == 2
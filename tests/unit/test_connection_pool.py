@@ -0,0 +1,106 @@
+import smtplib
+import pytest
+from flask import Flask
+from unittest.mock import Mock, patch
+
+from app.email.clients import create_imap_client
+from app.email.utils.connection_pool import ConnectionPool, ConnectionPoolTimeout, close_all_pools
+from app.email.processing.sender import EmailSender
+
+
+@pytest.fixture
+def factory():
+    return Mock(side_effect=lambda: Mock(name="conn"))
+
+
+def test_connection_is_reused(factory):
+    pool = ConnectionPool(factory, max_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first is second
+    assert factory.call_count == 1
+    assert pool.size == 1
+
+
+def test_failed_block_discards_connection(factory):
+    closer = Mock()
+    pool = ConnectionPool(factory, closer=closer)
+
+    with pytest.raises(RuntimeError):
+        with pool.connection():
+            raise RuntimeError("boom")
+
+    closer.assert_called_once()
+    assert pool.size == 0
+
+
+def test_stale_connection_is_probed_and_replaced(factory):
+    probe = Mock(return_value=False)
+    pool = ConnectionPool(factory, probe=probe, probe_interval=0)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    probe.assert_called_once_with(first)
+    assert first is not second
+
+
+def test_idle_timeout_closes_connection(factory):
+    closer = Mock()
+    pool = ConnectionPool(factory, closer=closer, idle_timeout=0)
+
+    with pool.connection():
+        pass
+    assert pool.prune() == 1
+    closer.assert_called_once()
+
+
+def test_concurrency_cap(factory):
+    pool = ConnectionPool(factory, max_size=1, acquire_timeout=0.01)
+    conn = pool.acquire()
+
+    with pytest.raises(ConnectionPoolTimeout):
+        pool.acquire()
+
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+
+def test_imap_pool_uses_configured_settings():
+    app = Flask(__name__)
+    app.config.update(MAIL_POOL_MAX_CONNECTIONS=5, MAIL_POOL_IDLE_TIMEOUT=45)
+
+    with app.app_context():
+        client = create_imap_client('imap.example.com', 'me@example.com', 'secret')
+    default = create_imap_client('imap.example.com', 'other@example.com', 'secret')
+
+    try:
+        pool = client._get_pool()
+        assert (pool.max_size, pool.idle_timeout) == (5, 45.0)
+        assert (default.max_connections, default.idle_timeout) == (2, 120.0)
+    finally:
+        close_all_pools()
+
+
+@pytest.mark.asyncio
+async def test_send_many_uses_one_smtp_session():
+    smtp = Mock()
+    with patch('app.email.processing.sender.smtplib.SMTP', return_value=smtp) as smtp_cls:
+        sender = EmailSender('smtp.example.com', 'me@example.com', 'pw', use_pool=False)
+        smtp.sendmail.side_effect = [None, smtplib.SMTPRecipientsRefused({}), None]
+
+        results = await sender.send_many([
+            {'to': f'user{i}@example.com', 'subject': 'Hi', 'content': 'Body'}
+            for i in range(3)
+        ])
+
+    assert results == [True, False, True]
+    assert smtp_cls.call_count == 1
+    smtp.login.assert_called_once()
+    assert smtp.sendmail.call_count == 3
@@ -0,0 +1,99 @@
+import gc
+import threading
+from unittest.mock import patch
+
+import psutil
+import pytest
+import spacy
+
+from app.email.analyzers.content.core import nlp_analyzer
+from app.email.analyzers.content.core.nlp_analyzer import ContentAnalyzer
+
+TEXTS = [
+    "Can you send the report to Alice by Friday? Thanks for your help.",
+    "Our meeting with Acme is moved to Monday. Please confirm.",
+    "Unsubscribe from this newsletter to stop receiving updates.",
+]
+
+
+def small_model():
+    """Blank English pipeline with sentences and a few entities, no model download needed."""
+    nlp = spacy.blank('en')
+    nlp.add_pipe('sentencizer')
+    ruler = nlp.add_pipe('entity_ruler')
+    ruler.add_patterns([
+        {'label': 'PERSON', 'pattern': 'Alice'},
+        {'label': 'ORG', 'pattern': 'Acme'},
+        {'label': 'DATE', 'pattern': [{'LOWER': {'IN': ['friday', 'monday']}}]},
+    ])
+    return nlp
+
+
+@pytest.fixture
+def loader():
+    with patch.object(nlp_analyzer, 'load_optimized_model', side_effect=lambda *a, **k: small_model()) as load:
+        yield load
+
+
+@pytest.mark.asyncio
+async def test_throughput_mode_returns_plain_results(loader):
+    analyzer = ContentAnalyzer(mode='throughput')
+
+    results = await analyzer.analyze_batch(TEXTS)
+
+    assert len(results) == 3
+    assert results[0]['entities'] == {'Alice': 'PERSON', 'Friday': 'DATE'}
+    assert results[0]['questions']['question_count'] == 1
+    assert results[0]['time_sensitivity']['has_deadline'] is True
+    assert results[2]['email_patterns']['is_bulk'] is True
+    for result in results:
+        assert not any(isinstance(value, (set, spacy.tokens.Doc)) for value in result.values())
+
+
+@pytest.mark.asyncio
+async def test_model_reloaded_only_past_rss_watermark(loader):
+    analyzer = ContentAnalyzer(mode='throughput', reload_rss_growth_mb=50)
+    baseline = analyzer._rss_baseline
+
+    with patch.object(analyzer, '_rss_mb', return_value=baseline + 10):
+        for _ in range(5):
+            await analyzer.analyze_batch(TEXTS)
+    assert analyzer.model_reloads == 0
+
+    with patch.object(analyzer, '_rss_mb', return_value=baseline + 60):
+        await analyzer.analyze_batch(TEXTS)
+    assert analyzer.model_reloads == 1
+    assert loader.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_model_reload_runs_off_event_loop_thread(loader):
+    analyzer = ContentAnalyzer(mode='throughput', reload_rss_growth_mb=50)
+    threads = []
+    loader.side_effect = lambda *a, **k: threads.append(threading.current_thread()) or small_model()
+
+    with patch.object(analyzer, '_rss_mb', return_value=analyzer._rss_baseline + 60):
+        await analyzer.analyze_batch(TEXTS)
+
+    assert analyzer.model_reloads == 1
+    assert threads and threads[0] is not threading.main_thread()
+
+
+@pytest.mark.asyncio
+async def test_throughput_mode_memory_stays_flat(loader):
+    analyzer = ContentAnalyzer(mode='throughput', reload_rss_growth_mb=10_000)
+    batch = TEXTS * 20
+    process = psutil.Process()
+
+    for _ in range(5):  # Warm up allocator and string store
+        await analyzer.analyze_batch(batch)
+    gc.collect()
+    before = process.memory_info().rss
+
+    for _ in range(50):
+        await analyzer.analyze_batch(batch)
+    gc.collect()
+    growth_mb = (process.memory_info().rss - before) / (1024 * 1024)
+
+    assert growth_mb < 10, f"RSS grew {growth_mb:.1f}MB over 3000 documents"
+    assert analyzer.model_reloads == 0
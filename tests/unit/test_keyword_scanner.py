@@ -0,0 +1,78 @@
+from unittest.mock import Mock, patch
+
+from app.email.analyzers.content.utils.pattern_matchers import (
+    KEYWORD_SCANNER,
+    KeywordScanner,
+    analyze_sentiment,
+    check_urgency,
+    has_html_indicator,
+    scan_text,
+    scan_texts,
+)
+
+
+def test_shared_and_nested_keywords_flag_every_family():
+    scanner = KeywordScanner({
+        'urgency': ('urgent', 'asap'),
+        'demand': ('must', 'asap'),
+        'positive': ('good',),
+        'agreement': ('sounds good',),
+        'noreply': (r'no[- ]?reply',),
+    })
+
+    assert scanner.scan('reply asap') == {'urgency', 'demand'}
+    assert scanner.scan('that sounds good') == {'positive', 'agreement'}
+    assert scanner.scan('sent from no-reply and noreply') == {'noreply'}
+    assert scanner.scan('goodness, urgently') == set()  # Whole words only
+
+
+def test_scan_text_returns_all_flags_together():
+    flags = scan_text("thanks! we need the signed contract by tomorrow. unsubscribe here")
+
+    assert flags['sentiment'] == analyze_sentiment("thanks! we need the signed contract by tomorrow. unsubscribe here")
+    assert flags['sentiment']['gratitude'] and flags['sentiment']['demand']
+    assert flags['email_patterns'] == {'is_bulk': True, 'is_automated': False}
+    assert flags['is_urgent'] is True
+
+
+def test_deadline_and_time_words_match_whole_words():
+    assert check_urgency("due by tomorrow") is True
+    assert check_urgency("maybe the cobalt order is fine") is False
+
+
+def test_batch_api_matches_single_scans():
+    texts = ["urgent: system notification", "great work, thank you", ""]
+
+    assert scan_texts(texts) == [scan_text(text) for text in texts]
+
+
+def test_html_indicator_detection_is_case_insensitive():
+    assert has_html_indicator("Visit WWW.example.com")
+    assert not has_html_indicator("Quarterly report")
+
+
+def test_long_body_is_scanned_in_one_pass():
+    body = ("the quarterly report for the regional office is attached " * 600)[:30000]
+    pattern = Mock(wraps=KEYWORD_SCANNER.pattern)
+
+    with patch.object(KEYWORD_SCANNER, 'pattern', pattern):
+        scan_text(body)
+        scan_texts([body, body])
+
+    assert pattern.finditer.call_count == 3
+
+
+def test_scan_stops_once_every_family_is_found():
+    scanner = KeywordScanner({'urgency': ('urgent',), 'positive': ('good',)})
+    compiled = scanner.pattern
+    matches = []
+
+    def finditer(text):
+        for match in compiled.finditer(text):
+            matches.append(match)
+            yield match
+
+    with patch.object(scanner, 'pattern', Mock(finditer=finditer)):
+        assert scanner.scan("urgent and good " * 1000) == {'urgency', 'positive'}
+
+    assert len(matches) == 2
@@ -0,0 +1,185 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import openai
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from flask import Flask
+from openai import AsyncOpenAI
+
+from app.email.analyzers.semantic.processors.batch_processor import BatchProcessor
+from app.email.analyzers.semantic.utilities import TokenHandler, create_completion_body
+from app.email.analyzers.semantic.utilities.llm_dispatcher import LLMDispatcher, parse_reset_duration
+from app.email.parsing import EmailMetadata
+
+ANALYSIS = {'needs_action': True, 'category': 'Work', 'action_items': [], 'summary': 'S', 'priority': 70}
+
+
+class CompletionServer:
+    """Local stand-in for the chat completions endpoint.
+
+    Each request pops the next (status, headers) from script; an empty script
+    answers 200. Tracks the highest number of requests handled at once.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.script = []
+        self.headers = {}
+        self.started = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.app = web.Application()
+        self.app.add_routes([web.post('/v1/chat/completions', self.complete)])
+
+    async def complete(self, request):
+        await request.json()
+        self.started.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        status, headers = self.script.pop(0) if self.script else (200, {})
+        if status != 200:
+            return web.json_response({'error': {'message': f'status {status}', 'type': 'error'}},
+                                     status=status, headers=headers)
+        return web.json_response({
+            'id': 'chatcmpl-1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': json.dumps(ANALYSIS)},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 40, 'completion_tokens': 10, 'total_tokens': 50}
+        }, headers={**self.headers, **headers})
+
+
+@pytest_asyncio.fixture
+async def server():
+    stand_in = CompletionServer()
+    runner = web.AppRunner(stand_in.app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    stand_in.client = AsyncOpenAI(base_url=f"http://127.0.0.1:{port}/v1", api_key='test')
+    yield stand_in
+    await stand_in.client.close()
+    await runner.cleanup()
+
+
+BODY = create_completion_body('gpt-4o-mini', 'Analyze this email', 300)
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration('6m0s') == 360
+    assert parse_reset_duration('1.5s') == 1.5
+    assert parse_reset_duration('20ms') == pytest.approx(0.02)
+    assert parse_reset_duration('2') == 2
+    assert parse_reset_duration('soon') is None
+    assert parse_reset_duration(None) is None
+
+
+@pytest.mark.asyncio
+async def test_requests_in_flight_are_bounded(server):
+    server.delay = 0.05
+    dispatcher = LLMDispatcher(max_concurrency=3)
+
+    responses = await asyncio.gather(*[dispatcher.complete(server.client, BODY) for _ in range(10)])
+
+    assert len(responses) == 10
+    assert server.max_in_flight == 3
+    assert dispatcher.stats['requests'] == 10
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_and_server_errors_are_retried(server):
+    server.script = [(429, {'retry-after-ms': '20'}), (503, {})]
+    dispatcher = LLMDispatcher(base_delay=0.01)
+
+    response = await dispatcher.complete(server.client, BODY)
+
+    assert json.loads(response.choices[0].message.content) == ANALYSIS
+    assert len(server.started) == 3
+    assert server.started[1] - server.started[0] >= 0.02
+    assert dispatcher.stats == {'requests': 1, 'retries': 2, 'rate_limited': 1, 'failures': 0}
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(server):
+    server.script = [(400, {})]
+    dispatcher = LLMDispatcher(base_delay=0.01)
+
+    with pytest.raises(openai.BadRequestError):
+        await dispatcher.complete(server.client, BODY)
+
+    assert len(server.started) == 1
+    assert dispatcher.stats['failures'] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_request_releases_its_slot(server):
+    server.delay = 0.5
+    dispatcher = LLMDispatcher(max_concurrency=1)
+
+    for _ in range(2):
+        task = asyncio.create_task(dispatcher.complete(server.client, BODY))
+        while len(server.started) < 1 or dispatcher._in_flight < 1:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert dispatcher._in_flight == 0
+        server.started.clear()
+
+    server.delay = 0.0
+    response = await asyncio.wait_for(dispatcher.complete(server.client, BODY), timeout=2)
+    assert json.loads(response.choices[0].message.content) == ANALYSIS
+
+
+@pytest.mark.asyncio
+async def test_exhausted_budget_in_headers_pauses_admission(server):
+    server.headers = {'x-ratelimit-remaining-requests': '0', 'x-ratelimit-reset-requests': '200ms',
+                      'x-ratelimit-remaining-tokens': '150000'}
+    dispatcher = LLMDispatcher()
+
+    await dispatcher.complete(server.client, BODY)
+    await dispatcher.complete(server.client, BODY)
+
+    assert server.started[1] - server.started[0] >= 0.2
+    assert dispatcher._tokens <= 150000
+
+
+class FailingCompletions:
+    """Answers single prompts, raising for emails whose subject mentions 'fail'."""
+
+    async def create(self, model, messages, **kwargs):
+        if 'Subject: fail' in messages[-1]['content']:
+            raise ValueError("upstream broke")
+        usage = SimpleNamespace(prompt_tokens=100, completion_tokens=20)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(ANALYSIS)))],
+                               usage=usage)
+
+
+@pytest.mark.asyncio
+async def test_failed_email_does_not_discard_batch(char_encoding):
+    app = Flask(__name__)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=FailingCompletions()))
+    app.get_openai_client = lambda: client
+    processor = BatchProcessor(TokenHandler(), pack_emails=False)
+    batch = [
+        (EmailMetadata(id=f'id-{i}', subject=subject, sender='a@example.com', body='Please review the draft.',
+                       date=datetime(2024, 1, 5, tzinfo=timezone.utc)), {})
+        for i, subject in enumerate(['ok one', 'fail two', 'ok three'])
+    ]
+
+    with app.app_context():
+        results = await processor.process_batch(batch)
+
+    assert [result['email_id'] for result in results] == ['id-0', 'id-1', 'id-2']
+    assert results[0]['category'] == 'Work' and results[2]['category'] == 'Work'
+    assert 'upstream broke' in results[1]['error']
+    assert 'category' not in results[1]
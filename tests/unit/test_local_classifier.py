@@ -0,0 +1,130 @@
+import json
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from flask import Flask
+
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.semantic.analyzer import SemanticAnalyzer
+from app.email.analyzers.semantic.utilities import TokenHandler
+from app.email.analyzers.semantic.classifier import (
+    LocalClassifier, LocalFastPath, examples_from_emails, split_examples, train_classifier, evaluate_fast_path
+)
+from app.email.models.processed_email import ProcessedEmail, LABEL_SOURCE_LLM
+from app.email.pipeline.helpers.threads import expand_thread_results
+from app.email.parsing import EmailMetadata
+
+PROMOTION = ('Flash sale: {n}% off everything', 'Deals <deals@shop.example.com>',
+             'Shop now and save {n}% on all items. Limited time offer. Unsubscribe here.')
+WORK = ('Review of contract {n}', 'Alice <alice@acme.com>',
+        'Could you review contract {n} and send me your comments by Friday? Thanks.')
+
+
+def cached_emails(count=40):
+    emails = []
+    for n in range(count):
+        for (subject, sender, body), category, needs_action in [(PROMOTION, 'Promotions', False),
+                                                                  (WORK, 'Work', True)]:
+            emails.append(ProcessedEmail(
+                id=f'{category}-{n}', subject=subject.format(n=n), sender=sender, body=body.format(n=n),
+                date=datetime(2024, 1, 5, tzinfo=timezone.utc), category=category, needs_action=needs_action,
+                summary='LLM summary', label_source=LABEL_SOURCE_LLM
+            ))
+    return emails
+
+
+def test_examples_skip_emails_without_llm_analysis():
+    emails = cached_emails(2)
+    emails[0].summary = 'No summary available'
+
+    examples = examples_from_emails(emails)
+    train, holdout = split_examples(examples, 0.5)
+
+    assert len(examples) == 3 and 'Promotions-0' not in [example.email_id for example in examples]
+    assert sorted(example.email_id for example in train + holdout) == sorted(e.email_id for e in examples)
+    assert split_examples(examples, 0.5) == (train, holdout)
+
+
+def test_examples_skip_local_and_thread_results():
+    emails = cached_emails(1)
+    fast_path_result = ProcessedEmail(id='local-1', subject='Sale', sender='deals@shop.example.com', body='',
+                                      date=datetime(2024, 1, 5, tzinfo=timezone.utc), category='Promotions',
+                                      summary='Sale', label_source='local_classifier')
+    earlier = EmailMetadata(id='earlier-1', subject='Re: Review of contract 0', sender='bob@acme.com',
+                            body='Earlier message', date=datetime(2024, 1, 4, tzinfo=timezone.utc))
+    expanded = expand_thread_results(emails, {emails[1].id: [earlier]})
+
+    examples = examples_from_emails(expanded + [fast_path_result])
+
+    assert sorted(example.email_id for example in examples) == ['Promotions-0', 'Work-0']
+
+
+def test_classifier_learns_llm_labels_and_round_trips(tmp_path):
+    classifier = train_classifier(examples_from_emails(cached_emails()))
+
+    promotion = classifier.predict('Flash sale: 70% off everything', 'Deals <deals@shop.example.com>',
+                                   'Save 70% on all items, limited time. Unsubscribe here.')
+    work = classifier.predict('Review of contract 99', 'Alice <alice@acme.com>',
+                              'Could you review contract 99 and send comments by Friday?')
+    assert (promotion.category, promotion.needs_action) == ('Promotions', False)
+    assert (work.category, work.needs_action) == ('Work', True)
+    assert promotion.confidence > 0.9
+
+    path = str(tmp_path / 'classifier.npz')
+    classifier.save(path)
+    loaded = LocalClassifier.load(path)
+    assert loaded.version == classifier.version and loaded.metadata['examples'] == 80
+    assert np.array_equal(loaded.category_weights, classifier.category_weights)
+    assert loaded.predict('Flash sale: 70% off everything', 'deals@shop.example.com', '') == \
+        classifier.predict('Flash sale: 70% off everything', 'deals@shop.example.com', '')
+
+
+def test_evaluation_reports_agreement_and_calls_avoided():
+    examples = examples_from_emails(cached_emails())
+    fast_path = LocalFastPath(train_classifier(examples), threshold=0.9)
+
+    report = evaluate_fast_path(fast_path, examples)
+
+    assert report['emails'] == 80
+    assert report['category_agreement'] == 1.0 and report['needs_action_agreement'] == 1.0
+    # Only Promotions (without action) may skip the LLM
+    assert report['calls_avoided'] == report['per_category']['Promotions']['avoided'] == 40
+    assert report['calls_avoided_rate'] == 0.5 and report['per_category']['Work']['avoided'] == 0
+
+
+@pytest.mark.asyncio
+async def test_analyzer_skips_llm_for_confident_promotions(tmp_path, char_encoding):
+    path = str(tmp_path / 'classifier.npz')
+    train_classifier(examples_from_emails(cached_emails())).save(path)
+    prompts = []
+
+    class Completions:
+        async def create(self, model, messages, **kwargs):
+            prompts.append(messages[-1]['content'])
+            content = json.dumps({'needs_action': True, 'category': 'Work', 'action_items': [],
+                                  'summary': 'Review the contract', 'priority': 70})
+            usage = SimpleNamespace(prompt_tokens=500, completion_tokens=40, total_tokens=540)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+    app = Flask(__name__)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=Completions()))
+    app.get_openai_client = lambda: client
+    analyzer = SemanticAnalyzer(pack_emails=False, local_classifier_path=path, token_handler=TokenHandler())
+    batch = [
+        (EmailMetadata(id='w', subject='Review of contract 7', sender='alice@acme.com',
+                       body='Could you review contract 7 by Friday?'), format_nlp_result({})),
+        (EmailMetadata(id='p', subject='Flash sale: 30% off everything', sender='deals@shop.example.com',
+                       body='Shop now and save 30% on all items. Unsubscribe here.'), format_nlp_result({})),
+    ]
+
+    with app.app_context():
+        results = await analyzer.analyze_batch(batch)
+
+    assert len(prompts) == 1 and 'Review of contract 7' in prompts[0]
+    assert [result['email_id'] for result in results] == ['w', 'p']
+    assert results[0]['summary'] == 'Review the contract'
+    assert results[1]['model'] == 'local-classifier' and results[1]['category'] == 'Promotions'
+    assert results[1]['cost'] == 0 and not results[1]['needs_action']
+    assert analyzer.fast_path.last_run_stats['avoided'] == 1
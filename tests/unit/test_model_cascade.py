@@ -0,0 +1,112 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, g
+
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.semantic.analyzer import SemanticAnalyzer
+from app.email.analyzers.semantic.utilities import TokenHandler, calculate_cost
+from app.email.parsing import EmailMetadata
+
+TRIAGE = {
+    'Newsletter': {'category': 'Promotions', 'needs_action': False, 'confidence': 0.95},
+    'Contract': {'category': 'Work', 'needs_action': True, 'confidence': 0.9},
+    'Dinner?': {'category': 'Personal', 'needs_action': False, 'confidence': 0.4},
+}
+
+
+class FakeUser:
+    def __init__(self, **settings):
+        self.settings = settings
+
+    def get_setting(self, path, default=None):
+        return self.settings.get(path, default)
+
+
+class ModelCompletions:
+    """Answers by subject; the triage model also reports a confidence."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def create(self, model, messages, max_tokens=None, **kwargs):
+        prompt = messages[-1]['content']
+        subject = prompt.split('Subject: ')[-1].split('\n')[0]
+        self.calls.append((model, subject, max_tokens, '"confidence"' in prompt))
+        analysis = {'action_items': [], 'summary': f'{model} summary', 'priority': 50,
+                    'category': 'Work', 'needs_action': True}
+        if model == 'gpt-4o-mini':
+            analysis.update(TRIAGE[subject])
+        usage = SimpleNamespace(prompt_tokens=1000, completion_tokens=50, total_tokens=1050)
+        message = SimpleNamespace(content=json.dumps(analysis))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+
+def record_runs(cascade):
+    """Collect the stats of each run of the cascade."""
+    runs = []
+    analyze = cascade.analyze_batch_with_stats
+
+    async def recorded(*args, **kwargs):
+        results, stats = await analyze(*args, **kwargs)
+        runs.append(stats)
+        return results, stats
+
+    cascade.analyze_batch_with_stats = recorded
+    return runs
+
+
+@pytest.mark.asyncio
+async def test_cascade_escalates_only_uncertain_work_or_action_emails(char_encoding):
+    app = Flask(__name__)
+    completions = ModelCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    app.get_openai_client = lambda: client
+    analyzer = SemanticAnalyzer(pack_emails=False, cascade_enabled=True, cascade_response_tokens=120,
+                                token_handler=TokenHandler())
+    runs = record_runs(analyzer.cascade)
+    batch = [(EmailMetadata(id=subject, subject=subject, sender='a@example.com', body='Hello there'),
+              format_nlp_result({})) for subject in TRIAGE]
+
+    with app.app_context():
+        g.user = FakeUser(**{'ai_features.model_type': 'gpt-4o'})
+        results = await analyzer.analyze_batch(batch)
+
+    triage_calls = [call for call in completions.calls if call[0] == 'gpt-4o-mini']
+    escalated_calls = [call for call in completions.calls if call[0] == 'gpt-4o']
+    assert all(max_tokens == 120 and asks_confidence for _, _, max_tokens, asks_confidence in triage_calls)
+    assert sorted(subject for _, subject, _, asks_confidence in escalated_calls if not asks_confidence) == \
+        ['Contract', 'Dinner?']
+
+    newsletter, contract, dinner = results
+    assert newsletter['summary'] == 'gpt-4o-mini summary' and not newsletter['cascade']['escalated']
+    assert contract['summary'] == 'gpt-4o summary'
+    assert contract['cascade']['reasons'] == ['category', 'needs_action']
+    assert dinner['cascade']['reasons'] == ['low_confidence'] and dinner['cascade']['triage_confidence'] == 0.4
+    # An escalated email pays for both requests
+    assert dinner['cost'] == pytest.approx(calculate_cost('gpt-4o', 1000, 50)[2] + calculate_cost('gpt-4o-mini', 1000, 50)[2])
+
+    [stats] = runs
+    assert stats['emails'] == 3 and stats['escalated'] == 2
+    assert stats['escalation_rate'] == pytest.approx(2 / 3)
+    assert stats['reasons'] == {'category': 1, 'needs_action': 1, 'low_confidence': 1}
+    assert stats['total_cost'] < stats['single_model_cost']
+
+
+@pytest.mark.asyncio
+async def test_cascade_is_skipped_when_user_model_is_the_triage_model(char_encoding):
+    app = Flask(__name__)
+    completions = ModelCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    app.get_openai_client = lambda: client
+    analyzer = SemanticAnalyzer(pack_emails=False, cascade_enabled=True, token_handler=TokenHandler())
+    runs = record_runs(analyzer.cascade)
+    batch = [(EmailMetadata(id='n', subject='Newsletter', sender='a@example.com', body='Hi'), format_nlp_result({}))]
+
+    with app.app_context():
+        g.user = FakeUser(**{'ai_features.model_type': 'gpt-4o-mini'})
+        results = await analyzer.analyze_batch(batch)
+
+    assert len(completions.calls) == 1 and not completions.calls[0][3]
+    assert 'cascade' not in results[0] and runs == [{}]
@@ -0,0 +1,43 @@
+import pytest
+
+from app.email.analyzers.content.core.nlp_analyzer import ContentAnalyzer
+from app.email.analyzers.content.utils.pattern_matchers import extract_key_phrases_regex
+from app.email.analyzers.content.utils.spacy_utils import load_optimized_model, validate_profile
+
+
+def test_regex_key_phrases_split_at_stopwords_and_punctuation():
+    phrases = extract_key_phrases_regex(
+        "Please send the quarterly budget report to Alice. Project kickoff, then lunch.", limit=5
+    )
+
+    assert [p['text'] for p in phrases] == ['quarterly budget report', 'Project kickoff']
+    assert phrases[0]['root'] == 'report'
+    assert phrases[0]['start'] == 16
+
+
+def test_minimal_profile_needs_no_trained_model():
+    nlp = load_optimized_model(profile='minimal')
+
+    doc = nlp("First sentence. Second one?")
+
+    assert nlp.pipe_names == ['sentencizer']
+    assert len(list(doc.sents)) == 2
+
+
+def test_unknown_profile_rejected():
+    assert validate_profile('FAST') == 'fast'
+    with pytest.raises(ValueError):
+        validate_profile('turbo')
+
+
+@pytest.mark.asyncio
+async def test_analyzer_adapts_features_to_minimal_profile():
+    analyzer = ContentAnalyzer(mode='throughput', profile='minimal')
+
+    result = (await analyzer.analyze_batch(["Could you review the vendor contract draft? It is urgent."]))[0]
+
+    assert result['key_phrases'] == ['vendor contract draft']
+    assert result['questions']['request_questions'] == ['Could you review the vendor contract draft?']
+    assert result['urgency'] is True
+    assert result['entities'] == {}
+    assert result['structural_elements']['verbs'] == []
@@ -0,0 +1,114 @@
+import textwrap
+import time
+
+import pytest
+
+from app.email.analyzers.content.processing import NLPWorkerError, NLPWorkerPool, SubprocessNLPAnalyzer
+
+# Speaks the worker protocol without SpaCy; exits on a batch containing "crash"
+FAKE_WORKER = textwrap.dedent('''
+    import json, os, sys
+    print(json.dumps({"type": "ready", "pid": os.getpid()}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("cmd") == "shutdown":
+            break
+        if "crash" in request["texts"]:
+            os._exit(3)
+        results = [{"length": len(t), "pid": os.getpid()} for t in request["texts"]]
+        print(json.dumps({"id": request["id"], "results": results}), flush=True)
+''')
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / 'fake_worker.py'
+    path.write_text(FAKE_WORKER)
+    return str(path)
+
+
+@pytest.fixture
+def make_pool(script):
+    pools = []
+
+    def factory(**kwargs):
+        pool = NLPWorkerPool(script_path=script, start_timeout=10, request_timeout=10, **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.close()
+
+
+def test_worker_is_reused_across_batches(make_pool):
+    pool = make_pool(size=1)
+    pool.start(wait=True)
+
+    first = pool.process(['a', 'bcd'])
+    second = pool.process(['efgh'])
+
+    assert [r['length'] for r in first] == [1, 3]
+    assert second[0]['length'] == 4
+    assert first[0]['pid'] == second[0]['pid']
+    assert pool.restarts == 0
+
+
+def test_worker_restarted_after_max_docs(make_pool):
+    pool = make_pool(size=1, max_docs=2)
+
+    first = pool.process(['a', 'b'])
+    second = pool.process(['c'])
+
+    assert pool.restarts == 1
+    assert first[0]['pid'] != second[0]['pid']
+
+
+def test_worker_restarted_over_rss_ceiling(make_pool):
+    pool = make_pool(size=1, max_rss_mb=1)
+
+    first = pool.process(['a'])
+    second = pool.process(['b'])
+
+    assert pool.restarts >= 1
+    assert first[0]['pid'] != second[0]['pid']
+
+
+def test_crashed_worker_is_replaced_and_batch_retried(make_pool):
+    pool = make_pool(size=1)
+
+    with pytest.raises(NLPWorkerError):
+        pool.process(['crash'])
+    assert pool.restarts == 2  # First attempt and its retry
+
+    assert pool.process(['ok'])[0]['length'] == 2
+
+
+def test_worker_start_failure_is_reported_immediately(tmp_path):
+    script = tmp_path / 'broken_worker.py'
+    script.write_text('import sys\nsys.exit("model not found")\n')
+    pool = NLPWorkerPool(script_path=str(script), start_timeout=120, request_timeout=120)
+
+    started = time.monotonic()
+    with pytest.raises(NLPWorkerError, match='failed to start'):
+        pool.process(['hello'])
+
+    assert time.monotonic() - started < 60  # Well before the 240s acquire timeout
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_analyzer_runs_batches_on_pool(make_pool):
+    analyzer = SubprocessNLPAnalyzer(worker_pool=make_pool(size=1))
+
+    assert [r['length'] for r in await analyzer.analyze_batch(['hello', 'hi'])] == [5, 2]
+
+
+@pytest.mark.asyncio
+async def test_analyzer_returns_errors_when_workers_fail(make_pool):
+    analyzer = SubprocessNLPAnalyzer(worker_pool=make_pool(size=1))
+
+    results = await analyzer.analyze_batch(['hello', 'crash'])
+
+    assert len(results) == 2
+    assert all('error' in r for r in results)
@@ -0,0 +1,130 @@
+import pytest
+from unittest.mock import patch
+
+from app.email.parsing import EmailMetadata, NormalizedText
+from app.email.analyzers.semantic.utilities import TokenHandler, get_token_handler, preprocess_email, preprocess_emails
+
+
+class CountingEncoding:
+    """Character-level stand-in for a tiktoken encoding that counts calls."""
+
+    def __init__(self):
+        self.encode_calls = 0
+        self.encoded_chars = 0
+        self.batches = []
+
+    def encode(self, text):
+        self.encode_calls += 1
+        self.encoded_chars += len(text)
+        return [ord(c) for c in text]
+
+    def encode_ordinary_batch(self, texts, num_threads=8):
+        self.batches.append(len(texts))
+        return [[ord(c) for c in text] for text in texts]
+
+    def decode(self, tokens):
+        return ''.join(chr(t) for t in tokens)
+
+
+@pytest.fixture
+def token_handler():
+    with patch('app.email.analyzers.semantic.utilities.token_handler.tiktoken.get_encoding',
+               return_value=CountingEncoding()):
+        return TokenHandler()
+
+
+def test_views_are_computed_once():
+    text = NormalizedText('<p>Hello&nbsp;<b>World</b></p>')
+
+    with patch('app.email.parsing.normalized_text.html_to_text', wraps=lambda raw, max_chars=None: 'Hello World') as convert:
+        assert text.clean == 'Hello World'
+        assert text.lower == 'hello world'
+        assert text.lower_prefix(5) == 'hello'
+        assert text.clean_prefix(5) == 'Hello'
+
+    assert convert.call_count == 1
+
+
+def test_prefix_converts_only_budget():
+    text = NormalizedText('<div>' + 'word ' * 1000 + '</div>')
+
+    prefix = text.lower_prefix(20)
+
+    assert len(prefix) <= 20
+    assert prefix.startswith('word word')
+    assert text._clean is None  # Full conversion not needed yet
+
+
+def test_email_metadata_creates_text_once():
+    email = EmailMetadata(id='<1@x>', body='<p>Body</p>')
+
+    assert isinstance(email.text, NormalizedText)
+    assert email.text.clean == 'Body'
+    assert 'text' not in repr(email)
+
+
+def test_truncation_is_memoized_and_encodes_once(token_handler):
+    text = NormalizedText('Short body.')
+
+    first = text.truncated(100, token_handler)
+    second = text.truncated(100, token_handler)
+
+    assert first is second
+    assert first.clean == 'Short body.'
+    assert first.token_ids(token_handler.encoding) == [ord(c) for c in 'Short body.']
+    assert token_handler.encoding.encode_calls == 1
+
+
+def test_truncation_ends_at_sentence(token_handler):
+    text = NormalizedText('First sentence here. Second sentence here. Third one is long')
+
+    truncated = text.truncated(50, token_handler)
+
+    assert truncated.clean == 'First sentence here. Second sentence here. [truncated]'
+
+
+def test_preprocess_email_shares_truncated_text(token_handler):
+    email = EmailMetadata(id='1', subject='s', sender='a@b.c', body='<p>Hello there.</p>')
+
+    clean = preprocess_email(email, token_handler, max_tokens=100)
+
+    assert clean.body == 'Hello there.'
+    assert clean.text is email.text.truncated(100, token_handler)
+    assert clean.text.view('prompt_body', str.upper) == 'HELLO THERE.'
+
+
+def test_truncation_encodes_only_budget_prefix(token_handler):
+    body = 'A sentence of filler text. ' * 20000
+
+    truncated = token_handler.truncate_to_tokens(body, 100)
+
+    assert truncated.endswith('. [truncated]') and len(truncated) < 200
+    assert token_handler.encoding.encoded_chars <= 100 * 8
+
+
+def test_prefix_within_budget_is_marked_truncated(token_handler):
+    text = NormalizedText('Short sentence. ' * 100)
+
+    truncated = text.truncated(100, token_handler)
+
+    assert truncated.clean.endswith('. [truncated]')
+    assert len(truncated.clean) <= 100 * 8 + len(' [truncated]')
+
+
+def test_preprocess_emails_encodes_batch_once(token_handler):
+    emails = [EmailMetadata(id=str(i), subject='s', sender='a@b.c', body=f'<p>Body {i}.</p>') for i in range(3)]
+
+    clean = preprocess_emails(emails, token_handler, max_tokens=100)
+
+    assert [email.body for email in clean] == ['Body 0.', 'Body 1.', 'Body 2.']
+    assert token_handler.encoding.batches == [3] and token_handler.encoding.encode_calls == 0
+    assert clean[1].text is emails[1].text.truncated(100, token_handler)
+    assert clean[1].text.token_ids(token_handler) == [ord(c) for c in 'Body 1.']
+
+
+def test_token_handler_is_shared():
+    with patch('app.email.analyzers.semantic.utilities.token_handler._default_handlers', {}), \
+            patch('app.email.analyzers.semantic.utilities.token_handler.tiktoken.get_encoding',
+                  return_value=CountingEncoding()) as get_encoding:
+        assert get_token_handler() is get_token_handler()
+        assert get_encoding.call_count == 1
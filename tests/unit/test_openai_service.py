@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from app.email.analyzers.semantic.utilities import LLMDispatcher, create_completion_body
+from app.services.openai_service import OpenAIClientManager
+
+ANALYSIS = {'category': 'Work', 'summary': 'S'}
+
+
+class CompletionServer:
+    """Local stand-in for the chat completions endpoint that records client connections."""
+
+    def __init__(self):
+        self.peers = []
+        self.app = web.Application()
+        self.app.add_routes([web.post('/v1/chat/completions', self.complete)])
+
+    async def complete(self, request):
+        body = await request.json()
+        self.peers.append(request.transport.get_extra_info('peername'))
+        if body.get('stream'):
+            response = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+            await response.prepare(request)
+            for piece in ('{"category": ', '"Work"}'):
+                chunk = {'id': 'c1', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'gpt-4o-mini',
+                         'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}]}
+                await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            if body.get('stream_options', {}).get('include_usage'):
+                usage = {'id': 'c1', 'object': 'chat.completion.chunk', 'created': 0, 'model': 'gpt-4o-mini',
+                         'choices': [], 'usage': {'prompt_tokens': 10, 'completion_tokens': 4, 'total_tokens': 14}}
+                await response.write(f"data: {json.dumps(usage)}\n\n".encode())
+            await response.write(b"data: [DONE]\n\n")
+            return response
+        return web.json_response({
+            'id': 'c1', 'object': 'chat.completion', 'created': 0, 'model': 'gpt-4o-mini',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': json.dumps(ANALYSIS)},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 10, 'completion_tokens': 5, 'total_tokens': 15}
+        })
+
+
+@pytest_asyncio.fixture
+async def manager():
+    server = CompletionServer()
+    runner = web.AppRunner(server.app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    manager = OpenAIClientManager(api_key='test', base_url=f"http://127.0.0.1:{port}/v1", http2=False)
+    manager.server = server
+    yield manager
+    await asyncio.to_thread(manager.close)
+    await runner.cleanup()
+
+
+async def ask(client, **kwargs):
+    return await client.chat.completions.create(
+        model='gpt-4o-mini', messages=[{'role': 'user', 'content': 'Analyze'}], **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_client_reuses_connection_across_event_loops(manager):
+    client = manager.get_client()
+
+    first = await ask(client)
+    # A route runs its work on a new event loop in another thread
+    second = await asyncio.to_thread(lambda: asyncio.run(ask(manager.get_client())))
+
+    assert json.loads(first.choices[0].message.content) == ANALYSIS
+    assert second.usage.total_tokens == 15
+    assert len(manager.server.peers) == 2
+    assert len(set(manager.server.peers)) == 1
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_read_through_client_loop(manager):
+    stream = await ask(manager.get_client(), stream=True)
+
+    content = ''.join([chunk.choices[0].delta.content or '' async for chunk in stream])
+
+    assert json.loads(content) == {'category': 'Work'}
+
+
+@pytest.mark.asyncio
+async def test_close_stops_loop_and_client_restarts_on_use(manager):
+    await ask(manager.get_client())
+    thread = manager._thread
+
+    await asyncio.to_thread(manager.close)
+
+    assert not thread.is_alive()
+    response = await ask(manager.get_client())
+    assert response.choices[0].message.content
+    assert manager._thread is not thread
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_requests_run_through_persistent_client(manager):
+    dispatcher = LLMDispatcher()
+
+    response = await dispatcher.complete(manager.get_client(), create_completion_body('gpt-4o-mini', 'Analyze', 50))
+
+    assert json.loads(response.choices[0].message.content) == ANALYSIS
+    assert dispatcher.stats['requests'] == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_streams_through_persistent_client(manager):
+    deltas = []
+    body = create_completion_body('gpt-4o-mini', 'Analyze', 50, stream=True)
+
+    response = await LLMDispatcher().complete(manager.get_client(), body, on_content=deltas.append)
+
+    assert deltas == ['{"category": ', '"Work"}']
+    assert json.loads(response.choices[0].message.content) == {'category': 'Work'}
+    assert response.usage.total_tokens == 14
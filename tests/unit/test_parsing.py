@@ -291,4 +291,81 @@ class TestEmailParser:
         metadata = parser.extract_metadata(malformed_multipart)
         assert isinstance(metadata, EmailMetadata)
         assert len(metadata.body.strip()) > 0
-        self._validate_metadata_fields(metadata)
\ No newline at end of file
+        self._validate_metadata_fields(metadata)
+
+class TestWorkerMetadataRecords:
+    """Tests for compact metadata records produced by the Gmail worker."""
+
+    def test_record_selects_body_and_normalizes_date(self):
+        """The worker record keeps only final fields with a UTC date."""
+        from app.email.clients.gmail.worker.email_parser import to_metadata_record
+
+        record = to_metadata_record({
+            'id': 'abc', 'thread_id': 't1', 'from': 'a@example.com', 'to': 'b@example.com',
+            'subject': 'Hi', 'date': '2024-03-01T09:30:00-08:00',
+            'body_text': 'plain', 'body_html': '<p>html</p>', 'headers': {'x': 'y'}
+        })
+
+        assert set(record) == {'id', 'thread_id', 'subject', 'sender', 'body', 'date'}
+        assert record['body'] == '<p>html</p>'
+        assert record['date'] == '2024-03-01T17:30:00+00:00'
+
+    def test_parser_wraps_record_without_reparsing(self, parser):
+        """Records are wrapped into EmailMetadata as-is."""
+        metadata = parser.extract_metadata({
+            'id': 'abc', 'thread_id': 't1', 'subject': 'Hi', 'sender': 'a@example.com',
+            'body': '<p>html</p>', 'date': '2024-03-01T17:30:00+00:00'
+        })
+
+        assert metadata.body == '<p>html</p>'
+        assert metadata.thread_id == 't1'
+        assert metadata.date.utcoffset().total_seconds() == 0
+        assert metadata.date.hour == 17
+
+
+class TestHtmlToText:
+    """Tests for the single-pass HTML-to-text converter."""
+
+    def test_skips_script_and_style_and_keeps_paragraphs(self):
+        """Invisible content is dropped and block structure becomes breaks."""
+        from app.email.parsing.utils.html_utils import html_to_text
+
+        text = html_to_text(
+            "<html><head><style>.a{color:red}</style></head><body>"
+            "<p>Hello&nbsp;<b>World</b></p><script>track()</script>"
+            "<p>Line one<br>Line   two &amp; more</p></body></html>"
+        )
+
+        assert text == "Hello World\n\nLine one\nLine two & more"
+
+    def test_plain_text_is_normalized(self):
+        """Text without markup keeps its paragraph breaks."""
+        from app.email.parsing.utils.html_utils import html_to_text
+
+        assert html_to_text("Hi   there\n\n\n\nRegards,\n  Bob") == "Hi there\n\nRegards,\nBob"
+
+    def test_stops_at_character_budget(self):
+        """Conversion output never exceeds the budget."""
+        from app.email.parsing.utils.html_utils import html_to_text
+
+        text = html_to_text("<div>" + "word " * 10000 + "</div>", max_chars=50)
+
+        assert len(text) <= 50
+        assert text.startswith("word word")
+
+    def test_entities_are_decoded_once(self):
+        """Escaped entities stay escaped after one round of decoding."""
+        from app.email.parsing.utils.html_utils import html_to_text
+
+        assert html_to_text("<p>&amp;lt;b&amp;gt; &mdash; &lt;b&gt;&#160;&hellip;</p>") == "&lt;b&gt; — <b> …"
+
+    def test_budget_matches_full_conversion_prefix(self):
+        """A budgeted conversion of a long document is a prefix of the full text."""
+        from app.email.parsing.utils.html_utils import html_to_text
+
+        block = '<tr><td><p>Offer&nbsp;{0} <a href="x?a=1&amp;b=2">shop</a></p><!-- <p> --></td></tr>'
+        document = "<style>" + ".c{}" * 500 + "</style><table>" + "".join(block.format(i) for i in range(3000)) + "</table>"
+
+        full = html_to_text(document)
+        for max_chars in (1, 40, 500, 5000):
+            assert html_to_text(document, max_chars=max_chars) == full[:max_chars].strip()
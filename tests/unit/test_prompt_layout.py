@@ -0,0 +1,93 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+from flask import Flask, g
+
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.semantic.processors.batch_processor import BatchProcessor
+from app.email.analyzers.semantic.processors.prompt_creator import PromptCreator
+from app.email.analyzers.semantic.utilities import TokenHandler, calculate_cost, get_llm_dispatcher
+from app.email.parsing import EmailMetadata
+
+
+class FakeUser:
+    def __init__(self, **settings):
+        self.settings = settings
+
+    def get_setting(self, path, default=None):
+        return self.settings.get(path, default)
+
+
+def make_email(i):
+    return EmailMetadata(id=f'id-{i}', subject=f'Subject {i}', sender='a@example.com',
+                         body=f'Can you review document {i} by Friday?')
+
+
+@pytest.fixture
+def creator(char_encoding):
+    return PromptCreator(TokenHandler())
+
+
+def test_static_instructions_come_before_email_content(creator):
+    app = Flask(__name__)
+    nlp = format_nlp_result({})
+
+    with app.app_context():
+        first = creator.create_prompt(make_email(1), nlp)
+        second = creator.create_prompt(make_email(2), nlp)
+        prefix = creator.get_template().prefix
+
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert 'OUTPUT FORMAT' in prefix and 'Subject' not in prefix
+    assert first.index('"priority": "integer"') < first.index('Subject: Subject 1')
+
+
+def test_template_is_compiled_once_per_settings_fingerprint(creator):
+    app = Flask(__name__)
+    fingerprints = []
+    with patch.object(PromptCreator, '_templates', {}), \
+            patch.object(PromptCreator, '_compile_template', autospec=True,
+                         side_effect=PromptCreator._compile_template) as compile_template:
+        for summary_length in ['short', 'short', 'long']:
+            with app.app_context():
+                g.user = FakeUser(**{'ai_features.summary_length': summary_length})
+                template = creator.get_template()
+                # Settings are read once per application context
+                assert creator.get_template() is template
+                fingerprints.append(template.fingerprint)
+                packed = creator.create_packed_prompt(['=== EMAIL [E1] ===\n'])
+
+    assert fingerprints[0] == fingerprints[1] != fingerprints[2]
+    assert compile_template.call_count == 2
+    assert packed.startswith(template.packed_prefix) and packed.endswith('=== EMAIL [E1] ===\n')
+    assert 'comprehensive 5-7 sentence summary' in template.prefix
+
+
+@pytest.mark.asyncio
+async def test_cached_tokens_are_reported_from_usage(char_encoding):
+    app = Flask(__name__)
+
+    class CachingCompletions:
+        async def create(self, model, messages, **kwargs):
+            usage = SimpleNamespace(prompt_tokens=2000, completion_tokens=100, total_tokens=2100,
+                                    prompt_tokens_details=SimpleNamespace(cached_tokens=1536))
+            content = json.dumps({'needs_action': False, 'category': 'Work', 'action_items': [],
+                                  'summary': 'S', 'priority': 40})
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=usage)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=CachingCompletions()))
+    app.get_openai_client = lambda: client
+    processor = BatchProcessor(TokenHandler(), pack_emails=False)
+    dispatcher = get_llm_dispatcher()
+    cached_before = dispatcher.cache_stats['cached_tokens']
+
+    with app.app_context():
+        results = await processor.process_batch([(make_email(i), format_nlp_result({})) for i in range(2)])
+
+    assert [result['cached_tokens'] for result in results] == [1536, 1536]
+    assert results[0]['cost'] == pytest.approx(calculate_cost('gpt-4o-mini', 2000, 100, 1536)[2])
+    assert results[0]['cost'] < calculate_cost('gpt-4o-mini', 2000, 100)[2]
+    assert dispatcher.cache_stats['cached_tokens'] - cached_before == 2 * 1536
+    assert 0 < dispatcher.cache_hit_rate <= 1
@@ -0,0 +1,343 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.email.processing.send_queue import (
+    InMemoryOutboundQueue,
+    OutboundQueue,
+    OutboundSender,
+    PermanentSendError,
+    RedisOutboundQueue,
+)
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the synchronous Redis commands the queue uses."""
+
+    def __init__(self):
+        self.lists = {}
+        self.zsets = {}
+        self.values = {}
+
+    def lpush(self, key, value):
+        self.lists.setdefault(key, []).insert(0, value)
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def lmove(self, source, destination, wherefrom, whereto):
+        items = self.lists.get(source)
+        if not items:
+            return None
+        value = items.pop() if wherefrom == 'RIGHT' else items.pop(0)
+        if whereto == 'LEFT':
+            self.lpush(destination, value)
+        else:
+            self.rpush(destination, value)
+        return value
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def lrem(self, key, count, value):
+        items = self.lists.get(key, [])
+        if value in items:
+            items.remove(value)
+            return 1
+        return 0
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    def zadd(self, key, mapping, nx=False, xx=False):
+        zset = self.zsets.setdefault(key, {})
+        for member, score in mapping.items():
+            if not (nx and member in zset) and not (xx and member not in zset):
+                zset[member] = score
+
+    def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    def zrem(self, key, member):
+        return int(self.zsets.get(key, {}).pop(member, None) is not None)
+
+    def zrangebyscore(self, key, low, high):
+        return [member for member, score in self.zsets.get(key, {}).items() if low <= score <= high]
+
+    def zcard(self, key):
+        return len(self.zsets.get(key, {}))
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def delete(self, key):
+        return int(self.values.pop(key, None) is not None)
+
+
+@pytest.fixture
+def queue():
+    return InMemoryOutboundQueue()
+
+
+@pytest.fixture
+def sender(queue):
+    s = OutboundSender(queue, app=None, max_attempts=2, base_delay=0)
+    s.start = Mock()  # Drive jobs by hand instead of the background thread
+    return s
+
+
+def _credentials(minutes=60):
+    expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=minutes)
+    return {'token': 'secret', 'expiry': expiry.isoformat(), 'token_uri': 'https://oauth2.example.com/token',
+            'scopes': ['gmail.send'], 'refresh_token': 'refresh', 'client_id': 'client', 'client_secret': 'shh'}
+
+
+def _message(**overrides):
+    message = {'to': 'a@example.com', 'subject': 'Hi', 'content': '<p>Hello</p>', 'user_id': 7}
+    message.update(overrides)
+    return message
+
+
+def test_queue_interface_is_abstract():
+    with pytest.raises(TypeError):
+        OutboundQueue()
+
+
+def test_submit_queues_job_and_status(sender, queue):
+    tracking_id = sender.submit(_message())
+
+    assert len(queue) == 1
+    assert queue.get_status(tracking_id)['status'] == 'queued'
+    assert queue.get_status(tracking_id)['user_id'] == 7
+    sender.start.assert_called_once()
+
+
+def test_only_the_access_token_is_stored_apart_from_job(sender, queue):
+    credentials = _credentials()
+    sender.submit(_message(user_email='Me@example.com'), credentials=credentials)
+
+    job = queue.dequeue()
+    assert 'credentials' not in job
+    assert 'secret' not in str(job)
+    assert job['credentials_ref'] == job['id']
+    stored = queue.get_credentials(job['credentials_ref'])
+    assert stored == {field: credentials[field] for field in ('token', 'expiry', 'token_uri', 'scopes')}
+
+
+def test_expiring_access_token_is_refreshed_before_queueing(sender, queue):
+    refreshed = {'token': 'fresh', 'expiry': _credentials(minutes=60)['expiry']}
+
+    with patch('app.email.clients.gmail.core.token_cache.token_cache.refresh', return_value=refreshed) as refresh:
+        sender.submit(_message(user_email='me@example.com'), credentials=_credentials(minutes=1))
+
+    assert refresh.call_args.args[1]['refresh_token'] == 'refresh'
+    assert queue.get_credentials(queue.dequeue()['credentials_ref'])['token'] == 'fresh'
+
+
+@pytest.mark.asyncio
+async def test_worker_in_another_process_uses_stored_credentials():
+    client = FakeRedis()
+    submitter = OutboundSender(RedisOutboundQueue(client), app=None)
+    submitter.start = Mock()
+    tracking_id = submitter.submit(_message(user_email='me@example.com'), credentials=_credentials())
+    stored = client.values[f'outbound:credentials:{tracking_id}']
+    assert 'refresh' not in stored and 'shh' not in stored
+    worker_queue = RedisOutboundQueue(client)
+    worker = OutboundSender(worker_queue, app=Mock(config={'GOOGLE_CLIENT_ID': 'client', 'GOOGLE_CLIENT_SECRET': 'shh'}))
+    gmail = Mock(connect=AsyncMock(), send_email=AsyncMock(return_value={'success': True}))
+
+    with patch('app.email.clients.gmail.client_subprocess.GmailClientSubprocess', return_value=gmail):
+        assert await worker.process_job(worker_queue.dequeue()) == 'sent'
+
+    used = gmail.connect.await_args.kwargs['credentials']
+    assert used['token'] == 'secret' and used['refresh_token'] is None
+    assert (used['client_id'], used['client_secret']) == ('client', 'shh')
+    assert worker_queue.get_status(tracking_id)['sent_via'] == 'gmail_api'
+    # The token is deleted once the job is done
+    assert f'outbound:credentials:{tracking_id}' not in client.values
+
+
+@pytest.mark.asyncio
+async def test_expired_credentials_fail_visibly(sender, queue):
+    tracking_id = sender.submit(_message(user_email='me@example.com'), credentials=_credentials())
+    queue._credentials.clear()
+
+    status = await sender.process_job(queue.dequeue())
+
+    assert status == 'failed'
+    assert 'credentials' in queue.get_status(tracking_id)['error']
+
+
+@pytest.mark.asyncio
+async def test_successful_delivery_marks_sent(sender, queue):
+    tracking_id = sender.submit(_message())
+    job = queue.dequeue()
+
+    with patch.object(sender, '_deliver', AsyncMock(return_value='smtp')):
+        status = await sender.process_job(job)
+
+    assert status == 'sent'
+    record = queue.get_status(tracking_id)
+    assert record['status'] == 'sent'
+    assert record['sent_via'] == 'smtp'
+    assert record['attempts'] == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_retried_then_fails(sender, queue):
+    tracking_id = sender.submit(_message())
+    deliver = AsyncMock(side_effect=ConnectionError("reset"))
+
+    with patch.object(sender, '_deliver', deliver):
+        assert await sender.process_job(queue.dequeue()) == 'retrying'
+        assert queue.get_status(tracking_id)['status'] == 'retrying'
+        retry = queue.dequeue()
+        assert retry['attempts'] == 1
+        assert await sender.process_job(retry) == 'failed'
+
+    record = queue.get_status(tracking_id)
+    assert record['status'] == 'failed'
+    assert record['attempts'] == 2
+    assert 'reset' in record['error']
+    assert len(queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_permanent_failure_is_not_retried(sender, queue):
+    tracking_id = sender.submit(_message())
+
+    status = await sender.process_job(queue.dequeue())  # No app, so SMTP is unconfigured
+
+    assert status == 'failed'
+    assert 'not configured' in queue.get_status(tracking_id)['error']
+    assert len(queue) == 0
+
+
+def test_smtp_config_requires_settings():
+    app = Mock()
+    app.config = {'SMTP_SERVER': 'smtp.example.com'}
+    with pytest.raises(PermanentSendError):
+        OutboundSender(InMemoryOutboundQueue(), app=app)._smtp_config()
+
+
+def test_redis_queue_requeues_unacknowledged_job():
+    client = FakeRedis()
+    crashed_worker = RedisOutboundQueue(client, claim_timeout=60)
+    crashed_worker.enqueue({'id': 'job-1', 'to': 'a@example.com'})
+
+    assert crashed_worker.dequeue()['id'] == 'job-1'
+    assert crashed_worker.dequeue() is None  # Claimed, not lost
+    assert client.llen('outbound:processing') == 1
+
+    # The claim expires, the sweep requeues it and another worker picks the job up
+    client.zadd('outbound:claims', {'job-1': time.time() - 61})
+    other_worker = RedisOutboundQueue(client, claim_timeout=60)
+    assert other_worker.dequeue() is None  # Dequeue leaves claims to the sweep
+    other_worker.requeue_stale()
+    job = other_worker.dequeue()
+
+    assert job['id'] == 'job-1'
+    other_worker.ack(job)
+    assert client.llen('outbound:processing') == 0
+    assert client.zcard('outbound:claims') == 0
+
+
+@pytest.mark.asyncio
+async def test_processed_jobs_are_acknowledged():
+    client = FakeRedis()
+    redis_queue = RedisOutboundQueue(client, claim_timeout=0)
+    redis_sender = OutboundSender(redis_queue, app=None, max_attempts=2, base_delay=0)
+    redis_sender.start = Mock()
+    redis_sender.submit(_message())
+    redis_sender.submit(_message())
+
+    with patch.object(redis_sender, '_deliver', AsyncMock(side_effect=['smtp', ConnectionError("reset")])):
+        assert await redis_sender.process_job(redis_queue.dequeue()) == 'sent'
+        assert await redis_sender.process_job(redis_queue.dequeue()) == 'retrying'
+
+    # Nothing is left claimed, so nothing is sent twice
+    assert client.llen('outbound:processing') == 0
+    assert len(redis_queue) == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_consumer_backs_off_until_woken(queue):
+    sender = OutboundSender(queue, app=None, poll_interval=0.01, max_poll_interval=0.04)
+    delays = []
+
+    async def idle(delay):
+        delays.append(delay)
+        if len(delays) == 4:
+            sender.submit(_message())  # Wakes the consumer
+            return True
+        if len(delays) == 6:
+            sender._stop.set()
+        return False
+
+    sender.start = Mock()
+    sender._idle = idle
+    sender.process_job = AsyncMock()
+    await sender._consume()
+
+    assert delays == [0.01, 0.02, 0.04, 0.04, 0.01, 0.02]
+    sender.process_job.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stale_claims_are_swept_on_their_own_timer(queue):
+    sender = OutboundSender(queue, app=None, sweep_interval=0.01)
+    sweeps = []
+
+    def requeue_stale():
+        sweeps.append(time.time())
+        if len(sweeps) == 3:
+            sender._stop.set()
+
+    queue.requeue_stale = requeue_stale
+    await sender._sweep()
+
+    assert len(sweeps) == 3
+
+
+@pytest.mark.asyncio
+async def test_claim_is_renewed_while_a_slow_send_runs():
+    client = FakeRedis()
+    redis_queue = RedisOutboundQueue(client, claim_timeout=0.05)
+    redis_sender = OutboundSender(redis_queue, app=None, heartbeat_interval=0.01)
+    redis_sender.start = Mock()
+    redis_sender.submit(_message())
+    other_worker = RedisOutboundQueue(client, claim_timeout=0.05)
+
+    async def slow_send(job):
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            other_worker.requeue_stale()
+        return 'smtp'
+
+    with patch.object(redis_sender, '_deliver', slow_send):
+        assert await redis_sender.process_job(redis_queue.dequeue()) == 'sent'
+
+    # The send outlived the claim timeout, but the job was never requeued
+    assert len(redis_queue) == 0
+    assert client.zcard('outbound:claims') == 0
+
+
+@pytest.mark.asyncio
+async def test_requeued_copy_of_a_sent_job_is_not_sent_again(sender, queue):
+    tracking_id = sender.submit(_message())
+    job = queue.dequeue()
+    deliver = AsyncMock(return_value='smtp')
+
+    with patch.object(sender, '_deliver', deliver):
+        assert await sender.process_job(job) == 'sent'
+        # The sweep requeued the job before its ack
+        assert await sender.process_job(dict(job)) == 'sent'
+
+    deliver.assert_awaited_once()
+    assert queue.get_status(tracking_id)['attempts'] == 1
@@ -0,0 +1,159 @@
+import asyncio
+import json
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.email.analyzers.semantic.processors.batch_processor import BatchProcessor
+from app.email.analyzers.semantic.processors.partial_parser import PartialResponseParser
+from app.email.analyzers.semantic.utilities import TokenHandler, create_completion_body
+from app.email.analyzers.semantic.utilities.llm_dispatcher import LLMDispatcher
+from app.email.models.analysis_command import AnalysisCommand
+from app.email.parsing import EmailMetadata
+from app.email.pipeline.helpers.processing import drain_partial_results, process_in_batches
+
+SUMMARY = 'Alice asks for the signed contract by Friday so the vendor can start onboarding next week.'
+
+
+def chunks(text, size=6):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class StreamingCompletions:
+    """Streams packed and single answers a few characters per chunk."""
+
+    async def create(self, model, messages, stream=False, **kwargs):
+        prompt = messages[-1]['content']
+        keys = re.findall(r'=== EMAIL \[(E\d+)\] ===', prompt)
+        analysis = {'needs_action': True, 'category': 'Work', 'action_items': ['Sign'], 'summary': SUMMARY,
+                    'priority': 70}
+        if keys:
+            content = json.dumps({'results': [dict(email_key=key, **analysis) for key in keys]})
+        else:
+            content = json.dumps(analysis)
+        assert stream and kwargs['stream_options'] == {'include_usage': True}
+        return self._stream(content)
+
+    async def _stream(self, content):
+        for piece in chunks(content):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece), finish_reason=None)],
+                                  usage=None, id='c1', created=0, model='gpt-4o-mini')
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(prompt_tokens=400, completion_tokens=60,
+                                                                total_tokens=460))
+
+
+def test_parser_reports_fields_as_they_complete():
+    text = json.dumps({'needs_action': False, 'category': 'Work', 'action_items': [{'summary': 'nested'}],
+                       'summary': 'Café "menu" \\ update', 'priority': 40})
+    parser = PartialResponseParser()
+
+    updates = [fields for piece in chunks(text, 5) for _, fields in parser.feed(piece)]
+
+    assert updates[0] == {'needs_action': False}
+    assert updates[1] == {'category': 'Work'}
+    summaries = [fields['summary'] for fields in updates if 'summary' in fields]
+    assert len(summaries) > 2 and summaries[-1] == 'Café "menu" \\ update'
+    assert all(summaries[-1].startswith(summary) for summary in summaries)
+
+
+def test_parser_separates_packed_records():
+    text = json.dumps({'results': [{'email_key': 'E1', 'category': 'Work', 'custom_categories': {'category': 'x'}},
+                                   {'email_key': 'E2', 'category': 'Personal', 'needs_action': True}]})
+    parser = PartialResponseParser(('email_key', 'category', 'needs_action'), record_depth=3)
+
+    records = {}
+    for piece in chunks(text, 4):
+        for record, fields in parser.feed(piece):
+            records.setdefault(record, {}).update(fields)
+
+    assert records == {0: {'email_key': 'E1', 'category': 'Work'},
+                       1: {'email_key': 'E2', 'category': 'Personal', 'needs_action': True}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('pack_emails', [True, False])
+async def test_batch_reports_partials_before_results(pack_emails, char_encoding):
+    app = Flask(__name__)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=StreamingCompletions()))
+    app.get_openai_client = lambda: client
+    processor = BatchProcessor(TokenHandler(), pack_emails=pack_emails, pack_token_budget=100_000)
+    batch = [
+        (EmailMetadata(id=f'id-{i}', subject=f'Contract {i}', sender='alice@example.com',
+                       body='Please sign the contract by Friday.', date=datetime(2024, 1, 5, tzinfo=timezone.utc)), {})
+        for i in range(3)
+    ]
+    partials = []
+
+    with app.app_context():
+        results = await processor.process_batch(batch, on_partial=partials.append)
+
+    assert [result['summary'] for result in results] == [SUMMARY] * 3
+    assert results[0]['prompt_tokens'] > 0
+    for i in range(3):
+        mine = [partial for partial in partials if partial['id'] == f'id-{i}']
+        assert mine[0]['subject'] == f'Contract {i}'
+        assert mine[0]['needs_action'] is True
+        assert any(partial.get('category') == 'Work' and 'summary' not in partial for partial in mine)
+        # The summary is delivered in steps, then complete
+        assert 1 < len([partial for partial in mine if 'summary' in partial]) < len(SUMMARY) // 6
+        assert mine[-1]['summary'] == SUMMARY
+
+
+@pytest.mark.asyncio
+async def test_partials_are_yielded_before_analysis_completes():
+    queue = asyncio.Queue()
+
+    async def analysis():
+        for i in range(3):
+            await asyncio.sleep(0.01)
+            queue.put_nowait({'id': i})
+        return 'done'
+
+    task = asyncio.ensure_future(analysis())
+    seen = []
+    async for partial in drain_partial_results(task, queue):
+        seen.append((partial['id'], task.done()))
+
+    assert [i for i, _ in seen] == [0, 1, 2]
+    assert not seen[0][1]
+    assert task.result() == 'done'
+
+
+@pytest.mark.asyncio
+async def test_disconnected_stream_frees_dispatcher_slot():
+    dispatcher = LLMDispatcher(max_concurrency=1)
+    body = create_completion_body('gpt-4o-mini', 'Analyze this email', 300)
+
+    class Completions:
+        def __init__(self, delay):
+            self.delay = delay
+
+        async def create(self, **kwargs):
+            await asyncio.sleep(self.delay)
+            return SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=10, prompt_tokens=8))
+
+    slow = SimpleNamespace(chat=SimpleNamespace(completions=Completions(60)))
+
+    class Processor:
+        async def analyze_parsed_emails(self, batch, user_id, ai_enabled, on_partial, user_email=None,
+                                        cache_duration=None):
+            on_partial({'id': batch[0].id})
+            return await dispatcher.complete(slow, body)
+
+    stream = process_in_batches([EmailMetadata(id='e1', body='Hi')], AnalysisCommand(batch_size=10),
+                                user_id=1, user_email='u@example.com', ai_enabled=True, cache_duration=1,
+                                stats={}, processor=Processor())
+    assert await stream.__anext__() == {'type': 'partial', 'data': {'id': 'e1'}}
+    assert dispatcher._in_flight == 1
+
+    # The client navigates away: the SSE generator is closed mid-analysis
+    await stream.aclose()
+    await asyncio.sleep(0.01)
+
+    assert dispatcher._in_flight == 0
+    fast = SimpleNamespace(chat=SimpleNamespace(completions=Completions(0)))
+    response = await asyncio.wait_for(dispatcher.complete(fast, body), timeout=2)
+    assert response.usage.total_tokens == 10
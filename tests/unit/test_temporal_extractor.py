@@ -0,0 +1,94 @@
+from unittest.mock import Mock, patch
+
+import pytest
+import spacy
+
+from app.email.analyzers.content.core import nlp_analyzer
+from app.email.analyzers.content.core.nlp_analyzer import ContentAnalyzer
+from app.email.analyzers.content.utils import temporal_extractor
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.content.utils.temporal_extractor import extract_time_sensitivity
+
+
+def test_deadline_with_weekday_and_time():
+    result = extract_time_sensitivity("Hi team. Please send the slides by Friday 3pm. Thanks!")
+
+    assert result['has_deadline'] is True
+    assert result['deadline_phrases'] == ["Please send the slides by Friday 3pm."]
+    assert result['time_references'] == ['Friday', '3pm']
+
+
+@pytest.mark.parametrize('text, reference', [
+    ("Need this EOD please", 'EOD'),
+    ("The invoice is due Jan 5th, 2025.", 'Jan 5th, 2025'),
+    ("Reply within 48 hours to keep your booking.", 'within 48 hours'),
+    ("SUBMIT BEFORE 17:00 UTC", '17:00 UTC'),
+])
+def test_deadline_expressions(text, reference):
+    result = extract_time_sensitivity(text)
+
+    assert result['has_deadline'] is True
+    assert reference in result['time_references']
+
+
+def test_time_reference_without_cue_is_not_deadline():
+    result = extract_time_sensitivity("We met on Monday at 5.30pm. I may come later.")
+
+    assert result['has_deadline'] is False
+    assert result['time_references'] == ['Monday', '5.30pm']
+
+
+def test_cue_words_match_whole_words_only():
+    assert extract_time_sensitivity("Goodbye tomorrow, standby today")['has_deadline'] is False
+
+
+def test_long_text_is_matched_in_one_pass():
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 500
+    pattern = Mock(wraps=temporal_extractor.TEMPORAL_PATTERN)
+
+    with patch.object(temporal_extractor, 'TEMPORAL_PATTERN', pattern), \
+         patch.object(temporal_extractor, '_sentence_bounds') as sentence_bounds:
+        result = extract_time_sensitivity(text)
+
+    assert result['has_deadline'] is False
+    pattern.finditer.assert_called_once_with(text.lower())
+    sentence_bounds.assert_not_called()  # No per-sentence work without a match
+
+
+def test_matching_stops_once_results_are_full():
+    text = "Send it by Friday 3pm, tomorrow or Monday. " * 500
+    compiled = temporal_extractor.TEMPORAL_PATTERN
+    matches = []
+
+    def finditer(lower):
+        for match in compiled.finditer(lower):
+            matches.append(match)
+            yield match
+
+    with patch.object(temporal_extractor, 'TEMPORAL_PATTERN', Mock(finditer=finditer)):
+        result = extract_time_sensitivity(text, max_references=3, max_phrases=1)
+
+    assert result['time_references'] == ['Friday', '3pm', 'tomorrow']
+    assert len(matches) == 3
+
+
+def test_formatter_extracts_from_text_when_worker_result_lacks_it():
+    formatted = format_nlp_result({'urgency': {'has_deadline': False}}, "Send it by tomorrow.")
+
+    assert formatted['time_sensitivity']['has_deadline'] is True
+    assert formatted['time_sensitivity']['time_references'] == ['tomorrow']
+
+
+@pytest.mark.asyncio
+async def test_minimal_profile_reports_deadlines():
+    def blank_model(*args, **kwargs):
+        nlp = spacy.blank('en')
+        nlp.add_pipe('sentencizer')
+        return nlp
+
+    with patch.object(nlp_analyzer, 'load_optimized_model', side_effect=blank_model):
+        analyzer = ContentAnalyzer(mode='throughput', profile='minimal')
+        results = await analyzer.analyze_batch(["Can you review the draft by next Tuesday?"])
+
+    assert results[0]['time_sensitivity']['has_deadline'] is True
+    assert results[0]['time_sensitivity']['time_references'] == ['next Tuesday']
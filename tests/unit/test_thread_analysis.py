@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, Mock
+
+from app.email.models.processed_email import ProcessedEmail
+from app.email.parsing import EmailMetadata
+from app.email.pipeline.helpers.threads import (
+    expand_thread_results,
+    group_by_thread,
+    prepare_thread_analysis,
+    store_thread_summaries,
+)
+
+NOW = datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _email(email_id, thread_id='', minutes=0, body='Body text'):
+    return EmailMetadata(id=email_id, subject='Re: plan', sender='a@example.com', body=body,
+                         date=NOW + timedelta(minutes=minutes), thread_id=thread_id)
+
+
+def _result(email_id, thread_id='t1', summary='Team agreed on Friday launch', priority=50, priority_level='MEDIUM'):
+    return ProcessedEmail(id=email_id, subject='Re: plan', sender='a@example.com', body='',
+                          date=NOW, summary=summary, category='Work', thread_id=thread_id,
+                          priority=priority, priority_level=priority_level)
+
+
+def test_group_by_thread_keeps_newest_per_thread():
+    old, new, single = _email('m1', 't1', 0), _email('m2', 't1', 5), _email('m3')
+
+    leaders, earlier = group_by_thread([new, single, old])
+
+    assert leaders == [new, single]
+    assert earlier == {'m2': [old]}
+
+
+@pytest.mark.asyncio
+async def test_prepare_attaches_compact_context():
+    old, new = _email('m1', 't1', 0, body='Can we launch Friday?'), _email('m2', 't1', 5)
+    cached = [_result('m0', summary='Launch plan proposed')]
+    cache = Mock()
+    cache.get_thread_summaries = AsyncMock(return_value={'t1': {'summary': 'Planning the launch'}})
+    stats = {}
+
+    leaders, earlier = await prepare_thread_analysis([old, new], cached, 'me@example.com', stats, cache)
+
+    assert leaders == [new]
+    assert new.thread_context.startswith('Thread so far: Planning the launch')
+    assert 'Launch plan proposed' in new.thread_context
+    assert 'Can we launch Friday?' in new.thread_context
+    assert old.thread_context == ''
+    assert stats['threads'] == {'analyzed': 1, 'skipped_earlier_messages': 1, 'with_context': 1}
+    cache.get_thread_summaries.assert_awaited_once_with('me@example.com', ['t1'])
+
+
+def test_expand_derives_results_for_earlier_messages():
+    old = _email('m1', 't1', 0)
+
+    expanded = expand_thread_results([_result('m2', priority=85, priority_level='HIGH')], {'m2': [old]})
+
+    assert [email.id for email in expanded] == ['m2', 'm1']
+    assert expanded[1].category == 'Work'
+    assert (expanded[1].priority, expanded[1].priority_level) == (85, 'HIGH')
+    assert expanded[1].summary.endswith('Team agreed on Friday launch')
+
+
+@pytest.mark.asyncio
+async def test_store_thread_summaries_uses_newest_summary():
+    cache = Mock()
+    cache.store_thread_summaries = AsyncMock()
+
+    await store_thread_summaries([_result('m2'), _result('m3', thread_id=None)], 'me@example.com', cache, 7)
+
+    summaries = cache.store_thread_summaries.await_args.args[1]
+    assert list(summaries) == ['t1']
+    assert summaries['t1']['summary'] == 'Team agreed on Friday launch'
+    assert summaries['t1']['latest_email_id'] == 'm2'
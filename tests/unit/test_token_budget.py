@@ -0,0 +1,67 @@
+from flask import Flask
+
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.semantic.processors.prompt_creator import PromptCreator
+from app.email.analyzers.semantic.utilities import TokenHandler, format_cost_stats
+from app.email.analyzers.semantic.utilities.token_budget import BODY_SECTION, MIN_BODY_TOKENS, TokenBudgetAllocator
+from app.email.parsing import EmailMetadata
+
+
+def make_creator(target):
+    return PromptCreator(TokenHandler(), email_token_target=target)
+
+
+def test_allocator_shrinks_and_drops_sections_to_fit_target():
+    allocator = TokenBudgetAllocator(email_token_target=1000)
+
+    budget = allocator.allocate(200, [
+        ('questions', 50, False),
+        (BODY_SECTION, 2000, True),
+        ('thread', 400, True),
+        ('entities', 30, False),
+    ])
+
+    # The body takes what the higher-value sections leave, the rest get nothing
+    assert budget.sections == {'questions': 50}
+    assert budget.body == 750
+    assert budget.dropped == ['thread', 'entities']
+    assert budget.budgeted == 1000
+
+
+def test_allocator_keeps_context_when_body_is_short_or_bulk():
+    allocator = TokenBudgetAllocator(email_token_target=1000)
+
+    short = allocator.allocate(200, [(BODY_SECTION, 80, True), ('thread', 300, True)])
+    bulk = allocator.allocate(200, [(BODY_SECTION, 2000, True), ('thread', 900, True)], category='Promotions')
+
+    assert short.body == 80 and short.sections == {'thread': 300}
+    assert bulk.body == 250
+    assert bulk.shrunk == ['thread'] and bulk.sections['thread'] == 1000 - 200 - 250
+    assert allocator.allocate(950, [(BODY_SECTION, 500, True)]).body == MIN_BODY_TOKENS
+
+
+def test_prompt_leaves_out_empty_sections_and_stays_within_target(char_encoding):
+    app = Flask(__name__)
+    creator = make_creator(target=700)
+    short = EmailMetadata(id='1', subject='Lunch', sender='bob@example.com', body='Lunch at noon?')
+    long = EmailMetadata(id='2', subject='Report', sender='bob@example.com', body='Quarterly numbers are in. ' * 200)
+    nlp = format_nlp_result({})
+
+    with app.app_context():
+        short_prompt, short_budget = creator.create_prompt_with_budget(short, nlp)
+        long_prompt, long_budget = creator.create_prompt_with_budget(long, nlp)
+        static_tokens = creator.get_template().prefix_tokens
+
+    assert 'Key Entities' not in short_prompt and 'Questions:' not in short_prompt
+    assert short_budget.body == len('Lunch at noon?')
+    assert long_budget.body < len(long.body) and long_budget.budgeted <= 700
+    # The budget accounts for the rendered prompt (character encoding: one token per character)
+    assert len(long_prompt) - static_tokens <= long_budget.budgeted
+    assert long_budget.budgeted_prompt_tokens == static_tokens + long_budget.budgeted
+
+
+def test_cost_stats_report_budgeted_next_to_actual_tokens():
+    stats = format_cost_stats('gpt-4o-mini', 1200, 80, budgeted_tokens=1350)
+
+    assert stats['prompt_tokens'] == 1200 and stats['budgeted_prompt_tokens'] == 1350
+    assert 'budgeted_prompt_tokens' not in format_cost_stats('gpt-4o-mini', 1200, 80)
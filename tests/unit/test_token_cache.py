@@ -0,0 +1,77 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+
+from app.email.clients.gmail.core.token_cache import TokenCache, serialize_expiry, parse_expiry
+from app.email.clients.gmail.client_subprocess import GmailClientSubprocess
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def cache():
+    cache = TokenCache(refresh_margin=300)
+    yield cache
+    cache.shutdown()
+
+
+def test_expiry_round_trip():
+    expiry = _utcnow().replace(microsecond=0)
+    assert parse_expiry(serialize_expiry(expiry)) == expiry
+    assert parse_expiry(None) is None
+    assert parse_expiry("not a date") is None
+
+
+def test_update_and_get(cache):
+    expiry = _utcnow() + timedelta(hours=1)
+    assert cache.update("User@Example.com", "tok-1", expiry)
+
+    cached = cache.get("user@example.com")
+    assert cached['token'] == "tok-1"
+    assert parse_expiry(cached['expiry']) == expiry
+
+
+def test_update_keeps_longer_lived_token(cache):
+    later = _utcnow() + timedelta(hours=1)
+    earlier = _utcnow() + timedelta(minutes=30)
+    cache.update("user@example.com", "fresh", later)
+
+    assert not cache.update("user@example.com", "stale", earlier)
+    assert cache.get("user@example.com")['token'] == "fresh"
+
+
+def test_expired_token_is_not_returned(cache):
+    cache.update("user@example.com", "old", _utcnow() - timedelta(seconds=1))
+    assert cache.get("user@example.com") is None
+
+
+def test_needs_refresh(cache):
+    assert cache.needs_refresh(_utcnow() + timedelta(seconds=60))
+    assert not cache.needs_refresh(_utcnow() + timedelta(hours=1))
+    assert not cache.needs_refresh(None)
+
+
+def test_schedule_refresh_runs_once_per_user(cache):
+    creds = {'token': 'old', 'refresh_token': 'refresh', 'token_uri': 'uri',
+             'client_id': 'id', 'client_secret': 'secret', 'scopes': []}
+    with patch.object(cache, '_refresh') as refresh:
+        cache._executor = Mock()
+        assert cache.schedule_refresh("user@example.com", creds)
+        assert not cache.schedule_refresh("user@example.com", creds)
+        assert cache._executor.submit.call_count == 1
+
+    assert not cache.schedule_refresh("other@example.com", {'token': 'x'})
+
+
+def test_worker_refreshed_token_is_written_back():
+    client = GmailClientSubprocess()
+    expiry = serialize_expiry(_utcnow() + timedelta(hours=1))
+    result = {'emails': [], 'refreshed_credentials': {'token': 'new-token', 'expiry': expiry}}
+
+    with patch('app.email.clients.gmail.client_subprocess.token_cache') as cache:
+        client._apply_refreshed_credentials(result, "user@example.com")
+
+    cache.update.assert_called_once_with("user@example.com", 'new-token', expiry)
+    assert 'refreshed_credentials' not in result
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from app.email.analyzers.content.processing import NLPWorkerPool
+from app.email.analyzers.content.utils.result_formatter import format_nlp_result
+from app.email.analyzers.content.utils.wire_format import (
+    WireFormatError,
+    decode_results,
+    dumps,
+    encode_results
+)
+
+RAW_RESULT = {
+    'entities': {
+        'PERSON': [{'text': 'Alice', 'start': 0, 'end': 5}],
+        'ORG': [{'text': 'Acme', 'start': 20, 'end': 24}, {'text': 'Initech', 'start': 30, 'end': 37}]
+    },
+    'key_phrases': [{'text': 'quarterly report', 'start': 8, 'end': 24, 'root': 'report'}],
+    'sentence_count': 2,
+    'questions': ['Can you send it?'],
+    'sentiment': {
+        'is_positive': True,
+        'is_negative': False,
+        'patterns': {'gratitude': True, 'agreement': False, 'dissatisfaction': False, 'demand': True}
+    },
+    'email_type': {'is_bulk': False, 'is_automated': True},
+    'urgency': {'is_urgent': True, 'has_deadline': True},
+    'time_sensitivity': {'has_deadline': True, 'deadline_phrases': ['Send it by Friday.'], 'time_references': ['Friday']},
+    'is_question': True,
+    'error': None
+}
+
+
+def test_round_trip_keeps_every_formatted_field():
+    decoded = decode_results(json.loads(dumps(encode_results([RAW_RESULT]))))[0]
+
+    expected = format_nlp_result(RAW_RESULT)
+    actual = format_nlp_result(decoded)
+    assert actual['entities'] == {'PERSON': ['Alice'], 'ORG': ['Acme', 'Initech']}
+    assert actual['key_phrases'] == ['quarterly report']
+    for field in ('sentence_count', 'urgency', 'sentiment_analysis', 'email_patterns', 'questions', 'time_sensitivity'):
+        assert actual[field] == expected[field]
+
+
+def test_labels_are_interned_and_payload_is_smaller():
+    payload = encode_results([RAW_RESULT] * 100)
+
+    assert payload['labels'] == ['PERSON', 'ORG']
+    assert len(dumps(payload)) * 3 < len(json.dumps([RAW_RESULT] * 100))
+
+
+def test_errors_survive_and_clean_results_have_none():
+    decoded = decode_results(encode_results([RAW_RESULT, {'error': 'boom'}]))
+
+    assert 'error' not in decoded[0]
+    assert decoded[1]['error'] == 'boom'
+
+
+@pytest.mark.parametrize('payload', [
+    {'v': 99, 'labels': [], 'rows': []},
+    {'v': 1, 'labels': [], 'rows': [[0, 1, [0, 'Alice'], [], [], [], [], None]]},
+    {'v': 1, 'labels': [], 'rows': [[0, 1]]},
+])
+def test_invalid_payloads_raise(payload):
+    with pytest.raises(WireFormatError):
+        decode_results(payload)
+
+
+def test_worker_pool_decodes_worker_payloads():
+    pool = NLPWorkerPool(size=1, profile='minimal', start_timeout=60, request_timeout=60)
+    try:
+        results = pool.process(["Please send the report by Friday 3pm. Thanks!", ""])
+    finally:
+        pool.close()
+
+    assert results[0]['time_sensitivity']['has_deadline'] is True
+    assert results[0]['sentiment']['patterns']['gratitude'] is True
+    assert results[1]['sentence_count'] == 0